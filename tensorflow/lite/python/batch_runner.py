@@ -0,0 +1,312 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Runs a TensorFlow Lite model over large batches of samples.
+
+`BatchRunner` scores NumPy arrays whose leading dimension indexes samples.
+
+* If every input of the model has a dynamic leading dimension (`-1` in its
+  `shape_signature`), inputs are resized once per chunk of `max_batch_size`
+  samples, so each `invoke()` processes a whole chunk.
+* Otherwise the model's own leading dimension is used as the chunk size and the
+  chunks are fanned out over a pool of interpreters, one per thread. The last
+  chunk is zero-padded if needed.
+
+`Interpreter.invoke()` releases the GIL, so the threads run in parallel. Outputs
+are copied straight from the interpreters' output buffers into preallocated
+result arrays.
+
+Outputs whose leading dimension is dynamic in their `shape_signature` (or, for
+models with a fixed leading dimension, equal to that of the inputs) are gathered
+per sample. Other outputs, e.g. scalars, are returned as computed for the first
+chunk.
+
+Example usage:
+
+```python
+runner = BatchRunner(model_path="model.tflite", num_interpreters=4)
+scores, = runner.run([images])
+```
+"""
+
+import multiprocessing.pool
+import os
+
+import numpy as np
+
+from tensorflow.lite.python import interpreter as interpreter_lib
+
+
+class BatchRunner:
+  """Runs a TFLite model over batches of samples using several interpreters."""
+
+  def __init__(self,
+               model_path=None,
+               model_content=None,
+               num_interpreters=None,
+               max_batch_size=None,
+               **interpreter_kwargs):
+    """Constructor.
+
+    Args:
+      model_path: Path to TF-Lite Flatbuffer file.
+      model_content: Content of model.
+      num_interpreters: Number of interpreter instances (and threads) to run
+        chunks on. Defaults to the number of CPUs.
+      max_batch_size: Maximum number of samples passed to one `invoke()` for
+        models with a dynamic leading dimension. Defaults to splitting each
+        batch evenly across the interpreters. Ignored for models with a fixed
+        leading dimension.
+      **interpreter_kwargs: Additional arguments passed to each `Interpreter`,
+        e.g. `num_threads` or `experimental_delegates`.
+
+    Raises:
+      ValueError: If the model has no inputs, or if `num_interpreters` or
+        `max_batch_size` are not positive.
+    """
+    if num_interpreters is None:
+      num_interpreters = os.cpu_count() or 1
+    if num_interpreters < 1:
+      raise ValueError('num_interpreters should be >= 1')
+    if max_batch_size is not None and max_batch_size < 1:
+      raise ValueError('max_batch_size should be >= 1')
+    self._max_batch_size = max_batch_size
+    self._interpreters = [
+        interpreter_lib.Interpreter(
+            model_path=model_path,
+            model_content=model_content,
+            **interpreter_kwargs) for _ in range(num_interpreters)
+    ]
+    for interpreter in self._interpreters:
+      interpreter.allocate_tensors()
+    self._input_details = self._interpreters[0].get_input_details()
+    self._output_details = self._interpreters[0].get_output_details()
+    if not self._input_details:
+      raise ValueError('Model has no inputs.')
+    self._dynamic_batch = all(
+        len(detail['shape_signature']) and detail['shape_signature'][0] == -1
+        for detail in self._input_details)
+    # Whether each output has a leading batch dimension, decided from the
+    # model's signature rather than from the shapes of a single `invoke()`,
+    # where an unbatched dimension may happen to equal the batch size.
+    if self._dynamic_batch:
+      self._batched_outputs = [
+          len(detail['shape_signature']) > 0 and
+          detail['shape_signature'][0] == -1
+          for detail in self._output_details
+      ]
+    else:
+      batch_size = self._input_details[0]['shape'][0]
+      self._batched_outputs = [
+          len(detail['shape']) > 0 and detail['shape'][0] == batch_size
+          for detail in self._output_details
+      ]
+    # Input shapes each interpreter is currently allocated for.
+    self._allocated_shapes = [None] * num_interpreters
+    self._pool = None
+
+  @property
+  def dynamic_batch(self):
+    """Whether inputs are resized to process whole chunks per `invoke()`."""
+    return self._dynamic_batch
+
+  def get_input_details(self):
+    """Gets input tensor details, see `Interpreter.get_input_details()`."""
+    return self._input_details
+
+  def get_output_details(self):
+    """Gets output tensor details, see `Interpreter.get_output_details()`."""
+    return self._output_details
+
+  def _normalize_inputs(self, inputs):
+    """Returns `inputs` as a list ordered like the model's inputs."""
+    if isinstance(inputs, dict):
+      missing = [
+          detail['name']
+          for detail in self._input_details
+          if detail['name'] not in inputs
+      ]
+      if missing or len(inputs) != len(self._input_details):
+        raise ValueError(
+            'Expected inputs named {}, got {}'.format(
+                [detail['name'] for detail in self._input_details],
+                sorted(inputs)))
+      inputs = [inputs[detail['name']] for detail in self._input_details]
+    else:
+      inputs = list(inputs)
+      if len(inputs) != len(self._input_details):
+        raise ValueError('Expected {} inputs, got {}'.format(
+            len(self._input_details), len(inputs)))
+    inputs = [
+        np.asarray(value, dtype=detail['dtype'])
+        for value, detail in zip(inputs, self._input_details)
+    ]
+    num_samples = {len(value) for value in inputs}
+    if len(num_samples) != 1:
+      raise ValueError(
+          'All inputs must have the same number of samples, got {}'.format(
+              [len(value) for value in inputs]))
+    return inputs, num_samples.pop()
+
+  def _chunk_size(self, num_samples):
+    if not self._dynamic_batch:
+      return int(self._input_details[0]['shape'][0])
+    if self._max_batch_size is not None:
+      return self._max_batch_size
+    return max(1, -(-num_samples // len(self._interpreters)))
+
+  def _ensure_batch_size(self, interpreter_index, inputs, batch_size):
+    """Resizes the inputs of an interpreter to `batch_size` if needed.
+
+    Args:
+      interpreter_index: Index of the interpreter to resize.
+      inputs: List of input arrays. Their non-batch dimensions, which may be
+        dynamic too, are used for the resized inputs.
+      batch_size: The new leading dimension of the inputs.
+    """
+    if not self._dynamic_batch:
+      return
+    shapes = tuple(
+        (batch_size,) + tuple(value.shape[1:]) for value in inputs)
+    if self._allocated_shapes[interpreter_index] == shapes:
+      return
+    interpreter = self._interpreters[interpreter_index]
+    for shape, detail in zip(shapes, self._input_details):
+      interpreter.resize_tensor_input(detail['index'], list(shape))
+    interpreter.allocate_tensors()
+    self._allocated_shapes[interpreter_index] = shapes
+
+  def _invoke(self, interpreter_index, inputs, start, end, chunk_size,
+              results=None, batched=None):
+    """Runs samples `[start, end)` on one interpreter.
+
+    Args:
+      interpreter_index: Index of the interpreter to run on.
+      inputs: List of input arrays.
+      start: Index of the first sample to run.
+      end: Index one past the last sample to run.
+      chunk_size: Number of samples per `invoke()`.
+      results: Optional list of result arrays. If given, batched outputs are
+        copied directly from the interpreter's buffers into
+        `results[:][start:end]`.
+      batched: List of bools telling which outputs have a leading batch
+        dimension. Required if `results` is given.
+
+    Returns:
+      If `results` is None, the list of unsliced output arrays.
+    """
+    interpreter = self._interpreters[interpreter_index]
+    num_samples = end - start
+    batch_size = num_samples if self._dynamic_batch else chunk_size
+    self._ensure_batch_size(interpreter_index, inputs, batch_size)
+    for value, detail in zip(inputs, self._input_details):
+      chunk = value[start:end]
+      if num_samples < batch_size:
+        padding = [(0, batch_size - num_samples)] + [(0, 0)] * (chunk.ndim - 1)
+        chunk = np.pad(chunk, padding)
+      interpreter.set_tensor(detail['index'], chunk)
+    interpreter.invoke()
+    if results is None:
+      return [
+          interpreter.get_tensor(detail['index'])
+          for detail in self._output_details
+      ]
+    for result, detail, is_batched in zip(results, self._output_details,
+                                          batched):
+      if is_batched:
+        # The view returned by `tensor()` must not outlive this statement,
+        # since the next `invoke()` refuses to run while views of its buffers
+        # exist.
+        result[start:end] = interpreter.tensor(detail['index'])()[:num_samples]
+
+  def _run_chunks(self, interpreter_index, inputs, chunks, chunk_size,
+                  results, batched):
+    """Runs `chunks` on one interpreter, writing into `results`."""
+    for start, end in chunks:
+      self._invoke(interpreter_index, inputs, start, end, chunk_size, results,
+                   batched)
+
+  def run(self, inputs):
+    """Runs the model on a batch of samples.
+
+    Args:
+      inputs: A list of arrays, one per model input in the order of
+        `get_input_details()`, or a dict from input name to array. The leading
+        dimension of every array indexes samples and must be the same for all
+        inputs.
+
+    Returns:
+      A list of arrays, one per model output in the order of
+      `get_output_details()`. The leading dimension of outputs with a batch
+      dimension indexes samples; other outputs are returned as computed for
+      the first chunk of samples.
+
+    Raises:
+      ValueError: If `inputs` do not match the model's inputs.
+    """
+    inputs, num_samples = self._normalize_inputs(inputs)
+    chunk_size = self._chunk_size(num_samples)
+    chunks = [(start, min(start + chunk_size, num_samples))
+              for start in range(0, num_samples, chunk_size)]
+    if not chunks:
+      return [
+          np.zeros([0] + list(detail['shape'][1:]), dtype=detail['dtype'])
+          for detail in self._output_details
+      ]
+
+    # Runs the first chunk on the calling thread to learn the per-sample
+    # output shapes, which may depend on the input shapes.
+    first_start, first_end = chunks[0]
+    first_outputs = self._invoke(0, inputs, first_start, first_end, chunk_size)
+    batched = self._batched_outputs
+    results = []
+    for output, is_batched in zip(first_outputs, batched):
+      if is_batched:
+        result = np.empty((num_samples,) + output.shape[1:], dtype=output.dtype)
+        result[first_start:first_end] = output[:first_end - first_start]
+      else:
+        result = output
+      results.append(result)
+
+    remaining = chunks[1:]
+    if not any(batched):
+      return results
+    num_workers = min(len(self._interpreters), len(remaining))
+    if num_workers <= 1:
+      self._run_chunks(0, inputs, remaining, chunk_size, results, batched)
+      return results
+
+    # Gives each interpreter a contiguous range of chunks.
+    per_worker = -(-len(remaining) // num_workers)
+    work = [(index, remaining[index * per_worker:(index + 1) * per_worker])
+            for index in range(num_workers)]
+    if self._pool is None:
+      self._pool = multiprocessing.pool.ThreadPool(len(self._interpreters))
+    self._pool.map(
+        lambda item: self._run_chunks(item[0], inputs, item[1], chunk_size,
+                                      results, batched), work)
+    return results
+
+  def close(self):
+    """Stops the worker threads. The runner must not be used afterwards."""
+    if self._pool is not None:
+      self._pool.close()
+      self._pool.join()
+      self._pool = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
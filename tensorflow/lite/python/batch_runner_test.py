@@ -0,0 +1,198 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests and benchmarks for BatchRunner."""
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow.lite.python import batch_runner
+from tensorflow.lite.python import interpreter as interpreter_wrapper
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import resource_loader
+from tensorflow.python.platform import test
+
+
+def _permute_model_path():
+  return resource_loader.get_path_to_datafile('testdata/permute_float.tflite')
+
+
+def _dynamic_batch_model():
+  """Returns a model computing `2 * x + 1` with a dynamic batch dimension."""
+
+  @tf.function(input_signature=[tf.TensorSpec([None, 3], tf.float32)])
+  def model(x):
+    return 2. * x + 1.
+
+  converter = tf.lite.TFLiteConverter.from_concrete_functions(
+      [model.get_concrete_function()], model)
+  return converter.convert()
+
+
+def _dynamic_shape_model():
+  """Returns a model computing `2 * x + 1`, with only dynamic dimensions."""
+
+  @tf.function(input_signature=[tf.TensorSpec([None, None], tf.float32)])
+  def model(x):
+    return 2. * x + 1.
+
+  converter = tf.lite.TFLiteConverter.from_concrete_functions(
+      [model.get_concrete_function()], model)
+  return converter.convert()
+
+
+def _unbatched_outputs_model():
+  """Returns a model with a batched output and outputs without batch dim."""
+
+  @tf.function(input_signature=[tf.TensorSpec([None, 3], tf.float32)])
+  def model(x):
+    # The number of columns, and a vector of 7s with one entry per column.
+    width = tf.cast(tf.shape(x)[1], tf.float32)
+    sevens = tf.reduce_sum(0. * x, axis=0) + 7.
+    return 2. * x + 1., width, sevens
+
+  converter = tf.lite.TFLiteConverter.from_concrete_functions(
+      [model.get_concrete_function()], model)
+  return converter.convert()
+
+
+def _run_one_by_one(model_path, samples):
+  """Reference implementation looping over samples in Python."""
+  interpreter = interpreter_wrapper.Interpreter(model_path=model_path)
+  interpreter.allocate_tensors()
+  input_index = interpreter.get_input_details()[0]['index']
+  output_index = interpreter.get_output_details()[0]['index']
+  outputs = []
+  for sample in samples:
+    interpreter.set_tensor(input_index, sample[np.newaxis])
+    interpreter.invoke()
+    outputs.append(interpreter.get_tensor(output_index)[0])
+  return np.stack(outputs)
+
+
+class BatchRunnerTest(test_util.TensorFlowTestCase):
+
+  def testFixedBatchFanOut(self):
+    samples = np.random.uniform(size=[37, 4]).astype(np.float32)
+    with batch_runner.BatchRunner(
+        model_path=_permute_model_path(), num_interpreters=3) as runner:
+      self.assertFalse(runner.dynamic_batch)
+      outputs = runner.run([samples])
+    self.assertLen(outputs, 1)
+    self.assertAllClose(
+        _run_one_by_one(_permute_model_path(), samples), outputs[0])
+
+  def testInputsByName(self):
+    samples = np.random.uniform(size=[5, 4]).astype(np.float32)
+    with batch_runner.BatchRunner(
+        model_path=_permute_model_path(), num_interpreters=2) as runner:
+      name = runner.get_input_details()[0]['name']
+      by_name, = runner.run({name: samples})
+      by_position, = runner.run([samples])
+    self.assertAllClose(by_position, by_name)
+
+  def testDynamicBatch(self):
+    samples = np.arange(30, dtype=np.float32).reshape([10, 3])
+    for max_batch_size in (None, 1, 4, 10, 32):
+      with batch_runner.BatchRunner(
+          model_content=_dynamic_batch_model(),
+          num_interpreters=2,
+          max_batch_size=max_batch_size) as runner:
+        self.assertTrue(runner.dynamic_batch)
+        outputs, = runner.run([samples])
+        # Reruns with a different number of samples to exercise resizing.
+        fewer_outputs, = runner.run([samples[:3]])
+      self.assertAllClose(2. * samples + 1., outputs)
+      self.assertAllClose(2. * samples[:3] + 1., fewer_outputs)
+
+  def testDynamicNonBatchDimensions(self):
+    with batch_runner.BatchRunner(
+        model_content=_dynamic_shape_model(), num_interpreters=2,
+        max_batch_size=4) as runner:
+      self.assertTrue(runner.dynamic_batch)
+      for shape in ([10, 3], [6, 5], [10, 3]):
+        samples = np.arange(np.prod(shape), dtype=np.float32).reshape(shape)
+        outputs, = runner.run([samples])
+        self.assertAllClose(2. * samples + 1., outputs)
+
+  def testUnbatchedOutputs(self):
+    samples = np.arange(30, dtype=np.float32).reshape([10, 3])
+    # With 3 samples per chunk, the unbatched vector of 7s has as many entries
+    # as the chunk, and must still not be gathered per sample.
+    for max_batch_size in (3, 4):
+      with batch_runner.BatchRunner(
+          model_content=_unbatched_outputs_model(), num_interpreters=2,
+          max_batch_size=max_batch_size) as runner:
+        outputs = runner.run([samples])
+      self.assertLen(outputs, 3)
+      # Output order is not guaranteed by the converter, so match by shape.
+      by_shape = {output.shape: output for output in outputs}
+      self.assertAllClose(2. * samples + 1., by_shape[(10, 3)])
+      self.assertAllClose(3., by_shape[()])
+      self.assertAllClose([7., 7., 7.], by_shape[(3,)])
+
+  def testEmptyBatch(self):
+    with batch_runner.BatchRunner(
+        model_path=_permute_model_path(), num_interpreters=1) as runner:
+      outputs, = runner.run([np.zeros([0, 4], dtype=np.float32)])
+    self.assertEqual((0, 4), outputs.shape)
+
+  def testInvalidInputs(self):
+    with batch_runner.BatchRunner(
+        model_content=_dynamic_batch_model(), num_interpreters=1) as runner:
+      with self.assertRaisesRegex(ValueError, 'Expected 1 inputs'):
+        runner.run([])
+      with self.assertRaisesRegex(ValueError, 'Expected inputs named'):
+        runner.run({'bogus': np.zeros([1, 3])})
+
+  def testInvalidArguments(self):
+    with self.assertRaisesRegex(ValueError, 'num_interpreters'):
+      batch_runner.BatchRunner(
+          model_path=_permute_model_path(), num_interpreters=0)
+    with self.assertRaisesRegex(ValueError, 'max_batch_size'):
+      batch_runner.BatchRunner(
+          model_path=_permute_model_path(), max_batch_size=0)
+
+
+class BatchRunnerBenchmark(test.Benchmark):
+  """Compares BatchRunner throughput with a Python loop over samples."""
+
+  def _report(self, name, num_samples, run_fn, iters=5):
+    run_fn()  # Warmup.
+    start = time.time()
+    for _ in range(iters):
+      run_fn()
+    wall_time = (time.time() - start) / iters
+    self.report_benchmark(
+        name=name,
+        iters=iters,
+        wall_time=wall_time,
+        extras={'samples_per_second': num_samples / wall_time})
+
+  def benchmarkPermuteFloat(self):
+    model_path = _permute_model_path()
+    samples = np.random.uniform(size=[10000, 4]).astype(np.float32)
+    self._report('permute_float_python_loop', len(samples),
+                 lambda: _run_one_by_one(model_path, samples))
+    for num_interpreters in (1, 4):
+      with batch_runner.BatchRunner(
+          model_path=model_path, num_interpreters=num_interpreters) as runner:
+        self._report(
+            'permute_float_batch_runner_%d' % num_interpreters, len(samples),
+            lambda: runner.run([samples]))  # pylint: disable=cell-var-from-loop
+
+
+if __name__ == '__main__':
+  test.main()
@@ -614,6 +614,10 @@ class TFLiteConverterBase:
     self.experimental_new_quantizer = True
     self.experimental_enable_resource_variables = True
     self._experimental_calibrate_only = False
+    # Number of calibration interpreters run in parallel, and an optional file
+    # caching the calibration statistics. See `Calibrator.calibrate`.
+    self._experimental_calibration_num_workers = 1
+    self._experimental_calibration_statistics_path = None
     self._experimental_sparsify_model = False
     self._experimental_disable_per_channel = False
     self._debug_info = None  # contains the stack traces of all the original
@@ -734,7 +738,9 @@ class TFLiteConverterBase:
     )
     if self._experimental_calibrate_only or self.experimental_new_quantizer:
       calibrated = calibrate_quantize.calibrate(
-          self.representative_dataset.input_gen
+          self.representative_dataset.input_gen,
+          num_workers=self._experimental_calibration_num_workers,
+          statistics_path=self._experimental_calibration_statistics_path,
       )
 
     if self._experimental_calibrate_only:
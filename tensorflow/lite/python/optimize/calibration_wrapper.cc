@@ -462,7 +462,12 @@ PyObject* CalibrationWrapper::FeedTensor(PyObject* input_value,
     }
   }
 
-  TFLITE_PY_CHECK(subgraph->Invoke());
+  // Release the GIL so that several calibrators can be fed in parallel.
+  TfLiteStatus status_code = kTfLiteOk;
+  Py_BEGIN_ALLOW_THREADS;
+  status_code = subgraph->Invoke();
+  Py_END_ALLOW_THREADS;
+  TFLITE_PY_CHECK(status_code);
   Py_RETURN_NONE;
 }
 
@@ -494,7 +499,12 @@ PyObject* CalibrationWrapper::FeedTensor(PyObject* input_value) {
     }
   }
 
-  TFLITE_PY_CHECK(interpreter_->Invoke());
+  // Release the GIL so that several calibrators can be fed in parallel.
+  TfLiteStatus status_code = kTfLiteOk;
+  Py_BEGIN_ALLOW_THREADS;
+  status_code = interpreter_->Invoke();
+  Py_END_ALLOW_THREADS;
+  TFLITE_PY_CHECK(status_code);
   Py_RETURN_NONE;
 }
 
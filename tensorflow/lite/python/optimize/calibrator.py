@@ -13,13 +13,20 @@
 # limitations under the License.
 # ==============================================================================
 """Python wrapper for post training quantization with calibration."""
+import json
+import queue
+import threading
+
+import flatbuffers
 import numpy as np
 
+from tensorflow.lite.python import schema_py_generated as schema_fb
 from tensorflow.lite.python.convert_phase import Component
 from tensorflow.lite.python.convert_phase import convert_phase
 from tensorflow.lite.python.convert_phase import SubComponent
 from tensorflow.lite.python.interpreter import Interpreter
 from tensorflow.python.framework import dtypes
+from tensorflow.python.platform import gfile
 from tensorflow.python.util.lazy_loader import LazyLoader
 
 # Lazy load since some of the performance benchmark skylark rules
@@ -35,11 +42,173 @@ _calibration_wrapper = LazyLoader(
 )
 
 
+_TFLITE_FILE_IDENTIFIER = b"TFL3"
+
+# Number of samples buffered per worker when calibrating in parallel.
+_SAMPLES_PER_WORKER_QUEUE = 4
+
+
 def add_intermediate_tensors(model_content):
   """Adds intermediate tensors to fused op if needed."""
   return _calibration_wrapper.AddIntermediateTensors(model_content)
 
 
+def get_calibration_statistics(calibrated_model):
+  """Extracts min/max calibration statistics from a calibrated model.
+
+  Args:
+    calibrated_model: Content of a TF-Lite Flatbuffer file, as returned by
+      `Calibrator.calibrate`.
+
+  Returns:
+    A dict from `(subgraph_index, tensor_index)` to a dict with the tensor
+    `name` and its `min` and `max` lists.
+  """
+  model = schema_fb.Model.GetRootAsModel(calibrated_model, 0)
+  statistics = {}
+  for subgraph_index in range(model.SubgraphsLength()):
+    subgraph = model.Subgraphs(subgraph_index)
+    for tensor_index in range(subgraph.TensorsLength()):
+      tensor = subgraph.Tensors(tensor_index)
+      quantization = tensor.Quantization()
+      if quantization is None or not quantization.MinLength():
+        continue
+      statistics[(subgraph_index, tensor_index)] = {
+          "name": tensor.Name().decode("utf-8"),
+          "min": quantization.MinAsNumpy().tolist(),
+          "max": quantization.MaxAsNumpy().tolist(),
+      }
+  return statistics
+
+
+def merge_calibration_statistics(statistics_list):
+  """Merges statistics collected over disjoint sets of samples.
+
+  Args:
+    statistics_list: A list of dicts as returned by
+      `get_calibration_statistics`.
+
+  Returns:
+    A dict with the element-wise minimum of all `min` values and maximum of all
+    `max` values for each tensor.
+
+  Raises:
+    ValueError: If the same tensor has statistics of different lengths.
+  """
+  merged = {}
+  for statistics in statistics_list:
+    for key, stat in statistics.items():
+      if key not in merged:
+        merged[key] = dict(stat)
+        continue
+      current = merged[key]
+      if len(current["min"]) != len(stat["min"]):
+        raise ValueError(
+            "Calibration statistics of tensor {} have mismatched lengths {} "
+            "and {}.".format(stat["name"], len(current["min"]),
+                             len(stat["min"])))
+      current["min"] = np.minimum(current["min"], stat["min"]).tolist()
+      current["max"] = np.maximum(current["max"], stat["max"]).tolist()
+  return merged
+
+
+def save_calibration_statistics(statistics, path):
+  """Writes calibration statistics to `path` as JSON."""
+  records = [
+      dict(stat, subgraph=subgraph_index, tensor=tensor_index)
+      for (subgraph_index, tensor_index), stat in sorted(statistics.items())
+  ]
+  with gfile.GFile(path, "w") as f:
+    f.write(json.dumps(records))
+
+
+def load_calibration_statistics(path):
+  """Reads calibration statistics written by `save_calibration_statistics`."""
+  with gfile.GFile(path, "r") as f:
+    records = json.loads(f.read())
+  return {
+      (record["subgraph"], record["tensor"]): {
+          "name": record["name"],
+          "min": record["min"],
+          "max": record["max"],
+      } for record in records
+  }
+
+
+def _uses_buffer_offset(model):
+  """Returns true if the buffers of `model` are stored after the flatbuffer."""
+  for index in range(model.MetadataLength()):
+    if model.Metadata(index).Name() == b"buffer_location":
+      return True
+  return False
+
+
+def apply_calibration_statistics(model_content, statistics):
+  """Returns `model_content` with min/max calibration statistics filled in.
+
+  Statistics of tensors which already have min/max vectors of the right length
+  are written in place, which preserves the layout of the model. Otherwise the
+  model is re-serialized, which is not supported for models that store their
+  buffers outside of the flatbuffer.
+
+  Args:
+    model_content: Content of a TF-Lite Flatbuffer file. It must be the same
+      model (including intermediate tensors, see `add_intermediate_tensors`)
+      that the statistics were collected on.
+    statistics: A dict as returned by `get_calibration_statistics`.
+
+  Returns:
+    The content of the calibrated model.
+
+  Raises:
+    ValueError: If the statistics do not match the model, or if the model would
+      need to be re-serialized but uses buffer offsets.
+  """
+  buf = bytearray(model_content)
+  model = schema_fb.Model.GetRootAsModel(buf, 0)
+  remaining = {}
+  for (subgraph_index, tensor_index), stat in statistics.items():
+    if subgraph_index >= model.SubgraphsLength():
+      raise ValueError("Model has no subgraph {}.".format(subgraph_index))
+    subgraph = model.Subgraphs(subgraph_index)
+    if tensor_index >= subgraph.TensorsLength():
+      raise ValueError("Subgraph {} has no tensor {}.".format(
+          subgraph_index, tensor_index))
+    tensor = subgraph.Tensors(tensor_index)
+    name = tensor.Name().decode("utf-8")
+    if name != stat["name"]:
+      raise ValueError(
+          "Calibration statistics are for tensor {} but tensor {} of "
+          "subgraph {} is {}.".format(stat["name"], tensor_index,
+                                      subgraph_index, name))
+    quantization = tensor.Quantization()
+    if (quantization is not None and
+        quantization.MinLength() == len(stat["min"]) and
+        quantization.MaxLength() == len(stat["max"])):
+      # The vectors are views into `buf`, so this updates the model in place.
+      quantization.MinAsNumpy()[:] = stat["min"]
+      quantization.MaxAsNumpy()[:] = stat["max"]
+    else:
+      remaining[(subgraph_index, tensor_index)] = stat
+  if not remaining:
+    return bytes(buf)
+
+  if _uses_buffer_offset(model):
+    raise ValueError(
+        "Cannot add calibration statistics to a model with buffer offsets.")
+  model_object = schema_fb.ModelT.InitFromObj(model)
+  for (subgraph_index, tensor_index), stat in remaining.items():
+    tensor = model_object.subgraphs[subgraph_index].tensors[tensor_index]
+    if tensor.quantization is None:
+      tensor.quantization = schema_fb.QuantizationParametersT()
+    tensor.quantization.min = list(stat["min"])
+    tensor.quantization.max = list(stat["max"])
+  builder = flatbuffers.Builder(1024)
+  builder.Finish(
+      model_object.Pack(builder), file_identifier=_TFLITE_FILE_IDENTIFIER)
+  return bytes(builder.Output())
+
+
 class Calibrator:
   """Calibrates a floating point model and then quantizes it.
 
@@ -70,18 +239,24 @@ class Calibrator:
       custom_op_registerers_by_name = []
     if custom_op_registerers_by_func is None:
       custom_op_registerers_by_func = []
+    self._custom_op_registerers_by_name = custom_op_registerers_by_name
+    self._custom_op_registerers_by_func = custom_op_registerers_by_func
+    self._calibrator = self._create_calibration_wrapper(model_content)
+    self._model_content = model_content
+    self._interpreter = None
+
+  def _create_calibration_wrapper(self, model_content):
     try:
-      self._calibrator = _calibration_wrapper.CalibrationWrapper(
+      calibrator = _calibration_wrapper.CalibrationWrapper(
           model_content,
-          custom_op_registerers_by_name,
-          custom_op_registerers_by_func,
+          self._custom_op_registerers_by_name,
+          self._custom_op_registerers_by_func,
       )
-      self._model_content = model_content
     except Exception as e:
       raise ValueError("Failed to parse the model: %s." % e)
-    if not self._calibrator:
+    if not calibrator:
       raise ValueError("Failed to parse the model.")
-    self._interpreter = None
+    return calibrator
 
   def _create_input_array_from_dict(self, signature_key, inputs):
     input_array = []
@@ -94,62 +269,137 @@ class Calibrator:
       input_array.append(inputs[input_name])
     return input_array
 
+  def _convert_sample(self, sample):
+    """Returns the `(signature_key, input_array)` to feed for `sample`."""
+    if isinstance(sample, tuple):
+      if not isinstance(sample[1], dict):
+        raise ValueError(
+            "You need to provide either a dictionary with input "
+            "names and values in the second argument in the "
+            "tuple"
+        )
+      # Convert signature based inputs to the tensor index based data.
+      if self._interpreter is None:
+        self._interpreter = Interpreter(model_content=self._model_content)
+      signature_key = sample[0]
+      input_array = self._create_input_array_from_dict(
+          signature_key, sample[1]
+      )
+    elif isinstance(sample, dict):
+      # Convert signature based inputs to the tensor index based data.
+      if self._interpreter is None:
+        self._interpreter = Interpreter(model_content=self._model_content)
+      signature_key = None
+      input_array = self._create_input_array_from_dict(None, sample)
+    elif isinstance(sample, list):
+      signature_key = None
+      input_array = sample
+    else:
+      raise ValueError(
+          "You need to provide either a dictionary with input "
+          "names and values, a tuple with signature key and a "
+          "dictionary with input names and values, or an array "
+          "with input values in the order of input tensors of "
+          "the graph in the representative_dataset function. "
+          "Unsupported value from dataset: {}.".format(sample)
+      )
+    return signature_key, input_array
+
+  def _feed_sample(
+      self, calibrator, initialized, signature_key, input_array, resize_input
+  ):
+    """Feeds one converted sample to `calibrator`."""
+    if signature_key not in initialized:
+      initialized[signature_key] = True
+      if resize_input:
+        if signature_key is not None:
+          calibrator.Prepare([list(s.shape) for s in input_array], signature_key)
+        else:
+          calibrator.Prepare([list(s.shape) for s in input_array])
+      else:
+        if signature_key is not None:
+          calibrator.Prepare(signature_key)
+        else:
+          calibrator.Prepare()
+    if signature_key is not None:
+      calibrator.FeedTensor(input_array, signature_key)
+    else:
+      calibrator.FeedTensor(input_array)
+
   def _feed_tensors(self, dataset_gen, resize_input):
     """Feed tensors to the calibrator."""
     initialized = {}
 
     for sample in dataset_gen():
-      if isinstance(sample, tuple):
-        if not isinstance(sample[1], dict):
-          raise ValueError(
-              "You need to provide either a dictionary with input "
-              "names and values in the second argument in the "
-              "tuple"
+      signature_key, input_array = self._convert_sample(sample)
+      self._feed_sample(
+          self._calibrator, initialized, signature_key, input_array,
+          resize_input
+      )
+
+  def _feed_tensors_in_parallel(self, dataset_gen, resize_input, num_workers):
+    """Feeds disjoint streams of samples to `num_workers` calibrators.
+
+    Samples are drawn from `dataset_gen` on the calling thread and handed out
+    round-robin to worker threads, each owning its own calibration wrapper.
+
+    Args:
+      dataset_gen: A generator that generates calibration samples.
+      resize_input: A boolean. True if the shape of the sample data is
+        different from the input.
+      num_workers: Number of calibration wrappers to run in parallel.
+
+    Returns:
+      The list of calibration wrappers which were fed at least one sample.
+    """
+    calibrators = [self._calibrator] + [
+        self._create_calibration_wrapper(self._model_content)
+        for _ in range(num_workers - 1)
+    ]
+    queues = [
+        queue.Queue(maxsize=_SAMPLES_PER_WORKER_QUEUE)
+        for _ in range(num_workers)
+    ]
+    fed = [False] * num_workers
+    errors = [None] * num_workers
+
+    def _worker(index):
+      initialized = {}
+      while True:
+        item = queues[index].get()
+        if item is None:
+          return
+        if errors[index] is not None:
+          # Keeps draining the queue so that the producer never blocks.
+          continue
+        try:
+          self._feed_sample(
+              calibrators[index], initialized, item[0], item[1], resize_input
           )
-        # Convert signature based inputs to the tensor index based data.
-        if self._interpreter is None:
-          self._interpreter = Interpreter(model_content=self._model_content)
-        signature_key = sample[0]
-        input_array = self._create_input_array_from_dict(
-            signature_key, sample[1]
-        )
-      elif isinstance(sample, dict):
-        # Convert signature based inputs to the tensor index based data.
-        if self._interpreter is None:
-          self._interpreter = Interpreter(model_content=self._model_content)
-        signature_key = None
-        input_array = self._create_input_array_from_dict(None, sample)
-      elif isinstance(sample, list):
-        signature_key = None
-        input_array = sample
-      else:
-        raise ValueError(
-            "You need to provide either a dictionary with input "
-            "names and values, a tuple with signature key and a "
-            "dictionary with input names and values, or an array "
-            "with input values in the order of input tensors of "
-            "the graph in the representative_dataset function. "
-            "Unsupported value from dataset: {}.".format(sample)
-        )
+          fed[index] = True
+        except Exception as e:  # pylint: disable=broad-except
+          errors[index] = e
 
-      if signature_key not in initialized:
-        initialized[signature_key] = True
-        if resize_input:
-          if signature_key is not None:
-            self._calibrator.Prepare(
-                [list(s.shape) for s in input_array], signature_key
-            )
-          else:
-            self._calibrator.Prepare([list(s.shape) for s in input_array])
-        else:
-          if signature_key is not None:
-            self._calibrator.Prepare(signature_key)
-          else:
-            self._calibrator.Prepare()
-      if signature_key is not None:
-        self._calibrator.FeedTensor(input_array, signature_key)
-      else:
-        self._calibrator.FeedTensor(input_array)
+    threads = [
+        threading.Thread(target=_worker, args=(index,), daemon=True)
+        for index in range(num_workers)
+    ]
+    for thread in threads:
+      thread.start()
+    try:
+      for count, sample in enumerate(dataset_gen()):
+        queues[count % num_workers].put(self._convert_sample(sample))
+    finally:
+      for q in queues:
+        q.put(None)
+      for thread in threads:
+        thread.join()
+    for error in errors:
+      if error is not None:
+        raise error
+    return [
+        calibrator for calibrator, was_fed in zip(calibrators, fed) if was_fed
+    ]
 
   @convert_phase(
       Component.OPTIMIZE_TFLITE_MODEL,
@@ -242,7 +492,7 @@ class Calibrator:
     )
 
   @convert_phase(Component.OPTIMIZE_TFLITE_MODEL, SubComponent.CALIBRATE)
-  def calibrate(self, dataset_gen):
+  def calibrate(self, dataset_gen, num_workers=1, statistics_path=None):
     """Calibrates the model with specified generator.
 
     Returns:
@@ -250,6 +500,48 @@ class Calibrator:
 
     Args:
       dataset_gen: A generator that generates calibration samples.
+      num_workers: Number of calibration interpreters to run in parallel. Each
+        one is fed a disjoint subset of the samples, and their min/max
+        statistics are merged afterwards.
+      statistics_path: Optional path. If a file exists at this path, the
+        calibration statistics are loaded from it and `dataset_gen` is not
+        run. Otherwise the statistics of this calibration are written to it,
+        so that the model can later be re-quantized with different options
+        without running the dataset again.
+
+    Raises:
+      ValueError: If `num_workers` is not positive.
     """
-    self._feed_tensors(dataset_gen, resize_input=True)
-    return self._calibrator.Calibrate()
+    if num_workers < 1:
+      raise ValueError("num_workers must be >= 1, got %d." % num_workers)
+    if statistics_path is not None and gfile.Exists(statistics_path):
+      return apply_calibration_statistics(
+          self._model_content, load_calibration_statistics(statistics_path)
+      )
+
+    if num_workers == 1:
+      self._feed_tensors(dataset_gen, resize_input=True)
+      calibrated = self._calibrator.Calibrate()
+    else:
+      calibrators = self._feed_tensors_in_parallel(
+          dataset_gen, resize_input=True, num_workers=num_workers
+      )
+      calibrated_models = [calibrator.Calibrate() for calibrator in calibrators]
+      if len(calibrated_models) <= 1:
+        calibrated = (
+            calibrated_models[0]
+            if calibrated_models
+            else self._calibrator.Calibrate()
+        )
+      else:
+        calibrated = apply_calibration_statistics(
+            calibrated_models[0],
+            merge_calibration_statistics(
+                [get_calibration_statistics(m) for m in calibrated_models]
+            ),
+        )
+    if statistics_path is not None:
+      save_calibration_statistics(
+          get_calibration_statistics(calibrated), statistics_path
+      )
+    return calibrated
@@ -236,6 +236,115 @@ class CalibratorTest(test_util.TensorFlowTestCase, parameterized.TestCase):
     quantized_model = quantizer.calibrate(input_gen)
     self.assertIsNotNone(quantized_model)
 
+  def test_parallel_calibration_matches_serial(self):
+    model_path = resource_loader.get_path_to_datafile(
+        'test_data/mobilenet_like_model.bin'
+    )
+    float_model = open(model_path, 'rb').read()
+    samples = [
+        np.random.uniform(-i, i, size=(1, 5, 5, 3)).astype(np.float32)
+        for i in range(1, 12)
+    ]
+
+    # Input generator for the model.
+    def input_gen():
+      for sample in samples:
+        yield [sample]
+
+    serial_model = _calibrator.Calibrator(float_model).calibrate(input_gen)
+    parallel_model = _calibrator.Calibrator(float_model).calibrate(
+        input_gen, num_workers=3
+    )
+    serial_stats = _calibrator.get_calibration_statistics(serial_model)
+    parallel_stats = _calibrator.get_calibration_statistics(parallel_model)
+    self.assertNotEmpty(serial_stats)
+    self.assertCountEqual(serial_stats.keys(), parallel_stats.keys())
+    for key, stat in serial_stats.items():
+      self.assertEqual(stat['name'], parallel_stats[key]['name'])
+      self.assertAllClose(stat['min'], parallel_stats[key]['min'])
+      self.assertAllClose(stat['max'], parallel_stats[key]['max'])
+
+  def test_parallel_calibration_with_fewer_samples_than_workers(self):
+    model_path = resource_loader.get_path_to_datafile(
+        'test_data/mobilenet_like_model.bin'
+    )
+    float_model = open(model_path, 'rb').read()
+
+    # Input generator for the model.
+    def input_gen():
+      yield [np.ones(shape=(1, 5, 5, 3), dtype=np.float32)]
+
+    quantizer = _calibrator.Calibrator(float_model)
+    calibrated_model = quantizer.calibrate(input_gen, num_workers=4)
+    self.assertNotEmpty(_calibrator.get_calibration_statistics(calibrated_model))
+
+  def test_parallel_calibration_raises_worker_errors(self):
+    model_path = resource_loader.get_path_to_datafile(
+        'test_data/mobilenet_like_model.bin'
+    )
+    float_model = open(model_path, 'rb').read()
+    quantizer = _calibrator.Calibrator(float_model)
+
+    # Input generator with the wrong number of inputs.
+    def input_gen():
+      for _ in range(4):
+        yield [np.ones(shape=(1, 5, 5, 3), dtype=np.float32)] * 2
+
+    with self.assertRaisesRegex(ValueError, 'Invalid input'):
+      quantizer.calibrate(input_gen, num_workers=2)
+    with self.assertRaisesRegex(ValueError, 'num_workers'):
+      quantizer.calibrate(input_gen, num_workers=0)
+
+  def test_calibration_statistics_round_trip(self):
+    model_path = resource_loader.get_path_to_datafile(
+        'test_data/mobilenet_like_model.bin'
+    )
+    float_model = open(model_path, 'rb').read()
+    statistics_path = self.create_tempfile().full_path + '.json'
+    num_calls = [0]
+
+    # Input generator for the model.
+    def input_gen():
+      num_calls[0] += 1
+      for _ in range(3):
+        yield [np.ones(shape=(1, 5, 5, 3), dtype=np.float32)]
+
+    calibrated_model = _calibrator.Calibrator(float_model).calibrate(
+        input_gen, statistics_path=statistics_path
+    )
+    reloaded_model = _calibrator.Calibrator(float_model).calibrate(
+        input_gen, statistics_path=statistics_path
+    )
+    self.assertEqual(1, num_calls[0])
+    expected = _calibrator.get_calibration_statistics(calibrated_model)
+    self.assertEqual(
+        expected, _calibrator.load_calibration_statistics(statistics_path)
+    )
+    self.assertEqual(
+        expected, _calibrator.get_calibration_statistics(reloaded_model)
+    )
+
+  def test_merge_calibration_statistics(self):
+    merged = _calibrator.merge_calibration_statistics([
+        {(0, 1): {'name': 'a', 'min': [-1.0, 0.0], 'max': [1.0, 2.0]}},
+        {
+            (0, 1): {'name': 'a', 'min': [-2.0, 1.0], 'max': [0.5, 3.0]},
+            (0, 2): {'name': 'b', 'min': [0.0], 'max': [4.0]},
+        },
+    ])
+    self.assertEqual(
+        {
+            (0, 1): {'name': 'a', 'min': [-2.0, 0.0], 'max': [1.0, 3.0]},
+            (0, 2): {'name': 'b', 'min': [0.0], 'max': [4.0]},
+        },
+        merged,
+    )
+    with self.assertRaisesRegex(ValueError, 'mismatched lengths'):
+      _calibrator.merge_calibration_statistics([
+          {(0, 1): {'name': 'a', 'min': [0.0], 'max': [1.0]}},
+          {(0, 1): {'name': 'a', 'min': [0.0, 0.0], 'max': [1.0, 1.0]}},
+      ])
+
   def test_add_intermediate_tensors(self):
     model_path = resource_loader.get_path_to_datafile(
         'test_data/mobilenet_like_model.bin'
@@ -17,6 +17,7 @@
 """Checkpoint Manager and other utilities for managing checkpoints."""
 import collections
 import copy
+import multiprocessing.pool
 import os.path
 import re
 import time
@@ -38,6 +39,15 @@ from tensorflow.python.util import deprecation
 from tensorflow.python.util.tf_export import tf_export
 
 
+# Upper bound on the number of threads used to stat or delete checkpoint files.
+# Checkpoints frequently live on remote filesystems, where each file operation
+# is dominated by round-trip latency rather than bandwidth.
+_MAX_FILE_IO_THREADS = 16
+
+# Characters which make a filespec a glob pattern rather than a plain path.
+_GLOB_CHARACTERS = re.compile(r"[*?\[]")
+
+
 def _evaluate(tensor):
   """Returns the numpy value of a tensor."""
   if context.executing_eagerly():
@@ -436,25 +446,20 @@ def get_checkpoint_mtimes(checkpoint_prefixes):
   Returns:
     A list of mtimes (in microseconds) of the found checkpoints.
   """
-  mtimes = []
-
-  def match_maybe_append(pathname):
-    fnames = file_io.get_matching_files(pathname)
-    if fnames:
-      mtimes.append(file_io.stat(fnames[0]).mtime_nsec / 1e9)
-      return True
-    return False
 
-  for checkpoint_prefix in checkpoint_prefixes:
-    # Tries V2's metadata file first.
-    pathname = _prefix_to_checkpoint_path(checkpoint_prefix,
-                                          saver_pb2.SaverDef.V2)
-    if match_maybe_append(pathname):
-      continue
-    # Otherwise, tries V1, where the prefix is the complete pathname.
-    match_maybe_append(checkpoint_prefix)
+  def _get_mtime(checkpoint_prefix):
+    # Tries V2's metadata file first. Otherwise, tries V1, where the prefix is
+    # the complete pathname.
+    for pathname in (_prefix_to_checkpoint_path(checkpoint_prefix,
+                                                saver_pb2.SaverDef.V2),
+                     checkpoint_prefix):
+      fnames = file_io.get_matching_files(pathname)
+      if fnames:
+        return file_io.stat(fnames[0]).mtime_nsec / 1e9
+    return None
 
-  return mtimes
+  return [mtime for mtime in _parallel_map(_get_mtime, checkpoint_prefixes)
+          if mtime is not None]
 
 
 @deprecation.deprecated(
@@ -474,26 +479,79 @@ def remove_checkpoint(checkpoint_prefix,
       `SaverDef.V2`.
     meta_graph_suffix: Suffix for `MetaGraphDef` file. Defaults to 'meta'.
   """
-  _delete_file_if_exists(
-      meta_graph_filename(checkpoint_prefix, meta_graph_suffix))
+  filespecs = [meta_graph_filename(checkpoint_prefix, meta_graph_suffix)]
   if checkpoint_format_version == saver_pb2.SaverDef.V2:
     # V2 has a metadata file and some data files.
-    _delete_file_if_exists(checkpoint_prefix + ".index")
-    _delete_file_if_exists(checkpoint_prefix + ".data-?????-of-?????")
+    filespecs.extend(_v2_checkpoint_filespecs(checkpoint_prefix))
   else:
     # V1, Legacy.  Exact match on the data file.
-    _delete_file_if_exists(checkpoint_prefix)
+    filespecs.append(checkpoint_prefix)
+  _delete_files_if_exist(filespecs)
+
+
+def _v2_checkpoint_filespecs(checkpoint_prefix):
+  """Returns filespecs matching the files of a V2 checkpoint."""
+  return [checkpoint_prefix + ".index",
+          checkpoint_prefix + ".data-?????-of-?????"]
+
+
+def _parallel_map(fn, items):
+  """Applies `fn` to each of `items` on a thread pool, preserving order."""
+  items = list(items)
+  if len(items) <= 1:
+    return [fn(item) for item in items]
+  pool = multiprocessing.pool.ThreadPool(
+      min(len(items), _MAX_FILE_IO_THREADS))
+  try:
+    return pool.map(fn, items)
+  finally:
+    pool.close()
+    pool.join()
 
 
 def _delete_file_if_exists(filespec):
   """Deletes files matching `filespec`."""
-  for pathname in file_io.get_matching_files(filespec):
+  _delete_files_if_exist([filespec])
+
+
+def _log_deletion_error(error):
+  """Logs an error raised while deleting checkpoints in the background."""
+  logging.error("Failed to delete old checkpoints in the background: %s",
+                error)
+
+
+def _delete_files_if_exist(filespecs):
+  """Deletes files matching any of `filespecs`.
+
+  Globs and deletions are issued concurrently. Filespecs without glob
+  characters are deleted directly, which avoids listing the directory.
+
+  Args:
+    filespecs: An iterable of paths or glob patterns.
+  """
+
+  def _expand(filespec):
+    if _GLOB_CHARACTERS.search(filespec):
+      return [(pathname, True) for pathname
+              in file_io.get_matching_files(filespec)]
+    return [(filespec, False)]
+
+  def _delete(pathname_and_matched):
+    pathname, matched = pathname_and_matched
     try:
       file_io.delete_file(pathname)
     except errors.NotFoundError:
-      logging.warning(
-          "Hit NotFoundError when deleting '%s', possibly because another "
-          "process/thread is also deleting/moving the same file", pathname)
+      # A plain path was never confirmed to exist, so only warn for files we
+      # saw while globbing.
+      if matched:
+        logging.warning(
+            "Hit NotFoundError when deleting '%s', possibly because another "
+            "process/thread is also deleting/moving the same file", pathname)
+
+  to_delete = []
+  for expanded in _parallel_map(_expand, filespecs):
+    to_delete.extend(expanded)
+  _parallel_map(_delete, to_delete)
 
 
 def meta_graph_filename(checkpoint_filename, meta_graph_suffix="meta"):
@@ -545,7 +603,8 @@ class CheckpointManager(object):
                checkpoint_name="ckpt",
                step_counter=None,
                checkpoint_interval=None,
-               init_fn=None):
+               init_fn=None,
+               experimental_background_deletion=False):
     """Configure a `CheckpointManager` for use in `directory`.
 
     If a `CheckpointManager` was previously used in `directory`, its
@@ -613,6 +672,13 @@ class CheckpointManager(object):
         between two checkpoints.
       init_fn: Callable. A function to do customized intialization if no
         checkpoints are in the directory.
+      experimental_background_deletion: A boolean. If `True`, checkpoints
+        removed from the active set are deleted on a background thread so that
+        `save` does not block on filesystem cleanup. Use `sync` to wait for
+        outstanding deletions, re-raise their errors and stop the background
+        thread. Errors are also logged as they happen. The "checkpoint"
+        state file is always updated before deletion starts, so it never
+        references a checkpoint which is being deleted.
 
     Raises:
       ValueError: If `max_to_keep` is not a positive integer.
@@ -631,6 +697,9 @@ class CheckpointManager(object):
     self._directory = directory
     self._checkpoint_prefix = os.path.join(directory, checkpoint_name)
     self._init_fn = init_fn
+    self._background_deletion = experimental_background_deletion
+    self._deletion_pool = None
+    self._pending_deletions = []
 
     if checkpoint_interval is not None:
       if step_counter is None:
@@ -711,6 +780,7 @@ class CheckpointManager(object):
       # Does not update self._last_preserved_timestamp, since everything is kept
       # in the active set.
       return
+    filespecs = []
     while len(self._maybe_delete) > self._max_to_keep:
       filename, timestamp = self._maybe_delete.popitem(last=False)
       # Even if we're keeping this checkpoint due to
@@ -721,8 +791,44 @@ class CheckpointManager(object):
                >= self._last_preserved_timestamp)):
         self._last_preserved_timestamp = timestamp
         continue
-      _delete_file_if_exists(filename + ".index")
-      _delete_file_if_exists(filename + ".data-?????-of-?????")
+      filespecs.extend(_v2_checkpoint_filespecs(filename))
+    if not filespecs:
+      return
+    if self._background_deletion:
+      if self._deletion_pool is None:
+        # A single worker keeps deletions in the order they were requested.
+        self._deletion_pool = multiprocessing.pool.ThreadPool(1)
+      self._pending_deletions = [
+          result for result in self._pending_deletions if not result.ready()]
+      self._pending_deletions.append(
+          self._deletion_pool.apply_async(
+              _delete_files_if_exist, (filespecs,),
+              error_callback=_log_deletion_error))
+    else:
+      _delete_files_if_exist(filespecs)
+
+  def _wait_for_deletions(self):
+    """Blocks until background checkpoint deletions have finished.
+
+    The background thread is then stopped. It is started again by the next
+    deletion.
+    """
+    pending, self._pending_deletions = self._pending_deletions, []
+    deletion_pool, self._deletion_pool = self._deletion_pool, None
+    if deletion_pool is not None:
+      deletion_pool.close()
+      deletion_pool.join()
+    for result in pending:
+      # Re-raises any exception hit while deleting.
+      result.get()
+
+  def __del__(self):
+    # Lets the background thread exit once it has finished the outstanding
+    # deletions. Joining it here would block garbage collection and interpreter
+    # shutdown; `sync` waits for the deletions instead.
+    deletion_pool = getattr(self, "_deletion_pool", None)
+    if deletion_pool is not None:
+      deletion_pool.close()
 
   def _record_state(self):
     """Saves the `CheckpointManager`'s state in `directory`."""
@@ -831,7 +937,8 @@ class CheckpointManager(object):
       self._record_state()
       self._sweep()
       # Write out the Checkpoint proto a second time, now without the deleted
-      # checkpoints.
+      # checkpoints. With background deletion the files may still exist at this
+      # point, but they are no longer referenced.
       self._record_state()
 
     # Register `_record_and_sweep_state` as a callback in `CheckpointOptions`
@@ -889,6 +996,7 @@ class CheckpointManager(object):
     return None
 
   def sync(self):
-    """Wait for any outstanding save or restore operations."""
+    """Wait for any outstanding save, restore or deletion operations."""
     if self._checkpoint:
       self._checkpoint.sync()
+    self._wait_for_deletions()
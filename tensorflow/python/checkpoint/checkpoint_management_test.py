@@ -15,10 +15,13 @@
 """Tests for tensorflow.python.training.saver.py."""
 
 import contextlib
+import gc
 import os
 import pathlib
 import shutil
 import tempfile
+import threading
+import time
 
 from google.protobuf import text_format
 
@@ -348,6 +351,69 @@ class CheckpointManagerTest(test.TestCase):
     self.assertTrue(checkpoint_management.checkpoint_exists(second_path))
     self.assertFalse(checkpoint_management.checkpoint_exists(first_path))
 
+  @test_util.run_in_graph_and_eager_modes
+  def testBackgroundDeletion(self):
+    checkpoint = util.Checkpoint()
+    directory = os.path.join(
+        self.get_temp_dir(),
+        # Avoid sharing directories between eager and graph
+        str(context.executing_eagerly()))
+    manager = checkpoint_management.CheckpointManager(
+        checkpoint, directory, max_to_keep=2,
+        experimental_background_deletion=True)
+    paths = [manager.save() for _ in range(5)]
+    manager.sync()
+    # The background thread is stopped until the next deletion.
+    self.assertIsNone(manager._deletion_pool)
+    self.assertEqual(paths[-2:], manager.checkpoints)
+    for path in paths[:3]:
+      self.assertFalse(checkpoint_management.checkpoint_exists(path))
+    for path in paths[3:]:
+      self.assertTrue(checkpoint_management.checkpoint_exists(path))
+    self.assertEqual(
+        paths[-2:],
+        checkpoint_management.get_checkpoint_state(
+            directory).all_model_checkpoint_paths)
+
+    paths.extend(manager.save() for _ in range(2))
+    self.assertIsNotNone(manager._deletion_pool)
+    num_threads = threading.active_count()
+    del manager
+    gc.collect()
+    # Deleting the manager doesn't wait, but the background thread exits once
+    # it has finished the outstanding deletions.
+    deadline = time.time() + 60
+    while (threading.active_count() >= num_threads and
+           time.time() < deadline):
+      time.sleep(0.01)
+    self.assertLess(threading.active_count(), num_threads)
+    for path in paths[:5]:
+      self.assertFalse(checkpoint_management.checkpoint_exists(path))
+
+  @test_util.run_in_graph_and_eager_modes
+  def testBackgroundDeletionErrors(self):
+    checkpoint = util.Checkpoint()
+    directory = os.path.join(
+        self.get_temp_dir(),
+        # Avoid sharing directories between eager and graph
+        str(context.executing_eagerly()))
+    manager = checkpoint_management.CheckpointManager(
+        checkpoint, directory, max_to_keep=1,
+        experimental_background_deletion=True)
+
+    def _fail(filespecs):
+      raise OSError("Cannot delete %s" % (filespecs,))
+
+    with test.mock.patch.object(
+        checkpoint_management, "_delete_files_if_exist", side_effect=_fail):
+      with test.mock.patch.object(logging, "error") as mock_log:
+        manager.save()
+        manager.save()
+        with self.assertRaisesRegex(OSError, "Cannot delete"):
+          manager.sync()
+    mock_log.assert_called_once()
+    self.assertIn("in the background", mock_log.call_args[0][0])
+
   @test_util.run_in_graph_and_eager_modes
   def testKeepAll(self):
     checkpoint = util.Checkpoint()
@@ -62,6 +62,13 @@ _POLL_FREQ_IN_SEC = 5
 # queue is full.
 _CLOSURE_QUEUE_MAX_SIZE = 256 * 1024
 
+# Default number of closures each worker can have in flight at the same time.
+# Each worker runs this many closure processing threads, so that a worker with
+# high dispatch or fetch latency can start executing the next closure while the
+# previous ones are still outstanding. Can be overridden with the
+# `TF_COORDINATOR_WORKER_INFLIGHT_WINDOW` environment variable.
+_WORKER_INFLIGHT_WINDOW = 1
+
 # RPC error message from PS
 _RPC_ERROR_FROM_PS = "GRPC error information from remote target /job:ps"
 
@@ -238,6 +245,9 @@ class Closure(object):
       self._function = function
 
     self._output_remote_value_ref = None
+    # Used to record the queueing and end-to-end latency of the closure.
+    self.schedule_time = time.time()
+    self.enqueue_time = None
 
   def build_output_remote_value(self):
     if self._output_remote_value_ref is None:
@@ -462,6 +472,7 @@ class _CoordinatedClosureQueue(object):
     else:
       with self._put_wait_lock, self._queue_lock:
         self._queue_free_slot_condition.wait_for(lambda: not self._queue.full())
+        closure.enqueue_time = time.time()
         self._queue.put(closure, block=False)
         metric_utils.monitor_int("queued_closures", self._queue.qsize())
         self._raise_if_error()
@@ -491,8 +502,11 @@ class _CoordinatedClosureQueue(object):
       if tag is not None and not self._tagged_queue[tag].empty():
         closure = self._tagged_queue[tag].get(block=False)
         return closure
+      metric_utils.monitor_sample("queue_depth", self._queue.qsize())
       closure = self._queue.get(block=False)
       metric_utils.monitor_int("queued_closures", self._queue.qsize())
+      metric_utils.monitor_sample("closure_queue_time",
+                                  time.time() - closure.enqueue_time)
       assert closure.tag is None
       assert tag is None or self._tagged_queue[tag].empty()
       self._queue_free_slot_condition.notify()
@@ -521,6 +535,7 @@ class _CoordinatedClosureQueue(object):
         closure.mark_cancelled()
       else:
         self._queue_free_slot_condition.wait_for(lambda: not self._queue.full())
+        closure.enqueue_time = time.time()
         self._queue.put(closure, block=False)
         metric_utils.monitor_int("queued_closures", self._queue.qsize())
         self._closures_queued_condition.notify()
@@ -573,6 +588,10 @@ class _CoordinatedClosureQueue(object):
       self._raise_if_error()
       return self._queue.empty() and self._inflight_closure_count == 0
 
+  def clear_tag(self, tag):
+    with self._queue_lock:
+      self.clear_tag_unlocked(tag)
+
   def clear_tag_unlocked(self, tag):
     self._tagged_queue[tag] = queue.Queue()
 
@@ -1030,15 +1049,23 @@ class Worker(object):
   Attributes:
     worker_index: The index of the worker in the cluster.
     device_name: The device string of the worker, e.g. "/job:worker/task:1".
-    executor: The worker's executor for remote function execution.
+    executor: The worker's executor for remote function execution, specific to
+      the calling closure processing thread.
     failure_handler: The failure handler used to handler worker preemption
       failure.
+    inflight_window: The maximum number of closures the worker processes at the
+      same time.
   """
 
-  def __init__(self, worker_index, device_name, cluster):
+  def __init__(self, worker_index, device_name, cluster, inflight_window=1):
+    if inflight_window < 1:
+      raise ValueError("The in-flight window of a worker must be at least 1, "
+                       "got %d." % inflight_window)
     self.worker_index = worker_index
     self.device_name = device_name
-    self.executor = executor.new_executor(enable_async=False)
+    self.inflight_window = inflight_window
+    self._executor = executor.new_executor(enable_async=False)
+    self._thread_local = threading.local()
     self.failure_handler = cluster.failure_handler
     self._cluster = cluster
     self._resource_tracking_lock = threading.Lock()
@@ -1046,10 +1073,24 @@ class Worker(object):
     self._is_dead_with_error = None
     self._should_worker_thread_run = True
 
-    # Worker threads need to start after `Worker`'s initialization.
-    threading.Thread(target=self._process_queue,
-                     name="WorkerClosureProcessingLoop-%d" % self.worker_index,
-                     daemon=True).start()
+    # Worker threads need to start after `Worker`'s initialization. Each thread
+    # has one closure in flight at a time. Closures that take per-worker
+    # resources as inputs wait for them to be built (see
+    # `_get_error_from_remote_values`), and resource closures are taken from
+    # the tagged queue before any closure scheduled after them, so resources
+    # are still built before they are used with more than one thread.
+    for thread_index in range(self.inflight_window):
+      name = "WorkerClosureProcessingLoop-%d" % self.worker_index
+      if thread_index:
+        name += "-%d" % thread_index
+      threading.Thread(target=self._process_queue,
+                       args=(thread_index,),
+                       name=name,
+                       daemon=True).start()
+
+  @property
+  def executor(self):
+    return getattr(self._thread_local, "executor", self._executor)
 
   def stop(self):
     """Ensure the worker thread is closed."""
@@ -1092,19 +1133,26 @@ class Worker(object):
                  "failure.", self.worker_index)
     with self._resource_tracking_lock:
       self._is_dead_with_error = e
-      # No locking on queue is needed since
-      #  * get will not happen concurrently here.
-      #  * put to the specific tagged queue will be guarded by
-      #    `self._resource_tracking_lock`.
-      self._cluster.closure_queue.clear_tag_unlocked(self.worker_index)
+      # With an inflight window larger than one, other processing threads of
+      # this worker may be calling `get` on the tagged queue concurrently, so
+      # the queue lock is needed. Puts to the tagged queue are additionally
+      # guarded by `self._resource_tracking_lock`.
+      self._cluster.closure_queue.clear_tag(self.worker_index)
       self._set_resources_aborted(e)
 
   def _on_worker_recovery(self):
     logging.info("[Worker %d] calling _on_worker_recovery", self.worker_index)
     with self._resource_tracking_lock:
+      if not self._is_dead_with_error:
+        # Another processing thread of this worker has already recovered from
+        # the same failure and rescheduled the resource closures.
+        return
       for weakref_resource in self._resource_remote_value_refs:
         resource = weakref_resource()
         if resource:
+          # Closures depending on the resource must wait for it to be rebuilt
+          # instead of observing the error it was aborted with.
+          resource._set_rebuilding()  # pylint: disable=protected-access
           self._schedule_resource(resource._closure)  # pylint: disable=protected-access
       self._is_dead_with_error = False
 
@@ -1122,6 +1170,8 @@ class Worker(object):
           # Copy the remote tensor to local (the coordinator) in case worker
           # becomes unavailable at a later time.
           closure.maybe_call_with_output_remote_value(lambda r: r.get())
+        metric_utils.monitor_sample("closure_latency",
+                                    time.time() - closure.schedule_time)
         self._cluster.closure_queue.mark_finished()
     except Exception as e:  # pylint: disable=broad-except
       # Avoid logging the derived cancellation error
@@ -1170,8 +1220,16 @@ class Worker(object):
                    self.worker_index, delay_secs)
     time.sleep(delay_secs)
 
-  def _process_queue(self):
-    """Function running in a worker thread to process closure queues."""
+  def _process_queue(self, thread_index=0):
+    """Function running in a worker thread to process closure queues.
+
+    Args:
+      thread_index: The index of the thread among the `inflight_window`
+        processing threads of this worker. Threads other than the first one use
+        their own executor, so that their closures don't wait for each other.
+    """
+    if thread_index:
+      self._thread_local.executor = executor.new_executor(enable_async=False)
     self._maybe_delay()
     while self._should_worker_thread_run:
       closure = self._cluster.closure_queue.get(tag=self.worker_index)
@@ -1222,10 +1280,12 @@ class Worker(object):
 
   def _register_and_schedule_resource_closure(self, closure):
     """Build remote value for, register for reconstruction, and schedule."""
-    # Some notes about the concurrency: currently all the activities related to
-    # the same worker such as creating resources, setting resources' aborted
-    # status, and executing closures happen on the same thread. This allows us
-    # to have simpler logic of concurrency.
+    # Some notes about the concurrency: with the default in-flight window of 1,
+    # all the activities related to the same worker such as creating
+    # resources, setting resources' aborted status, and executing closures
+    # happen on the same thread. With a larger window they are spread over the
+    # worker's processing threads, and the resource state is guarded by
+    # `self._resource_tracking_lock`.
 
     resource_remote_value = closure.build_output_remote_value()
     with self._resource_tracking_lock:
@@ -1301,6 +1361,14 @@ class Cluster(object):
     self._transient_timeouts_lock = threading.Lock()
     self._transient_timeouts_count = 0
 
+    # Number of closures each worker can have in flight at the same time. A
+    # larger window hides the dispatch and fetch latency of workers between
+    # short closures, at the cost of one more thread per worker for each
+    # additional closure.
+    self._worker_inflight_window = int(
+        os.environ.get("TF_COORDINATOR_WORKER_INFLIGHT_WINDOW",
+                       _WORKER_INFLIGHT_WINDOW))
+
     self.closure_queue = _CoordinatedClosureQueue()
     # Set this environment variable to use an experimental
     # integration with the runtime coordination service to aid in failure
@@ -1317,7 +1385,8 @@ class Cluster(object):
         "/job:worker/replica:0/task:%d" % i for i in range(self._num_workers)
     ]
     self.workers = [
-        Worker(i, w, self) for i, w in enumerate(worker_device_strings)
+        Worker(i, w, self, inflight_window=self._worker_inflight_window)
+        for i, w in enumerate(worker_device_strings)
     ]
 
     # Cancellation manager for all resource closures.
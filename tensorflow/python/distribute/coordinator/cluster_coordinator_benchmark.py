@@ -0,0 +1,106 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for scheduling closures with `ClusterCoordinator`.
+
+The cluster runs in local processes started by `MultiProcessRunner`, so the
+closures are small and the wall time per closure is dominated by the
+coordinator's scheduling, dispatch and fetch overhead.
+"""
+
+import time
+
+from tensorflow.python.distribute import multi_process_runner
+from tensorflow.python.distribute import multi_worker_test_base
+from tensorflow.python.distribute import parameter_server_strategy_v2
+from tensorflow.python.distribute.cluster_resolver import cluster_resolver as cluster_resolver_lib
+from tensorflow.python.distribute.coordinator import cluster_coordinator as coordinator_lib
+from tensorflow.python.distribute.coordinator import metric_utils
+from tensorflow.python.eager import def_function
+from tensorflow.python.eager import test
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import variables
+from tensorflow.python.training.server_lib import ClusterSpec
+
+_NUM_WORKERS = 2
+_NUM_CLOSURES = 500
+
+
+class ClusterCoordinatorBenchmark(test.Benchmark):
+  """Measures the per-closure overhead of `schedule` and `join`."""
+
+  def _make_coordinator(self, cluster, inflight_window):
+    cluster_def = cluster.cluster_resolver.cluster_spec().as_dict()
+    cluster_def["chief"] = [
+        "localhost:%d" % multi_worker_test_base.pick_unused_port()
+    ]
+    cluster_resolver = cluster_resolver_lib.SimpleClusterResolver(
+        ClusterSpec(cluster_def), rpc_layer="grpc")
+    strategy = parameter_server_strategy_v2.ParameterServerStrategyV2(
+        cluster_resolver)
+    coordinator_lib._WORKER_INFLIGHT_WINDOW = inflight_window
+    try:
+      return coordinator_lib.ClusterCoordinator(strategy)
+    finally:
+      coordinator_lib._WORKER_INFLIGHT_WINDOW = 1
+
+  def _run_benchmark(self, inflight_window):
+    cluster = multi_worker_test_base.create_multi_process_cluster(
+        num_workers=_NUM_WORKERS, num_ps=1, rpc_layer="grpc")
+    try:
+      coordinator = self._make_coordinator(cluster, inflight_window)
+      with coordinator.strategy.scope():
+        v = variables.Variable(initial_value=0, dtype=dtypes.int64)
+
+      @def_function.function
+      def step():
+        v.assign_add(1)
+        return v.read_value()
+
+      # Warm up: trace the function and create the remote executors.
+      for _ in range(_NUM_WORKERS * inflight_window):
+        coordinator.schedule(step)
+      coordinator.join()
+      metric_utils._init()  # pylint: disable=protected-access
+
+      start = time.time()
+      for _ in range(_NUM_CLOSURES):
+        coordinator.schedule(step)
+      coordinator.join()
+      wall_time = time.time() - start
+
+      latency = metric_utils.get_metric_summary("closure_latency")
+      queue_time = metric_utils.get_metric_summary("closure_queue_time")
+      execution = metric_utils.get_metric_summary("closure_execution")
+      extras = {
+          "closures_per_sec": _NUM_CLOSURES / wall_time,
+          "mean_closure_latency": latency["sum"] / latency["num"],
+          "mean_closure_queue_time": queue_time["sum"] / queue_time["num"],
+          "mean_closure_execution": execution["sum"] / execution["num"],
+      }
+      self.report_benchmark(
+          name="schedule_overhead_inflight_window_%d" % inflight_window,
+          iters=_NUM_CLOSURES,
+          wall_time=wall_time / _NUM_CLOSURES,
+          extras=extras)
+    finally:
+      cluster.stop()
+
+  def benchmark_schedule_overhead(self):
+    for inflight_window in (1, 2, 4, 8):
+      self._run_benchmark(inflight_window)
+
+
+if __name__ == "__main__":
+  multi_process_runner.test_main()
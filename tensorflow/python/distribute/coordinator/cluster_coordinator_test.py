@@ -971,6 +971,58 @@ class ScheduleStartDelayTest(ClusterCoordinatorTest):
     super(ScheduleStartDelayTest, cls).tearDownClass()
 
 
+class WorkerInflightWindowBasicTest(ClusterCoordinatorTest):
+  """Test basic functionality works with several closures in flight per worker.
+
+  Execute the same set of test cases as in `ClusterCoordinatorTest`, with each
+  worker processing up to three closures at the same time.
+  """
+
+  @classmethod
+  def setUpClass(cls):
+    super(WorkerInflightWindowBasicTest, cls).setUpClass()
+    coordinator_lib._WORKER_INFLIGHT_WINDOW = 3
+    cls.coordinator = make_coordinator(num_workers=5, num_ps=2)
+    cls.strategy = cls.coordinator.strategy
+
+  @classmethod
+  def tearDownClass(cls):
+    coordinator_lib._WORKER_INFLIGHT_WINDOW = 1
+    super(WorkerInflightWindowBasicTest, cls).tearDownClass()
+
+  def testProcessingThreadsPerWorker(self):
+    thread_names = [t.name for t in threading.enumerate()]
+    for worker in self.coordinator._cluster.workers:
+      self.assertEqual(worker.inflight_window, 3)
+      self.assertIn(
+          'WorkerClosureProcessingLoop-%d' % worker.worker_index, thread_names)
+      for i in range(1, 3):
+        self.assertIn(
+            'WorkerClosureProcessingLoop-%d-%d' % (worker.worker_index, i),
+            thread_names)
+
+  def testAllClosuresExecutedOnce(self):
+    with self.strategy.scope():
+      v = variables.Variable(initial_value=0, dtype=dtypes.int32)
+
+    @def_function.function
+    def f():
+      v.assign_add(1)
+
+    for _ in range(30):
+      self.coordinator.schedule(f)
+    self.coordinator.join()
+    self.assertEqual(v.read_value().numpy(), 30)
+    closure_queue = self.coordinator._cluster.closure_queue
+    self.assertEqual(closure_queue.inflight_closure_count, 0)
+
+  def testInvalidInflightWindow(self):
+    with self.assertRaisesRegex(ValueError, 'must be at least 1'):
+      coordinator_lib.Worker(
+          0, '/job:worker/replica:0/task:0', self.coordinator._cluster,
+          inflight_window=0)
+
+
 class ErrorReportingTest(TestCaseWithErrorReportingThread):
 
   @classmethod
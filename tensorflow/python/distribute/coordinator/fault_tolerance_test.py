@@ -56,6 +56,25 @@ class SingleWorkerFaultToleranceTest(
     super(SingleWorkerFaultToleranceTest, self).setUp(1, 1)
 
 
+class WorkerInflightWindowFaultToleranceTest(
+    fault_tolerance_test_base.BaseFaultToleranceTest, test.TestCase):
+  """Fault tolerance tests with several closures inflight per worker.
+
+  Each worker runs multiple processing threads, so resource closures are
+  rescheduled while other threads of the same worker still consume closures
+  that depend on those resources.
+  """
+
+  def setUp(self):
+    self._saved_inflight_window = cluster_coordinator._WORKER_INFLIGHT_WINDOW
+    cluster_coordinator._WORKER_INFLIGHT_WINDOW = 3
+    super(WorkerInflightWindowFaultToleranceTest, self).setUp(2, 2)
+
+  def tearDown(self):
+    super(WorkerInflightWindowFaultToleranceTest, self).tearDown()
+    cluster_coordinator._WORKER_INFLIGHT_WINDOW = self._saved_inflight_window
+
+
 class InitFaultToleranceTest(test.TestCase):
   """Test preemptions during strategy init."""
 
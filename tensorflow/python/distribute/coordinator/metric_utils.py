@@ -40,6 +40,11 @@ def _init():
   # Server def update: range from 1s to 10000s
   server_update_time_buckets = monitoring.ExponentialBuckets(
       scale=1, growth_factor=10, bucket_count=5)
+  # Closure latency (queueing, execution and fetch): same range as fetch
+  latency_time_buckets = fetch_time_buckets
+  # Queue depth: range from 1 to 262144 closures, i.e. [(1, 4), (4, 16), ...]
+  queue_depth_buckets = monitoring.ExponentialBuckets(
+      scale=1, growth_factor=4, bucket_count=10)
 
   function_tracing_sampler = monitoring.Sampler(
       '/tensorflow/api/ps_strategy/coordinator/function_tracing',
@@ -62,6 +67,24 @@ def _init():
       'Sample to track the time (in seconds) for updating the server def upon '
       'worker recovery.')
 
+  closure_queue_time_sampler = monitoring.Sampler(
+      '/tensorflow/api/ps_strategy/coordinator/closure_queue_time',
+      latency_time_buckets,
+      'Sampler to track the time (in seconds) closures wait in the '
+      'coordinator queue before being dispatched to a worker.')
+
+  closure_latency_sampler = monitoring.Sampler(
+      '/tensorflow/api/ps_strategy/coordinator/closure_latency',
+      latency_time_buckets,
+      'Sampler to track the time (in seconds) from scheduling a closure to '
+      'its output being fetched, including time spent in the queue.')
+
+  queue_depth_sampler = monitoring.Sampler(
+      '/tensorflow/api/ps_strategy/coordinator/queue_depth',
+      queue_depth_buckets,
+      'Sampler to track how many closures are in the coordinator queue when a '
+      'closure is dispatched to a worker.')
+
   queued_closure_gauge = monitoring.IntGauge(
       '/tensorflow/api/ps_strategy/coordinator/queued_closures',
       'Track how many closures are in the coordinator queue pending execution.')
@@ -79,6 +102,9 @@ def _init():
       'closure_execution': closure_execution_sampler,
       'remote_value_fetch': remote_value_fetch_sampler,
       'server_def_update': server_def_update_sampler,
+      'closure_queue_time': closure_queue_time_sampler,
+      'closure_latency': closure_latency_sampler,
+      'queue_depth': queue_depth_sampler,
       'queued_closures': queued_closure_gauge,
       'inflight_closures': inflight_closure_gauge,
       'worker_failures': worker_failure_counter,
@@ -114,6 +140,16 @@ def monitor_int(metric_name, value):
     metric.get_cell().set(value)
 
 
+def monitor_sample(metric_name, value):
+  if not enable_metrics:
+    return
+  else:
+    if not _METRICS_MAPPING:
+      _init()
+    metric = _METRICS_MAPPING[metric_name]
+    metric.get_cell().add(value)
+
+
 def monitor_increment_counter(metric_name):
   if not enable_metrics:
     return
@@ -142,7 +178,7 @@ def _get_metric_histogram(histogram_proto):
   bucket_limits = histogram_proto.bucket_limit
   bucket_vals = histogram_proto.bucket
   ret['histogram'] = {}
-  # Add lower limit as 0, since all these metrics are durations
+  # Add lower limit as 0, since all these metrics are durations or counts
   bucket_limits.insert(0, 0)
   for lb, ub, val in zip(bucket_limits[:-1], bucket_limits[1:], bucket_vals):
     ret['histogram'][(lb, ub)] = val
@@ -118,6 +118,15 @@ class MetricUtilsTest(test.TestCase):
     self.assertEqual(metric_closure['num'], 2)
     metric_remote_value = metric_utils.get_metric_summary('remote_value_fetch')
     self.assertEqual(metric_remote_value['num'], 2)
+    # Queueing, latency and queue depth are recorded once per dispatched
+    # closure.
+    metric_queue_time = metric_utils.get_metric_summary('closure_queue_time')
+    self.assertEqual(metric_queue_time['num'], 2)
+    metric_latency = metric_utils.get_metric_summary('closure_latency')
+    self.assertEqual(metric_latency['num'], 2)
+    self.assertGreaterEqual(metric_latency['sum'], metric_closure['sum'])
+    metric_queue_depth = metric_utils.get_metric_summary('queue_depth')
+    self.assertEqual(metric_queue_depth['num'], 2)
 
     self.assertEqual(result.fetch(), 3)
 
@@ -69,6 +69,11 @@ class RemoteValueImpl(remote_value.RemoteValue):
     # Wake up any waiting thread and clear the event.
     self._status_available_event.set()
 
+  def _set_rebuilding(self):
+    # Block readers until the rescheduled closure sets a new status.
+    self._status = remote_value.RemoteValueStatus.NOT_READY
+    self._status_available_event.clear()
+
   def _rebuild_on(self, worker):
     self._status_available_event.clear()
     # TODO(yuefengz): we may need to rebuild its inputs as well.
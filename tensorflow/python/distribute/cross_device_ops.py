@@ -1141,14 +1141,15 @@ class CollectiveAllReduce(CrossDeviceOps):
       # as to overlap calculation with communication. However, this may not be
       # optimal for cases like gradients of complicated non-sequential models.
       #
-      # Note that we reverse the list before packing so that the first pack
-      # won't be too small, since it's more likely for first few packs to have
-      # long queuing time due to concurrent intense computation.
+      # The pack plan groups values of the same dtype into packs of balanced
+      # sizes, and orders the packs by when all of their values are available.
+      # It only depends on the shapes and dtypes of the values, so the launcher
+      # reuses it across steps.
       #
       # TODO(b/147393503): explore solutions for optimal ordering.
       dense_values.reverse()
-      packs = cross_device_utils.group_by_size(dense_values,
-                                               options.bytes_per_pack)
+      plan = launcher.pack_plan(dense_values, options.bytes_per_pack)
+      packs = plan.pack(dense_values)
 
       if not context.executing_eagerly() and replica_id == 0:
         logging.info(
@@ -1157,7 +1158,7 @@ class CollectiveAllReduce(CrossDeviceOps):
             len(dense_values), len(self._launchers), self._group_size,
             options.implementation, len(packs))
 
-      dense_results = launcher.batch_all_reduce(packs, options)
+      dense_results = plan.unpack(launcher.batch_all_reduce(packs, options))
       if reduce_op == reduce_util.ReduceOp.MEAN:
         for i, v in enumerate(dense_results):
           with ops.device(self._devices[replica_id]):
@@ -285,6 +285,8 @@ class CollectiveReplicaLauncher(object):
     self._collective_keys = collective_keys
     self._device = device
     self._options = options
+    # Pack plans of `batch_all_reduce`, keyed by the signature of the tensors.
+    self._pack_plans = {}
     if self._use_ordering_token():
       with ops.init_scope(), ops.device(device):
         self._ordering_token = resource_variable_ops.ResourceVariable(0.)
@@ -404,6 +406,26 @@ class CollectiveReplicaLauncher(object):
           timeout=options.timeout_seconds,
           ordering_token=ordering_token)
 
+  def pack_plan(self, input_tensors: List[core.TensorLike],
+                bytes_per_pack: int) -> "PackPlan":
+    """Returns a `PackPlan` for `input_tensors`, reusing it across steps.
+
+    Args:
+      input_tensors: a list of dense tensors, ordered by when they are expected
+        to be available.
+      bytes_per_pack: an integer.
+
+    Returns:
+      A `PackPlan` made by `make_pack_plan`. The same plan is returned for all
+      calls with tensors of the same shapes and dtypes.
+    """
+    key = _pack_plan_signature(input_tensors, bytes_per_pack)
+    plan = self._pack_plans.get(key)
+    if plan is None:
+      plan = make_pack_plan(input_tensors, bytes_per_pack)
+      self._pack_plans[key] = plan
+    return plan
+
   def batch_all_reduce(
       self,
       input_tensor_packs: List[List[core.TensorLike]],
@@ -716,6 +738,114 @@ def group_by_size(input_tensors, bytes_per_pack):
   return packs
 
 
+def _pack_plan_signature(input_tensors, bytes_per_pack):
+  """Returns a hashable key for the pack plan of `input_tensors`."""
+  signature = []
+  for value in input_tensors:
+    shape = value.shape
+    signature.append((None if shape.rank is None else tuple(shape.as_list()),
+                      value.dtype.base_dtype))
+  return tuple(signature), bytes_per_pack
+
+
+class PackPlan(object):
+  """A deterministic assignment of dense tensors to all-reduce packs.
+
+  The plan only depends on the shapes and dtypes of the tensors, so a plan made
+  for one step can be reused for all steps that reduce tensors with the same
+  signature. Packs are ordered by when their tensors are expected to be
+  available, so they may not follow the order of the input tensors; use
+  `unpack` to restore it.
+  """
+
+  def __init__(self, packs):
+    """Creates a plan.
+
+    Args:
+      packs: a list of lists of indices into the input tensors. Each index must
+        appear exactly once.
+    """
+    self._packs = tuple(tuple(pack) for pack in packs)
+    self._num_values = sum(len(pack) for pack in self._packs)
+
+  @property
+  def packs(self):
+    """A tuple of tuples of the indices of the tensors in each pack."""
+    return self._packs
+
+  def pack(self, input_tensors):
+    """Groups `input_tensors` into packs according to the plan."""
+    if len(input_tensors) != self._num_values:
+      raise ValueError(
+          'PackPlan was made for %d tensors, but got %d.' %
+          (self._num_values, len(input_tensors)))
+    return [[input_tensors[i] for i in pack] for pack in self._packs]
+
+  def unpack(self, flat_outputs):
+    """Reorders the flattened outputs of the packs to the input order."""
+    result = [None] * self._num_values
+    flat_indices = [i for pack in self._packs for i in pack]
+    for i, value in zip(flat_indices, flat_outputs):
+      result[i] = value
+    return result
+
+
+def make_pack_plan(input_tensors, bytes_per_pack):
+  """Makes a `PackPlan` that groups `input_tensors` into balanced packs.
+
+  `input_tensors` should be ordered by when they are expected to be available,
+  e.g. gradients in reverse layer order. Each pack only contains tensors of the
+  same dtype, so that they can be concatenated. The tensors of each dtype are
+  split into contiguous packs of roughly equal size, each at least
+  `bytes_per_pack` large if possible, and the packs are ordered by the position
+  of their last tensor, i.e. by when all of their tensors are available.
+
+  Args:
+    input_tensors: a list of Tensor.
+    bytes_per_pack: an integer.
+
+  Returns:
+    A `PackPlan`. The tensors of each dtype are grouped into one pack if
+    `bytes_per_pack` is zero or any of the tensors has unknown shape.
+  """
+  indices_by_dtype = {}
+  for i, value in enumerate(input_tensors):
+    indices_by_dtype.setdefault(value.dtype.base_dtype, []).append(i)
+
+  sizes = []
+  for value in input_tensors:
+    num_elements = value.shape.num_elements()
+    if num_elements is None:
+      logging.warning(
+          'not packing values due to the unknown or inconsistent shape of %s',
+          value)
+      bytes_per_pack = 0
+      break
+    sizes.append(num_elements * value.dtype.size)
+
+  packs = []
+  for indices in indices_by_dtype.values():
+    if bytes_per_pack == 0:
+      packs.append(indices)
+      continue
+    total_size = sum(sizes[i] for i in indices)
+    # Err on the side of having few but large packs, like `group_by_size`.
+    num_packs = max(1, total_size // bytes_per_pack)
+    target_size = total_size / num_packs
+    dtype_packs = [[]]
+    accumulated_size = 0
+    for i in indices:
+      dtype_packs[-1].append(i)
+      accumulated_size += sizes[i]
+      if (accumulated_size >= target_size * len(dtype_packs) and
+          len(dtype_packs) < num_packs and i != indices[-1]):
+        dtype_packs.append([])
+    packs.extend(dtype_packs)
+  # A pack is ready once its last tensor is available.
+  packs.sort(key=lambda pack: (pack[-1], pack[0]))
+  return PackPlan(packs)
+
+
 def _pad_util(input_tensor, full_axis_dim):
   """Pad the `input_tensor`'s first dimension to be `full_axis_dim`."""
   missing_axis_dim = full_axis_dim - array_ops.shape_v2(input_tensor)[0]
@@ -16,6 +16,7 @@
 
 from absl.testing import parameterized
 
+from tensorflow.python.distribute import collective_util
 from tensorflow.python.distribute import combinations
 from tensorflow.python.distribute import cross_device_utils
 from tensorflow.python.distribute import device_util
@@ -175,5 +176,95 @@ class GroupBySizeTest(test.TestCase):
     self.assertEqual(packs[0], values)
 
 
+class PackPlanTest(test.TestCase):
+
+  def testSplitsByDtype(self):
+    values = [
+        array_ops.ones([10], dtype=dtypes.float32),
+        array_ops.ones([10], dtype=dtypes.float16),
+        array_ops.ones([10], dtype=dtypes.float32),
+        array_ops.ones([10], dtype=dtypes.float16),
+    ]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=0)
+    self.assertEqual(plan.packs, ((0, 2), (1, 3)))
+    for pack in plan.pack(values):
+      self.assertLen(set(v.dtype for v in pack), 1)
+
+  def testBalancedPacks(self):
+    # Each value is 400 bytes, so 2 packs of 800 bytes are made.
+    values = [array_ops.ones([100], dtype=dtypes.float32) for _ in range(4)]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=700)
+    self.assertEqual(plan.packs, ((0, 1), (2, 3)))
+
+  def testSmallValuesAreNotLeftAlone(self):
+    values = [
+        # size = 800
+        array_ops.ones([200], dtype=dtypes.float32),
+        # size = 40
+        array_ops.ones([10], dtype=dtypes.float32),
+        # size = 800
+        array_ops.ones([200], dtype=dtypes.float32),
+        # size = 4
+        array_ops.ones([1], dtype=dtypes.float32),
+    ]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=800)
+    self.assertEqual(plan.packs, ((0, 1), (2, 3)))
+
+  def testPackOrderFollowsAvailability(self):
+    values = [
+        array_ops.ones([100], dtype=dtypes.float32),
+        array_ops.ones([100], dtype=dtypes.float16),
+        array_ops.ones([100], dtype=dtypes.float32),
+        array_ops.ones([100], dtype=dtypes.float16),
+        array_ops.ones([100], dtype=dtypes.float32),
+    ]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=400)
+    # The float32 packs are ready after the 1st, 3rd and 5th values, and the
+    # float16 pack after the 4th one.
+    self.assertEqual(plan.packs, ((0,), (2,), (1, 3), (4,)))
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=800)
+    self.assertEqual(plan.packs, ((1, 3), (0, 2, 4)))
+
+  def testUnpackRestoresOrder(self):
+    values = [
+        array_ops.ones([1], dtype=dtypes.float32),
+        array_ops.ones([1], dtype=dtypes.int32),
+        array_ops.ones([1], dtype=dtypes.float32),
+    ]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=0)
+    flat = [v for pack in plan.pack(values) for v in pack]
+    self.assertEqual(plan.unpack(flat), values)
+    with self.assertRaisesRegex(ValueError, "made for 3 tensors"):
+      plan.pack(values[:2])
+
+  def testUnknownShape(self):
+    def create_placeholder(shape, dtype):
+      with ops.Graph().as_default():
+        return array_ops.placeholder(dtype=dtype, shape=shape)
+
+    values = [
+        array_ops.ones([10, 10], dtype=dtypes.float32),
+        create_placeholder([None, 10], dtype=dtypes.float32),
+        array_ops.ones([10, 10], dtype=dtypes.float32),
+    ]
+    plan = cross_device_utils.make_pack_plan(values, bytes_per_pack=1)
+    self.assertEqual(plan.packs, ((0, 1, 2),))
+
+  def testLauncherReusesPlan(self):
+    launcher = cross_device_utils.CollectiveReplicaLauncher(
+        group_key=1,
+        group_size=1,
+        collective_keys=cross_device_utils.CollectiveKeys(),
+        device="/cpu:0",
+        options=collective_util.Options())
+    values = [array_ops.ones([100], dtype=dtypes.float32) for _ in range(4)]
+    plan = launcher.pack_plan(values, bytes_per_pack=700)
+    self.assertIs(plan, launcher.pack_plan(
+        [array_ops.zeros([100], dtype=dtypes.float32) for _ in range(4)],
+        bytes_per_pack=700))
+    self.assertIsNot(plan, launcher.pack_plan(values, bytes_per_pack=0))
+    self.assertIsNot(plan, launcher.pack_plan(values[:3], bytes_per_pack=700))
+
+
 if __name__ == "__main__":
   test.main()
@@ -148,6 +148,11 @@ def _if_spawn_run_and_exit():
   # 1. Spawn the process for semaphore tracker.
   # 2. Spawn the initial process for forkserver.
   # 3. Spawn any process as requested by the "spawn" method.
+  #
+  # Note that by now the test binary has imported the test module and all of
+  # its dependencies, including TensorFlow. Subprocesses forked by the
+  # forkserver inherit these modules, so there is nothing left for
+  # `multiprocessing.set_forkserver_preload` to import ahead of time.
   exec(cmd)  # pylint: disable=exec-used
   sys.exit(0)  # Semaphore tracker doesn't explicitly sys.exit.
 
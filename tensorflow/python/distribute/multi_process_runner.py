@@ -73,6 +73,13 @@ _ProcessStatusInfo = collections.namedtuple(
 MultiProcessRunnerResult = collections.namedtuple('MultiProcessRunnerResult',
                                                   ['return_value', 'stdout'])
 
+# Time spent by a task of a `MultiProcessPoolRunner.run` call. `startup_time` is
+# the time in seconds from starting the task's process until it was ready to
+# run functions, or 0 if the process was already started by a previous run.
+# `execution_time` is the time in seconds spent running the function.
+TaskTiming = collections.namedtuple(
+    'TaskTiming', ['task_type', 'task_id', 'startup_time', 'execution_time'])
+
 # visible_gpus: If not None, CUDA_VISIBLE_DEVICES is set to visible_gpus.
 TestEnvironment = collections.namedtuple('TestEnvironment', [
     'task_type', 'task_id', 'cluster_spec', 'rpc_layer', 'grpc_fail_fast',
@@ -194,10 +201,7 @@ class MultiProcessRunner(object):
           'ThreadSanitizer is not compatible with MultiProcessRunner.')
 
     assert cluster_spec is not None
-    if 'chief' in cluster_spec and len(cluster_spec['chief']) > 1:
-      raise ValueError('If chief exists in the cluster, there must be at most '
-                       'one chief. Current `cluster_spec` has {} chiefs.'
-                       .format(len(cluster_spec['chief'])))
+    _check_cluster_spec(cluster_spec)
     _check_initialization()
     if not callable(fn):
       raise ValueError('fn is not a callable')
@@ -892,6 +896,13 @@ class MultiProcessPoolRunner(object):
 
   It's similar to MultiProcessRunner, but uses a pool of processes to avoid the
   expensive initialization cost of Tensorflow.
+
+  The pool can be reconfigured to a different cluster spec between runs with
+  `reconfigure()`. Processes of tasks that are in both cluster specs are reused,
+  processes are only started for new tasks, and processes of tasks that are
+  removed are kept idle so that they can be reused if the task is added back.
+  Note that state created by previous runs, e.g. a started server, is not reset
+  when the pool is reconfigured.
   """
 
   def __init__(self, cluster_spec, initializer=None, share_gpu=True):
@@ -912,11 +923,21 @@ class MultiProcessPoolRunner(object):
       ValueError: if there are more than one chief in the `cluster_spec`.
     """
     _active_pool_runners.add(self)
+    _check_cluster_spec(cluster_spec)
     self._cluster_spec = cluster_spec
     self._initializer = initializer
     self._share_gpu = share_gpu
     self._conn = {}
     self._runner = None
+    # Number of times the pool has been reconfigured, and the configuration
+    # each process was last given. Processes are started with the
+    # configuration of the pool at the time they are started.
+    self._generation = 0
+    self._barrier = None
+    self._process_generation = {}
+    # Start time of processes which haven't reported that they are ready yet.
+    self._pending_start_times = {}
+    self._timings = []
 
   def __del__(self):
     self.shutdown()
@@ -926,6 +947,8 @@ class MultiProcessPoolRunner(object):
     for conn in self._conn.values():
       conn.close()
     self._conn = {}
+    self._process_generation = {}
+    self._pending_start_times = {}
     if self._runner is not None:
       try:
         self._runner.join()
@@ -952,19 +975,63 @@ class MultiProcessPoolRunner(object):
         cluster_spec=self._cluster_spec,
         use_dill_for_args=False,
         share_gpu=self._share_gpu)
+    self._start_missing_tasks()
+
+  def _tasks(self):
+    return [(task_type, task_id)
+            for task_type, addresses in self._cluster_spec.items()
+            for task_id in range(len(addresses))]
+
+  def _start_missing_tasks(self):
+    """Starts processes for the tasks of the cluster spec that have none."""
     if self._initializer:
       initializer = dill.dumps(self._initializer, dill.HIGHEST_PROTOCOL)
     else:
       initializer = None
-    for task_type, addresses in self._cluster_spec.items():
-      for task_id, _ in enumerate(addresses):
-        conn1, conn2 = multiprocessing.Pipe(duplex=True)
-        self._conn[(task_type, task_id)] = conn1
-        self._runner.start_single_process(
-            task_type,
-            task_id,
-            fn=_pool_runner_worker,
-            args=(task_type, task_id, initializer, conn2))
+    for task_type, task_id in self._tasks():
+      if (task_type, task_id) in self._conn:
+        continue
+      conn1, conn2 = multiprocessing.Pipe(duplex=True)
+      self._conn[(task_type, task_id)] = conn1
+      self._process_generation[(task_type, task_id)] = 0
+      self._pending_start_times[(task_type, task_id)] = time.time()
+      self._runner.start_single_process(
+          task_type,
+          task_id,
+          cluster_spec=self._cluster_spec,
+          fn=_pool_runner_worker,
+          args=(task_type, task_id, initializer, conn2))
+
+  def reconfigure(self, cluster_spec):
+    """Changes the cluster spec used by subsequent `run` calls.
+
+    Args:
+      cluster_spec: Dict for the new cluster spec.
+
+    Raises:
+      ValueError: if there are more than one chief in the `cluster_spec`.
+    """
+    _check_cluster_spec(cluster_spec)
+    if cluster_spec == self._cluster_spec:
+      return
+    self._cluster_spec = cluster_spec
+    self._generation += 1
+    self._barrier = None
+
+  @property
+  def timings(self):
+    """A list of `TaskTiming`s, one for each task of the last `run` call."""
+    return list(self._timings)
+
+  def _recv(self, task_type, task_id):
+    try:
+      return self._conn[(task_type, task_id)].recv()
+    except EOFError:
+      # This shouldn't happen due to exceptions in fn. This usually
+      # means bugs in the runner.
+      self.shutdown()
+      raise RuntimeError('Unexpected EOF. Worker process may have died. '
+                         'Please report a bug')
 
   def run(self, fn, args=None, kwargs=None):
     """Runs `fn` with `args` and `kwargs` on all jobs.
@@ -982,22 +1049,41 @@ class MultiProcessPoolRunner(object):
     multi_process_lib.Process()
     if self._runner is None:
       self._start()
+    else:
+      self._start_missing_tasks()
 
+    tasks = self._tasks()
+    if self._generation and self._barrier is None:
+      # Processes started before the pool was reconfigured share a barrier
+      # for the original cluster spec.
+      self._barrier = manager().Barrier(len(tasks))
     fn = dill.dumps(fn, dill.HIGHEST_PROTOCOL)
-    for conn in self._conn.values():
-      conn.send((fn, args or [], kwargs or {}))
+    for task in tasks:
+      conn = self._conn[task]
+      if self._process_generation[task] != self._generation:
+        conn.send(('configure', self._cluster_spec, self._barrier))
+        self._process_generation[task] = self._generation
+      conn.send(('run', fn, args or [], kwargs or {}))
 
     process_statuses = []
-    for (task_type, task_id), conn in self._conn.items():
+    self._timings = []
+    for task_type, task_id in tasks:
+      startup_time = 0.
+      start_time = self._pending_start_times.pop((task_type, task_id), None)
+      if start_time is not None:
+        # The first message from a process is the time it became ready.
+        startup_time = self._recv(task_type, task_id) - start_time
       logging.info('Waiting for the result from %s-%d', task_type, task_id)
-      try:
-        process_statuses.append(conn.recv())
-      except EOFError:
-        # This shouldn't happen due to exceptions in fn. This usually
-        # means bugs in the runner.
-        self.shutdown()
-        raise RuntimeError('Unexpected EOF. Worker process may have died. '
-                           'Please report a bug')
+      process_status, execution_time = self._recv(task_type, task_id)
+      process_statuses.append(process_status)
+      self._timings.append(
+          TaskTiming(
+              task_type=task_type,
+              task_id=task_id,
+              startup_time=startup_time,
+              execution_time=execution_time))
+      logging.info('%s-%d started in %.3fs and ran in %.3fs', task_type,
+                   task_id, startup_time, execution_time)
 
     return_values = []
     for process_status in process_statuses:
@@ -1015,7 +1101,9 @@ def _pool_runner_worker(task_type, task_id, initializer, conn):
 
   It listens for callables to run and returns the result until `conn` is closed.
   It captures the exceptions during executing the callable and return it through
-  `conn`.
+  `conn`, along with the time it took to run. Once the process is ready, it
+  first sends the current time through `conn`, so that the pool can measure its
+  startup time.
 
   Args:
     task_type: the task type.
@@ -1024,19 +1112,30 @@ def _pool_runner_worker(task_type, task_id, initializer, conn):
     conn: a multiprocessing.Connection object to listen for tasks and send
       results.
   """
+  global _barrier
+
   if initializer:
     initializer = dill.loads(initializer)
     initializer()
+  conn.send(time.time())
   while True:
     try:
-      fn, args, kwargs = conn.recv()
+      message = conn.recv()
     except EOFError:
       break
+    if message[0] == 'configure':
+      _, cluster_spec, _barrier = message
+      rpc_layer = json.loads(os.environ['TF_CONFIG']).get('rpc_layer')
+      _set_tf_config(task_type, task_id, cluster_spec, rpc_layer)
+      continue
+    _, fn, args, kwargs = message
     fn = dill.loads(fn)
+    start_time = time.time()
     info = _run_contained(task_type, task_id, fn, args, kwargs)
+    execution_time = time.time() - start_time
     sys.stdout.flush()
     sys.stderr.flush()
-    conn.send(info)
+    conn.send((info, execution_time))
 
 
 def _run_contained(task_type, task_id, fn, args, kwargs):
@@ -1131,6 +1230,13 @@ class NotInitializedError(RuntimeError):
   pass
 
 
+def _check_cluster_spec(cluster_spec):
+  if 'chief' in cluster_spec and len(cluster_spec['chief']) > 1:
+    raise ValueError('If chief exists in the cluster, there must be at most '
+                     'one chief. Current `cluster_spec` has {} chiefs.'
+                     .format(len(cluster_spec['chief'])))
+
+
 def _check_initialization():
   if not multi_process_lib.initialized():
     raise NotInitializedError(
@@ -68,6 +68,17 @@ def fn_that_returns_pid():
   return os.getpid()
 
 
+def fn_that_returns_task_and_pid():
+  tf_config = json.loads(os.environ['TF_CONFIG'])
+  return (tf_config['task']['type'], tf_config['task']['index'],
+          sorted(tf_config['cluster']), os.getpid())
+
+
+def fn_that_waits_on_barrier():
+  multi_process_runner.get_barrier().wait()
+  return multi_worker_test_base.get_task_type()
+
+
 V = None
 
 
@@ -597,6 +608,57 @@ class MultiProcessPoolRunnerTest(test.TestCase):
     result = runner.run(fn_that_sets_global, args=(2,))
     self.assertAllEqual(result, [1, 1])
 
+  def test_reconfigure(self):
+    cluster_spec = multi_worker_test_base.create_cluster_spec(num_workers=2)
+    runner = multi_process_runner.MultiProcessPoolRunner(cluster_spec)
+    pids = {(task_type, task_id): pid for task_type, task_id, _, pid in
+            runner.run(fn_that_returns_task_and_pid)}
+
+    # Worker 0 and 1 are reused, and a chief is started.
+    runner.reconfigure(
+        multi_worker_test_base.create_cluster_spec(
+            has_chief=True, num_workers=2))
+    result = runner.run(fn_that_returns_task_and_pid)
+    self.assertLen(result, 3)
+    for task_type, task_id, jobs, pid in result:
+      self.assertEqual(jobs, ['chief', 'worker'])
+      if task_type == 'worker':
+        self.assertEqual(pids[(task_type, task_id)], pid)
+    self.assertCountEqual(runner.run(fn_that_waits_on_barrier),
+                          ['chief', 'worker', 'worker'])
+
+    # Worker 1 is idle and isn't sent functions.
+    runner.reconfigure(
+        multi_worker_test_base.create_cluster_spec(num_workers=1))
+    result = runner.run(fn_that_returns_task_and_pid)
+    self.assertLen(result, 1)
+    self.assertEqual(result[0][:3], ('worker', 0, ['worker']))
+    self.assertEqual(result[0][3], pids[('worker', 0)])
+    self.assertEqual(runner.run(fn_that_waits_on_barrier), ['worker'])
+
+  def test_reconfigure_with_multiple_chiefs(self):
+    runner = multi_process_runner.MultiProcessPoolRunner(
+        multi_worker_test_base.create_cluster_spec(num_workers=1))
+    with self.assertRaisesRegex(ValueError, 'at most one chief'):
+      runner.reconfigure({'chief': ['localhost:1', 'localhost:2']})
+
+  def test_timings(self):
+    cluster_spec = multi_worker_test_base.create_cluster_spec(num_workers=2)
+    runner = multi_process_runner.MultiProcessPoolRunner(cluster_spec)
+    runner.run(time.sleep, args=(0.5,))
+    timings = runner.timings
+    self.assertCountEqual([(t.task_type, t.task_id) for t in timings],
+                          [('worker', 0), ('worker', 1)])
+    for timing in timings:
+      self.assertGreater(timing.startup_time, 0)
+      self.assertGreaterEqual(timing.execution_time, 0.5)
+
+    # Processes are warm in subsequent runs.
+    runner.run(fn_that_does_nothing)
+    for timing in runner.timings:
+      self.assertEqual(timing.startup_time, 0)
+      self.assertLess(timing.execution_time, 0.5)
+
   def test_global_pool(self):
     _global_pool.run(fn_that_does_nothing)
 
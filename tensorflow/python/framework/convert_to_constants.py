@@ -15,6 +15,9 @@
 """Helpers to convert variables to constants in TensorFlow 2.0."""
 
 import collections
+import hashlib
+import struct
+
 import numpy as np
 
 from tensorflow.core.framework import attr_value_pb2
@@ -24,6 +27,7 @@ from tensorflow.core.framework import variable_pb2
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.core.protobuf import meta_graph_pb2
 from tensorflow.core.protobuf import rewriter_config_pb2
+from tensorflow.core.util import memmapped_file_system_pb2
 from tensorflow.python.eager import context
 from tensorflow.python.eager import wrap_function
 from tensorflow.python.framework import dtypes
@@ -32,6 +36,7 @@ from tensorflow.python.framework import graph_util
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import tensor_util
 from tensorflow.python.grappler import tf_optimizer
+from tensorflow.python.lib.io import file_io
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import variables
 from tensorflow.python.platform import tf_logging as logging
@@ -46,6 +51,10 @@ VAR_ASSIGN_COLLECTION = "extra_var_assign_ops"
 _CONDITIONAL_OPS = set(["If", "StatelessIf"])
 _LOOP_OPS = set(["While", "StatelessWhile"])
 _CONTROL_FLOW_OPS = _CONDITIONAL_OPS.union(_LOOP_OPS)
+# Region names and alignment used by MemmappedFileSystemWriter.
+_MEMMAPPED_PACKAGE_PREFIX = "memmapped_package://"
+_MEMMAPPED_GRAPH_DEF_NAME = _MEMMAPPED_PACKAGE_PREFIX + "."
+_MEMMAPPED_ALIGNMENT = 64
 
 
 class _TensorData(
@@ -1105,7 +1114,129 @@ def _construct_concrete_function(func, output_graph_def,
   return new_func
 
 
-def _replace_variables_by_constants(converter_data):
+def _constant_digest(tensor_proto):
+  """Returns a digest of the dtype, shape and value of a TensorProto."""
+  hasher = hashlib.sha256()
+  hasher.update(struct.pack("<i", tensor_proto.dtype))
+  hasher.update(tensor_proto.tensor_shape.SerializeToString(deterministic=True))
+  if tensor_proto.tensor_content:
+    hasher.update(tensor_proto.tensor_content)
+  else:
+    # Strings, scalars and splats keep their values in the typed fields.
+    hasher.update(tensor_proto.SerializeToString(deterministic=True))
+  return hasher.digest()
+
+
+def _deduplicate_constants(graph_def, node_names):
+  """Stores constants with the same value once.
+
+  Every Const node in `node_names` whose value equals the value of a previous
+  one is replaced by an Identity of that node, so consumers and node names are
+  unchanged but the tensor bytes are only kept once in the GraphDef.
+
+  Args:
+    graph_def: The GraphDef to rewrite in place.
+    node_names: Names of the top-level nodes that may be deduplicated.
+
+  Returns:
+    The number of tensor bytes removed from `graph_def`.
+  """
+  canonical_names = {}
+  removed_bytes = 0
+  for node in graph_def.node:
+    if node.op != "Const" or node.name not in node_names:
+      continue
+    tensor_proto = node.attr["value"].tensor
+    digest = _constant_digest(tensor_proto)
+    canonical_name = canonical_names.setdefault(digest, node.name)
+    if canonical_name == node.name:
+      continue
+    removed_bytes += tensor_proto.ByteSize()
+    node.op = "Identity"
+    node.input.insert(0, canonical_name)
+    node.attr["T"].CopyFrom(node.attr["dtype"])
+    del node.attr["dtype"]
+    del node.attr["value"]
+  if removed_bytes:
+    logging.info("Deduplicated constants, removed %d bytes.", removed_bytes)
+  return removed_bytes
+
+
+def convert_constants_to_memmapped_package(graph_def,
+                                           package_path,
+                                           min_size_bytes=1024):
+  """Moves the large constants of a frozen graph into a memmapped package.
+
+  Top-level Const nodes with at least `min_size_bytes` of data are replaced by
+  ImmutableConst nodes reading their value from a region of the file at
+  `package_path`, which is written in the format of
+  `tensorflow/core/util/memmapped_file_system_writer.h`. Constants with the
+  same value share a region. The returned GraphDef is also stored in
+  the package, under `memmapped_package://.`.
+
+  The graph can only be run in a session whose `Env` is a `MemmappedEnv`
+  initialized from the package, which maps the constants instead of copying
+  them into the graph.
+
+  Args:
+    graph_def: A frozen GraphDef. It is not modified.
+    package_path: Path of the package file to write.
+    min_size_bytes: Constants with fewer bytes of data are kept inline.
+
+  Returns:
+    A copy of `graph_def` with the large constants replaced by ImmutableConst
+    nodes.
+  """
+  output_graph_def = graph_pb2.GraphDef()
+  output_graph_def.CopyFrom(graph_def)
+  regions = {}
+  for node in output_graph_def.node:
+    if node.op != "Const":
+      continue
+    tensor_proto = node.attr["value"].tensor
+    dtype = dtypes.as_dtype(tensor_proto.dtype)
+    if dtype in (dtypes.string, dtypes.resource, dtypes.variant):
+      continue
+    value = tensor_util.MakeNdarray(tensor_proto)
+    if value.nbytes < min_size_bytes or not value.nbytes:
+      continue
+    region_name = (
+        _MEMMAPPED_PACKAGE_PREFIX + "const_" +
+        _constant_digest(tensor_proto).hex())
+    if region_name not in regions:
+      regions[region_name] = np.ascontiguousarray(value).tobytes()
+    node.op = "ImmutableConst"
+    node.attr["shape"].shape.CopyFrom(tensor_proto.tensor_shape)
+    node.attr["memory_region_name"].s = region_name.encode("utf-8")
+    del node.attr["value"]
+
+  directory = memmapped_file_system_pb2.MemmappedFileSystemDirectory()
+  offset = 0
+  with file_io.FileIO(package_path, "wb") as f:
+    for region_name, data in regions.items():
+      padding = -offset % _MEMMAPPED_ALIGNMENT
+      f.write(b"\0" * padding)
+      offset += padding
+      directory.element.add(
+          name=region_name, offset=offset, length=len(data))
+      f.write(data)
+      offset += len(data)
+    serialized_graph_def = output_graph_def.SerializeToString()
+    directory.element.add(
+        name=_MEMMAPPED_GRAPH_DEF_NAME,
+        offset=offset,
+        length=len(serialized_graph_def))
+    f.write(serialized_graph_def)
+    offset += len(serialized_graph_def)
+    f.write(directory.SerializeToString())
+    f.write(struct.pack("<Q", offset))
+  logging.info("Wrote %d constants (%d bytes) to %s.", len(regions),
+               sum(len(data) for data in regions.values()), package_path)
+  return output_graph_def
+
+
+def _replace_variables_by_constants(converter_data,
+                                    deduplicate_constants=False):
   """Replaces variables by constants on a given graph.
 
   Given a _ConverterData instance with converted variables in its tensor_data
@@ -1114,6 +1245,8 @@ def _replace_variables_by_constants(converter_data):
 
   Args:
     converter_data: A pre-populated _ConverterData instance.
+    deduplicate_constants: Whether to store converted variables with the same
+      value once.
 
   Returns:
     The converted graph.
@@ -1125,6 +1258,9 @@ def _replace_variables_by_constants(converter_data):
         None, tensor_data)
 
   converted_graph = input_graph.converted_self().graph_def
+  if deduplicate_constants:
+    _deduplicate_constants(converted_graph,
+                           set(converter_data.tensor_data.keys()))
 
   converted_input_indices = {
       t.index
@@ -1137,7 +1273,8 @@ def _replace_variables_by_constants(converter_data):
 
 def convert_variables_to_constants_v2(func,
                                       lower_control_flow=True,
-                                      aggressive_inlining=False):
+                                      aggressive_inlining=False,
+                                      deduplicate_constants=False):
   """Replaces all the variables in a graph with constants of the same values.
 
   TensorFlow 2.0 function for converting all Variable ops into Const ops holding
@@ -1156,6 +1293,9 @@ def convert_variables_to_constants_v2(func,
     aggressive_inlining: Boolean indicating whether or not to do aggressive
       function inlining (might be unsafe if function has stateful ops, not
       properly connected to control outputs). (default False)
+    deduplicate_constants: Boolean indicating whether or not to store variables
+      with the same value, e.g. tied weights, as a single Const node that the
+      other converted nodes read through Identity nodes. (default False)
 
   Returns:
     ConcreteFunction containing a simplified version of the original.
@@ -1167,7 +1307,8 @@ def convert_variables_to_constants_v2(func,
       aggressive_inlining=aggressive_inlining)
 
   output_graph_def, converted_input_indices = _replace_variables_by_constants(
-      converter_data=converter_data)
+      converter_data=converter_data,
+      deduplicate_constants=deduplicate_constants)
 
   return _construct_concrete_function(func, output_graph_def,
                                       converted_input_indices)
@@ -1175,7 +1316,8 @@ def convert_variables_to_constants_v2(func,
 
 def convert_var_to_const_function_in_v1(func,
                                         lower_control_flow=True,
-                                        aggressive_inlining=False):
+                                        aggressive_inlining=False,
+                                        deduplicate_constants=False):
   """Replaces all the variables in a graph with constants of the same values.
 
   This function works as same as convert_variables_to_constants_v2, but it
@@ -1194,6 +1336,9 @@ def convert_var_to_const_function_in_v1(func,
     aggressive_inlining: Boolean indicating whether or not to do aggressive
       function inlining (might be unsafe if function has stateful ops, not
       properly connected to control outputs). (default False)
+    deduplicate_constants: Boolean indicating whether or not to store variables
+      with the same value, e.g. tied weights, as a single Const node that the
+      other converted nodes read through Identity nodes. (default False)
 
   Raises:
       RuntimeError: If no Session context is present.
@@ -1214,7 +1359,8 @@ def convert_var_to_const_function_in_v1(func,
       session=session)
 
   output_graph_def, converted_input_indices = _replace_variables_by_constants(
-      converter_data=converter_data)
+      converter_data=converter_data,
+      deduplicate_constants=deduplicate_constants)
 
   return _construct_concrete_function(func, output_graph_def,
                                       converted_input_indices)
@@ -1222,7 +1368,8 @@ def convert_var_to_const_function_in_v1(func,
 
 def convert_variables_to_constants_v2_as_graph(func,
                                                lower_control_flow=True,
-                                               aggressive_inlining=False):
+                                               aggressive_inlining=False,
+                                               deduplicate_constants=False):
   """Replaces all the variables in a graph with constants of the same values.
 
   This function works as same as convert_variables_to_constants_v2, but it
@@ -1236,6 +1383,9 @@ def convert_variables_to_constants_v2_as_graph(func,
     aggressive_inlining: Boolean indicating whether or not to do aggressive
       function inlining (might be unsafe if function has stateful ops, not
       properly connected to control outputs).
+    deduplicate_constants: Boolean indicating whether or not to store variables
+      with the same value, e.g. tied weights, as a single Const node that the
+      other converted nodes read through Identity nodes. (default False)
 
   Returns:
     ConcreteFunction containing a simplified version of the original, and also
@@ -1248,7 +1398,8 @@ def convert_variables_to_constants_v2_as_graph(func,
       aggressive_inlining=aggressive_inlining)
 
   output_graph_def, converted_input_indices = _replace_variables_by_constants(
-      converter_data=converter_data)
+      converter_data=converter_data,
+      deduplicate_constants=deduplicate_constants)
 
   frozen_func = _construct_concrete_function(func, output_graph_def,
                                              converted_input_indices)
@@ -1260,7 +1411,8 @@ def convert_variables_to_constants_from_session_graph(
     graph_def,
     output_node_names,
     variable_names_allowlist=None,
-    variable_names_denylist=None):
+    variable_names_denylist=None,
+    deduplicate_constants=False):
   """Replaces all the variables in a graph with constants of the same values.
 
   This function works similarly to convert_variables_to_constants_v2, but it
@@ -1278,6 +1430,8 @@ def convert_variables_to_constants_from_session_graph(
       all variables are converted).
     variable_names_denylist: The set of variable names to omit converting to
       constants.
+    deduplicate_constants: Boolean indicating whether or not to store variables
+      with the same value as a single Const node. (default False)
 
   Returns:
     An optimized GraphDef.
@@ -1288,7 +1442,8 @@ def convert_variables_to_constants_from_session_graph(
           graph_def=graph_def,
           output_node_names=output_node_names,
           variable_names_allowlist=variable_names_allowlist,
-          variable_names_denylist=variable_names_denylist))
+          variable_names_denylist=variable_names_denylist),
+      deduplicate_constants=deduplicate_constants)
   return graph_def
 
 
@@ -16,6 +16,7 @@
 
 import os
 import re
+import struct
 
 import numpy as np
 
@@ -28,6 +29,7 @@ from tensorflow.core.framework import op_def_pb2
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.core.protobuf import meta_graph_pb2
 from tensorflow.core.protobuf import saved_model_pb2
+from tensorflow.core.util import memmapped_file_system_pb2
 from tensorflow.python.client import session as session_lib
 from tensorflow.python.eager import def_function
 from tensorflow.python.framework import constant_op
@@ -269,6 +271,90 @@ class VariablesToConstantsTest(test.TestCase):
         input_func)
     self._testConvertedFunction(root, root.f, output_func, input_data)
 
+  @test_util.run_v2_only
+  def testDeduplicateConstants(self):
+    """Test that variables with the same value are stored once."""
+    input_data = {"x": constant_op.constant(1., shape=[64])}
+    root = autotrackable.AutoTrackable()
+    root.v1 = variables.Variable(np.arange(64, dtype=np.float32))
+    root.v2 = variables.Variable(np.arange(64, dtype=np.float32))
+    root.v3 = variables.Variable(np.ones(64, dtype=np.float32))
+    root.f = def_function.function(
+        lambda x: root.v1 * x + root.v2 * root.v3)
+    input_func = root.f.get_concrete_function(input_data["x"])
+
+    _, graph_def = (
+        convert_to_constants.convert_variables_to_constants_v2_as_graph(
+            input_func))
+    output_func, output_graph_def = (
+        convert_to_constants.convert_variables_to_constants_v2_as_graph(
+            input_func, deduplicate_constants=True))
+    ops_by_name = {node.name: node.op for node in output_graph_def.node}
+    self.assertEqual([node.name for node in graph_def.node],
+                     [node.name for node in output_graph_def.node])
+    self.assertEqual(
+        [node.op for node in graph_def.node].count("Const") - 1,
+        list(ops_by_name.values()).count("Const"))
+    original_ops_by_name = {node.name: node.op for node in graph_def.node}
+    identities = [
+        node for node in output_graph_def.node
+        if node.op != original_ops_by_name[node.name]
+    ]
+    self.assertLen(identities, 1)
+    self.assertEqual("Identity", identities[0].op)
+    self.assertEqual("Const", ops_by_name[identities[0].input[0]])
+    self.assertEqual(dtypes.float32.as_datatype_enum,
+                     identities[0].attr["T"].type)
+    self._testConvertedFunction(root, root.f, output_func, input_data)
+
+  @test_util.run_v2_only
+  def testConvertConstantsToMemmappedPackage(self):
+    """Test moving large constants into a memmapped package."""
+    input_data = {"x": constant_op.constant(1., shape=[256])}
+    root = autotrackable.AutoTrackable()
+    root.v1 = variables.Variable(np.arange(256, dtype=np.float32))
+    root.v2 = variables.Variable(np.arange(256, dtype=np.float32))
+    root.v3 = variables.Variable(2.)
+    root.f = def_function.function(
+        lambda x: root.v1 * x + root.v2 * root.v3)
+    input_func = root.f.get_concrete_function(input_data["x"])
+    _, graph_def = (
+        convert_to_constants.convert_variables_to_constants_v2_as_graph(
+            input_func))
+
+    package_path = os.path.join(self.get_temp_dir(), "weights.mmap")
+    output_graph_def = (
+        convert_to_constants.convert_constants_to_memmapped_package(
+            graph_def, package_path, min_size_bytes=1024))
+    immutable_consts = [
+        node for node in output_graph_def.node if node.op == "ImmutableConst"
+    ]
+    self.assertLen(immutable_consts, 2)
+    # Constants with the same value share a region.
+    self.assertEqual(immutable_consts[0].attr["memory_region_name"].s,
+                     immutable_consts[1].attr["memory_region_name"].s)
+    # Small constants are kept inline.
+    self.assertIn("Const", [node.op for node in output_graph_def.node])
+
+    package = file_io.read_file_to_string(package_path, binary_mode=True)
+    directory_offset, = struct.unpack("<Q", package[-8:])
+    directory = memmapped_file_system_pb2.MemmappedFileSystemDirectory()
+    directory.ParseFromString(package[directory_offset:-8])
+    regions = {
+        element.name: package[element.offset:element.offset + element.length]
+        for element in directory.element
+    }
+    self.assertLen(regions, 2)
+    self.assertEqual(
+        np.arange(256, dtype=np.float32).tobytes(),
+        regions[immutable_consts[0].attr["memory_region_name"].s.decode()])
+    for element in directory.element:
+      if element.name != "memmapped_package://.":
+        self.assertEqual(0, element.offset % 64)
+    self.assertEqual(
+        output_graph_def,
+        graph_pb2.GraphDef.FromString(regions["memmapped_package://."]))
+
   @test_util.run_v2_only
   def testVariableSavedModel(self):
     """Test a basic model with Variables with saving/loading the SavedModel."""
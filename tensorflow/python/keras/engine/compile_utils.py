@@ -15,17 +15,44 @@
 """Utilites for `Model.compile`."""
 
 import copy
+import itertools
 
 from tensorflow.python.distribute import distribute_lib
+from tensorflow.python.framework import ops
+from tensorflow.python.framework import tensor as tensor_lib
+from tensorflow.python.keras import backend
 from tensorflow.python.keras import losses as losses_mod
 from tensorflow.python.keras import metrics as metrics_mod
 from tensorflow.python.keras.utils import generic_utils
 from tensorflow.python.keras.utils import losses_utils
 from tensorflow.python.keras.utils import tf_utils
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import array_ops_stack
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import weights_broadcast_ops
 from tensorflow.python.util import nest
 
+# Loss and metric functions which only reduce the last axis of their inputs
+# (or a given `axis`, if it is negative). They can be applied to the
+# predictions of several outputs at once, stacked along a new leading axis.
+_GROUPABLE_FNS = frozenset([
+    losses_mod.binary_crossentropy,
+    losses_mod.categorical_crossentropy,
+    losses_mod.hinge,
+    losses_mod.kl_divergence,
+    losses_mod.log_cosh,
+    losses_mod.mean_absolute_error,
+    losses_mod.mean_absolute_percentage_error,
+    losses_mod.mean_squared_error,
+    losses_mod.mean_squared_logarithmic_error,
+    losses_mod.poisson,
+    losses_mod.sparse_categorical_crossentropy,
+    losses_mod.squared_hinge,
+    metrics_mod.binary_accuracy,
+    metrics_mod.categorical_accuracy,
+    metrics_mod.sparse_categorical_accuracy,
+])
+
 
 class Container(object):
   """Base Container class."""
@@ -103,7 +130,19 @@ class Container(object):
 class LossesContainer(Container):
   """A container class for losses passed to `Model.compile`."""
 
-  def __init__(self, losses, loss_weights=None, output_names=None):
+  def __init__(self, losses, loss_weights=None, output_names=None,
+               grouped=False):
+    """Initializes a container for losses.
+
+    Arguments:
+      losses: see the `loss` argument from `tf.keras.Model.compile`.
+      loss_weights: see the `loss_weights` argument from
+        `tf.keras.Model.compile`.
+      output_names: A list of strings of names of outputs for the model.
+      grouped: Whether the same built-in loss of several outputs is computed
+        once over the stacked predictions of these outputs, see
+        `_compute_grouped_losses()`.
+    """
     super(LossesContainer, self).__init__(output_names=output_names)
 
     # Keep user-supplied values untouched for recompiling and serialization.
@@ -114,6 +153,7 @@ class LossesContainer(Container):
     self._loss_weights = loss_weights
     self._per_output_metrics = None  # Per-output losses become metrics.
     self._loss_metric = metrics_mod.Mean(name='loss')  # Total loss.
+    self._grouped = grouped
     self._built = False
 
   @property
@@ -190,18 +230,28 @@ class LossesContainer(Container):
     y_true = nest.flatten(y_true)
     sample_weight = nest.flatten(sample_weight)
 
+    if self._grouped and ops.executing_eagerly_outside_functions():
+      grouped_loss_values = self._compute_grouped_losses(
+          y_true, y_pred, sample_weight)
+    else:
+      grouped_loss_values = {}
+
     loss_values = []  # Used for gradient calculation.
     loss_metric_values = []  # Used for loss metric calculation.
     batch_dim = None
     zip_args = (y_true, y_pred, sample_weight, self._losses, self._loss_weights,
                 self._per_output_metrics)
-    for y_t, y_p, sw, loss_obj, loss_weight, metric_obj in zip(*zip_args):
+    for i, (y_t, y_p, sw, loss_obj, loss_weight,
+            metric_obj) in enumerate(zip(*zip_args)):
       if y_t is None or loss_obj is None:  # Ok to have no loss for an output.
         continue
 
-      y_t, y_p, sw = match_dtype_and_rank(y_t, y_p, sw)
-      sw = apply_mask(y_p, sw, get_mask(y_p))
-      loss_value = loss_obj(y_t, y_p, sample_weight=sw)
+      if i in grouped_loss_values:
+        loss_value = grouped_loss_values[i]
+      else:
+        y_t, y_p, sw = match_dtype_and_rank(y_t, y_p, sw)
+        sw = apply_mask(y_p, sw, get_mask(y_p))
+        loss_value = loss_obj(y_t, y_p, sample_weight=sw)
 
       loss_metric_value = loss_value
       # Correct for the `Mean` loss metrics counting each replica as a batch.
@@ -249,6 +299,52 @@ class LossesContainer(Container):
       # Ok for a model to have no compiled loss.
       return array_ops.zeros(shape=())
 
+  def _compute_grouped_losses(self, y_true, y_pred, sample_weight):
+    """Computes the losses of outputs which share the same loss at once.
+
+    Outputs are grouped when their loss is a `LossFunctionWrapper` of one of
+    `_GROUPABLE_FNS` with the same arguments and reduction, and their labels,
+    predictions and sample weights can be stacked. The loss function is then
+    called once on the stacked tensors, and the losses are reduced per output
+    like `losses_utils.compute_weighted_loss()` does.
+
+    Args:
+      y_true: Flat list of labels, one per output.
+      y_pred: Flat list of predictions, one per output.
+      sample_weight: Flat list of sample weights, one per output.
+
+    Returns:
+      Dict mapping the index of each grouped output to its loss value.
+    """
+    groups = {}
+    for i, (y_t, y_p, sw, loss_obj) in enumerate(
+        zip(y_true, y_pred, sample_weight, self._losses)):
+      if (y_t is None or loss_obj is None or
+          type(loss_obj).call is not losses_mod.LossFunctionWrapper.call):
+        continue
+      reduction = loss_obj._get_reduction()  # pylint: disable=protected-access
+      if reduction not in (losses_utils.ReductionV2.SUM,
+                           losses_utils.ReductionV2.SUM_OVER_BATCH_SIZE):
+        continue
+      key = _group_key(loss_obj.fn, loss_obj._fn_kwargs, y_t, y_p, sw)  # pylint: disable=protected-access
+      if key is not None:
+        groups.setdefault((key, reduction), []).append(i)
+
+    loss_values = {}
+    for (_, reduction), indices in groups.items():
+      if len(indices) < 2:
+        continue
+      loss_obj = self._losses[indices[0]]
+      y_t, y_p, sw = _stack_outputs(
+          [y_true[i] for i in indices], [y_pred[i] for i in indices],
+          [sample_weight[i] for i in indices])
+      with backend.name_scope(loss_obj._name_scope):  # pylint: disable=protected-access
+        losses = loss_obj.call(y_t, y_p)
+        losses = _reduce_grouped_losses(losses, sw, reduction)
+      for k, i in enumerate(indices):
+        loss_values[i] = losses[k]
+    return loss_values
+
   def reset_state(self):
     """Resets the state of loss metrics."""
     if not self._built:
@@ -293,7 +389,7 @@ class MetricsContainer(Container):
   """A container class for metrics passed to `Model.compile`."""
 
   def __init__(self, metrics=None, weighted_metrics=None, output_names=None,
-               from_serialized=False):
+               from_serialized=False, grouped=False):
     """Initializes a container for metrics.
 
     Arguments:
@@ -304,6 +400,9 @@ class MetricsContainer(Container):
       from_serialized: Whether the model being compiled is from a serialized
         model.  Used to avoid redundantly applying pre-processing renaming
         steps.
+      grouped: Whether the same built-in metric of several outputs is updated
+        from one computation over the stacked predictions of these outputs,
+        see `_update_grouped_metrics()`.
     """
     super(MetricsContainer, self).__init__(output_names=output_names)
 
@@ -316,6 +415,7 @@ class MetricsContainer(Container):
     self._built = False
 
     self._from_serialized = from_serialized
+    self._grouped = grouped
 
   @property
   def metrics(self):
@@ -442,12 +542,24 @@ class MetricsContainer(Container):
     y_true = nest.flatten(y_true) if y_true is not None else []
     sample_weight = nest.flatten(sample_weight)
 
+    if self._grouped and ops.executing_eagerly_outside_functions():
+      grouped_metrics = self._update_grouped_metrics(y_true, y_pred,
+                                                     sample_weight)
+    else:
+      grouped_metrics = set()
+
     zip_args = (y_true, y_pred, sample_weight, self._metrics,
                 self._weighted_metrics)
     for y_t, y_p, sw, metric_objs, weighted_metric_objs in zip(*zip_args):
+      metric_objs = [
+          m for m in metric_objs if m is not None and m not in grouped_metrics
+      ]
+      weighted_metric_objs = [
+          wm for wm in weighted_metric_objs
+          if wm is not None and wm not in grouped_metrics
+      ]
       # Ok to have no metrics for an output.
-      if (y_t is None or (all(m is None for m in metric_objs) and
-                          all(wm is None for wm in weighted_metric_objs))):
+      if y_t is None or (not metric_objs and not weighted_metric_objs):
         continue
 
       y_t, y_p, sw = match_dtype_and_rank(y_t, y_p, sw)
@@ -455,15 +567,60 @@ class MetricsContainer(Container):
       sw = apply_mask(y_p, sw, mask)
 
       for metric_obj in metric_objs:
-        if metric_obj is None:
-          continue
         metric_obj.update_state(y_t, y_p, sample_weight=mask)
 
       for weighted_metric_obj in weighted_metric_objs:
-        if weighted_metric_obj is None:
-          continue
         weighted_metric_obj.update_state(y_t, y_p, sample_weight=sw)
 
+  def _update_grouped_metrics(self, y_true, y_pred, sample_weight):
+    """Updates the metrics which several outputs share at once.
+
+    Metrics are grouped when they are `MeanMetricWrapper`s of one of
+    `_GROUPABLE_FNS` with the same arguments and dtype, and the labels,
+    predictions and sample weights of their outputs can be stacked. The metric
+    function is then called once on the stacked tensors, and the `total` and
+    `count` of every metric of the group are updated from one reduction, like
+    `MeanMetricWrapper.update_state()` does.
+
+    Args:
+      y_true: Flat list of labels, one per output.
+      y_pred: Flat list of predictions, one per output.
+      sample_weight: Flat list of sample weights, one per output.
+
+    Returns:
+      The set of metrics which were updated.
+    """
+    groups = {}
+    zip_args = (y_true, y_pred, sample_weight, self._metrics,
+                self._weighted_metrics)
+    for i, (y_t, y_p, sw, metric_objs,
+            weighted_metric_objs) in enumerate(zip(*zip_args)):
+      if y_t is None:
+        continue
+      # Metrics are only weighted by `sample_weight` if they are weighted
+      # metrics, and always by the mask, so masked outputs are not grouped.
+      for m, weights in itertools.chain(
+          zip(metric_objs, itertools.repeat(None)),
+          zip(weighted_metric_objs, itertools.repeat(sw))):
+        if (m is None or type(m).update_state is not
+            metrics_mod.MeanMetricWrapper.update_state):
+          continue
+        key = _group_key(m._fn, m._fn_kwargs, y_t, y_p, weights)  # pylint: disable=protected-access
+        if key is not None:
+          groups.setdefault((key, m.dtype), []).append((m, i, weights))
+
+    grouped_metrics = set()
+    for entries in groups.values():
+      if len(entries) < 2:
+        continue
+      metric_objs = [m for m, _, _ in entries]
+      y_t, y_p, sw = _stack_outputs([y_true[i] for _, i, _ in entries],
+                                    [y_pred[i] for _, i, _ in entries],
+                                    [weights for _, _, weights in entries])
+      _update_grouped_mean_metrics(metric_objs, y_t, y_p, sw)
+      grouped_metrics.update(metric_objs)
+    return grouped_metrics
+
   def reset_state(self):
     """Resets the state of all `Metric`s in this container."""
     if self._built:
@@ -707,6 +864,128 @@ def apply_mask(y_p, sw, mask):
   return sw
 
 
+def _group_key(fn, fn_kwargs, y_t, y_p, sw):
+  """Returns a key shared by the outputs whose loss or metric can be grouped.
+
+  Args:
+    fn: The loss or metric function.
+    fn_kwargs: The keyword arguments passed to `fn`.
+    y_t: Labels of the output.
+    y_p: Predictions of the output.
+    sw: Optional sample weights applied to the loss or metric.
+
+  Returns:
+    A hashable key, or None if the loss or metric can't be grouped.
+  """
+  if fn not in _GROUPABLE_FNS or get_mask(y_p) is not None:
+    return None
+  axis = fn_kwargs.get('axis')
+  if axis is not None and axis >= 0:
+    # Stacking adds a leading axis, which would shift the axis to reduce.
+    return None
+  tensors = (y_t, y_p) if sw is None else (y_t, y_p, sw)
+  specs = []
+  for t in tensors:
+    # The batch size is the same for all outputs, but other dimensions must be
+    # known for the tensors to be stacked.
+    if (not isinstance(t, tensor_lib.Tensor) or t.shape.rank is None or
+        not t.shape[1:].is_fully_defined()):
+      return None
+    specs.append((t.dtype, t.shape.rank, tuple(t.shape.as_list()[1:])))
+  try:
+    kwargs = tuple(sorted(fn_kwargs.items()))
+    hash(kwargs)
+  except TypeError:
+    return None
+  return (fn, kwargs, sw is None, tuple(specs))
+
+
+def _stack_outputs(y_true, y_pred, sample_weight):
+  """Stacks the labels, predictions and sample weights of several outputs."""
+  matched = [
+      match_dtype_and_rank(y_t, y_p, sw)
+      for y_t, y_p, sw in zip(y_true, y_pred, sample_weight)
+  ]
+  y_t = array_ops_stack.stack([y_t for y_t, _, _ in matched])
+  y_p = array_ops_stack.stack([y_p for _, y_p, _ in matched])
+  if sample_weight[0] is None:
+    return y_t, y_p, None
+  return y_t, y_p, array_ops_stack.stack([sw for _, _, sw in matched])
+
+
+def _reduce_grouped_losses(losses, sample_weight, reduction):
+  """Weights and reduces stacked losses, per entry of the first axis.
+
+  Args:
+    losses: Losses of shape `[num_outputs, batch_size, d1, ... dN]`.
+    sample_weight: Optional sample weights of the outputs, stacked along the
+      first axis.
+    reduction: Either `SUM` or `SUM_OVER_BATCH_SIZE`.
+
+  Returns:
+    The reduced loss of each output, of shape `[num_outputs]`.
+  """
+  input_dtype = losses.dtype
+  losses = math_ops.cast(losses, 'float32')
+  if sample_weight is None:
+    sample_weight = 1.0
+  sample_weight = math_ops.cast(sample_weight, 'float32')
+  losses, _, sample_weight = losses_utils.squeeze_or_expand_dimensions(  # pylint: disable=unbalanced-tuple-unpacking
+      losses, None, sample_weight)
+  weighted_losses = math_ops.multiply(losses, sample_weight)
+  loss = math_ops.reduce_sum(
+      weighted_losses, axis=list(range(1, weighted_losses.shape.rank)))
+  if reduction == losses_utils.ReductionV2.SUM_OVER_BATCH_SIZE:
+    num_elements = math_ops.cast(
+        array_ops.size(weighted_losses) // array_ops.shape(weighted_losses)[0],
+        loss.dtype)
+    loss = math_ops.div_no_nan(loss, num_elements)
+  return math_ops.cast(loss, input_dtype)
+
+
+def _update_grouped_mean_metrics(metric_objs, y_t, y_p, sample_weight):
+  """Updates `MeanMetricWrapper`s of the same function from stacked outputs.
+
+  Args:
+    metric_objs: The metrics, one per entry of the first axis of `y_t`.
+    y_t: Stacked labels.
+    y_p: Stacked predictions.
+    sample_weight: Optional stacked sample weights.
+  """
+  metric_obj = metric_objs[0]
+  dtype = metric_obj.dtype
+  y_t = math_ops.cast(y_t, dtype)
+  y_p = math_ops.cast(y_p, dtype)
+  y_p, y_t = losses_utils.squeeze_or_expand_dimensions(y_p, y_t)
+  values = metric_obj._fn(y_t, y_p, **metric_obj._fn_kwargs)  # pylint: disable=protected-access
+  values = math_ops.cast(values, dtype)
+
+  if sample_weight is None:
+    num_values = math_ops.cast(
+        array_ops.size(values) // array_ops.shape(values)[0], dtype)
+    num_values = array_ops.fill([len(metric_objs)], num_values)
+  else:
+    sample_weight = math_ops.cast(sample_weight, dtype)
+    values, _, sample_weight = losses_utils.squeeze_or_expand_dimensions(
+        values, sample_weight=sample_weight)
+    try:
+      sample_weight = weights_broadcast_ops.broadcast_weights(
+          sample_weight, values)
+    except ValueError:
+      # Reduce values to the same rank as the weights, like `Reduce` does.
+      values = math_ops.reduce_mean(
+          values, axis=list(range(sample_weight.shape.rank,
+                                  values.shape.rank)))
+    values = math_ops.multiply(values, sample_weight)
+    num_values = math_ops.reduce_sum(
+        sample_weight, axis=list(range(1, sample_weight.shape.rank)))
+  totals = math_ops.reduce_sum(values, axis=list(range(1, values.shape.rank)))
+
+  for k, m in enumerate(metric_objs):
+    m.total.assign_add(totals[k])
+    m.count.assign_add(num_values[k])
+
+
 def get_custom_object_name(obj):
   """Returns the name to use for a custom loss or metric callable.
 
@@ -0,0 +1,84 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for grouped losses and metrics of models with many outputs.
+
+Every head of the models has the same loss and metrics, so with
+`experimental_group_outputs=True` they are computed once per step over the
+stacked heads rather than once per head.
+"""
+
+import time
+
+import numpy as np
+
+from tensorflow.python.eager import test
+from tensorflow.python.keras.engine import functional
+from tensorflow.python.keras.engine import input_layer
+from tensorflow.python.keras.layers import core
+
+_NUM_ITERS = 20
+_BATCH_SIZE = 32
+
+
+class ManyHeadsBenchmark(test.Benchmark):
+
+  def _run(self, num_heads, grouped, with_sample_weight):
+    inputs = input_layer.Input(shape=(8,))
+    outputs = [core.Dense(4)(inputs) for _ in range(num_heads)]
+    model = functional.Functional(inputs, outputs)
+    model.compile(
+        optimizer='sgd',
+        loss='mse',
+        metrics=['mae'],
+        weighted_metrics=['mse'],
+        experimental_group_outputs=grouped)
+    x = np.ones((_BATCH_SIZE, 8), dtype=np.float32)
+    y = [np.ones((_BATCH_SIZE, 4), dtype=np.float32)] * num_heads
+    sample_weight = ([np.ones((_BATCH_SIZE,), dtype=np.float32)] * num_heads
+                     if with_sample_weight else None)
+
+    # The first step traces the train function.
+    start = time.time()
+    model.train_on_batch(x, y, sample_weight=sample_weight)
+    trace_time = time.time() - start
+
+    start = time.time()
+    for _ in range(_NUM_ITERS):
+      model.train_on_batch(x, y, sample_weight=sample_weight)
+    wall_time = (time.time() - start) / _NUM_ITERS
+    self.report_benchmark(
+        name="many_heads_%d_%s%s" % (num_heads,
+                                     "grouped" if grouped else "ungrouped",
+                                     "_weighted" if with_sample_weight else ""),
+        iters=_NUM_ITERS,
+        wall_time=wall_time,
+        extras={
+            "num_heads": num_heads,
+            "trace_time": trace_time
+        })
+
+  def benchmark_many_heads(self):
+    for num_heads in (10, 100):
+      for grouped in (False, True):
+        self._run(num_heads, grouped, with_sample_weight=False)
+
+  def benchmark_many_heads_weighted(self):
+    for num_heads in (10, 100):
+      for grouped in (False, True):
+        self._run(num_heads, grouped, with_sample_weight=True)
+
+
+if __name__ == "__main__":
+  test.main()
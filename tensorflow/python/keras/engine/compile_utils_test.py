@@ -0,0 +1,205 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the grouped losses and metrics of compile_utils."""
+
+from absl.testing import parameterized
+import numpy as np
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.eager import test
+from tensorflow.python.framework import constant_op
+from tensorflow.python.keras import losses as losses_mod
+from tensorflow.python.keras import metrics as metrics_mod
+from tensorflow.python.keras.engine import compile_utils
+from tensorflow.python.keras.engine import functional
+from tensorflow.python.keras.engine import input_layer
+from tensorflow.python.keras.layers import core
+from tensorflow.python.keras.utils import losses_utils
+from tensorflow.python.ops import array_ops
+
+_NUM_OUTPUTS = 3
+_OUTPUT_NAMES = ['output_%d' % i for i in range(_NUM_OUTPUTS)]
+
+
+def _make_outputs(seed, with_sample_weight):
+  rng = np.random.RandomState(seed)
+  y_true = [
+      constant_op.constant(rng.randint(0, 2, (8, 2)).astype(np.float32))
+      for _ in range(_NUM_OUTPUTS)
+  ]
+  y_pred = [
+      constant_op.constant(rng.uniform(0.05, 0.95, (8, 2)).astype(np.float32))
+      for _ in range(_NUM_OUTPUTS)
+  ]
+  if with_sample_weight:
+    sample_weight = [
+        constant_op.constant(rng.uniform(0., 2., (8,)).astype(np.float32))
+        for _ in range(_NUM_OUTPUTS)
+    ]
+  else:
+    sample_weight = None
+  return y_true, y_pred, sample_weight
+
+
+class GroupedLossesTest(test.TestCase, parameterized.TestCase):
+
+  def _make_container(self, reduction, grouped):
+    losses = [
+        losses_mod.MeanSquaredError(reduction=reduction),
+        losses_mod.MeanSquaredError(reduction=reduction),
+        losses_mod.BinaryCrossentropy(reduction=reduction),
+    ]
+    return compile_utils.LossesContainer(
+        losses, loss_weights=[1., 0.5, 2.], output_names=_OUTPUT_NAMES,
+        grouped=grouped)
+
+  @parameterized.named_parameters(
+      ('sum', losses_utils.ReductionV2.SUM, False),
+      ('sum_weighted', losses_utils.ReductionV2.SUM, True),
+      ('sum_over_batch_size', losses_utils.ReductionV2.SUM_OVER_BATCH_SIZE,
+       False),
+      ('sum_over_batch_size_weighted',
+       losses_utils.ReductionV2.SUM_OVER_BATCH_SIZE, True),
+  )
+  def test_grouped_matches_ungrouped(self, reduction, with_sample_weight):
+    grouped = self._make_container(reduction, grouped=True)
+    ungrouped = self._make_container(reduction, grouped=False)
+    for seed in range(2):
+      y_true, y_pred, sample_weight = _make_outputs(seed, with_sample_weight)
+      self.assertAllClose(
+          ungrouped(y_true, y_pred, sample_weight=sample_weight),
+          grouped(y_true, y_pred, sample_weight=sample_weight))
+    self.assertAllClose([m.result() for m in ungrouped.metrics],
+                        [m.result() for m in grouped.metrics])
+
+    # Both mean squared errors were computed by one call.
+    flat_sample_weight = sample_weight or [None] * _NUM_OUTPUTS
+    grouped_values = grouped._compute_grouped_losses(y_true, y_pred,
+                                                     flat_sample_weight)
+    self.assertCountEqual([0, 1], grouped_values)
+
+  def test_grouped_in_function(self):
+    grouped = self._make_container(losses_utils.ReductionV2.SUM, grouped=True)
+    ungrouped = self._make_container(
+        losses_utils.ReductionV2.SUM, grouped=False)
+    y_true, y_pred, sample_weight = _make_outputs(0, True)
+    fn = def_function.function(
+        lambda c: c(y_true, y_pred, sample_weight=sample_weight))
+    self.assertAllClose(fn(ungrouped), fn(grouped))
+
+  def test_positive_axis_is_not_grouped(self):
+    # Channels-first predictions, with the classes along axis 1.
+    losses = [
+        losses_mod.CategoricalCrossentropy(axis=1),
+        losses_mod.CategoricalCrossentropy(axis=1),
+    ]
+    grouped = compile_utils.LossesContainer(
+        losses, output_names=_OUTPUT_NAMES[:2], grouped=True)
+    ungrouped = compile_utils.LossesContainer(
+        losses, output_names=_OUTPUT_NAMES[:2])
+    rng = np.random.RandomState(0)
+    y_true = [
+        constant_op.constant(
+            np.eye(3, dtype=np.float32)[rng.randint(0, 3, (4, 5))].transpose(
+                0, 2, 1)) for _ in range(2)
+    ]
+    y_pred = [
+        constant_op.constant(
+            rng.dirichlet(np.ones(3), (4, 5)).astype(np.float32).transpose(
+                0, 2, 1)) for _ in range(2)
+    ]
+    self.assertAllClose(ungrouped(y_true, y_pred), grouped(y_true, y_pred))
+    self.assertEmpty(
+        grouped._compute_grouped_losses(y_true, y_pred, [None, None]))
+
+  def test_unstackable_outputs_are_not_grouped(self):
+    grouped = compile_utils.LossesContainer(
+        'mse', output_names=_OUTPUT_NAMES[:2], grouped=True)
+    ungrouped = compile_utils.LossesContainer(
+        'mse', output_names=_OUTPUT_NAMES[:2])
+    # The outputs have different shapes.
+    y_true = [array_ops.ones((4, 2)), array_ops.ones((4, 3))]
+    y_pred = [array_ops.fill((4, 2), 0.5), array_ops.fill((4, 3), 0.5)]
+    self.assertAllClose(ungrouped(y_true, y_pred), grouped(y_true, y_pred))
+    self.assertEmpty(
+        grouped._compute_grouped_losses(y_true, y_pred, [None, None]))
+
+
+class GroupedMetricsTest(test.TestCase, parameterized.TestCase):
+
+  def _make_container(self, grouped):
+    return compile_utils.MetricsContainer(
+        metrics=[['mae', metrics_mod.BinaryAccuracy()] for _ in _OUTPUT_NAMES],
+        weighted_metrics=[['mse'] for _ in _OUTPUT_NAMES],
+        output_names=_OUTPUT_NAMES, grouped=grouped)
+
+  @parameterized.named_parameters(
+      ('unweighted', False),
+      ('weighted', True),
+  )
+  def test_grouped_matches_ungrouped(self, with_sample_weight):
+    grouped = self._make_container(grouped=True)
+    ungrouped = self._make_container(grouped=False)
+    for seed in range(2):
+      y_true, y_pred, sample_weight = _make_outputs(seed, with_sample_weight)
+      grouped.update_state(y_true, y_pred, sample_weight=sample_weight)
+      ungrouped.update_state(y_true, y_pred, sample_weight=sample_weight)
+    self.assertEqual([m.name for m in ungrouped.metrics],
+                     [m.name for m in grouped.metrics])
+    self.assertAllClose([m.result() for m in ungrouped.metrics],
+                        [m.result() for m in grouped.metrics])
+
+    # All metrics were grouped across outputs.
+    y_true, y_pred, sample_weight = _make_outputs(2, with_sample_weight)
+    flat_sample_weight = sample_weight or [None] * _NUM_OUTPUTS
+    self.assertCountEqual(
+        grouped.metrics,
+        grouped._update_grouped_metrics(y_true, y_pred, flat_sample_weight))
+
+
+class GroupedModelTest(test.TestCase, parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ('unweighted', False),
+      ('weighted', True),
+  )
+  def test_evaluate(self, with_sample_weight):
+    inputs = input_layer.Input(shape=(4,))
+    outputs = [
+        core.Dense(2, activation='sigmoid', name=name)(inputs)
+        for name in _OUTPUT_NAMES
+    ]
+    model = functional.Functional(inputs, outputs)
+    x = np.random.RandomState(0).uniform(size=(16, 4)).astype(np.float32)
+    y = [np.ones((16, 2), np.float32) for _ in _OUTPUT_NAMES]
+    sample_weight = ([np.linspace(0., 1., 16).astype(np.float32)] *
+                     _NUM_OUTPUTS if with_sample_weight else None)
+    results = []
+    for grouped in (False, True):
+      model.compile(
+          loss='binary_crossentropy',
+          metrics=['mae'],
+          weighted_metrics=['mse'],
+          experimental_group_outputs=grouped)
+      results.append(
+          model.evaluate(x, y, sample_weight=sample_weight, batch_size=8,
+                         verbose=0, return_dict=True))
+    self.assertEqual(sorted(results[0]), sorted(results[1]))
+    for name, value in results[0].items():
+      self.assertAllClose(value, results[1][name], msg=name)
+
+
+if __name__ == '__main__':
+  test.main()
@@ -531,40 +531,37 @@ class Functional(training_lib.Model):
     for input_t, mask in zip(inputs, masks):
       input_t._keras_mask = mask
 
-    # Dictionary mapping reference tensors to computed tensors.
-    tensor_dict = {}
-    tensor_usage_count = self._tensor_usage_count
-    for x, y in zip(self.inputs, inputs):
-      y = self._conform_to_reference_input(y, ref_input=x)
-      x_id = str(id(x))
-      tensor_dict[x_id] = [y] * tensor_usage_count[x_id]
-
-    nodes_by_depth = self._nodes_by_depth
-    depth_keys = list(nodes_by_depth.keys())
-    depth_keys.sort(reverse=True)
-
-    for depth in depth_keys:
-      nodes = nodes_by_depth[depth]
-      for node in nodes:
-        if node.is_input:
-          continue  # Input tensors already exist.
-
-        if any(t_id not in tensor_dict for t_id in node.flat_input_ids):
-          continue  # Node is not computable, try skipping.
-
-        args, kwargs = node.map_arguments(tensor_dict)
-        outputs = node.layer(*args, **kwargs)
-
-        # Update tensor_dict.
-        for x_id, y in zip(node.flat_output_ids, nest.flatten(outputs)):
-          tensor_dict[x_id] = [y] * tensor_usage_count[x_id]
-
-    output_tensors = []
-    for x in self.outputs:
-      x_id = str(id(x))
-      assert x_id in tensor_dict, 'Could not compute output ' + str(x)
-      output_tensors.append(tensor_dict[x_id].pop())
+    plan = self._execution_plan
+    if plan is None:
+      plan = self._execution_plan = _ExecutionPlan(
+          self.inputs, self.outputs, self._nodes_by_depth)
+
+    # Computed tensors, indexed by the slots of the plan.
+    values = [None] * plan.num_slots
+    for slot, x, y in zip(plan.input_slots, self.inputs, inputs):
+      values[slot] = self._conform_to_reference_input(y, ref_input=x)
+
+    for step in plan.steps:
+      if step.single_positional_tensor_passed:
+        outputs = step.layer(values[step.argument_slots[0][0]])
+      else:
+        flat_arguments = copy.copy(step.flat_arguments)
+        for slot, index in step.argument_slots:
+          flat_arguments[index] = values[slot]
+        args, kwargs = nest.pack_sequence_as(step.arguments_structure,
+                                             flat_arguments)
+        outputs = step.layer(*args, **kwargs)
+
+      if step.single_output:
+        values[step.output_slots[0]] = outputs
+      else:
+        for slot, y in zip(step.output_slots, nest.flatten(outputs)):
+          values[slot] = y
+      # Release the tensors which are no longer needed.
+      for slot in step.released_slots:
+        values[slot] = None
 
+    output_tensors = [values[slot] for slot in plan.output_slots]
     return nest.pack_sequence_as(self._nested_outputs, output_tensors)
 
   def _flatten_to_reference_inputs(self, tensors):
@@ -839,6 +836,8 @@ class Functional(training_lib.Model):
       tensor_usage_count[str(id(tensor))] += 1
 
     self._tensor_usage_count = tensor_usage_count
+    # The graph changed, so the plan is compiled again on the next call.
+    self._execution_plan = None
 
   def _assert_weights_created(self):
     # Override the implementation in Model.
@@ -1082,6 +1081,97 @@ def _map_subgraph_network(inputs, outputs):
   return nest.flatten([nodes for nodes in nodes_by_depth.values()]), layers
 
 
+class _PlanStep(object):
+  """Calls the layer of one node of an `_ExecutionPlan`."""
+
+  __slots__ = ('layer', 'single_positional_tensor_passed', 'flat_arguments',
+               'arguments_structure', 'argument_slots', 'output_slots',
+               'single_output', 'released_slots')
+
+  def __init__(self, node, argument_slots, output_slots):
+    self.layer = node.layer
+    # Used to avoid expensive `nest` operations in the most common case.
+    self.single_positional_tensor_passed = (
+        node._single_positional_tensor_passed and bool(argument_slots))
+    self.flat_arguments = node._flat_arguments
+    self.arguments_structure = (node.call_args, node.call_kwargs)
+    # List of (slot, index in `flat_arguments`) of the Keras tensor arguments.
+    self.argument_slots = argument_slots
+    self.output_slots = output_slots
+    self.single_output = not nest.is_nested(node.outputs)
+    self.released_slots = []
+
+
+class _ExecutionPlan(object):
+  """The order in which the nodes of a Functional model are run.
+
+  Walking `_nodes_by_depth` and mapping tensors through a dict keyed by tensor
+  ids on every call adds a noticeable overhead to eager calls of deep models.
+  The plan does that walk once: every tensor is given an integer slot in a
+  list of values, and every step knows the slots of its arguments and outputs,
+  as well as the slots it is the last user of, so that intermediate tensors
+  are released as early as possible.
+  """
+
+  def __init__(self, inputs, outputs, nodes_by_depth):
+    """Compiles a plan.
+
+    Args:
+      inputs: The flat list of input Keras tensors of the model.
+      outputs: The flat list of output Keras tensors of the model.
+      nodes_by_depth: Dict mapping depths to the nodes of the model.
+
+    Raises:
+      AssertionError: If an output can't be computed from `inputs`.
+    """
+    slots = {}
+    self.num_slots = 0
+
+    def new_slot(x_id):
+      slots[x_id] = self.num_slots
+      self.num_slots += 1
+      return slots[x_id]
+
+    self.input_slots = []
+    for x in inputs:
+      x_id = str(id(x))
+      self.input_slots.append(slots[x_id] if x_id in slots else new_slot(x_id))
+
+    self.steps = []
+    last_step_using = {}
+    for depth in sorted(nodes_by_depth.keys(), reverse=True):
+      for node in nodes_by_depth[depth]:
+        if node.is_input:
+          continue  # Input tensors already exist.
+
+        if any(t_id not in slots for t_id in node.flat_input_ids):
+          continue  # Node is not computable, try skipping.
+
+        argument_slots = [(slots[kt_id], kt_index)
+                          for kt_id, kt_index in
+                          node._keras_inputs_ids_and_indices]
+        for slot, _ in argument_slots:
+          last_step_using[slot] = len(self.steps)
+        output_slots = [new_slot(x_id) for x_id in node.flat_output_ids]
+        self.steps.append(_PlanStep(node, argument_slots, output_slots))
+
+    self.output_slots = []
+    for x in outputs:
+      x_id = str(id(x))
+      assert x_id in slots, 'Could not compute output ' + str(x)
+      self.output_slots.append(slots[x_id])
+
+    kept_slots = set(self.output_slots)
+    for step in self.steps:
+      # Outputs which are never used are released right away.
+      for slot in step.output_slots:
+        if slot not in last_step_using and slot not in kept_slots:
+          step.released_slots.append(slot)
+    for slot, i in last_step_using.items():
+      if slot not in kept_slots:
+        self.steps[i].released_slots.append(slot)
+
+
 def _should_skip_first_node(layer):
   """Returns True if the first layer node should not be saved or loaded."""
   # Networks that are constructed with an Input layer/shape start with a
@@ -0,0 +1,71 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for the per-call overhead of eager Functional model calls.
+
+The models are deep stacks of tiny layers called on a single example, so the
+wall time per call is dominated by the Python overhead of running the graph of
+layers rather than by the computation itself.
+"""
+
+import time
+
+import numpy as np
+
+from tensorflow.python.eager import test
+from tensorflow.python.keras.engine import functional
+from tensorflow.python.keras.engine import input_layer
+from tensorflow.python.keras.layers import core
+from tensorflow.python.keras.layers import merge
+
+_NUM_ITERS = 100
+
+
+class FunctionalCallBenchmark(test.Benchmark):
+
+  def _run(self, name, model):
+    x = np.ones((1, 4), dtype=np.float32)
+    model(x)  # Warm up, and build the execution plan.
+    start = time.time()
+    for _ in range(_NUM_ITERS):
+      model(x)
+    wall_time = (time.time() - start) / _NUM_ITERS
+    self.report_benchmark(
+        name=name,
+        iters=_NUM_ITERS,
+        wall_time=wall_time,
+        extras={"num_layers": len(model.layers)})
+
+  def benchmark_chain(self):
+    for num_layers in (10, 100, 1000):
+      inputs = input_layer.Input(shape=(4,))
+      x = inputs
+      for _ in range(num_layers):
+        x = core.Dense(4)(x)
+      self._run("functional_call_chain_%d_layers" % num_layers,
+                functional.Functional(inputs, x))
+
+  def benchmark_residual(self):
+    for num_layers in (10, 100, 1000):
+      inputs = input_layer.Input(shape=(4,))
+      x = inputs
+      # Every block has a Dense and an Add layer, with a skip connection.
+      for _ in range(num_layers // 2):
+        x = merge.Add()([x, core.Dense(4)(x)])
+      self._run("functional_call_residual_%d_layers" % num_layers,
+                functional.Functional(inputs, x))
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,160 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the execution plan of Functional models."""
+
+from unittest import mock
+
+import numpy as np
+
+from tensorflow.python.eager import test
+from tensorflow.python.keras.engine import base_layer
+from tensorflow.python.keras.engine import functional
+from tensorflow.python.keras.engine import input_layer
+from tensorflow.python.keras.engine import sequential
+from tensorflow.python.keras.layers import core
+from tensorflow.python.keras.layers import merge
+from tensorflow.python.ops import math_ops
+
+
+class _DoubleAndIncrement(base_layer.Layer):
+  """Returns `[2 * x, x + 1]`."""
+
+  def call(self, inputs):
+    return [2. * inputs, inputs + 1.]
+
+
+def _chain(num_layers):
+  inputs = input_layer.Input(shape=(4,))
+  x = inputs
+  for _ in range(num_layers):
+    x = core.Dense(4)(x)
+  return functional.Functional(inputs, x)
+
+
+def _released(plan):
+  return [slot for step in plan.steps for slot in step.released_slots]
+
+
+class ExecutionPlanTest(test.TestCase):
+
+  def testPlanIsBuiltOnce(self):
+    model = _chain(3)
+    x = np.ones((2, 4), dtype=np.float32)
+    execution_plan = functional._ExecutionPlan  # pylint: disable=protected-access
+    with mock.patch.object(
+        functional, '_ExecutionPlan', wraps=execution_plan) as plan_class:
+      first = model(x)
+      plan = model._execution_plan
+      for _ in range(3):
+        self.assertAllClose(first, model(x))
+    self.assertEqual(1, plan_class.call_count)
+    self.assertIs(plan, model._execution_plan)
+
+  def testPlanIsInvalidatedByInsertLayers(self):
+    inputs = input_layer.Input(shape=(4,))
+    outputs = core.Dense(4)(inputs)
+    model = functional.Functional(inputs, outputs)
+    x = np.ones((2, 4), dtype=np.float32)
+    model(x)
+    self.assertIsNotNone(model._execution_plan)
+
+    # Adding a symbolic loss inserts an AddLoss layer in the graph.
+    model.add_loss(math_ops.reduce_sum(outputs))
+    self.assertIsNone(model._execution_plan)
+    model(x)
+    self.assertLen(model.losses, 1)
+    self.assertIsInstance(model._execution_plan.steps[-1].layer,
+                          base_layer.AddLoss)
+
+  def testPlanIsInvalidatedWhenSequentialIsRebuilt(self):
+    model = sequential.Sequential([core.Dense(4, input_shape=(4,))])
+    x = np.ones((2, 4), dtype=np.float32)
+    model(x)
+    self.assertIsNotNone(model._execution_plan)
+
+    model.add(core.Dense(3))
+    self.assertIsNone(model._execution_plan)
+    self.assertEqual((2, 3), model(x).shape)
+    self.assertLen(model._execution_plan.steps, 2)
+
+  def testNonComputableNodesAreSkipped(self):
+    dense = core.Dense(4)
+    a = input_layer.Input(shape=(4,))
+    b = input_layer.Input(shape=(4,))
+    model = functional.Functional(a, dense(a))
+    # A node of the shared layer that depends on a tensor the model doesn't
+    # compute.
+    other = dense(b)
+    other_node = other._keras_history.layer._inbound_nodes[
+        other._keras_history.node_index]
+    nodes_by_depth = {
+        depth: list(nodes) for depth, nodes in model._nodes_by_depth.items()
+    }
+    nodes_by_depth[0].append(other_node)
+
+    plan = functional._ExecutionPlan(model.inputs, model.outputs,  # pylint: disable=protected-access
+                                     nodes_by_depth)
+    self.assertLen(plan.steps, 1)
+    self.assertIs(dense, plan.steps[0].layer)
+
+  def testMultiOutputLayer(self):
+    inputs = input_layer.Input(shape=(4,))
+    doubled, incremented = _DoubleAndIncrement()(inputs)
+    total = merge.Add()([doubled, incremented])
+    model = functional.Functional(inputs, [total, incremented])
+
+    x = np.arange(8, dtype=np.float32).reshape((2, 4))
+    total_value, incremented_value = model(x)
+    self.assertAllClose(3. * x + 1., total_value)
+    self.assertAllClose(x + 1., incremented_value)
+
+    split_step = model._execution_plan.steps[0]
+    self.assertFalse(split_step.single_output)
+    self.assertLen(split_step.output_slots, 2)
+
+  def testReleasedSlots(self):
+    # A skip connection: `hidden` is used by a Dense and by the Add after it.
+    inputs = input_layer.Input(shape=(4,))
+    hidden = core.Dense(4)(inputs)
+    outputs = merge.Add()([hidden, core.Dense(4)(hidden)])
+    model = functional.Functional(inputs, outputs)
+    model(np.ones((2, 4), dtype=np.float32))
+    plan = model._execution_plan
+
+    first, second, add = plan.steps
+    hidden_slot, = first.output_slots
+    self.assertEqual(plan.input_slots, first.released_slots)
+    self.assertEqual([], second.released_slots)
+    self.assertCountEqual([hidden_slot, second.output_slots[0]],
+                          add.released_slots)
+    # Every slot but the outputs is released exactly once.
+    self.assertCountEqual(
+        set(range(plan.num_slots)) - set(plan.output_slots), _released(plan))
+
+  def testUnusedOutputsAreReleasedRightAway(self):
+    inputs = input_layer.Input(shape=(4,))
+    _, incremented = _DoubleAndIncrement()(inputs)
+    model = functional.Functional(inputs, incremented)
+    model(np.ones((2, 4), dtype=np.float32))
+    plan = model._execution_plan
+
+    step, = plan.steps
+    doubled_slot, incremented_slot = step.output_slots
+    self.assertIn(doubled_slot, step.released_slots)
+    self.assertNotIn(incremented_slot, _released(plan))
+
+
+if __name__ == '__main__':
+  test.main()
@@ -479,6 +479,7 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
               weighted_metrics=None,
               run_eagerly=None,
               steps_per_execution=None,
+              experimental_group_outputs=False,
               **kwargs):
     """Configures the model for training.
 
@@ -543,6 +544,14 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
           `Callback.on_batch_begin` and `Callback.on_batch_end` methods
           will only be called every `N` batches
           (i.e. before/after each `tf.function` execution).
+        experimental_group_outputs: Bool. Defaults to `False`. If `True`, the
+          built-in losses and metrics which several outputs have in common are
+          computed once over the stacked labels and predictions of these
+          outputs, instead of once per output. This reduces the size of the
+          traced graph of models with many similar outputs. Outputs with
+          masks, ragged tensors or shapes that can't be stacked, and custom
+          losses and metrics, are still handled one by one. Not supported in
+          TF1 graph mode, where it has no effect.
         **kwargs: Arguments supported for backwards compatibility only.
 
     Raises:
@@ -567,10 +576,11 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
 
       self.optimizer = self._get_optimizer(optimizer)
       self.compiled_loss = compile_utils.LossesContainer(
-          loss, loss_weights, output_names=self.output_names)
+          loss, loss_weights, output_names=self.output_names,
+          grouped=experimental_group_outputs)
       self.compiled_metrics = compile_utils.MetricsContainer(
           metrics, weighted_metrics, output_names=self.output_names,
-          from_serialized=from_serialized)
+          from_serialized=from_serialized, grouped=experimental_group_outputs)
 
       self._configure_steps_per_execution(steps_per_execution or 1)
 
@@ -2253,7 +2263,9 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
                    filepath,
                    by_name=False,
                    skip_mismatch=False,
-                   options=None):
+                   options=None,
+                   max_chunk_bytes=None,
+                   num_threads=None):
     """Loads all layer weights, either from a TensorFlow or an HDF5 weight file.
 
     If `by_name` is False weights are loaded based on the network's
@@ -2286,6 +2298,12 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
             the weight (only valid when `by_name=True`).
         options: Optional `tf.train.CheckpointOptions` object that specifies
             options for loading weights.
+        max_chunk_bytes: Optional number of bytes, only used for weight files
+            in HDF5 format. If set and executing eagerly, the weights are read
+            on a thread pool and assigned in chunks of at most this size,
+            instead of being read fully into memory first.
+        num_threads: Optional number of threads reading HDF5 weights when
+            `max_chunk_bytes` is set. Defaults to 8.
 
     Returns:
         When loading a weight file in TensorFlow format, returns the same status
@@ -2342,9 +2360,12 @@ class Model(base_layer.Layer, version_utils.ModelVersionSelector):
           f = f['model_weights']
         if by_name:
           hdf5_format.load_weights_from_hdf5_group_by_name(
-              f, self.layers, skip_mismatch=skip_mismatch)
+              f, self.layers, skip_mismatch=skip_mismatch,
+              max_chunk_bytes=max_chunk_bytes, num_threads=num_threads)
         else:
-          hdf5_format.load_weights_from_hdf5_group(f, self.layers)
+          hdf5_format.load_weights_from_hdf5_group(
+              f, self.layers, max_chunk_bytes=max_chunk_bytes,
+              num_threads=num_threads)
 
     # Perform any layer defined finalization of the layer state.
     for layer in self.layers:
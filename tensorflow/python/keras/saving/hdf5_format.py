@@ -15,11 +15,13 @@
 # pylint: disable=protected-access
 """Functions for saving and loading a Keras Model from HDF5 format."""
 
+from concurrent import futures
 import json
 import os
 
 import numpy as np
 
+from tensorflow.python.eager import context
 from tensorflow.python.keras import backend
 from tensorflow.python.keras import optimizer_v1
 from tensorflow.python.keras.saving import model_config as model_config_lib
@@ -27,6 +29,7 @@ from tensorflow.python.keras.saving import saving_utils
 from tensorflow.python.keras.saving.saved_model import json_utils
 from tensorflow.python.keras.utils.generic_utils import LazyLoader
 from tensorflow.python.keras.utils.io_utils import ask_to_proceed_with_overwrite
+from tensorflow.python.ops import resource_variable_ops
 from tensorflow.python.ops import variables as variables_module
 from tensorflow.python.platform import gfile
 from tensorflow.python.platform import tf_logging as logging
@@ -48,6 +51,13 @@ sequential_lib = LazyLoader(
     "tensorflow.python.keras.engine.sequential")
 # pylint:enable=g-inconsistent-quotes
 
+# Default number of threads reading datasets when weights are loaded in chunks.
+_DEFAULT_LOAD_THREADS = 8
+
+# Layers whose weights may be converted by `_convert_rnn_weights()` without a
+# change of shape, so they can't be assigned directly from the datasets.
+_CONVERTED_LAYER_CLASSES = frozenset(['LSTM', 'CuDNNLSTM', 'GRU', 'CuDNNGRU'])
+
 
 def save_model_to_hdf5(model, filepath, overwrite=True, include_optimizer=True):
   """Saves a model to a HDF5 file.
@@ -646,12 +656,104 @@ def save_weights_to_hdf5_group(f, layers):
         param_dset[:] = val
 
 
-def load_weights_from_hdf5_group(f, layers):
+class _ChunkedWeightLoader(object):
+  """Assigns HDF5 datasets to variables in chunks, on a thread pool.
+
+  Each dataset is read `max_chunk_bytes` at a time along its first dimension,
+  and every chunk is assigned to the matching slice of the variable, so no
+  full copy of the weights is held in memory. Only datasets which need no
+  conversion by `preprocess_weights_for_loading()` can be loaded this way,
+  see `add()`.
+
+  h5py serializes all reads under its global lock, so the threads do not read
+  in parallel: they overlap reading a chunk with converting and assigning
+  others.
+  """
+
+  def __init__(self, max_chunk_bytes=None, num_threads=None):
+    if max_chunk_bytes is not None and max_chunk_bytes <= 0:
+      raise ValueError('max_chunk_bytes must be positive, got {}.'.format(
+          max_chunk_bytes))
+    if num_threads is not None and num_threads <= 0:
+      raise ValueError('num_threads must be positive, got {}.'.format(
+          num_threads))
+    # Slices of variables can only be assigned from NumPy values eagerly.
+    self._enabled = (
+        max_chunk_bytes is not None and context.executing_eagerly())
+    self._max_chunk_bytes = max_chunk_bytes
+    self._num_threads = num_threads or _DEFAULT_LOAD_THREADS
+    self._pending = []
+
+  def add(self, layer, symbolic_weights, datasets, original_keras_version):
+    """Queues the datasets of `layer`, if they can be assigned directly.
+
+    Args:
+      layer: The layer the weights are loaded into.
+      symbolic_weights: The variables of `layer`, see `_legacy_weights()`.
+      datasets: The HDF5 datasets saved for `layer`.
+      original_keras_version: Keras version for the weights, as a string.
+
+    Returns:
+      Whether the datasets were queued. If not, they must be read fully and
+      preprocessed.
+    """
+    if not self._enabled or original_keras_version == '1':
+      return False
+    if len(symbolic_weights) != len(datasets):
+      return False
+    if any(sublayer.__class__.__name__ in _CONVERTED_LAYER_CLASSES
+           for sublayer in layer._flatten_layers()):
+      return False
+    if any(backend.int_shape(weight) != dataset.shape
+           for weight, dataset in zip(symbolic_weights, datasets)):
+      return False
+    self._pending.extend(zip(symbolic_weights, datasets))
+    return True
+
+  def run(self):
+    """Assigns all the queued datasets."""
+    if not self._pending:
+      return
+    with futures.ThreadPoolExecutor(self._num_threads) as executor:
+      results = [
+          executor.submit(self._assign, weight, dataset)
+          for weight, dataset in self._pending
+      ]
+      for result in results:
+        result.result()
+    self._pending = []
+
+  def _assign(self, weight, dataset):
+    dtype = backend.dtype_numpy(weight)
+    row_bytes = max(dataset.dtype.itemsize, np.dtype(dtype).itemsize)
+    if dataset.shape:
+      row_bytes *= dataset.size // max(dataset.shape[0], 1)
+    if (not dataset.shape or
+        dataset.shape[0] * row_bytes <= self._max_chunk_bytes or
+        not isinstance(weight, resource_variable_ops.BaseResourceVariable)):
+      weight.assign(np.asarray(dataset[()], dtype=dtype))
+      return
+    rows = max(self._max_chunk_bytes // max(row_bytes, 1), 1)
+    for start in range(0, dataset.shape[0], rows):
+      stop = min(start + rows, dataset.shape[0])
+      weight[start:stop].assign(np.asarray(dataset[start:stop], dtype=dtype))
+
+
+def load_weights_from_hdf5_group(f, layers, max_chunk_bytes=None,
+                                 num_threads=None):
   """Implements topological (order-based) weight loading.
 
   Args:
       f: A pointer to a HDF5 group.
       layers: a list of target layers.
+      max_chunk_bytes: Optional number of bytes. If set and executing eagerly,
+          the datasets are read on a thread pool and assigned to the variables
+          in chunks of at most this size, instead of being read fully into
+          memory first. Weights which need converting, e.g. from Keras 1 or
+          CuDNN layers, are still read fully.
+      num_threads: Optional number of threads reading datasets when
+          `max_chunk_bytes` is set. Defaults to 8. Reads are serialized by
+          h5py, so the threads only overlap reads with assignments.
 
   Raises:
       ValueError: in case of mismatch between provided layers
@@ -690,15 +792,20 @@ def load_weights_from_hdf5_group(f, layers):
                      ' layers into a model with ' + str(len(filtered_layers)) +
                      ' layers.')
 
+  chunked_loader = _ChunkedWeightLoader(max_chunk_bytes, num_threads)
   # We batch weight value assignments in a single backend call
   # which provides a speedup in TensorFlow.
   weight_value_tuples = []
   for k, name in enumerate(layer_names):
     g = f[name]
     weight_names = load_attributes_from_hdf5_group(g, 'weight_names')
-    weight_values = [np.asarray(g[weight_name]) for weight_name in weight_names]
     layer = filtered_layers[k]
     symbolic_weights = _legacy_weights(layer)
+    datasets = [g[weight_name] for weight_name in weight_names]
+    if chunked_loader.add(layer, symbolic_weights, datasets,
+                          original_keras_version):
+      continue
+    weight_values = [np.asarray(dataset) for dataset in datasets]
     weight_values = preprocess_weights_for_loading(
         layer, weight_values, original_keras_version, original_backend)
     if len(weight_values) != len(symbolic_weights):
@@ -711,15 +818,17 @@ def load_weights_from_hdf5_group(f, layers):
                        str(len(weight_values)) + ' elements.')
     weight_value_tuples += zip(symbolic_weights, weight_values)
   backend.batch_set_value(weight_value_tuples)
+  chunked_loader.run()
 
 
 def load_weights_from_hdf5_group_by_name(
-    f, layers, skip_mismatch=False):
+    f, layers, skip_mismatch=False, max_chunk_bytes=None, num_threads=None):
   """Implements name-based weight loading.
 
   (instead of topological weight loading).
 
-  Layers that have no matching name are skipped.
+  Layers that have no matching name are skipped, without reading their
+  weights.
 
   Args:
       f: A pointer to a HDF5 group.
@@ -727,6 +836,11 @@ def load_weights_from_hdf5_group_by_name(
       skip_mismatch: Boolean, whether to skip loading of layers
           where there is a mismatch in the number of weights,
           or a mismatch in the shape of the weights.
+      max_chunk_bytes: Optional number of bytes. If set and executing eagerly,
+          the datasets are read on a thread pool and assigned to the variables
+          in chunks of at most this size, see `load_weights_from_hdf5_group()`.
+      num_threads: Optional number of threads reading datasets when
+          `max_chunk_bytes` is set. Defaults to 8.
 
   Raises:
       ValueError: in case of mismatch between provided layers
@@ -754,16 +868,25 @@ def load_weights_from_hdf5_group_by_name(
     if layer.name:
       index.setdefault(layer.name, []).append(layer)
 
+  chunked_loader = _ChunkedWeightLoader(max_chunk_bytes, num_threads)
   # We batch weight value assignments in a single backend call
   # which provides a speedup in TensorFlow.
   weight_value_tuples = []
   for k, name in enumerate(layer_names):
+    if name not in index:
+      continue
     g = f[name]
     weight_names = load_attributes_from_hdf5_group(g, 'weight_names')
-    weight_values = [np.asarray(g[weight_name]) for weight_name in weight_names]
+    datasets = [g[weight_name] for weight_name in weight_names]
+    weight_values = None
 
-    for layer in index.get(name, []):
+    for layer in index[name]:
       symbolic_weights = _legacy_weights(layer)
+      if chunked_loader.add(layer, symbolic_weights, datasets,
+                            original_keras_version):
+        continue
+      if weight_values is None:
+        weight_values = [np.asarray(dataset) for dataset in datasets]
       weight_values = preprocess_weights_for_loading(
           layer, weight_values, original_keras_version, original_backend)
       if len(weight_values) != len(symbolic_weights):
@@ -797,6 +920,7 @@ def load_weights_from_hdf5_group_by_name(
         else:
           weight_value_tuples.append((symbolic_weights[i], weight_values[i]))
   backend.batch_set_value(weight_value_tuples)
+  chunked_loader.run()
 
 
 def save_attributes_to_hdf5_group(group, name, data):
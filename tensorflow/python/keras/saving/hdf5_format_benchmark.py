@@ -0,0 +1,82 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for loading weights from HDF5 files.
+
+Compares the default loading, which reads every dataset into memory before
+assigning it, with chunked loading on a thread pool. The peak memory is the
+peak of the allocations traced by `tracemalloc`, which include NumPy arrays.
+"""
+
+import os
+import time
+import tracemalloc
+
+from tensorflow.python.eager import test
+from tensorflow.python.keras.engine import sequential
+from tensorflow.python.keras.layers import core
+from tensorflow.python.keras.saving import hdf5_format
+
+try:
+  import h5py  # pylint: disable=g-import-not-at-top
+except ImportError:
+  h5py = None
+
+_NUM_LAYERS = 8
+_UNITS = 2048
+_MAX_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class HDF5WeightLoadingBenchmark(test.Benchmark):
+
+  def _make_model(self):
+    model = sequential.Sequential(
+        [core.Dense(_UNITS) for _ in range(_NUM_LAYERS)])
+    model.build((None, _UNITS))
+    return model
+
+  def _run(self, name, max_chunk_bytes=None, num_threads=None):
+    model = self._make_model()
+    filepath = os.path.join(self.get_temp_dir(), "weights.h5")
+    model.save_weights(filepath)
+
+    with h5py.File(filepath, "r") as f:
+      tracemalloc.start()
+      start = time.time()
+      hdf5_format.load_weights_from_hdf5_group(
+          f, model.layers, max_chunk_bytes=max_chunk_bytes,
+          num_threads=num_threads)
+      wall_time = time.time() - start
+      _, peak_bytes = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+
+    self.report_benchmark(
+        name=name,
+        iters=1,
+        wall_time=wall_time,
+        extras={
+            "file_bytes": os.path.getsize(filepath),
+            "peak_traced_bytes": peak_bytes,
+        })
+
+  def benchmark_load_weights_default(self):
+    self._run("load_weights_default")
+
+  def benchmark_load_weights_chunked(self):
+    self._run("load_weights_chunked_1_thread", _MAX_CHUNK_BYTES, 1)
+    self._run("load_weights_chunked_8_threads", _MAX_CHUNK_BYTES, 8)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,171 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for chunked weight loading from HDF5 files."""
+
+import os
+
+import numpy as np
+
+from tensorflow.python.eager import test
+from tensorflow.python.keras.engine import base_layer
+from tensorflow.python.keras.engine import sequential
+from tensorflow.python.keras.layers import core
+from tensorflow.python.keras.layers import recurrent
+from tensorflow.python.keras.saving import hdf5_format
+
+try:
+  import h5py  # pylint: disable=g-import-not-at-top
+except ImportError:
+  h5py = None
+
+# A row of the kernel of `dense_a` is 64 bytes, so it is read in 32 chunks.
+_MAX_CHUNK_BYTES = 64
+
+
+class _Scale(base_layer.Layer):
+  """Multiplies its inputs by a scalar weight, saved as a 0-d dataset."""
+
+  def build(self, input_shape):
+    self.scale = self.add_weight('scale', shape=(), initializer='ones')
+    super(_Scale, self).build(input_shape)
+
+  def call(self, inputs):
+    return inputs * self.scale
+
+
+def _dense_model(second_name='dense_b'):
+  model = sequential.Sequential([
+      core.Dense(16, name='dense_a'),
+      core.Dense(8, name=second_name),
+      _Scale(name='scale'),
+  ])
+  model.build((None, 32))
+  return model
+
+
+def _lstm_model():
+  model = sequential.Sequential([
+      recurrent.LSTM(4, name='lstm'),
+      core.Dense(2, name='dense'),
+  ])
+  model.build((None, 3, 5))
+  return model
+
+
+def _datasets(f, layer_name):
+  g = f[layer_name]
+  weight_names = hdf5_format.load_attributes_from_hdf5_group(g, 'weight_names')
+  return [g[weight_name] for weight_name in weight_names]
+
+
+def _randomize(model, seed=0):
+  rng = np.random.RandomState(seed)
+  model.set_weights([
+      np.asarray(rng.uniform(size=weight.shape), np.float32)
+      for weight in model.get_weights()
+  ])
+
+
+class ChunkedWeightLoadingTest(test.TestCase):
+
+  def setUp(self):
+    super(ChunkedWeightLoadingTest, self).setUp()
+    if h5py is None:
+      self.skipTest('h5py is required.')
+
+  def _save(self, model):
+    filepath = os.path.join(self.get_temp_dir(), 'weights.h5')
+    model.save_weights(filepath)
+    return filepath
+
+  def _assertWeightsEqual(self, expected, actual):
+    self.assertEqual(len(expected), len(actual))
+    for expected_value, actual_value in zip(expected, actual):
+      self.assertAllEqual(expected_value, actual_value)
+
+  def testChunkedMatchesDefault(self):
+    saved = _dense_model()
+    _randomize(saved)
+    filepath = self._save(saved)
+
+    default = _dense_model()
+    default.load_weights(filepath)
+    chunked = _dense_model()
+    chunked.load_weights(
+        filepath, max_chunk_bytes=_MAX_CHUNK_BYTES, num_threads=3)
+    self._assertWeightsEqual(default.get_weights(), chunked.get_weights())
+    self._assertWeightsEqual(saved.get_weights(), chunked.get_weights())
+
+  def testChunkedLoaderQueuesAllDatasets(self):
+    saved = _dense_model()
+    _randomize(saved)
+    filepath = self._save(saved)
+    model = _dense_model()
+
+    loader = hdf5_format._ChunkedWeightLoader(_MAX_CHUNK_BYTES)  # pylint: disable=protected-access
+    with h5py.File(filepath, 'r') as f:
+      for layer in model.layers:
+        # The 0-d scale is queued too, and assigned without chunking.
+        self.assertTrue(
+            loader.add(layer, layer.weights, _datasets(f, layer.name),
+                       '2.4.0'), layer.name)
+      loader.run()
+    self._assertWeightsEqual(saved.get_weights(), model.get_weights())
+
+  def testRecurrentAndKeras1WeightsAreNotChunked(self):
+    saved = _lstm_model()
+    _randomize(saved)
+    filepath = self._save(saved)
+    model = _lstm_model()
+
+    loader = hdf5_format._ChunkedWeightLoader(_MAX_CHUNK_BYTES)  # pylint: disable=protected-access
+    with h5py.File(filepath, 'r') as f:
+      lstm, dense = model.layers
+      self.assertFalse(
+          loader.add(lstm, lstm.weights, _datasets(f, 'lstm'), '2.4.0'))
+      self.assertFalse(
+          loader.add(dense, dense.weights, _datasets(f, 'dense'), '1'))
+
+    # The recurrent weights fall back to the default loading.
+    model.load_weights(filepath, max_chunk_bytes=_MAX_CHUNK_BYTES)
+    self._assertWeightsEqual(saved.get_weights(), model.get_weights())
+
+  def testByNameSkipsAbsentLayers(self):
+    saved = _dense_model()
+    _randomize(saved)
+    filepath = self._save(saved)
+
+    # `dense_b` is absent from the model, and `dense_c` from the file.
+    model = _dense_model(second_name='dense_c')
+    _randomize(model, seed=1)
+    dense_c_weights = model.get_layer('dense_c').get_weights()
+    model.load_weights(
+        filepath, by_name=True, max_chunk_bytes=_MAX_CHUNK_BYTES)
+    for name in ('dense_a', 'scale'):
+      self._assertWeightsEqual(
+          saved.get_layer(name).get_weights(),
+          model.get_layer(name).get_weights())
+    self._assertWeightsEqual(dense_c_weights,
+                             model.get_layer('dense_c').get_weights())
+
+  def testInvalidArguments(self):
+    with self.assertRaisesRegex(ValueError, 'max_chunk_bytes'):
+      hdf5_format._ChunkedWeightLoader(max_chunk_bytes=0)  # pylint: disable=protected-access
+    with self.assertRaisesRegex(ValueError, 'num_threads'):
+      hdf5_format._ChunkedWeightLoader(max_chunk_bytes=1, num_threads=0)  # pylint: disable=protected-access
+
+
+if __name__ == '__main__':
+  test.main()
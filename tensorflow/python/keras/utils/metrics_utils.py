@@ -480,6 +480,156 @@ def _update_confusion_matrix_variables_optimized(
   return control_flow_ops.group(update_ops)
 
 
+# Minimum number of sorted thresholds for which the confusion matrix variables
+# are updated from a histogram of the predictions instead of comparing every
+# prediction with every threshold.
+_HISTOGRAM_MIN_THRESHOLDS = 2
+
+
+def _update_confusion_matrix_variables_histogram(
+    variables_to_update,
+    y_true,
+    y_pred,
+    thresholds,
+    multi_label=False,
+    sample_weights=None,
+    label_weights=None):
+  """Update confusion matrix variables from a histogram of the predictions.
+
+  This generalizes `_update_confusion_matrix_variables_optimized()` to any
+  sorted list of thresholds. The bucket of a prediction p is the number of
+  thresholds strictly less than p, which is found with a binary search:
+    bucket_index(p) = searchsorted(thresholds, p, side='left')
+  so that bucket 0 holds the predictions that are not above any threshold, and
+  bucket i > 0 the predictions above thresholds t_0, ..., t_{i-1}. The weights
+  of the true and false labels are accumulated per bucket with a single
+  tf.math.unsorted_segment_sum(), and since
+    TP(t_i) = sum( B(j), j > i )
+  the confusion matrix is again a reversed cumulative sum of the buckets.
+
+  For example:
+  y_true = [0, 0, 1, 1]
+  y_pred = [0.1, 0.5, 0.3, 0.9]
+  thresholds = [0.2, 0.4, 0.8]
+  bucket_index(y_pred) = [0, 2, 1, 3]
+  tp_bucket_value = [0, 1, 0, 1]
+  true_positive = tf.math.cumsum(tp_bucket_value, reverse=True)[1:]
+                = [2, 1, 1]
+
+  This implementation exhibits a run time complexity of O(N * log(T) + T) and
+  a space complexity of O(T + N), where T is the number of thresholds and N is
+  the size of predictions.
+
+  Args:
+    variables_to_update: Dictionary with 'tp', 'fn', 'tn', 'fp' as valid keys
+      and corresponding variables to update as values.
+    y_true: A floating point `Tensor` whose shape matches `y_pred`. Will be cast
+      to `bool`.
+    y_pred: A floating point `Tensor` of arbitrary shape.
+    thresholds: A sorted 1-D floating point `Tensor`.
+    multi_label: Optional boolean indicating whether multidimensional
+      prediction/labels should be treated as multilabel responses, or flattened
+      into a single label. When True, the valus of `variables_to_update` must
+      have a second dimension equal to the number of labels in y_true and
+      y_pred, and those tensors must not be RaggedTensors.
+    sample_weights: Optional `Tensor` whose rank is either 0, or the same rank
+      as `y_true`, and must be broadcastable to `y_true` (i.e., all dimensions
+      must be either `1`, or the same as the corresponding `y_true` dimension).
+    label_weights: Optional tensor of non-negative weights for multilabel
+      data. The weights are applied when calculating TP, FP, FN, and TN without
+      explicit multilabel handling (i.e. when the data is to be flattened).
+
+  Returns:
+    Update op.
+  """
+  num_buckets = thresholds.shape.as_list()[0] + 1
+
+  if sample_weights is None:
+    sample_weights = 1.0
+  else:
+    sample_weights = weights_broadcast_ops.broadcast_weights(
+        math_ops.cast(sample_weights, dtype=y_pred.dtype), y_pred)
+    if not multi_label:
+      sample_weights = array_ops.reshape(sample_weights, [-1])
+  if label_weights is None:
+    label_weights = 1.0
+  else:
+    label_weights = array_ops.expand_dims(label_weights, 0)
+    label_weights = weights_broadcast_ops.broadcast_weights(label_weights,
+                                                            y_pred)
+    if not multi_label:
+      label_weights = array_ops.reshape(label_weights, [-1])
+  weights = math_ops.multiply(sample_weights, label_weights)
+
+  y_true = math_ops.cast(math_ops.cast(y_true, dtypes.bool), y_true.dtype)
+  if not multi_label:
+    y_true = array_ops.reshape(y_true, [-1])
+    y_pred = array_ops.reshape(y_pred, [-1])
+
+  true_labels = math_ops.multiply(y_true, weights)
+  false_labels = math_ops.multiply((1.0 - y_true), weights)
+
+  flat_pred = array_ops.reshape(y_pred, [-1])
+  bucket_indices = array_ops.searchsorted(
+      thresholds, flat_pred, side='left', out_type=dtypes.int32)
+  # A NaN prediction is not above any threshold, as when it is compared with
+  # every threshold, so it goes to bucket 0 whatever its search returned.
+  bucket_indices = array_ops.where_v2(
+      math_ops.is_nan(flat_pred), 0, bucket_indices)
+  if multi_label:
+    # Give each label its own range of buckets, so that the histograms of all
+    # labels are accumulated with one segment sum.
+    num_labels = array_ops.shape(y_pred)[1]
+    bucket_indices = array_ops.reshape(
+        bucket_indices, array_ops.shape(y_pred)) + math_ops.range(
+            num_labels) * num_buckets
+    num_segments = num_labels * num_buckets
+  else:
+    num_segments = num_buckets
+
+  labels = array_ops_stack.stack([
+      array_ops.reshape(true_labels, [-1]),
+      array_ops.reshape(false_labels, [-1])
+  ], axis=1)
+  buckets = math_ops.unsorted_segment_sum(
+      data=labels, segment_ids=array_ops.reshape(bucket_indices, [-1]),
+      num_segments=num_segments)
+  if multi_label:
+    buckets = array_ops.transpose_v2(
+        array_ops.reshape(buckets, [num_labels, num_buckets, 2]), [1, 0, 2])
+  # counts[0] holds the total weights of the true and false labels.
+  counts = math_ops.cumsum(buckets, axis=0, reverse=True)
+  tp = counts[1:, ..., 0]
+  fp = counts[1:, ..., 1]
+
+  update_ops = []
+  if ConfusionMatrix.TRUE_POSITIVES in variables_to_update:
+    variable = variables_to_update[ConfusionMatrix.TRUE_POSITIVES]
+    update_ops.append(variable.assign_add(tp))
+  if ConfusionMatrix.FALSE_POSITIVES in variables_to_update:
+    variable = variables_to_update[ConfusionMatrix.FALSE_POSITIVES]
+    update_ops.append(variable.assign_add(fp))
+  if ConfusionMatrix.TRUE_NEGATIVES in variables_to_update:
+    variable = variables_to_update[ConfusionMatrix.TRUE_NEGATIVES]
+    tn = counts[0, ..., 1] - fp
+    update_ops.append(variable.assign_add(tn))
+  if ConfusionMatrix.FALSE_NEGATIVES in variables_to_update:
+    variable = variables_to_update[ConfusionMatrix.FALSE_NEGATIVES]
+    fn = counts[0, ..., 0] - tp
+    update_ops.append(variable.assign_add(fn))
+  return control_flow_ops.group(update_ops)
+
+
+def _is_sorted_thresholds(thresholds):
+  """Returns whether `thresholds` is a sorted Python or numpy 1-D list."""
+  if not isinstance(thresholds, (list, tuple, np.ndarray)):
+    return False
+  thresholds = np.asarray(thresholds)
+  return (thresholds.ndim == 1 and
+          len(thresholds) >= _HISTOGRAM_MIN_THRESHOLDS and
+          bool(np.all(np.diff(thresholds) >= 0)))
+
+
 def is_evenly_distributed_thresholds(thresholds):
   """Check if the thresholds list is evenly distributed.
 
@@ -557,7 +707,9 @@ def update_confusion_matrix_variables(variables_to_update,
     thresholds_distributed_evenly: Boolean, whether the thresholds are evenly
       distributed within the list. An optimized method will be used if this is
       the case. See _update_confusion_matrix_variables_optimized() for more
-      details.
+      details. Otherwise, if `thresholds` is a sorted list of several
+      thresholds, the variables are updated from a histogram of the
+      predictions, see _update_confusion_matrix_variables_histogram().
 
   Returns:
     Update op.
@@ -594,6 +746,8 @@ def update_confusion_matrix_variables(variables_to_update,
     # and ranged between [0, 1]. See is_evenly_distributed_thresholds() for more
     # details.
     thresholds_with_epsilon = thresholds[0] < 0.0 or thresholds[-1] > 1.0
+  thresholds_sorted = (not thresholds_distributed_evenly and
+                       _is_sorted_thresholds(thresholds))
 
   thresholds = tensor_conversion.convert_to_tensor_v2_with_dispatch(
       thresholds, dtype=variable_dtype
@@ -654,6 +808,12 @@ def update_confusion_matrix_variables(variables_to_update,
         label_weights=label_weights,
         thresholds_with_epsilon=thresholds_with_epsilon)
 
+  if thresholds_sorted:
+    return _update_confusion_matrix_variables_histogram(
+        variables_to_update, y_true, y_pred, thresholds,
+        multi_label=multi_label, sample_weights=sample_weight,
+        label_weights=label_weights)
+
   pred_shape = array_ops.shape(y_pred)
   num_predictions = pred_shape[0]
   if y_pred.shape.ndims == 1:
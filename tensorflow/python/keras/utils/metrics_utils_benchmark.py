@@ -0,0 +1,89 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for updating confusion matrix variables with custom thresholds.
+
+Compares the histogram update used for sorted, unevenly distributed thresholds
+with the update that compares every prediction with every threshold.
+"""
+
+import time
+
+import numpy as np
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.eager import test
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import random_seed
+from tensorflow.python.keras.utils import metrics_utils
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import random_ops
+from tensorflow.python.ops import variables
+
+_BATCH_SIZE = 4096
+_NUM_ITERS = 20
+
+
+class ConfusionMatrixUpdateBenchmark(test.Benchmark):
+
+  def _run(self, num_thresholds, histogram):
+    random_seed.set_random_seed(0)
+    # Sorted but not evenly distributed, like the thresholds of an AUC with
+    # custom thresholds.
+    thresholds = np.sort(np.random.RandomState(0).uniform(
+        size=num_thresholds)).tolist()
+    confusion_matrix = {
+        key: variables.Variable(np.zeros(num_thresholds), dtype=dtypes.float32)
+        for key in list(metrics_utils.ConfusionMatrix)
+    }
+    y_true = math_ops.cast(
+        random_ops.random_uniform([_BATCH_SIZE, 1]) > 0.5, dtypes.float32)
+    y_pred = random_ops.random_uniform([_BATCH_SIZE, 1])
+
+    @def_function.function
+    def update():
+      metrics_utils.update_confusion_matrix_variables(
+          confusion_matrix, y_true, y_pred, thresholds)
+
+    min_thresholds = metrics_utils._HISTOGRAM_MIN_THRESHOLDS  # pylint: disable=protected-access
+    if not histogram:
+      metrics_utils._HISTOGRAM_MIN_THRESHOLDS = num_thresholds + 1  # pylint: disable=protected-access
+    try:
+      update()  # Warm up, and trace with the selected implementation.
+      start = time.time()
+      for _ in range(_NUM_ITERS):
+        update()
+      confusion_matrix[metrics_utils.ConfusionMatrix.TRUE_POSITIVES].numpy()
+      wall_time = (time.time() - start) / _NUM_ITERS
+    finally:
+      metrics_utils._HISTOGRAM_MIN_THRESHOLDS = min_thresholds  # pylint: disable=protected-access
+
+    self.report_benchmark(
+        name="update_confusion_matrix_%s_%d_thresholds" %
+        ("histogram" if histogram else "tiled", num_thresholds),
+        iters=_NUM_ITERS,
+        wall_time=wall_time,
+        extras={"batch_size": _BATCH_SIZE})
+
+  def benchmark_histogram(self):
+    for num_thresholds in (200, 1000, 10000):
+      self._run(num_thresholds, histogram=True)
+
+  def benchmark_tiled(self):
+    for num_thresholds in (200, 1000, 10000):
+      self._run(num_thresholds, histogram=False)
+
+
+if __name__ == "__main__":
+  test.main()
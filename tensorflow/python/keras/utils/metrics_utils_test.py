@@ -0,0 +1,127 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for updating confusion matrix variables with custom thresholds."""
+
+from absl.testing import parameterized
+import numpy as np
+
+from tensorflow.python.eager import test
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.keras.utils import metrics_utils
+from tensorflow.python.ops import variables
+
+# Sorted but unevenly distributed, with a duplicate and with thresholds outside
+# of [0, 1].
+_THRESHOLDS = [-1e-7, 0., 0.25, 0.25, 0.4, 0.5, 0.75, 1., 1. + 1e-7]
+_BATCH_SIZE = 32
+
+
+def _make_data(seed, num_labels):
+  rng = np.random.RandomState(seed)
+  shape = (_BATCH_SIZE, num_labels)
+  y_true = rng.randint(0, 2, shape).astype(np.float32)
+  y_pred = rng.uniform(size=shape).astype(np.float32)
+  # Predictions equal to a threshold, including the ends of [0, 1].
+  y_pred.flat[:6] = [0., 0.25, 0.4, 0.5, 0.75, 1.]
+  sample_weight = rng.uniform(0., 2., (_BATCH_SIZE, 1)).astype(np.float32)
+  return y_true, y_pred, sample_weight
+
+
+def _new_confusion_matrix(shape):
+  return {
+      key: variables.Variable(np.zeros(shape), dtype=dtypes.float32)
+      for key in list(metrics_utils.ConfusionMatrix)
+  }
+
+
+def _numpy(confusion_matrix):
+  return {key: value.numpy() for key, value in confusion_matrix.items()}
+
+
+class HistogramConfusionMatrixTest(test.TestCase, parameterized.TestCase):
+
+  def _update(self, histogram, y_true, y_pred, multi_label=False, **kwargs):
+    shape = [len(_THRESHOLDS)]
+    if multi_label:
+      shape.append(y_pred.shape[1])
+    confusion_matrix = _new_confusion_matrix(shape)
+    min_thresholds = metrics_utils._HISTOGRAM_MIN_THRESHOLDS  # pylint: disable=protected-access
+    if not histogram:
+      metrics_utils._HISTOGRAM_MIN_THRESHOLDS = len(_THRESHOLDS) + 1  # pylint: disable=protected-access
+    try:
+      metrics_utils.update_confusion_matrix_variables(
+          confusion_matrix, constant_op.constant(y_true),
+          constant_op.constant(y_pred), _THRESHOLDS,
+          multi_label=multi_label, **kwargs)
+    finally:
+      metrics_utils._HISTOGRAM_MIN_THRESHOLDS = min_thresholds  # pylint: disable=protected-access
+    return _numpy(confusion_matrix)
+
+  def testThresholdsUseHistogram(self):
+    self.assertTrue(metrics_utils._is_sorted_thresholds(_THRESHOLDS))  # pylint: disable=protected-access
+    self.assertFalse(
+        metrics_utils.is_evenly_distributed_thresholds(_THRESHOLDS))
+    self.assertFalse(
+        metrics_utils._is_sorted_thresholds(list(reversed(_THRESHOLDS))))  # pylint: disable=protected-access
+
+  @parameterized.named_parameters(
+      ('single_label', False, False, False),
+      ('single_label_weighted', False, True, False),
+      ('single_label_label_weights', False, True, True),
+      ('multi_label', True, False, False),
+      ('multi_label_weighted', True, True, False),
+  )
+  def testMatchesTiledUpdate(self, multi_label, weighted, with_label_weights):
+    y_true, y_pred, sample_weight = _make_data(0, num_labels=3)
+    kwargs = {'multi_label': multi_label}
+    if weighted:
+      kwargs['sample_weight'] = constant_op.constant(sample_weight)
+    if with_label_weights:
+      kwargs['label_weights'] = constant_op.constant([0.5, 1., 2.])
+    expected = self._update(False, y_true, y_pred, **kwargs)
+    actual = self._update(True, y_true, y_pred, **kwargs)
+    for key in expected:
+      self.assertAllClose(expected[key], actual[key], msg=str(key))
+
+  def testNanPredictionsAreNegative(self):
+    # NaN predictions are rejected by update_confusion_matrix_variables(), but
+    # the histogram update still counts them as negative at every threshold,
+    # like a comparison with every threshold does.
+    y_true = np.array([1., 0., 1., 0.], np.float32)
+    y_pred = np.array([np.nan, np.nan, 0.3, 0.6], np.float32)
+    confusion_matrix = _new_confusion_matrix([len(_THRESHOLDS)])
+    metrics_utils._update_confusion_matrix_variables_histogram(  # pylint: disable=protected-access
+        confusion_matrix, constant_op.constant(y_true),
+        constant_op.constant(y_pred),
+        constant_op.constant(_THRESHOLDS, dtypes.float32))
+    actual = _numpy(confusion_matrix)
+
+    thresholds = np.array(_THRESHOLDS, np.float32)[:, np.newaxis]
+    predicted = y_pred[np.newaxis, :] > thresholds
+    positive = y_true[np.newaxis, :] > 0
+    cm = metrics_utils.ConfusionMatrix
+    self.assertAllClose(
+        np.sum(predicted & positive, axis=1), actual[cm.TRUE_POSITIVES])
+    self.assertAllClose(
+        np.sum(predicted & ~positive, axis=1), actual[cm.FALSE_POSITIVES])
+    self.assertAllClose(
+        np.sum(~predicted & ~positive, axis=1), actual[cm.TRUE_NEGATIVES])
+    self.assertAllClose(
+        np.sum(~predicted & positive, axis=1), actual[cm.FALSE_NEGATIVES])
+
+
+if __name__ == '__main__':
+  test.main()
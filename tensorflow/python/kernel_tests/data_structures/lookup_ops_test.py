@@ -15,6 +15,7 @@
 """Tests for lookup ops."""
 import os
 import tempfile
+import time
 import unittest
 
 from absl.testing import parameterized
@@ -1083,6 +1084,188 @@ class InitializeTableFromFileOpTest(BaseLookupTableTest):
       self.assertEqual(vocab_size, self.evaluate(table.size()))
 
 
+class ShardedTextFileInitializerTest(BaseLookupTableTest):
+
+  def _createFile(self, basename, content):
+    filename = os.path.join(self.get_temp_dir(), basename)
+    with open(filename, "wb") as f:
+      f.write(content)
+    return filename
+
+  def _createTable(self, init, default_value=-1):
+    return lookup_ops.StaticHashTable(init, default_value)
+
+  @test_util.run_v2_only
+  def testMatchesTextFileInitializer(self):
+    words = ["word%d" % i for i in range(100)]
+    filename = self._createFile(
+        "words.txt",
+        "".join("%s\t%d\n" % (w, 10 * i) for i, w in enumerate(words)).encode())
+    keys = constant_op.constant(words + ["UNK"])
+    for key_index, value_index in [(0, 1), (0, -1), (-2, -1)]:
+      expected = self._createTable(
+          lookup_ops.TextFileInitializer(filename, dtypes.string, key_index,
+                                         dtypes.int64, value_index))
+      for num_shards in (1, 3, 7, 1000):
+        table = self._createTable(
+            lookup_ops.ShardedTextFileInitializer(
+                filename,
+                dtypes.string,
+                key_index,
+                dtypes.int64,
+                value_index,
+                num_shards=num_shards))
+        self.assertEqual(self.evaluate(expected.size()),
+                         self.evaluate(table.size()))
+        self.assertAllEqual(expected.lookup(keys), table.lookup(keys))
+
+  @test_util.run_v2_only
+  def testLineEndingsAndOffset(self):
+    filename = self._createFile("crlf.txt", b"brain\r\nsalad\r\nsurgery")
+    init = lookup_ops.ShardedTextFileInitializer(
+        filename,
+        dtypes.string,
+        lookup_ops.TextFileIndex.WHOLE_LINE,
+        dtypes.int64,
+        lookup_ops.TextFileIndex.LINE_NUMBER,
+        value_index_offset=1,
+        num_shards=4)
+    table = self._createTable(init)
+    self.assertAllEqual([1, 2, 3, -1],
+                        table.lookup(
+                            constant_op.constant(
+                                ["brain", "salad", "surgery", "tank"])))
+    self.assertGreaterEqual(init.last_init_seconds, 0)
+
+  @test_util.run_v2_only
+  def testVocabSize(self):
+    filename = self._createFile("vocab.txt", b"brain\nsalad\nsurgery\n\n")
+    table = self._createTable(
+        lookup_ops.ShardedTextFileInitializer(
+            filename,
+            dtypes.string,
+            lookup_ops.TextFileIndex.WHOLE_LINE,
+            dtypes.int64,
+            lookup_ops.TextFileIndex.LINE_NUMBER,
+            vocab_size=2,
+            num_shards=2))
+    self.assertEqual(2, self.evaluate(table.size()))
+
+    with self.assertRaisesRegex(errors_impl.InvalidArgumentError,
+                                "Invalid vocab_size"):
+      self._createTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename,
+              dtypes.string,
+              lookup_ops.TextFileIndex.WHOLE_LINE,
+              dtypes.int64,
+              lookup_ops.TextFileIndex.LINE_NUMBER,
+              vocab_size=10))
+    with self.assertRaisesRegex(errors_impl.InvalidArgumentError,
+                                "empty line"):
+      self._createTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename,
+              dtypes.string,
+              lookup_ops.TextFileIndex.WHOLE_LINE,
+              dtypes.int64,
+              lookup_ops.TextFileIndex.LINE_NUMBER))
+
+  @test_util.run_v2_only
+  def testInvalidContent(self):
+    filename = self._createFile("columns.txt", b"brain\t1\nsalad\n")
+    with self.assertRaisesRegex(errors_impl.InvalidArgumentError,
+                                "Invalid number of columns"):
+      self._createTable(
+          lookup_ops.ShardedTextFileInitializer(filename, dtypes.string, 0,
+                                                dtypes.int64, 1))
+    filename = self._createFile("values.txt", b"brain\t1\nsalad\tx\n")
+    with self.assertRaisesRegex(errors_impl.InvalidArgumentError,
+                                "not a valid int64"):
+      self._createTable(
+          lookup_ops.ShardedTextFileInitializer(filename, dtypes.string, 0,
+                                                dtypes.int64, 1))
+
+  @test_util.run_v2_only
+  def testSnapshot(self):
+    filename = self._createFile("snapshot.txt", b"brain\t1\nsalad\t2\n")
+    snapshot_path = os.path.join(self.get_temp_dir(), "snapshot")
+    keys = constant_op.constant(["brain", "salad", "surgery"])
+
+    def create_table():
+      return self._createTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename,
+              dtypes.string,
+              0,
+              dtypes.int64,
+              1,
+              snapshot_path=snapshot_path))
+
+    self.assertAllEqual([1, 2, -1], create_table().lookup(keys))
+    self.assertTrue(
+        os.path.exists(os.path.join(snapshot_path, "metadata.json")))
+    self.assertAllEqual([1, 2, -1], create_table().lookup(keys))
+
+    # The snapshot is stale once the file changes.
+    self._createFile("snapshot.txt", b"brain\t1\nsalad\t2\nsurgery\t3\n")
+    self.assertAllEqual([1, 2, 3], create_table().lookup(keys))
+
+  @test_util.run_v2_only
+  def testSnapshotStrings(self):
+    # Strings may end with NUL bytes, and may be empty.
+    filename = self._createFile("strings.txt",
+                                b"brain\x00\t\nsalad\tx\x00\x00\n\ty\n")
+    snapshot_path = os.path.join(self.get_temp_dir(), "strings_snapshot")
+
+    def create_table():
+      return self._createTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename,
+              dtypes.string,
+              0,
+              dtypes.string,
+              1,
+              snapshot_path=snapshot_path), "?")
+
+    keys = constant_op.constant(["brain\x00", "brain", "salad", ""])
+    expected = [b"", b"?", b"x\x00\x00", b"y"]
+    self.assertAllEqual(expected, create_table().lookup(keys))
+    # Reads the snapshot.
+    self.assertAllEqual(expected, create_table().lookup(keys))
+
+  @test_util.run_v2_only
+  def testSnapshotOfAnotherFile(self):
+    first = self._createFile("first.txt", b"brain\t1\nsalad\t2\n")
+    second = self._createFile("second.txt", b"brain\t3\nsalad\t4\n")
+    # The files only differ by their name and content.
+    stat = os.stat(first)
+    os.utime(second, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    snapshot_path = os.path.join(self.get_temp_dir(), "shared_snapshot")
+    keys = constant_op.constant(["brain", "salad"])
+
+    def create_table(filename):
+      return self._createTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename,
+              dtypes.string,
+              0,
+              dtypes.int64,
+              1,
+              snapshot_path=snapshot_path))
+
+    self.assertAllEqual([1, 2], create_table(first).lookup(keys))
+    self.assertAllEqual([3, 4], create_table(second).lookup(keys))
+
+  def testInvalidArguments(self):
+    with self.assertRaisesRegex(ValueError, "num_shards"):
+      lookup_ops.ShardedTextFileInitializer(
+          "vocab.txt", dtypes.string, 0, dtypes.int64, 1, num_shards=0)
+    with self.assertRaisesRegex(ValueError, "only supports"):
+      lookup_ops.ShardedTextFileInitializer("vocab.txt", dtypes.string, 0,
+                                            dtypes.int16, 1)
+
+
 @parameterized.named_parameters(
     (f"_{is_anonymous}", is_anonymous) for is_anonymous in [False, True])
 class StaticVocabularyTableTest(BaseLookupTableTest):
@@ -1504,6 +1687,174 @@ class StaticVocabularyTableTest(BaseLookupTableTest):
     self.assertEqual(loaded.is_ref_counting(), is_anonymous)
 
 
+class CachedLookupTableTest(BaseLookupTableTest):
+
+  def _createVocabFile(self, basename, values=("brain", "salad", "surgery")):
+    vocabulary_file = os.path.join(self.get_temp_dir(), basename)
+    with open(vocabulary_file, "w") as f:
+      f.write("\n".join(values) + "\n")
+    return vocabulary_file
+
+  def _createVocabularyTable(self, num_oov_buckets=1):
+    return self.getVocabularyTable()(
+        lookup_ops.KeyValueTensorInitializer(
+            ["brain", "salad", "surgery"], [0, 1, 2], value_dtype=dtypes.int64),
+        num_oov_buckets)
+
+  @test_util.run_v2_only
+  def testLookup(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(), capacity=16)
+    keys = constant_op.constant([["brain", "salad"], ["brain", "UNK"]])
+
+    self.assertAllEqual([[0, 1], [0, 3]], table.lookup(keys))
+    self.assertEqual(0, self.evaluate(table.hits))
+    self.assertEqual(4, self.evaluate(table.misses))
+    self.assertEqual(3, self.evaluate(table.cache_size()))
+    self.assertEqual(4, self.evaluate(table.size()))
+
+    self.assertAllEqual([[0, 1], [0, 3]], table.lookup(keys))
+    self.assertEqual(4, self.evaluate(table.hits))
+    self.assertEqual(4, self.evaluate(table.misses))
+
+  @test_util.run_v2_only
+  def testLookupInFunction(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(), capacity=16)
+
+    @def_function.function
+    def lookup(keys):
+      return table.lookup(keys)
+
+    keys = constant_op.constant(["surgery", "UNK", "surgery"])
+    self.assertAllEqual([2, 3, 2], lookup(keys))
+    self.assertAllEqual([2, 3, 2], lookup(keys))
+    self.assertEqual(3, self.evaluate(table.hits))
+    self.assertEqual(3, self.evaluate(table.misses))
+
+  @test_util.run_v2_only
+  def testSparseAndRaggedKeys(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(), capacity=16)
+    sp_keys = sparse_tensor.SparseTensor(
+        constant_op.constant([[0, 0], [1, 1]], dtypes.int64),
+        constant_op.constant(["salad", "UNK"]),
+        constant_op.constant([2, 2], dtypes.int64))
+    sp_ids = table.lookup(sp_keys)
+    self.assertAllEqual([[0, 0], [1, 1]], sp_ids.indices)
+    self.assertAllEqual([1, 3], sp_ids.values)
+
+    rt_keys = ragged_tensor.RaggedTensor.from_row_lengths(
+        constant_op.constant(["brain", "salad", "UNK"]), [2, 1])
+    rt_ids = table.lookup(rt_keys)
+    self.assertAllEqual([[0, 1], [3]], rt_ids)
+    self.assertEqual(2, self.evaluate(table.hits))
+
+  @test_util.run_v2_only
+  def testEviction(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(num_oov_buckets=100), capacity=8)
+    table.lookup(constant_op.constant(["a%d" % i for i in range(10)]))
+    # An eighth of the capacity is freed once the cache is full.
+    self.assertEqual(7, self.evaluate(table.cache_size()))
+
+    recent_keys = constant_op.constant(["b0", "b1"])
+    table.lookup(recent_keys)
+    self.assertEqual(7, self.evaluate(table.cache_size()))
+    table.lookup(recent_keys)
+    self.assertEqual(2, self.evaluate(table.hits))
+    self.assertEqual(12, self.evaluate(table.misses))
+
+  @test_util.run_v2_only
+  def testHotKeysAreNotEvicted(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(num_oov_buckets=100), capacity=8)
+    table.lookup(constant_op.constant(["a%d" % i for i in range(7)]))
+    # Recency is sampled, but a key repeated in a lookup is always refreshed.
+    table.lookup(constant_op.constant(["a0"] * 8))
+    table.lookup(constant_op.constant(["b0", "b1"]))
+    self.assertEqual(7, self.evaluate(table.cache_size()))
+    table.lookup(constant_op.constant(["a0"]))
+    self.assertEqual(9, self.evaluate(table.hits))
+    self.assertEqual(9, self.evaluate(table.misses))
+
+  @test_util.run_v2_only
+  def testTinyLfuAdmission(self):
+    table = lookup_ops.CachedLookupTable(
+        self._createVocabularyTable(),
+        capacity=16,
+        admission="tinylfu",
+        admission_threshold=2)
+    keys = constant_op.constant(["salad"])
+    for _ in range(3):
+      self.assertAllEqual([1], table.lookup(keys))
+    # The key is only admitted after its second miss.
+    self.assertEqual(1, self.evaluate(table.hits))
+    self.assertEqual(2, self.evaluate(table.misses))
+
+  @test_util.run_v2_only
+  def testInvalidArguments(self):
+    vocabulary_table = self._createVocabularyTable()
+    with self.assertRaisesRegex(ValueError, "capacity"):
+      lookup_ops.CachedLookupTable(vocabulary_table, capacity=0)
+    with self.assertRaisesRegex(ValueError, "admission"):
+      lookup_ops.CachedLookupTable(
+          vocabulary_table, capacity=8, admission="lfu")
+    with self.assertRaisesRegex(ValueError, "admission_threshold"):
+      lookup_ops.CachedLookupTable(
+          vocabulary_table,
+          capacity=8,
+          admission="tinylfu",
+          admission_threshold=0)
+    table = lookup_ops.CachedLookupTable(vocabulary_table, capacity=8)
+    with self.assertRaises(TypeError):
+      table.lookup(constant_op.constant([1], dtypes.int64))
+    with self.assertRaisesRegex(TypeError, "immutable"):
+      lookup_ops.CachedLookupTable(
+          lookup_ops.MutableHashTable(dtypes.string, dtypes.int64, -1),
+          capacity=8)
+    with self.assertRaisesRegex(TypeError, "immutable"):
+      lookup_ops.CachedLookupTable(
+          lookup_ops.DenseHashTable(
+              dtypes.int64, dtypes.int64, default_value=-1, empty_key=-1,
+              deleted_key=-2),
+          capacity=8)
+
+  @test_util.run_v2_only
+  def testSavedModelSaveRestore(self):
+    save_dir = os.path.join(self.get_temp_dir(), "save_restore")
+    save_path = os.path.join(tempfile.mkdtemp(prefix=save_dir), "hash")
+
+    root = autotrackable.AutoTrackable()
+    vocab_file = self._createVocabFile("feat_to_id_cached.txt",
+                                       ("brain", "salad", "surgery"))
+    root.table = lookup_ops.CachedLookupTable(
+        self.getVocabularyTable()(
+            lookup_ops.TextFileIdTableInitializer(vocab_file), 1),
+        capacity=16)
+
+    @def_function.function(
+        input_signature=[tensor_spec.TensorSpec([None], dtypes.string)])
+    def lookup(keys):
+      return root.table.lookup(keys)
+
+    root.lookup = lookup
+    keys = constant_op.constant(["salad", "UNK", "salad"])
+    self.assertAllEqual([1, 3, 1], root.lookup(keys))
+    # The wrapped table shares the resource of the cached table, so it is not
+    # exported separately. Its initializer is, for the vocabulary asset.
+    children = root.table._trackable_children()
+    self.assertNotIn("_table", children)
+    self.assertIn("_initializer", children)
+
+    saved_model_save.save(root, save_path)
+
+    del root
+    loaded = saved_model_load.load(save_path)
+    self.assertAllEqual([1, 3, 1], loaded.lookup(keys))
+    self.assertAllEqual([1, 3, 1], loaded.lookup(keys))
+
+
 @parameterized.named_parameters(
     (f"_{is_anonymous}", is_anonymous) for is_anonymous in [False, True])
 class DenseHashTableOpTest(test.TestCase):
@@ -4285,5 +4636,85 @@ class DenseHashTableBenchmark(MutableHashTableBenchmark):
         deleted_key=-2)
 
 
+class CachedLookupTableBenchmark(test.Benchmark):
+  """Compares a `CachedLookupTable` with its table on Zipf distributed keys."""
+
+  def _benchmark_lookup(self, cached, admission="lru"):
+    vocab_size = 100000
+    batch_size = 1024
+    rng = np.random.RandomState(0)
+    batches = (rng.zipf(1.2, size=(100, batch_size)) % (2 * vocab_size))
+    with ops.Graph().as_default():
+      table = lookup_ops.StaticVocabularyTableV1(
+          lookup_ops.KeyValueTensorInitializer(
+              np.arange(vocab_size, dtype=np.int64),
+              np.arange(vocab_size, dtype=np.int64)),
+          num_oov_buckets=1000)
+      if cached:
+        table = lookup_ops.CachedLookupTable(
+            table, capacity=10000, admission=admission)
+      keys = dataset_ops.make_one_shot_iterator(
+          dataset_ops.Dataset.from_tensor_slices(batches).repeat()).get_next()
+      lookup = table.lookup(keys)
+      with session.Session() as sess:
+        sess.run([variables.global_variables_initializer(),
+                  lookup_ops.tables_initializer()])
+        self.run_op_benchmark(
+            sess, lookup.op, burn_iters=10, min_iters=1000,
+            extras={"batch_size": batch_size})
+
+  def benchmark_zipf_lookup(self):
+    self._benchmark_lookup(cached=False)
+
+  def benchmark_zipf_cached_lookup_lru(self):
+    self._benchmark_lookup(cached=True)
+
+  def benchmark_zipf_cached_lookup_tinylfu(self):
+    self._benchmark_lookup(cached=True, admission="tinylfu")
+
+
+
+class ShardedTextFileInitializerBenchmark(test.Benchmark):
+  """Compares the time to initialize a table from a large vocabulary file."""
+
+  def _vocabulary_file(self):
+    filename = os.path.join(tempfile.mkdtemp(), "vocab.txt")
+    with open(filename, "w") as f:
+      f.write("".join("token_%d\t%d\n" % (i, i) for i in range(1000000)))
+    return filename
+
+  def _benchmark_init(self, name, create_initializer, iters=3):
+    wall_times = []
+    for _ in range(iters):
+      start = time.time()
+      table = lookup_ops.StaticHashTable(create_initializer(), -1)
+      table.size().numpy()
+      wall_times.append(time.time() - start)
+    self.report_benchmark(
+        name=name, iters=iters, wall_time=sorted(wall_times)[iters // 2])
+
+  def benchmark_init(self):
+    filename = self._vocabulary_file()
+    snapshot_path = os.path.join(os.path.dirname(filename), "snapshot")
+    with context.eager_mode():
+      self._benchmark_init(
+          "text_file_initializer",
+          lambda: lookup_ops.TextFileInitializer(filename, dtypes.string, 0,
+                                                 dtypes.int64, 1))
+      self._benchmark_init(
+          "sharded_text_file_initializer",
+          lambda: lookup_ops.ShardedTextFileInitializer(
+              filename, dtypes.string, 0, dtypes.int64, 1))
+      lookup_ops.StaticHashTable(
+          lookup_ops.ShardedTextFileInitializer(
+              filename, dtypes.string, 0, dtypes.int64, 1,
+              snapshot_path=snapshot_path), -1)
+      self._benchmark_init(
+          "sharded_text_file_initializer_snapshot",
+          lambda: lookup_ops.ShardedTextFileInitializer(
+              filename, dtypes.string, 0, dtypes.int64, 1,
+              snapshot_path=snapshot_path))
+
+
 if __name__ == "__main__":
   test.main()
@@ -15,13 +15,18 @@
 
 import numpy as np
 
+from tensorflow.python.client import session
 from tensorflow.python.framework import config
 from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import ops
 from tensorflow.python.framework import test_util
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import math_ops
 from tensorflow.python.ops.linalg import linalg as linalg_lib
+from tensorflow.python.ops.linalg import linear_operator_composition
 from tensorflow.python.ops.linalg import linear_operator_test_util
+from tensorflow.python.platform import benchmark
 from tensorflow.python.platform import test
 
 linalg = linalg_lib
@@ -286,6 +291,122 @@ class NonSquareLinearOperatorCompositionTest(
     self.assertTrue(operator.is_square)
 
 
+
+@test_util.run_all_in_graph_and_eager_modes
+class LinearOperatorCompositionMatmulPlanTest(test.TestCase):
+
+  def _full(self, rows, cols):
+    return linalg.LinearOperatorFullMatrix(
+        rng.randn(rows, cols).astype(np.float64))
+
+  def test_plan_prefers_thin_intermediates(self):
+    chain = [(self._full(20, 2), False), (self._full(2, 20), False),
+             (self._full(20, 20), False)]
+    cost, tree = linear_operator_composition._best_matmul_plan(chain, 50)
+    # A @ ((B @ C) @ x) only forms matrices with 2 rows, where B is made dense
+    # and C is applied to it from the right.
+    self.assertEqual((0, (((1,), 2), 3)), tree)
+    self.assertLess(
+        cost, linear_operator_composition._sequential_matmul_cost(chain, 50))
+
+  def test_plan_applies_structured_operators(self):
+    diag = linalg.LinearOperatorDiag(rng.randn(20).astype(np.float64))
+    chain = [(self._full(2, 20), False), (diag, False),
+             (self._full(20, 20), False)]
+    _, tree = linear_operator_composition._best_matmul_plan(chain, 100)
+    # The diagonal is applied to the dense first operator, it is never made
+    # dense itself.
+    self.assertEqual(((((0,), 1), 2), 3), tree)
+
+  def test_plan_requires_static_shapes(self):
+    chain = [(self._full(2, 20), False)]
+    self.assertIsNone(
+        linear_operator_composition._best_matmul_plan(chain, None))
+
+  def test_matmul_matches_dense(self):
+    diag = linalg.LinearOperatorDiag(rng.randn(20).astype(np.float64))
+    operators = [self._full(20, 2), self._full(2, 20), diag, self._full(20, 20)]
+    operator = linalg.LinearOperatorComposition(operators)
+    dense = np.eye(20)
+    for o in operators:
+      dense = np.matmul(dense, self.evaluate(o.to_dense()))
+    x = rng.randn(20, 50)
+    for adjoint in (False, True):
+      for adjoint_arg in (False, True):
+        expected = np.matmul(dense.T if adjoint else dense,
+                             x.T if adjoint_arg else x)
+        self.assertAllClose(
+            expected,
+            self.evaluate(
+                operator.matmul(
+                    x.T if adjoint_arg else x,
+                    adjoint=adjoint,
+                    adjoint_arg=adjoint_arg)))
+    self.assertAllClose(dense, self.evaluate(operator.to_dense()))
+
+  def test_kronecker_products_stay_kronecker(self):
+    a = linalg.LinearOperatorKronecker([self._full(3, 3), self._full(4, 4)])
+    b = linalg.LinearOperatorKronecker([self._full(3, 3), self._full(4, 4)])
+    product = a.matmul(b)
+    self.assertIsInstance(product, linalg.LinearOperatorKronecker)
+    self.assertAllClose(
+        np.matmul(self.evaluate(a.to_dense()), self.evaluate(b.to_dense())),
+        self.evaluate(product.to_dense()))
+    # Each factor is applied to a reshaping of the 12 x 5 matrix.
+    self.assertEqual(
+        product.operators[1]._matmul_cost(15) +
+        product.operators[0]._matmul_cost(20), product._matmul_cost(5))
+
+
+
+class LinearOperatorCompositionBenchmark(test.Benchmark):
+  """Compares planned and right-to-left matmuls of typical operator chains."""
+
+  def _full(self, rows, cols):
+    return linalg.LinearOperatorFullMatrix(
+        rng.randn(rows, cols).astype(np.float32))
+
+  def _chains(self):
+    n = 1024
+    yield "low_rank", [self._full(n, 16), self._full(16, n)]
+    yield "low_rank_times_full", [
+        self._full(n, 16), self._full(16, n), self._full(n, n)]
+    yield "diag_kronecker_low_rank", [
+        linalg.LinearOperatorDiag(rng.rand(n).astype(np.float32)),
+        linalg.LinearOperatorKronecker([self._full(32, 32), self._full(32, 32)]),
+        self._full(n, 16),
+        self._full(16, n)]
+    yield "kronecker_times_kronecker", [
+        linalg.LinearOperatorKronecker([self._full(32, 32), self._full(32, 32)]),
+        linalg.LinearOperatorKronecker([self._full(32, 32), self._full(32, 32)])]
+
+  def _sequential_matmul(self, operators, x):
+    for operator in reversed(operators):
+      x = operator.matmul(x)
+    return x
+
+  def benchmarkCompositionMatmul(self):
+    for name, operators in self._chains():
+      for num_columns in 1, 1024:
+        for planned in False, True:
+          with ops.Graph().as_default(), \
+              session.Session(config=benchmark.benchmark_config()) as sess, \
+              ops.device("/cpu:0"):
+            x = rng.randn(operators[-1].shape[-1], num_columns).astype(
+                np.float32)
+            if planned:
+              y = linalg.LinearOperatorComposition(operators).matmul(x)
+            else:
+              y = self._sequential_matmul(operators, x)
+            self.run_op_benchmark(
+                sess,
+                control_flow_ops.group(y),
+                min_iters=25,
+                store_memory_usage=False,
+                name="composition_matmul_{}_num_columns_{}_{}".format(
+                    name, num_columns, "planned" if planned else "sequential"))
+
+
 if __name__ == "__main__":
   linear_operator_test_util.add_tests(SquareLinearOperatorCompositionTest)
   linear_operator_test_util.add_tests(NonSquareLinearOperatorCompositionTest)
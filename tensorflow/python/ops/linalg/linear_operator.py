@@ -673,6 +673,25 @@ class LinearOperator(
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     raise NotImplementedError("_matmul is not implemented.")
 
+  def _matmul_cost(self, num_columns):
+    """Estimated number of multiplications of `matmul` with a matrix.
+
+    `LinearOperatorComposition` uses this to choose the order in which a chain
+    of operators is multiplied. The default is the cost of a dense matmul.
+    Operators with structure should override this.
+
+    Args:
+      num_columns: Python `int`, the number of columns of the matrix `x`.
+
+    Returns:
+      Python `int`, or `None` if the matrix shape of the operator is not known
+      statically. The batch shape is ignored.
+    """
+    rows, cols = linear_operator_util.static_matrix_shape(self)
+    if rows is None or cols is None:
+      return None
+    return rows * cols * num_columns
+
   def matmul(
       self,
       x,
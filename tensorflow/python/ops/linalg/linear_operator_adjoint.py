@@ -185,6 +185,9 @@ class LinearOperatorAdjoint(linear_operator.LinearOperator):
     return array_ops.concat([
         shape[:-2], [shape[-1], shape[-2]]], axis=-1)
 
+  def _matmul_cost(self, num_columns):
+    return self.operator._matmul_cost(num_columns)  # pylint: disable=protected-access
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     return self.operator.matmul(
         x, adjoint=(not adjoint), adjoint_arg=adjoint_arg)
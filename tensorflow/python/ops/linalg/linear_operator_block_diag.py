@@ -449,6 +449,10 @@ class LinearOperatorBlockDiag(linear_operator.LinearOperator):
         op_dimension.assert_is_compatible_with(x.shape[arg_dim])
       return self._matmul(x, adjoint=adjoint, adjoint_arg=adjoint_arg)
 
+  def _matmul_cost(self, num_columns):
+    costs = [o._matmul_cost(num_columns) for o in self.operators]  # pylint: disable=protected-access
+    return None if None in costs else sum(costs)
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     arg_dim = -1 if adjoint_arg else -2
     block_dimensions = (self._block_range_dimensions() if adjoint
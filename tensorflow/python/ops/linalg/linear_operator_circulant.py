@@ -618,6 +618,13 @@ class _BaseLinearOperatorCirculant(linear_operator.LinearOperator):
         self._unblockify(self.spectrum)
     )
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    if rows is None:
+      return None
+    # Two FFTs of x, and the product with the spectrum.
+    return int(rows * (2 * np.log2(max(rows, 2)) + 1)) * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     x = linalg.adjoint(x) if adjoint_arg else x
     # With F the matrix of a DFT, and F^{-1}, F^H the inverse and Hermitian
@@ -24,6 +24,7 @@ from tensorflow.python.ops import check_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import linalg_ops
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops.linalg import linalg_impl as linalg
 from tensorflow.python.ops.linalg import linear_operator
 from tensorflow.python.ops.linalg import linear_operator_lower_triangular
 from tensorflow.python.ops.linalg import linear_operator_util
@@ -97,6 +98,16 @@ class LinearOperatorComposition(linear_operator.LinearOperator):
   The performance of `LinearOperatorComposition` on any operation is equal to
   the sum of the individual operators' operations.
 
+  When all matrix shapes are static, `matmul` (and therefore `to_dense`) picks
+  the cheapest order in which to multiply the chain `op1 @ ... @ opJ @ x`, as
+  estimated from the shapes and the structure of the operators. For instance
+  with `op1` of shape `[10, 1000]`, `op2` of shape `[1000, 1000]` and `x` of
+  shape `[1000, 1000]`, the `[10, 1000]` product `op1 @ op2` is formed first
+  instead of computing `op2 @ x`. Structured operators such as
+  `LinearOperatorDiag` or `LinearOperatorKronecker` are applied to
+  intermediate results rather than converted to dense matrices, unless that
+  conversion is cheaper.
+
 
   #### Matrix property hints
 
@@ -321,7 +332,26 @@ class LinearOperatorComposition(linear_operator.LinearOperator):
         is_square=True,
     )
 
+  def _matmul_cost(self, num_columns):
+    plan = _best_matmul_plan(
+        [(operator, False) for operator in self.operators], num_columns)
+    return None if plan is None else plan[0]
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
+    if adjoint:
+      chain = [(operator, True) for operator in reversed(self.operators)]
+    else:
+      chain = [(operator, False) for operator in self.operators]
+    num_columns = None
+    if x.shape.rank is not None:
+      num_columns = tensor_shape.dimension_value(
+          x.shape[-2 if adjoint_arg else -1])
+    plan = _best_matmul_plan(chain, num_columns)
+    if plan is not None:
+      cost, tree = plan
+      if cost < _sequential_matmul_cost(chain, num_columns):
+        return _matmul_with_plan(tree, chain, x, adjoint_arg)
+
     # If self.operators = [A, B], and not adjoint, then
     # matmul_order_list = [B, A].
     # As a result, we return A.matmul(B.matmul(x))
@@ -402,3 +432,116 @@ def _composition_must_be_self_adjoint(operators):
   # Done checking...could still be SA.
   # We may not catch some cases. E.g. (A @ I) @ A.H is SA, but is not AAT form.
   return False
+
+
+def _sequential_matmul_cost(chain, num_columns):
+  """Cost of applying the operators of `chain` one by one to `x`."""
+  return sum(operator._matmul_cost(num_columns) for operator, _ in chain)  # pylint: disable=protected-access
+
+
+def _best_matmul_plan(chain, num_columns):
+  """Finds the cheapest association order of a product of operators.
+
+  This is the classic matrix chain ordering dynamic program, where the cost of
+  a product involving a single operator is given by `_matmul_cost`, so that
+  structured operators are applied rather than converted to dense matrices.
+
+  Args:
+    chain: List of `(operator, adjoint)` pairs. The product is
+      `op_0 @ ... @ op_{k-1} @ x`, where `op_i` is the adjoint of the `i`-th
+      operator if its `adjoint` is `True`.
+    num_columns: Python `int`, number of columns of `x`, or `None`.
+
+  Returns:
+    `None` if some matrix shape is not static. Otherwise a pair `(cost, tree)`,
+    where `tree` is `i` for the `i`-th operator, `(i,)` for the `i`-th operator
+    converted to a dense matrix, `len(chain)` for `x`, or a pair
+    `(left_tree, right_tree)` for a product.
+  """
+  if num_columns is None:
+    return None
+  num_operators = len(chain)
+  # Leaf `i` has shape `[sizes[i], sizes[i + 1]]`, with `x` the last leaf.
+  sizes = []
+  for operator, adjoint in chain:
+    rows, cols = linear_operator_util.static_matrix_shape(operator)
+    if rows is None or cols is None:
+      return None
+    if adjoint:
+      rows, cols = cols, rows
+    sizes.append(rows)
+  sizes.extend([cols, num_columns])
+
+  # Costs of applying each operator to matrices with any possible number of
+  # columns.
+  apply_costs = {}
+  for i, (operator, _) in enumerate(chain):
+    for size in set(sizes):
+      cost = operator._matmul_cost(size)  # pylint: disable=protected-access
+      if cost is None:
+        return None
+      apply_costs[i, size] = cost
+
+  best = {(i, i): (0, i) for i in range(num_operators + 1)}
+  for length in range(2, num_operators + 2):
+    for i in range(num_operators + 2 - length):
+      j = i + length - 1
+      candidates = []
+      for split in range(i, j):
+        rows, inner, cols = sizes[i], sizes[split + 1], sizes[j + 1]
+        left_cost, left_tree = best[i, split]
+        right_cost, right_tree = best[split + 1, j]
+        cost = left_cost + right_cost
+        right_is_operator = split + 1 == j and j < num_operators
+        if split == i and right_is_operator:
+          # One of the two operators is made dense.
+          candidates.append(
+              (cost + apply_costs[i, cols] + inner * cols, (i, (j,))))
+          candidates.append(
+              (cost + rows * inner + apply_costs[j, rows], ((i,), j)))
+        elif split == i:
+          # The operator is applied to the right product.
+          candidates.append((cost + apply_costs[i, cols], (i, right_tree)))
+        elif right_is_operator:
+          # The operator is applied to the adjoint of the left product.
+          candidates.append((cost + apply_costs[j, rows], (left_tree, j)))
+        else:
+          candidates.append(
+              (cost + rows * inner * cols, (left_tree, right_tree)))
+      # On ties, prefer the earliest split, i.e. applying operators to `x`.
+      best[i, j] = min(candidates, key=lambda candidate: candidate[0])
+  return best[0, num_operators]
+
+
+def _matmul_with_plan(tree, chain, x, adjoint_arg):
+  """Computes the product of `chain` and `x` in the order given by `tree`."""
+  num_operators = len(chain)
+
+  # Products are represented as `(tensor, adjoint)`, where the product is the
+  # adjoint of `tensor` if `adjoint` is `True`, to avoid transposes.
+  def evaluate(tree):
+    if not isinstance(tree, tuple):
+      if tree == num_operators:
+        return False, (x, adjoint_arg)
+      return True, chain[tree]
+    if len(tree) == 1:
+      operator, adjoint = chain[tree[0]]
+      return False, (operator.to_dense(), adjoint)
+    left_is_operator, left = evaluate(tree[0])
+    right_is_operator, right = evaluate(tree[1])
+    if left_is_operator:
+      operator, adjoint = left
+      tensor, tensor_adjoint = right
+      return False, (operator.matmul(
+          tensor, adjoint=adjoint, adjoint_arg=tensor_adjoint), False)
+    tensor, tensor_adjoint = left
+    if right_is_operator:
+      # L @ A = (A^H @ L^H)^H.
+      operator, adjoint = right
+      return False, (operator.matmul(
+          tensor, adjoint=not adjoint, adjoint_arg=not tensor_adjoint), True)
+    return False, (math_ops.matmul(
+        tensor, right[0], adjoint_a=tensor_adjoint, adjoint_b=right[1]), False)
+
+  _, (result, adjoint) = evaluate(tree)
+  return linalg.adjoint(result) if adjoint else result
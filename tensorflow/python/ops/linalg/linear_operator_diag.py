@@ -334,6 +334,10 @@ class LinearOperatorDiag(linear_operator.LinearOperator):
         is_positive_definite=True,
         is_square=True)
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else rows * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     diag_term = math_ops.conj(self._diag) if adjoint else self._diag
     x = linalg.adjoint(x) if adjoint_arg else x
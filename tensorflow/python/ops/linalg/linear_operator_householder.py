@@ -196,6 +196,10 @@ class LinearOperatorHouseholder(linear_operator.LinearOperator):
   def _linop_inverse(self) -> "LinearOperatorHouseholder":
     return self
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else 2 * rows * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     # Given a vector `v`, we would like to reflect `x` about the hyperplane
     # orthogonal to `v` going through the origin.  We first project `x` to `v`
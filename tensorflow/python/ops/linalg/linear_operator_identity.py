@@ -395,6 +395,9 @@ class LinearOperatorIdentity(BaseLinearOperatorIdentity):
     zeros = array_ops.zeros(shape=special_shape, dtype=self.dtype)
     return x + zeros
 
+  def _matmul_cost(self, num_columns):
+    return 0
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     # Note that adjoint has no effect since this matrix is self-adjoint.
     x = linalg.adjoint(x) if adjoint_arg else x
@@ -835,6 +838,10 @@ class LinearOperatorScaledIdentity(BaseLinearOperatorIdentity):
     else:
       return super()._linop_solve(left_operator, right_operator)
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else rows * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     x = linalg.adjoint(x) if adjoint_arg else x
     if self._assert_proper_shapes:
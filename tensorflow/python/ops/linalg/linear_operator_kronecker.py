@@ -26,11 +26,18 @@ from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import math_ops
 from tensorflow.python.ops.linalg import linalg_impl as linalg
 from tensorflow.python.ops.linalg import linear_operator
+from tensorflow.python.ops.linalg import linear_operator_util
+from tensorflow.python.ops.linalg import property_hint_util
 from tensorflow.python.util.tf_export import tf_export
 
 __all__ = ["LinearOperatorKronecker"]
 
 
+def _static_dimensions_equal(a, b):
+  a = tensor_shape.dimension_value(a)
+  return a is not None and a == tensor_shape.dimension_value(b)
+
+
 def _prefer_static_shape(x):
   if x.shape.is_fully_defined():
     return x.shape
@@ -306,6 +313,29 @@ class LinearOperatorKronecker(linear_operator.LinearOperator):
         is_positive_definite=self.is_positive_definite,
         is_square=True)
 
+  def _linop_matmul(
+      self,
+      left_operator: "LinearOperatorKronecker",
+      right_operator: linear_operator.LinearOperator,
+  ) -> linear_operator.LinearOperator:
+    # (A1 x A2) (B1 x B2) = (A1 B1) x (A2 B2) if the shapes of the factors
+    # match, so the product keeps the structure instead of being composed.
+    if (not isinstance(right_operator, LinearOperatorKronecker) or
+        len(left_operator.operators) != len(right_operator.operators) or
+        not all(
+            _static_dimensions_equal(a.domain_dimension, b.range_dimension)
+            for a, b in zip(left_operator.operators, right_operator.operators))):
+      return super()._linop_matmul(left_operator, right_operator)
+
+    is_square = property_hint_util.is_square(left_operator, right_operator)
+    return LinearOperatorKronecker(
+        operators=[
+            a.matmul(b) for a, b in zip(left_operator.operators,
+                                        right_operator.operators)],
+        is_non_singular=property_hint_util.combined_non_singular_hint(
+            left_operator, right_operator) if is_square else None,
+        is_square=is_square)
+
   def _solve_matmul_internal(
       self,
       x,
@@ -393,6 +423,23 @@ class LinearOperatorKronecker(linear_operator.LinearOperator):
 
     return output
 
+  def _matmul_cost(self, num_columns):
+    # Mirrors `_solve_matmul_internal`, which applies the factors from last to
+    # first to a reshaping of `x`.
+    _, num_elements = linear_operator_util.static_matrix_shape(self)
+    if num_elements is None:
+      return None
+    num_elements *= num_columns
+    cost = 0
+    for operator in reversed(self.operators):
+      rows, cols = linear_operator_util.static_matrix_shape(operator)
+      operator_cost = operator._matmul_cost(num_elements // cols)  # pylint: disable=protected-access
+      if operator_cost is None:
+        return None
+      cost += operator_cost
+      num_elements = num_elements // cols * rows
+    return cost
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     def matmul_fn(o, x, adjoint, adjoint_arg):
       return o.matmul(x, adjoint=adjoint, adjoint_arg=adjoint_arg)
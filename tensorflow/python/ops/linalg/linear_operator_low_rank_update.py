@@ -373,6 +373,15 @@ class LinearOperatorLowRankUpdate(linear_operator.LinearOperator):
       v = tensor_conversion.convert_to_tensor_v2_with_dispatch(self.v)
     return u, v
 
+  def _matmul_cost(self, num_columns):
+    rows, cols = linear_operator_util.static_matrix_shape(self)
+    rank = tensor_shape.dimension_value(self.u.shape[-1])
+    base_cost = self.base_operator._matmul_cost(num_columns)  # pylint: disable=protected-access
+    if None in (rows, cols, rank, base_cost):
+      return None
+    # base @ x + u @ (diag_update @ (v^H @ x)).
+    return base_cost + rank * (rows + cols + 1) * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     u, v = self._get_uv_as_tensors()
     l = self.base_operator
@@ -195,6 +195,10 @@ class LinearOperatorLowerTriangular(linear_operator.LinearOperator):
         self._get_diag(),
         message="Singular operator:  Diagonal contained zero values.")
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else rows * (rows + 1) // 2 * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     return math_ops.matmul(
         self._get_tril(), x, adjoint_a=adjoint, adjoint_b=adjoint_arg)
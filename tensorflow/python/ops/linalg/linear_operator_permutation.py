@@ -207,6 +207,10 @@ class LinearOperatorPermutation(linear_operator.LinearOperator):
     perm = perm if perm is not None else self.perm
     return array_ops.shape(perm)[-1]
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else rows * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     perm = tensor_conversion.convert_to_tensor_v2_with_dispatch(self.perm)
     if adjoint and not self.is_self_adjoint:
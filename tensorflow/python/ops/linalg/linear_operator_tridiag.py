@@ -297,6 +297,10 @@ class LinearOperatorTridiag(linear_operator.LinearOperator):
       new_subdiag = manip_ops.roll(superdiag, shift=1, axis=-1)
       return array_ops_stack.stack([new_superdiag, diag, new_subdiag], axis=-2)
 
+  def _matmul_cost(self, num_columns):
+    rows, _ = linear_operator_util.static_matrix_shape(self)
+    return None if rows is None else 3 * rows * num_columns
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     diagonals = self.diagonals
     if adjoint:
@@ -19,6 +19,7 @@ import numpy as np
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import tensor_conversion
+from tensorflow.python.framework import tensor_shape
 from tensorflow.python.module import module
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import check_ops
@@ -503,6 +504,12 @@ def is_adjoint_pair(x, y):
   return x.H is y or y.H is x
 
 
+def static_matrix_shape(operator):
+  """Returns the `(rows, columns)` of `operator`, `None` if not static."""
+  return (tensor_shape.dimension_value(operator.range_dimension),
+          tensor_shape.dimension_value(operator.domain_dimension))
+
+
 def is_aat_form(operators):
   """Returns True if operators is of the form A @ A.H, possibly recursively."""
   operators = list(operators)
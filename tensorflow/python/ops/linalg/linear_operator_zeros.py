@@ -306,6 +306,9 @@ class LinearOperatorZeros(linear_operator.LinearOperator):
     zeros = array_ops.zeros(shape=special_shape, dtype=self.dtype)
     return x + zeros
 
+  def _matmul_cost(self, num_columns):
+    return 0
+
   def _matmul(self, x, adjoint=False, adjoint_arg=False):
     if self._assert_proper_shapes:
       x = linalg.adjoint(x) if adjoint_arg else x
@@ -15,28 +15,43 @@
 """Lookup operations."""
 # pylint: disable=g-bad-name
 import collections
+from concurrent import futures
 import functools
+import json
+import os
+import time
 import uuid
 
+import numpy as np
+
 from tensorflow.python.checkpoint import saveable_compat
 from tensorflow.python.eager import context
+from tensorflow.python.eager import monitoring
 from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import errors_impl
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import sparse_tensor
 from tensorflow.python.framework import tensor as tensor_lib
 from tensorflow.python.framework import tensor_shape
 from tensorflow.python.framework import tensor_util
+from tensorflow.python.lib.io import file_io
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import array_ops_stack
+from tensorflow.python.ops import cond
 from tensorflow.python.ops import control_flow_ops
+from tensorflow.python.ops import gen_io_ops
 from tensorflow.python.ops import gen_lookup_ops
+from tensorflow.python.ops import gen_nn_ops
 # Ensure lookup gradients are registered
 from tensorflow.python.ops import lookup_grad  # pylint: disable=unused-import
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import resource_variable_ops
 from tensorflow.python.ops import string_ops
 # go/tf-wildcard-import
 # pylint: disable=wildcard-import
 from tensorflow.python.ops.gen_lookup_ops import *
+from tensorflow.python.platform import tf_logging as logging
 from tensorflow.python.saved_model import registration
 from tensorflow.python.trackable import asset
 # pylint: enable=wildcard-import
@@ -48,6 +63,30 @@ from tensorflow.python.util import compat as compat_util
 from tensorflow.python.util.deprecation import deprecated
 from tensorflow.python.util.tf_export import tf_export
 
+_cache_hits = monitoring.Counter(
+    "/tensorflow/api/lookup/cache_hits",
+    "The number of keys found in the cache of a CachedLookupTable.",
+    "table_name")
+_cache_misses = monitoring.Counter(
+    "/tensorflow/api/lookup/cache_misses",
+    "The number of keys not found in the cache of a CachedLookupTable.",
+    "table_name")
+
+# Number of hash functions of the count-min sketch of `CachedLookupTable`.
+_CACHE_SKETCH_DEPTH = 4
+# A lookup of `CachedLookupTable` refreshes the recency of one in this many
+# hits.
+_CACHE_RECENCY_INTERVAL = 8
+
+_text_file_init_milliseconds = monitoring.Sampler(
+    "/tensorflow/api/lookup/text_file_init_milliseconds",
+    monitoring.ExponentialBuckets(scale=1, growth_factor=2, bucket_count=26),
+    "Time (in milliseconds) spent reading the entries of a "
+    "ShardedTextFileInitializer.", "source")
+
+# Version of the snapshots written by `ShardedTextFileInitializer`.
+_SNAPSHOT_VERSION = 2
+
 
 @tf_export(v1=["initialize_all_tables"])
 @deprecated(None, "Use `tf.tables_initializer` instead.")
@@ -813,6 +852,345 @@ class TextFileInitializer(TableInitializerBase):
     return shared_name
 
 
+def _invalid_argument(message):
+  return errors_impl.InvalidArgumentError(None, None, message)
+
+
+def _split_lines(data):
+  """Splits `data` into a vector of lines, without their trailing newlines."""
+  if not data:
+    return constant_op.constant([], dtypes.string)
+  lines = string_ops.string_split_v2([data], sep="\n").values
+  if data.endswith(b"\n"):
+    lines = lines[:-1]
+  if b"\r" in data:
+    lines = string_ops.regex_replace(lines, "\r$", "")
+  return lines
+
+
+class ShardedTextFileInitializer(TextFileInitializer):
+  """Initializes a table from a text file read in parallel byte ranges.
+
+  This initializer produces the same table as `TextFileInitializer`, which
+  reads the file line by line in a single kernel. Instead, the file is split
+  into `num_shards` byte ranges which are read and parsed concurrently, and the
+  entries are imported into the table at once.
+
+  If `snapshot_path` is set, the parsed keys and values are saved to a
+  directory of `.npy` files the first time the table is initialized. Later
+  initializations memory-map the snapshot instead of reading the text file, as
+  long as the name, size and modification time of the file are unchanged.
+
+  The time spent reading the entries is logged and recorded in the
+  `/tensorflow/api/lookup/text_file_init_milliseconds` monitoring sampler,
+  labeled with `"text"` or `"snapshot"`. It is also available as
+  `last_init_seconds`.
+
+  The entries are read and parsed by eager string ops, which run concurrently
+  across shards, when the table is initialized eagerly. This is the case for
+  tables created under TF2. In graph mode, this initializer falls back to the
+  kernel of `TextFileInitializer`.
+  """
+
+  def __init__(self,
+               filename,
+               key_dtype,
+               key_index,
+               value_dtype,
+               value_index,
+               vocab_size=None,
+               delimiter="\t",
+               name=None,
+               value_index_offset=0,
+               num_shards=None,
+               snapshot_path=None):
+    """Constructs a table initializer object to populate from a text file.
+
+    Args:
+      filename: The filename of the text file to be used for initialization.
+      key_dtype: The `key` data type.
+      key_index: the index that represents information of a line to get the
+        table 'key' values from.
+      value_dtype: The `value` data type.
+      value_index: the index that represents information of a line to get the
+        table 'value' values from.'
+      vocab_size: The number of elements in the file, if known.
+      delimiter: The delimiter to separate fields in a line.
+      name: A name for the operation (optional).
+      value_index_offset: A number to add to all indices extracted from the
+        file, see `TextFileInitializer`.
+      num_shards: Number of byte ranges read concurrently. Defaults to the
+        number of CPUs, at most 16.
+      snapshot_path: Optional local directory to save the parsed entries to,
+        and to memory-map them from on later initializations.
+
+    Raises:
+      ValueError: when the filename is empty, `num_shards` is not positive, or
+      when the table key and value data types do not match the expected data
+      types.
+    """
+    if num_shards is None:
+      num_shards = min(os.cpu_count() or 1, 16)
+    if num_shards <= 0:
+      raise ValueError(f"`num_shards` should be > 0, received: {num_shards}")
+    for dtype in (key_dtype, value_dtype):
+      if dtypes.as_dtype(dtype) not in (dtypes.int32, dtypes.int64,
+                                        dtypes.float32, dtypes.float64,
+                                        dtypes.string):
+        raise ValueError("ShardedTextFileInitializer only supports int32, "
+                         "int64, float32, float64 and string keys and values, "
+                         f"received: {dtypes.as_dtype(dtype)}")
+    super(ShardedTextFileInitializer, self).__init__(
+        filename,
+        key_dtype,
+        key_index,
+        value_dtype,
+        value_index,
+        vocab_size=vocab_size,
+        delimiter=delimiter,
+        name=name,
+        value_index_offset=value_index_offset)
+    self._num_shards = num_shards
+    self._snapshot_path = snapshot_path
+    self._last_init_seconds = None
+
+  @property
+  def last_init_seconds(self):
+    """Seconds spent reading the entries in the last eager initialization."""
+    return self._last_init_seconds
+
+  def initialize(self, table):
+    """Initializes the table from the text file or its snapshot.
+
+    Args:
+      table: The table to be initialized.
+
+    Returns:
+      The operation that initializes the table.
+
+    Raises:
+      TypeError: when the keys and values data types do not match the table
+      key and value data types.
+      InvalidArgumentError: when the file content is invalid.
+    """
+    if not context.executing_eagerly():
+      return super(ShardedTextFileInitializer, self).initialize(table)
+    check_table_dtypes(table, self.key_dtype, self.value_dtype)
+    filename = compat_util.as_str(
+        ops.convert_to_tensor(self._filename, dtypes.string).numpy())
+
+    start_time = time.time()
+    keys, values = None, None
+    source = "snapshot"
+    source_stat = file_io.stat(filename)
+    if self._snapshot_path:
+      keys, values = self._load_snapshot(filename, source_stat)
+    if keys is None:
+      source = "text"
+      keys, values = self._read_text_file(filename, source_stat.length)
+      if self._snapshot_path:
+        self._save_snapshot(keys, values, filename, source_stat)
+    self._last_init_seconds = time.time() - start_time
+    _text_file_init_milliseconds.get_cell(source).add(
+        self._last_init_seconds * 1000)
+    logging.info("Read %d entries from the %s of %s in %.3f seconds.",
+                 len(keys), source, filename, self._last_init_seconds)
+
+    with ops.name_scope(self._name, "sharded_text_file_init",
+                        (table.resource_handle,)):
+      init_op = gen_lookup_ops.lookup_table_import_v2(
+          table.resource_handle,
+          ops.convert_to_tensor(keys, self.key_dtype),
+          ops.convert_to_tensor(values, self.value_dtype))
+    ops.add_to_collection(ops.GraphKeys.TABLE_INITIALIZERS, init_op)
+    return init_op
+
+  def _read_text_file(self, filename, file_size):
+    """Returns arrays of the keys and values of `filename`."""
+    shard_size = max(-(-file_size // self._num_shards), 1)
+    ranges = [(start, min(start + shard_size, file_size))
+              for start in range(0, file_size, shard_size)]
+    with futures.ThreadPoolExecutor(max_workers=self._num_shards) as executor:
+      shards = list(
+          executor.map(lambda r: self._read_lines(filename, *r), ranges))
+
+      num_lines = sum(len(lines) for lines in shards)
+      if self._vocab_size is not None:
+        if num_lines < self._vocab_size:
+          raise _invalid_argument(
+              f"Invalid vocab_size in {filename}: expected "
+              f"{self._vocab_size} but got {num_lines}")
+        if num_lines > self._vocab_size:
+          logging.warning("Truncated %s before its end at %d records.",
+                          filename, self._vocab_size)
+        remaining = self._vocab_size
+        for i, lines in enumerate(shards):
+          shards[i] = lines[:remaining]
+          remaining -= len(shards[i])
+
+      first_line_numbers = np.cumsum([0] + [len(lines) for lines in shards])
+      # The string kernels release the GIL, so the shards are parsed
+      # concurrently.
+      parsed = list(
+          executor.map(
+              lambda args: self._parse_lines(filename, *args),
+              zip(shards, first_line_numbers)))
+    del shards
+    if not parsed:
+      return (np.zeros([0], self.key_dtype.as_numpy_dtype),
+              np.zeros([0], self.value_dtype.as_numpy_dtype))
+    return (array_ops.concat([keys for keys, _ in parsed], 0),
+            array_ops.concat([values for _, values in parsed], 0))
+
+  def _read_lines(self, filename, start, end):
+    """Returns the lines which begin in the byte range [start, end)."""
+    with file_io.FileIO(filename, "rb") as f:
+      if start > 0:
+        f.seek(start - 1)
+        data = f.read(end - start + 1)
+        # The first line begins after the first newline, which may be the
+        # last byte of the previous range.
+        newline = data.find(b"\n")
+        if newline < 0:
+          return _split_lines(b"")
+        data = data[newline + 1:]
+      else:
+        data = f.read(end)
+      if data and not data.endswith(b"\n"):
+        # The last line ends in the next range.
+        data += f.readline()
+    return _split_lines(data)
+
+  def _parse_lines(self, filename, lines, first_line_number):
+    """Returns the keys and values of the vector of `lines`."""
+    empty = array_ops.where_v2(
+        math_ops.equal(string_ops.string_length(lines), 0))
+    if empty.shape[0]:
+      line_number = first_line_number + int(empty[0, 0])
+      raise _invalid_argument(f"Invalid content in {filename}: empty line "
+                              f"found at line {line_number}.")
+    tokens = None
+    if max(self._key_index, self._value_index) >= 0:
+      tokens = string_ops.string_split_v2(
+          lines, sep=compat_util.as_bytes(self._delimiter))
+      expected_size = max(self._key_index, self._value_index) + 1
+      num_columns = math_ops.unsorted_segment_sum(
+          array_ops.ones_like(tokens.indices[:, 0]), tokens.indices[:, 0],
+          array_ops.size(lines))
+      invalid = array_ops.where_v2(math_ops.less(num_columns, expected_size))
+      if invalid.shape[0]:
+        i = int(invalid[0, 0])
+        raise _invalid_argument(
+            f"Invalid number of columns in {filename} line "
+            f"{first_line_number + i} ({lines[i].numpy()!r}) : expected at "
+            f"least {expected_size} got {int(num_columns[i])}")
+    keys = self._parse_column(filename, lines, tokens, self._key_index,
+                              self.key_dtype, first_line_number)
+    values = self._parse_column(filename, lines, tokens, self._value_index,
+                                self.value_dtype, first_line_number)
+    return keys, values
+
+  def _parse_column(self, filename, lines, tokens, index, dtype,
+                    first_line_number):
+    """Converts one column of `lines` to a vector of `dtype`."""
+    if index == TextFileIndex.LINE_NUMBER:
+      return np.arange(
+          first_line_number, first_line_number + len(lines),
+          dtype=np.int64) + self._offset
+    if index == TextFileIndex.WHOLE_LINE:
+      column = lines
+    else:
+      # Every line has a token at `index`, and tokens are in line order.
+      column = array_ops.boolean_mask(
+          tokens.values, math_ops.equal(tokens.indices[:, 1], index))
+    if dtype == dtypes.string:
+      return column
+    try:
+      array = string_ops.string_to_number(column, out_type=dtype)
+    except errors_impl.InvalidArgumentError:
+      raise _invalid_argument(
+          f"Field in lines {first_line_number} to "
+          f"{first_line_number + len(lines) - 1} of {filename} is not a valid "
+          f"{dtype.name}.") from None
+    if dtype == dtypes.int32:
+      array += self._offset
+    return array
+
+  def _snapshot_metadata(self, filename, source_stat):
+    return {
+        "version": _SNAPSHOT_VERSION,
+        "filename": filename,
+        "length": source_stat.length,
+        "mtime_nsec": source_stat.mtime_nsec,
+        "key_index": self._key_index,
+        "value_index": self._value_index,
+        "key_dtype": self.key_dtype.name,
+        "value_dtype": self.value_dtype.name,
+        "vocab_size": self._vocab_size,
+        "delimiter": self._delimiter,
+        "offset": self._offset,
+    }
+
+  def _load_snapshot(self, filename, source_stat):
+    """Returns the memory-mapped keys and values, or None if stale."""
+    metadata_path = os.path.join(self._snapshot_path, "metadata.json")
+    if not os.path.exists(metadata_path):
+      return None, None
+    with open(metadata_path) as f:
+      metadata = json.load(f)
+    if metadata != self._snapshot_metadata(filename, source_stat):
+      logging.info("Ignoring the stale lookup table snapshot in %s.",
+                   self._snapshot_path)
+      return None, None
+    return (self._load_snapshot_column("keys", self.key_dtype),
+            self._load_snapshot_column("values", self.value_dtype))
+
+  def _load_snapshot_column(self, name, dtype):
+    array = self._load_snapshot_array(name)
+    if dtype == dtypes.string:
+      # The file is read into a single string by a kernel, and the strings are
+      # sliced out of it in a single op, skipping the header of the `.npy`
+      # file. Their bytes are never copied in Python.
+      offsets = self._load_snapshot_array(f"{name}_offsets")
+      contents = gen_io_ops.read_file(self._snapshot_array_path(name))
+      return string_ops.substr(contents, array.offset + offsets[:-1],
+                               offsets[1:] - offsets[:-1])
+    return array
+
+  def _snapshot_array_path(self, name):
+    return os.path.join(self._snapshot_path, f"{name}.npy")
+
+  def _load_snapshot_array(self, name):
+    return np.load(self._snapshot_array_path(name), mmap_mode="r")
+
+  def _save_snapshot(self, keys, values, filename, source_stat):
+    """Saves `keys` and `values`, replacing any previous snapshot."""
+    os.makedirs(self._snapshot_path, exist_ok=True)
+    for name, array in (("keys", keys), ("values", values)):
+      array = ops.convert_to_tensor(array)
+      if array.dtype == dtypes.string:
+        # Strings are saved as the concatenation of their bytes, and the offset
+        # of each string in it. Fixed-width arrays would strip trailing NULs.
+        offsets = np.zeros(len(array) + 1, np.int64)
+        np.cumsum(string_ops.string_length(array).numpy(), out=offsets[1:])
+        self._save_snapshot_array(f"{name}_offsets", offsets)
+        array = np.frombuffer(
+            string_ops.reduce_join(array).numpy(), np.uint8)
+      else:
+        array = array.numpy()
+      self._save_snapshot_array(name, array)
+    # The metadata is written last, so that an interrupted save is stale.
+    metadata_path = os.path.join(self._snapshot_path, "metadata.json")
+    with open(metadata_path + ".tmp", "w") as f:
+      json.dump(self._snapshot_metadata(filename, source_stat), f)
+    os.replace(metadata_path + ".tmp", metadata_path)
+
+  def _save_snapshot_array(self, name, array):
+    path = self._snapshot_array_path(name)
+    np.save(path + ".tmp", array)
+    os.replace(path + ".tmp.npy", path)
+
+
 class TextFileStringTableInitializer(TextFileInitializer):
   """Table initializer for `int64` IDs to string tables from a text file."""
 
@@ -1419,6 +1797,313 @@ class StaticVocabularyTableV1(StaticVocabularyTable):
       return control_flow_ops.no_op()
 
 
+class CachedLookupTable(LookupInterface):
+  """A lookup table with a cache of the values of recently looked up keys.
+
+  Keys found in the cache skip the wrapped `table`, e.g. the vocabulary lookup
+  and the hashing into out-of-vocabulary buckets of a `StaticVocabularyTable`.
+  This pays off when a small set of hot keys makes up most of the lookups.
+
+  The cache holds at most `capacity` keys. When it is full, the least recently
+  used keys are evicted, `capacity // 8` at a time. Recency is sampled: to keep
+  hits cheap, a lookup only refreshes the recency of every eighth hit, which
+  tracks the keys that are looked up often. Keys which are not in the cache are
+  admitted into it depending on `admission`:
+
+  * `"lru"`: every key is admitted.
+  * `"tinylfu"`: a key is admitted once it was missed `admission_threshold`
+    times, as estimated by a count-min sketch of the missed keys. The counts of
+    the sketch are halved every `10 * capacity` misses, so that keys which are
+    seldom looked up don't evict hot keys.
+
+  The numbers of keys found and not found in the cache are counted by the
+  `hits` and `misses` variables. When executing eagerly, they are also added
+  to the `/tensorflow/api/lookup/cache_hits` and
+  `/tensorflow/api/lookup/cache_misses` monitoring counters.
+
+  Example usage:
+
+  ```python
+  table = tf.lookup.StaticVocabularyTable(initializer, num_oov_buckets=100)
+  cached_table = lookup_ops.CachedLookupTable(table, capacity=100000)
+  ids = cached_table.lookup(keys)
+  ```
+
+  The cache is not saved in checkpoints. Since cached values are never
+  invalidated, the wrapped table must not change: `MutableHashTable` and
+  `DenseHashTable` can't be cached.
+  """
+
+  def __init__(self,
+               table,
+               capacity,
+               admission="lru",
+               admission_threshold=2,
+               name=None):
+    """Construct a `CachedLookupTable` object.
+
+    Args:
+      table: The immutable `LookupInterface` to cache, with `tf.string` or
+        integer keys and scalar values.
+      capacity: Maximum number of keys in the cache.
+      admission: Either `"lru"` or `"tinylfu"`, see above.
+      admission_threshold: Number of misses after which a key is admitted
+        into the cache, when `admission` is `"tinylfu"`.
+      name: A name for the operation (optional).
+
+    Raises:
+      ValueError: when `capacity` or `admission_threshold` are not positive, or
+        `admission` is invalid.
+      TypeError: when the key dtype of `table` is not integer or string, or
+        `table` is mutable.
+    """
+    if isinstance(table, (MutableHashTable, DenseHashTable)):
+      raise TypeError("`table` must be immutable, since cached values are "
+                      f"never invalidated, got {type(table).__name__}.")
+    if capacity <= 0:
+      raise ValueError(f"`capacity` must be > 0, got {capacity}.")
+    if admission not in ("lru", "tinylfu"):
+      raise ValueError("`admission` must be one of 'lru' or 'tinylfu', got "
+                       f"{admission!r}.")
+    if admission_threshold <= 0:
+      raise ValueError("`admission_threshold` must be > 0, got "
+                       f"{admission_threshold}.")
+    key_dtype = table.key_dtype
+    if (not key_dtype.is_integer) and (dtypes.string != key_dtype):
+      raise TypeError("Invalid `key_dtype`, expected integer or string, got "
+                      f"{key_dtype}.")
+    if name:
+      name = name.rstrip("/")
+    name = name or "%s_cache" % (table.name or "table")
+    self._table_name = name.split("/")[-1]
+
+    self._table = table
+    self._capacity = capacity
+    self._admission = admission
+    self._admission_threshold = admission_threshold
+    if table.value_dtype == dtypes.string:
+      default_value = ""
+    elif table.value_dtype == dtypes.bool:
+      default_value = False
+    else:
+      default_value = 0
+    # Stamps are the number of the lookup in which a key was last used, and -1
+    # for keys which are not in the cache.
+    self._stamps = MutableHashTable(
+        key_dtype, dtypes.int64, -1, name=f"{self._table_name}_stamps",
+        checkpoint=False)
+    self._values = MutableHashTable(
+        key_dtype, table.value_dtype, default_value,
+        name=f"{self._table_name}_values", checkpoint=False)
+    with ops.init_scope():
+      self._step = resource_variable_ops.ResourceVariable(
+          0, dtype=dtypes.int64, trainable=False, name="step")
+      self._hits = resource_variable_ops.ResourceVariable(
+          0, dtype=dtypes.int64, trainable=False, name="hits")
+      self._misses = resource_variable_ops.ResourceVariable(
+          0, dtype=dtypes.int64, trainable=False, name="misses")
+      if admission == "tinylfu":
+        self._sketch_width = max(2 * capacity, 64)
+        self._sketch = resource_variable_ops.ResourceVariable(
+            array_ops.zeros([_CACHE_SKETCH_DEPTH, self._sketch_width],
+                            dtype=dtypes.int32),
+            trainable=False, name="sketch")
+        self._sketch_additions = resource_variable_ops.ResourceVariable(
+            0, dtype=dtypes.int64, trainable=False, name="sketch_additions")
+    # Like `StaticVocabularyTable`, the resource of the wrapped table is the
+    # resource of this table, so only its initializer is tracked.
+    initializer = getattr(table, "_initializer", None)
+    if isinstance(initializer, trackable_base.Trackable):
+      self._initializer = self._track_trackable(initializer, "_initializer")
+    super(CachedLookupTable, self).__init__(key_dtype, table.value_dtype)
+    self._track_trackable(self._stamps, "_stamps")
+    self._track_trackable(self._values, "_values")
+    self._track_trackable(self._hits, "_hits")
+    self._track_trackable(self._misses, "_misses")
+
+  def _create_resource(self):
+    return self._table._create_resource()  # pylint: disable=protected-access
+
+  def _initialize(self):
+    return self._table._initialize()  # pylint: disable=protected-access
+
+  @property
+  def resource_handle(self):
+    return self._table.resource_handle
+
+  @property
+  def name(self):
+    return self._table_name
+
+  @property
+  def table(self):
+    """The wrapped table."""
+    return self._table
+
+  @property
+  def capacity(self):
+    """The maximum number of keys in the cache."""
+    return self._capacity
+
+  @property
+  def hits(self):
+    """A variable counting the keys found in the cache."""
+    return self._hits
+
+  @property
+  def misses(self):
+    """A variable counting the keys not found in the cache."""
+    return self._misses
+
+  def size(self, name=None):
+    """Compute the number of elements in the wrapped table."""
+    return self._table.size(name=name)
+
+  def cache_size(self, name=None):
+    """Compute the number of keys in the cache."""
+    with ops.name_scope(name, "%s_CacheSize" % self.name):
+      return self._stamps.size()
+
+  def lookup(self, keys, name=None):
+    """Looks up `keys` in the cache, and in the wrapped table on a miss.
+
+    Args:
+      keys: Keys to look up. May be either a `SparseTensor` or dense `Tensor`.
+      name: Optional name for the op.
+
+    Returns:
+      A `SparseTensor` if keys are sparse, a `RaggedTensor` if keys are ragged,
+      otherwise a dense `Tensor`.
+
+    Raises:
+      TypeError: when `keys` doesn't match the table key data type.
+    """
+    if keys.dtype.base_dtype != self._key_dtype:
+      raise TypeError(f"Dtype of argument `keys` must be {self._key_dtype}, "
+                      f"received: {keys.dtype}")
+    values = keys
+    if isinstance(keys, (sparse_tensor.SparseTensor, internal.RaggedTensor)):
+      values = keys.values
+
+    with ops.name_scope(name, "%s_Lookup" % self.name):
+      # Repeated keys are not deduplicated: hot keys are hits, which cost less
+      # than a `unique` of every batch. Only the missed keys are looked up in
+      # the wrapped table, repeated ones included.
+      flat_keys = array_ops.reshape(values, [-1])
+      is_hit = math_ops.greater_equal(self._stamps.lookup(flat_keys), 0)
+      miss_index = array_ops.reshape(
+          array_ops.where_v2(math_ops.logical_not(is_hit)), [-1])
+      miss_keys = array_ops.gather(flat_keys, miss_index)
+      miss_values = self._table.lookup(miss_keys)
+      flat_ids = array_ops.tensor_scatter_nd_update(
+          self._values.lookup(flat_keys),
+          array_ops.expand_dims(miss_index, -1), miss_values)
+
+      admitted = self._admit(miss_keys)
+      admitted_keys = array_ops.boolean_mask(miss_keys, admitted)
+      step = self._step.assign_add(1)
+      # Only every `_CACHE_RECENCY_INTERVAL`-th hit refreshes its stamp. The
+      # offset rotates, so that each hit is sampled in turn.
+      hit_keys = array_ops.boolean_mask(flat_keys, is_hit)
+      sampled_hit_keys = hit_keys[
+          step % _CACHE_RECENCY_INTERVAL::_CACHE_RECENCY_INTERVAL]
+      used_keys = array_ops.concat([sampled_hit_keys, admitted_keys], 0)
+      updates = [
+          self._values.insert(admitted_keys,
+                              array_ops.boolean_mask(miss_values, admitted)),
+          self._stamps.insert(
+              used_keys, array_ops.fill(array_ops.shape(used_keys), step)),
+      ]
+      with ops.control_dependencies(updates):
+        updates.append(self._maybe_evict())
+
+      num_hits = array_ops.size(hit_keys, out_type=dtypes.int64)
+      num_misses = array_ops.size(miss_keys, out_type=dtypes.int64)
+      updates.append(self._hits.assign_add(num_hits))
+      updates.append(self._misses.assign_add(num_misses))
+      with ops.control_dependencies(updates):
+        ids = array_ops.reshape(flat_ids, array_ops.shape(values))
+
+    if context.executing_eagerly():
+      _cache_hits.get_cell(self.name).increase_by(int(num_hits))
+      _cache_misses.get_cell(self.name).increase_by(int(num_misses))
+
+    if isinstance(keys, sparse_tensor.SparseTensor):
+      return sparse_tensor.SparseTensor(keys.indices, ids, keys.dense_shape)
+    elif isinstance(keys, internal.RaggedTensor):
+      return keys.with_values(ids)
+    return ids
+
+  def _admit(self, keys):
+    """Returns which of the missed `keys` are admitted into the cache.
+
+    Args:
+      keys: Keys which are not in the cache, once per lookup of the key.
+
+    Returns:
+      A boolean `Tensor` with the shape of `keys`.
+    """
+    if self._admission == "lru":
+      return array_ops.fill(array_ops.shape(keys), True)
+
+    # Double hashing derives the indices of the sketch from a single hash.
+    width = self._sketch_width
+    hashes = string_ops.string_to_hash_bucket_fast(
+        _as_string(keys), num_buckets=width * width)
+    indices = []
+    for row in range(_CACHE_SKETCH_DEPTH):
+      columns = (hashes % width + row * (hashes // width)) % width
+      indices.append(array_ops_stack.stack(
+          [array_ops.fill(array_ops.shape(columns),
+                          constant_op.constant(row, dtypes.int64)), columns],
+          axis=1))
+    indices = array_ops.concat(indices, 0)
+    # Repeated keys add their counts up.
+    update = self._sketch.scatter_nd_add(
+        indices,
+        array_ops.ones([array_ops.shape(indices)[0]], dtype=dtypes.int32))
+    with ops.control_dependencies([update]):
+      estimates = math_ops.reduce_min(
+          array_ops.reshape(
+              array_ops.gather_nd(self._sketch.read_value(), indices),
+              [_CACHE_SKETCH_DEPTH, -1]), axis=0)
+      additions = self._sketch_additions.assign_add(
+          array_ops.size(keys, out_type=dtypes.int64))
+
+    def age():
+      # Halve all counts, so that the sketch follows recent frequencies.
+      with ops.control_dependencies([
+          self._sketch.assign(math_ops.floordiv(self._sketch, 2)),
+          self._sketch_additions.assign(0)]):
+        return constant_op.constant(True)
+
+    with ops.control_dependencies([estimates]):
+      aged = cond.cond(
+          math_ops.greater_equal(additions, 10 * self._capacity), age,
+          lambda: constant_op.constant(False))
+    with ops.control_dependencies([aged]):
+      return math_ops.greater_equal(estimates, self._admission_threshold)
+
+  def _maybe_evict(self):
+    """Evicts the least recently used keys if the cache is over capacity."""
+    target_size = self._capacity - self._capacity // 8
+
+    def evict():
+      keys, stamps = self._stamps.export()
+      num_evicted = math_ops.cast(
+          array_ops.size(keys) - target_size, dtypes.int32)
+      _, index = gen_nn_ops.top_kv2(-stamps, num_evicted, sorted=False)
+      evicted_keys = array_ops.gather(keys, index)
+      with ops.control_dependencies([
+          self._values.remove(evicted_keys),
+          self._stamps.remove(evicted_keys)]):
+        return constant_op.constant(True)
+
+    return cond.cond(
+        math_ops.greater(self._stamps.size(), self._capacity), evict,
+        lambda: constant_op.constant(False))
+
+
 def index_table_from_file(vocabulary_file=None,
                           num_oov_buckets=0,
                           vocab_size=None,
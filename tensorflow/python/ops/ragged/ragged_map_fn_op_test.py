@@ -13,11 +13,19 @@
 # limitations under the License.
 # ==============================================================================
 """Tests for ragged_map_ops.map_fn."""
+import time
+
 from absl.testing import parameterized
 import numpy as np
 
+from tensorflow.python.client import session
+from tensorflow.python.eager import backprop
+from tensorflow.python.eager import context
+from tensorflow.python.eager import def_function
+from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import errors
+from tensorflow.python.framework import ops
 from tensorflow.python.framework import sparse_tensor
 from tensorflow.python.framework import test_util
 from tensorflow.python.ops import array_ops
@@ -30,6 +38,7 @@ from tensorflow.python.ops.ragged import ragged_functional_ops
 from tensorflow.python.ops.ragged import ragged_map_ops
 from tensorflow.python.ops.ragged import ragged_math_ops
 from tensorflow.python.ops.ragged import ragged_tensor
+from tensorflow.python.platform import benchmark
 from tensorflow.python.platform import googletest
 
 
@@ -37,6 +46,20 @@ def _stack_mean_and_sum(x):
   return array_ops_stack.stack([mo.reduce_mean(x), mo.reduce_sum(x)])
 
 
+def _vectorizes(fn, elems, dtype):
+  """Returns whether `map_fn(fn, elems, dtype)` is vectorized in a function."""
+  results = []
+
+  @def_function.function
+  def trace():
+    results.append(
+        ragged_map_ops._vectorized_map_fn(
+            fn, elems, ragged_map_ops._ragged_type_to_spec(dtype), True))
+
+  trace()
+  return results[0] is not None
+
+
 @test_util.run_all_in_graph_and_eager_modes
 class RaggedMapOpTest(test_util.TensorFlowTestCase,
                       parameterized.TestCase):
@@ -332,6 +355,189 @@ class RaggedMapOpTest(test_util.TensorFlowTestCase,
     expected = [[[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4]], [[1]]]
     self.assertAllEqual(y, expected)
 
+  @parameterized.parameters([
+      dict(fn=lambda x: x * 2. + 1., ragged_output=True),
+      dict(fn=lambda x: mo.maximum(x, 0.) - 1., ragged_output=True),
+      dict(fn=lambda x: x - mo.reduce_mean(x), ragged_output=True),
+      dict(fn=lambda x: x / mo.reduce_max(mo.abs(x)), ragged_output=True),
+      dict(fn=mo.reduce_sum, ragged_output=False),
+      dict(fn=mo.reduce_mean, ragged_output=False),
+      dict(fn=mo.reduce_max, ragged_output=False),
+      dict(fn=mo.reduce_min, ragged_output=False),
+      dict(fn=mo.reduce_prod, ragged_output=False),
+      dict(fn=lambda x: mo.reduce_sum(x * x) + 1., ragged_output=False),
+      dict(fn=lambda x: mo.reduce_any(x > 1.), ragged_output=False,
+           result_dtype=dtypes.bool),
+      dict(fn=lambda x: mo.reduce_all(x > 1.), ragged_output=False,
+           result_dtype=dtypes.bool),
+  ])
+  def testVectorizedMatchesLoop(self, fn, ragged_output,
+                                result_dtype=dtypes.float32):
+    elems = ragged_factory_ops.constant(
+        [[1., -2., 3.], [], [4., 5.], [-6.]], dtypes.float32)
+    if ragged_output:
+      dtype = ragged_tensor.RaggedTensorType(result_dtype, ragged_rank=1)
+      signature = ragged_tensor.RaggedTensorSpec([None], result_dtype)
+    else:
+      dtype = result_dtype
+      signature = result_dtype
+    self.assertTrue(_vectorizes(fn, elems, dtype))
+    output = def_function.function(
+        lambda: ragged_map_ops.map_fn(fn, elems, dtype=dtype))()
+    expected = map_fn_lib.map_fn(fn, elems, fn_output_signature=signature)
+    self.assertAllClose(expected, output)
+    self.assertAllClose(expected, ragged_map_ops.map_fn(fn, elems, dtype=dtype))
+
+  def testNotVectorizedEagerly(self):
+    if not context.executing_eagerly():
+      return
+    traces = []
+
+    def fn(x):
+      traces.append(x)
+      return mo.reduce_sum(x)
+
+    elems = ragged_factory_ops.constant([[1., 2.], [3.]])
+    self.assertIsNone(
+        ragged_map_ops._vectorized_map_fn(fn, elems, dtypes.float32, True))
+    # `fn` was not traced to be analyzed.
+    self.assertEmpty(traces)
+    self.assertAllClose([3., 3.], ragged_map_ops.map_fn(fn, elems))
+
+  def testVectorizedWithInnerDimensions(self):
+    elems = ragged_factory_ops.constant(
+        [[[1., 2.], [3., 4.]], [], [[5., 6.]]], ragged_rank=1)
+    bias = constant_op.constant([10., 20.])
+
+    def normalize(x):
+      return x - mo.reduce_mean(x, axis=0, keepdims=True) + bias
+
+    output = ragged_map_ops.map_fn(
+        normalize,
+        elems,
+        dtype=ragged_tensor.RaggedTensorType(dtypes.float32, ragged_rank=1))
+    self.assertAllClose(
+        output, [[[9., 19.], [11., 21.]], [], [[10., 20.]]])
+    totals = ragged_map_ops.map_fn(
+        lambda x: mo.reduce_sum(x, axis=1), elems,
+        dtype=ragged_tensor.RaggedTensorType(dtypes.float32, ragged_rank=1))
+    self.assertAllClose(totals, [[3., 7.], [], [11.]])
+    sums = ragged_map_ops.map_fn(lambda x: mo.reduce_sum(x, axis=0), elems)
+    self.assertAllClose(sums, [[4., 6.], [0., 0.], [5., 6.]])
+
+  def testVectorizedGradient(self):
+    flat_values = constant_op.constant([1., 2., 3., 4., 5.])
+    with backprop.GradientTape() as tape:
+      tape.watch(flat_values)
+      elems = ragged_tensor.RaggedTensor.from_row_splits(
+          flat_values, [0, 3, 3, 5])
+      output = ragged_map_ops.map_fn(lambda x: mo.reduce_sum(x * x), elems)
+    self.assertAllClose(output, [14., 0., 41.])
+    self.assertAllClose(
+        tape.gradient(output, flat_values), [2., 4., 6., 8., 10.])
+
+  @parameterized.parameters([
+      # Not element-wise.
+      dict(fn=lambda x: array_ops.reverse(x, [0])),
+      # Integer means are not computed from per-row partial means.
+      dict(fn=mo.reduce_mean, elems_dtype=dtypes.int32),
+      # Per-element outputs require a ragged `dtype`.
+      dict(fn=lambda x: x + 1),
+      # Broadcasts against the row dimension.
+      dict(fn=lambda x: x + constant_op.constant([1, 2, 3])),
+  ])
+  def testVectorizedFallsBackToLoop(self, fn, elems_dtype=dtypes.int32):
+    elems = ragged_factory_ops.constant([[1, 2, 3], [4, 5, 6]], elems_dtype)
+    self.assertFalse(_vectorizes(fn, elems, elems_dtype))
+    output = def_function.function(
+        lambda: ragged_map_ops.map_fn(fn, elems))()
+    expected = map_fn_lib.map_fn(fn, elems, fn_output_signature=elems_dtype)
+    self.assertAllEqual(expected, output)
+
+
+class RaggedMapFnBenchmark(googletest.Benchmark):
+
+  def _run_benchmark(self, name, fn, nrows, mean_row_length, ragged_output):
+    np.random.seed(0)
+    row_lengths = np.random.poisson(mean_row_length, nrows)
+    with ops.Graph().as_default(), session.Session(
+        config=benchmark.benchmark_config()) as sess:
+      elems = ragged_tensor.RaggedTensor.from_row_lengths(
+          np.random.rand(row_lengths.sum()).astype(np.float32), row_lengths)
+      if ragged_output:
+        dtype = ragged_tensor.RaggedTensorType(dtypes.float32, ragged_rank=1)
+        signature = ragged_tensor.RaggedTensorSpec([None], dtypes.float32)
+      else:
+        dtype = signature = dtypes.float32
+      loop = map_fn_lib.map_fn(fn, elems, fn_output_signature=signature)
+      vectorized = ragged_map_ops.map_fn(fn, elems, dtype=dtype)
+      extras = {'nrows': nrows, 'mean_row_length': mean_row_length}
+      for mode, output in [('loop', loop), ('vectorized', vectorized)]:
+        if ragged_output:
+          output = output.flat_values
+        self.run_op_benchmark(
+            sess,
+            output,
+            min_iters=20,
+            name='ragged_map_fn_%s_%s_%d_%d' %
+            (name, mode, nrows, mean_row_length),
+            extras=extras)
+
+  def benchmarkElementwise(self):
+    for nrows, mean_row_length in [(100, 10), (1000, 10), (1000, 100)]:
+      self._run_benchmark('elementwise', lambda x: x * x + 1., nrows,
+                          mean_row_length, ragged_output=True)
+
+  def benchmarkReduceSum(self):
+    for nrows, mean_row_length in [(100, 10), (1000, 10), (1000, 100)]:
+      self._run_benchmark('reduce_sum', mo.reduce_sum, nrows, mean_row_length,
+                          ragged_output=False)
+
+  def benchmarkNormalize(self):
+    for nrows, mean_row_length in [(100, 10), (1000, 10), (1000, 100)]:
+      self._run_benchmark('normalize', lambda x: x - mo.reduce_mean(x), nrows,
+                          mean_row_length, ragged_output=True)
+
+  def _run_eager_benchmark(self, name, fn, nrows, mean_row_length,
+                           ragged_output, iters=20):
+    np.random.seed(0)
+    row_lengths = np.random.poisson(mean_row_length, nrows)
+    with context.eager_mode():
+      elems = ragged_tensor.RaggedTensor.from_row_lengths(
+          np.random.rand(row_lengths.sum()).astype(np.float32), row_lengths)
+      if ragged_output:
+        dtype = ragged_tensor.RaggedTensorType(dtypes.float32, ragged_rank=1)
+        signature = ragged_tensor.RaggedTensorSpec([None], dtypes.float32)
+      else:
+        dtype = signature = dtypes.float32
+      eager = lambda: ragged_map_ops.map_fn(fn, elems, dtype=dtype)
+      function_loop = def_function.function(
+          lambda: map_fn_lib.map_fn(fn, elems, fn_output_signature=signature))
+      function_vectorized = def_function.function(eager)
+      extras = {'nrows': nrows, 'mean_row_length': mean_row_length}
+      for mode, run in [('eager', eager), ('function_loop', function_loop),
+                        ('function_vectorized', function_vectorized)]:
+        run()  # Warm up, and trace the functions.
+        start = time.time()
+        for _ in range(iters):
+          run()
+        self.report_benchmark(
+            name='ragged_map_fn_%s_%s_%d_%d' %
+            (name, mode, nrows, mean_row_length),
+            iters=iters,
+            wall_time=(time.time() - start) / iters,
+            extras=extras)
+
+  def benchmarkEagerReduceSum(self):
+    for nrows, mean_row_length in [(100, 10), (1000, 10)]:
+      self._run_eager_benchmark('reduce_sum', mo.reduce_sum, nrows,
+                                mean_row_length, ragged_output=False)
+
+  def benchmarkEagerNormalize(self):
+    for nrows, mean_row_length in [(100, 10), (1000, 10)]:
+      self._run_eager_benchmark('normalize', lambda x: x - mo.reduce_mean(x),
+                                nrows, mean_row_length, ragged_output=True)
+
 
 if __name__ == '__main__':
   googletest.main()
@@ -14,7 +14,22 @@
 # ==============================================================================
 """Functional operations for RaggedTensors."""
 
+import numpy as np
+
+from tensorflow.python.autograph.core import ag_ctx as autograph_ctx
+from tensorflow.python.autograph.impl import api as autograph
+from tensorflow.python.eager import context
+from tensorflow.python.eager import execute
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import func_graph as func_graph_module
+from tensorflow.python.framework import ops
+from tensorflow.python.framework import tensor as tensor_lib
+from tensorflow.python.framework import tensor_shape
+from tensorflow.python.framework import tensor_spec
+from tensorflow.python.framework import tensor_util
+from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import map_fn as map_fn_lib
+from tensorflow.python.ops import math_ops
 from tensorflow.python.ops.ragged import ragged_tensor
 from tensorflow.python.util import nest
 
@@ -67,6 +82,14 @@ def map_fn(fn,
 
   instead.
 
+  If `elems` is a single `RaggedTensor` with `ragged_rank=1`, and `fn` only
+  uses element-wise operations and reductions over the row (such as
+  `tf.reduce_sum(row)` or `row - tf.reduce_mean(row)`), then `fn` is not run
+  once per row. Instead, it is run once on `elems.flat_values`, with the
+  reductions over rows computed by segment ops using `elems.value_rowids()`.
+  The result is the same as with the loop, up to floating-point rounding. Other
+  functions fall back to the loop.
+
   When executing eagerly, map_fn does not execute in parallel even if
   `parallel_iterations` is set to a value > 1. You can still get the
   performance benefits of running a function in parallel by using the
@@ -153,6 +176,11 @@ def map_fn(fn,
   if dtype is None:
     dtype = nest.map_structure(lambda e: e.dtype, elems)
   dtype = nest.map_structure(_ragged_type_to_spec, dtype)
+  if isinstance(elems, ragged_tensor.RaggedTensor):
+    with ops.name_scope(name, "map", [elems]):
+      result = _vectorized_map_fn(fn, elems, dtype, back_prop)
+    if result is not None:
+      return result
   return map_fn_lib.map_fn(fn,
                            elems,
                            dtype,
@@ -172,3 +200,301 @@ def _ragged_type_to_spec(t):
         None, t.dtype, t.ragged_rank - 1, t.row_splits_dtype)
   else:
     return t
+
+
+# Element-wise operations supported by `_vectorized_map_fn`. Their outputs only
+# depend on the matching (broadcast) elements of their inputs, so they can be
+# applied to all the rows at once.
+_ELEMENTWISE_OPS = frozenset([
+    "Abs", "Acos", "Acosh", "Add", "AddV2", "Angle", "Asin", "Asinh", "Atan",
+    "Atan2", "Atanh", "BitwiseAnd", "BitwiseOr", "BitwiseXor", "Cast", "Ceil",
+    "Complex", "ComplexAbs", "Conj", "Cos", "Cosh", "Digamma", "Div",
+    "DivNoNan", "Elu", "Equal", "Erf", "Erfc", "Erfinv", "Exp", "Expm1",
+    "Floor", "FloorDiv", "FloorMod", "Greater", "GreaterEqual", "Identity",
+    "Igamma", "Igammac", "Imag", "Inv", "Invert", "IsFinite", "IsInf", "IsNan",
+    "LeftShift", "Less", "LessEqual", "Lgamma", "Log", "Log1p", "LogicalAnd",
+    "LogicalNot", "LogicalOr", "Maximum", "Minimum", "Mod", "Mul", "MulNoNan",
+    "Ndtri", "Neg", "NotEqual", "OnesLike", "Pow", "Real", "RealDiv",
+    "Reciprocal", "Relu", "Relu6", "RightShift", "Rint", "Round", "Rsqrt",
+    "SelectV2", "Selu", "Sigmoid", "Sign", "Sin", "Sinh", "Softplus",
+    "Softsign", "Sqrt", "Square", "SquaredDifference", "StopGradient", "Sub",
+    "Tan", "Tanh", "TruncateDiv", "TruncateMod", "Xdivy", "Xlog1py", "Xlogy",
+    "ZerosLike", "Zeta"
+])
+
+
+def _segment_reduction(segment_fn):
+  return lambda data, rt: segment_fn(data, rt.value_rowids(), rt.nrows())
+
+
+def _per_row(row_value, result):
+  """Reshapes a vector with one value per row to broadcast against `result`."""
+  return array_ops.reshape(row_value, [-1] + [1] * (result.shape.rank - 1))
+
+
+def _segment_mean(data, rt):
+  # Unlike `unsorted_segment_mean`, this returns NaN for empty rows, like
+  # `reduce_mean` does for empty tensors.
+  sums = math_ops.unsorted_segment_sum(data, rt.value_rowids(), rt.nrows())
+  counts = math_ops.cast(rt.row_lengths(), sums.dtype)
+  return sums / _per_row(counts, sums)
+
+
+def _segment_extremum(segment_fn, empty_value):
+  """Returns a segment max or min which matches `reduce_max` or `reduce_min`.
+
+  Segment reductions return the lowest (or highest) finite value for empty
+  segments, while reductions of empty floating point tensors return -inf (or
+  inf).
+
+  Args:
+    segment_fn: `unsorted_segment_max` or `unsorted_segment_min`.
+    empty_value: The value of the reduction of an empty floating point tensor.
+  """
+
+  def reduce(data, rt):
+    result = segment_fn(data, rt.value_rowids(), rt.nrows())
+    if not result.dtype.is_floating:
+      return result
+    empty = _per_row(math_ops.equal(rt.row_lengths(), 0), result)
+    return array_ops.where_v2(
+        empty, math_ops.cast(empty_value, result.dtype), result)
+
+  return reduce
+
+
+def _segment_all(data, rt):
+  return math_ops.unsorted_segment_min(
+      math_ops.cast(data, dtypes.int32), rt.value_rowids(), rt.nrows()) > 0
+
+
+def _segment_any(data, rt):
+  return math_ops.unsorted_segment_max(
+      math_ops.cast(data, dtypes.int32), rt.value_rowids(), rt.nrows()) > 0
+
+
+# Reductions supported by `_vectorized_map_fn`, mapped to the reduction used on
+# the vectorized tensors, and to the segment reduction used when the reduction
+# is over the row dimension.
+_REDUCTIONS = {
+    "All": (math_ops.reduce_all, _segment_all),
+    "Any": (math_ops.reduce_any, _segment_any),
+    "Max": (math_ops.reduce_max,
+            _segment_extremum(math_ops.unsorted_segment_max, -np.inf)),
+    "Mean": (math_ops.reduce_mean, _segment_mean),
+    "Min": (math_ops.reduce_min,
+            _segment_extremum(math_ops.unsorted_segment_min, np.inf)),
+    "Prod": (math_ops.reduce_prod,
+             _segment_reduction(math_ops.unsorted_segment_prod)),
+    "Sum": (math_ops.reduce_sum,
+            _segment_reduction(math_ops.unsorted_segment_sum)),
+}
+
+# How a tensor of `fn`, traced on a single row, depends on the row. A tensor
+# which depends on the row is vectorized by adding an outer dimension: for
+# `_PER_ELEMENT` tensors, this dimension replaces the row dimension and has one
+# entry per element of `flat_values`; for `_PER_ROW` tensors, it has one entry
+# per row.
+_INVARIANT = 0
+_PER_ROW = 1
+_PER_ELEMENT = 2
+
+
+def _reduction_axes(op):
+  rank = op.inputs[0].shape.rank
+  axes = np.ravel(tensor_util.constant_value(op.inputs[1]))
+  return sorted(set(int(axis) % rank for axis in axes))
+
+
+def _plan_vectorization(graph):
+  """Returns the kind of each tensor in `graph`, or None if unsupported.
+
+  Args:
+    graph: A `FuncGraph` with `fn` traced on a single row, which is the first
+      input.
+
+  Returns:
+    A dict mapping the `ref()` of each tensor in `graph` to one of
+    `_INVARIANT`, `_PER_ROW` or `_PER_ELEMENT`, or None if some operation can't
+    be vectorized.
+  """
+  kinds = {graph.inputs[0].ref(): _PER_ELEMENT}
+  for t in graph.internal_captures:
+    kinds[t.ref()] = _INVARIANT
+  for op in graph.get_operations():
+    if op.outputs and all(t.ref() in kinds for t in op.outputs):
+      continue  # An input placeholder.
+    if op.control_inputs or len(op.outputs) != 1:
+      return None
+    output = op.outputs[0]
+    if any(t.shape.rank is None for t in list(op.inputs) + [output]):
+      return None
+    input_kinds = [kinds[t.ref()] for t in op.inputs]
+    kind = max(input_kinds, default=_INVARIANT)
+    if op.type == "Const":
+      pass
+    elif op.type in _REDUCTIONS:
+      if (input_kinds[1] != _INVARIANT or
+          tensor_util.constant_value(op.inputs[1]) is None):
+        return None
+      if kind == _PER_ELEMENT and 0 in _reduction_axes(op):
+        dtype = op.inputs[0].dtype
+        if op.type == "Mean" and not (dtype.is_floating or dtype.is_complex):
+          # The mean of the per-row partial means is not exact for integers.
+          return None
+        kind = _PER_ROW
+    elif op.type in _ELEMENTWISE_OPS:
+      if kind == _PER_ELEMENT:
+        for t, input_kind in zip(op.inputs, input_kinds):
+          if t.shape.rank < output.shape.rank:
+            # The row dimension isn't the outermost dimension of the output.
+            if input_kind == _PER_ELEMENT:
+              return None
+          elif input_kind != _PER_ELEMENT and t.shape[0] != 1:
+            # Broadcasts against the row dimension of a per-element tensor.
+            return None
+    else:
+      return None
+    kinds[output.ref()] = kind
+  return kinds
+
+
+def _copy_op(op, inputs):
+  """Creates a copy of the traced `op` with `inputs` in the default graph."""
+  new_op = ops.get_default_graph().create_op(
+      op.type, inputs, [t.dtype for t in op.outputs],
+      attrs=op.node_def.attr, compute_device=True)
+  flat_attrs = []
+  for name in op.node_def.attr:
+    flat_attrs.append(str(name))
+    flat_attrs.append(new_op.get_attr(str(name)))
+  execute.record_gradient(op.type, new_op.inputs, tuple(flat_attrs),
+                          new_op.outputs[:])
+  return new_op.outputs[0]
+
+
+def _broadcast_input(value, t, kind, output_kind, output_rank, rt):
+  """Aligns the vectorized `value` of `t` with the output of its consumer."""
+  rank = t.shape.rank
+  if kind == _INVARIANT:
+    if output_kind == _PER_ELEMENT and rank == output_rank:
+      # The dimension broadcast against the row is replaced by the elements.
+      value = array_ops.squeeze(value, [0])
+    return value
+  if kind == _PER_ROW and output_kind == _PER_ELEMENT:
+    value = array_ops.gather(value, rt.value_rowids())
+    if rank == output_rank:
+      value = array_ops.squeeze(value, [1])
+      rank -= 1
+    output_rank -= 1
+  for _ in range(output_rank - rank):
+    value = array_ops.expand_dims(value, 1)
+  return value
+
+
+def _vectorize(graph, kinds, rt):
+  """Returns the vectorized value of each tensor of `graph`, keyed by `ref()`."""
+  values = {graph.inputs[0].ref(): rt.flat_values}
+  for external, internal in graph.captures:
+    values[internal.ref()] = external
+  for op in graph.get_operations():
+    output = op.outputs[0]
+    if output.ref() in values:
+      continue
+    output_kind = kinds[output.ref()]
+    input_kind = kinds[op.inputs[0].ref()] if op.inputs else _INVARIANT
+    if op.type in _REDUCTIONS and input_kind != _INVARIANT:
+      reduce_fn, segment_fn = _REDUCTIONS[op.type]
+      value = values[op.inputs[0].ref()]
+      axes = _reduction_axes(op)
+      keepdims = op.get_attr("keep_dims")
+      if input_kind == _PER_ROW:
+        value = reduce_fn(value, [axis + 1 for axis in axes], keepdims=keepdims)
+      else:
+        inner_axes = [axis for axis in axes if axis]
+        if inner_axes:
+          value = reduce_fn(value, inner_axes, keepdims=keepdims)
+        if output_kind == _PER_ROW:
+          value = segment_fn(value, rt)
+          if keepdims:
+            value = array_ops.expand_dims(value, 1)
+    else:
+      value = _copy_op(op, [
+          _broadcast_input(values[t.ref()], t, kinds[t.ref()], output_kind,
+                           output.shape.rank, rt) for t in op.inputs
+      ])
+    values[output.ref()] = value
+  return values
+
+
+def _vectorized_map_fn(fn, elems, dtype, back_prop):
+  """Runs `map_fn` on the flat values of `elems`, or returns None.
+
+  Args:
+    fn: The callable passed to `map_fn`.
+    elems: A `RaggedTensor`.
+    dtype: The output signature of `fn`, with `RaggedTensorType`s converted to
+      `RaggedTensorSpec`s.
+    back_prop: Whether gradients are propagated to `elems`.
+
+  Returns:
+    The result of `map_fn(fn, elems, dtype)`, or None if `fn` can't be
+    vectorized and `map_fn` must run it once per row.
+  """
+  if elems.ragged_rank != 1:
+    return None
+  if context.executing_eagerly():
+    # Analyzing `fn` takes a trace of it (running its Python code once more),
+    # which would not be reused by the next eager call.  So `fn` is only
+    # vectorized when building a graph, e.g. in a `tf.function`.
+    return None
+  row_spec = tensor_spec.TensorSpec(
+      tensor_shape.TensorShape([None]).concatenate(elems.flat_values.shape[1:]),
+      elems.dtype)
+  try:
+    graph = func_graph_module.func_graph_from_py_func(
+        "ragged_map_fn_row",
+        autograph.tf_convert(fn, autograph_ctx.control_status_ctx()),
+        args=None,
+        kwargs=None,
+        signature=[row_spec],
+        add_control_dependencies=False)
+  except Exception:  # pylint: disable=broad-except
+    # The loop traces `fn` again, and reports the error.
+    return None
+  kinds = _plan_vectorization(graph)
+  if kinds is None:
+    return None
+
+  try:
+    nest.assert_same_structure(dtype, graph.structured_outputs)
+  except (TypeError, ValueError):
+    return None
+  flat_dtype = nest.flatten(dtype)
+  flat_outputs = nest.flatten(graph.structured_outputs)
+  for spec, output in zip(flat_dtype, flat_outputs):
+    if not isinstance(output, tensor_lib.Tensor):
+      return None
+    if isinstance(spec, ragged_tensor.RaggedTensorSpec):
+      # The rows of the result are the outputs of `fn`.
+      if (kinds[output.ref()] != _PER_ELEMENT or spec.ragged_rank != 0 or
+          spec.dtype != output.dtype or
+          spec.row_splits_dtype != elems.row_splits.dtype):
+        return None
+    elif isinstance(spec, tensor_spec.TensorSpec):
+      if kinds[output.ref()] != _PER_ROW or spec.dtype != output.dtype:
+        return None
+    elif (kinds[output.ref()] != _PER_ROW or
+          not isinstance(spec, dtypes.DType) or spec != output.dtype):
+      return None
+
+  values = _vectorize(graph, kinds, elems)
+  results = []
+  for spec, output in zip(flat_dtype, flat_outputs):
+    value = values[output.ref()]
+    if not back_prop:
+      value = array_ops.stop_gradient(value)
+    if isinstance(spec, ragged_tensor.RaggedTensorSpec):
+      value = elems.with_flat_values(value)
+    results.append(value)
+  return nest.pack_sequence_as(dtype, results)
@@ -19,9 +19,13 @@
 # TODO(edloper):  Make into a ExtensionType (if possible)
 
 
+import weakref
+
 import numpy as np
 
 from tensorflow.core.protobuf import struct_pb2
+from tensorflow.python.eager import context
+from tensorflow.python.eager import monitoring
 from tensorflow.python.framework import composite_tensor
 from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
@@ -41,6 +45,17 @@ from tensorflow.python.ops.ragged import segment_id_ops
 from tensorflow.python.saved_model import nested_structure_coder
 from tensorflow.python.util.tf_export import tf_export
 
+# Only encodings added to graphs are counted, so that the eager path stays
+# cheap.
+_conversions_counter = monitoring.Counter(
+    "/tensorflow/api/ragged/row_partition_conversions",
+    "The number of row partition encodings added to a graph by computing "
+    "them from another encoding.", "encoding")
+_cache_hits_counter = monitoring.Counter(
+    "/tensorflow/api/ragged/row_partition_cache_hits",
+    "The number of row partition encodings reused from a shared cache in a "
+    "graph.", "encoding")
+
 # ===============================================================================
 # RowPartition
 # ===============================================================================
@@ -110,6 +125,12 @@ class RowPartition(composite_tensor.CompositeTensor):
   unnecessary recomputations.)  To check which encodings are precomputed, use
   `RowPartition.has_precomputed_<encoding>`.  To cache an additional
   encoding, use `RowPartition.with_precomputed_<encoding>`.
+
+  Encodings which are not precomputed are cached the first time they are
+  computed.  The cache is shared by all `RowPartition`s with the same
+  `row_splits` tensor, so e.g. `value_rowids` is computed at most once per graph
+  for all of them.  Partitions whose `row_splits` are gated by validation checks
+  have their own cache, so their encodings depend on the checks.
   """
 
   # =============================================================================
@@ -122,7 +143,8 @@ class RowPartition(composite_tensor.CompositeTensor):
                nrows=None,
                uniform_row_length=None,
                nvals=None,
-               internal=False):
+               internal=False,
+               encoding_cache=None):
     """Creates a `RowPartition` from the specified encoding tensor(s).
 
     This constructor is private -- please use one of the following ops to
@@ -147,6 +169,9 @@ class RowPartition(composite_tensor.CompositeTensor):
       nvals: A scalar tensor.
       internal: Private key value, required to ensure that this private
         constructor is *only* called from the factory methods.
+      encoding_cache: The `_EncodingCache` of a `RowPartition` which encodes
+        the same partition with the same `row_splits` tensor, if any.  If
+        None, then the cache of `row_splits` is used.
 
     Raises:
       TypeError: If a row partitioning tensor has an inappropriate dtype.
@@ -188,6 +213,15 @@ class RowPartition(composite_tensor.CompositeTensor):
     self._uniform_row_length = uniform_row_length
     self._nvals = nvals
 
+    encoding_cache = _register_encoding_cache(row_splits, encoding_cache)
+    if row_lengths is not None:
+      encoding_cache.add("row_lengths", row_lengths)
+    if value_rowids is not None:
+      encoding_cache.add("value_rowids", value_rowids)
+    if nrows is not None:
+      encoding_cache.add("nrows", nrows)
+    self._encoding_cache = encoding_cache
+
   # =============================================================================
   # Factory Methods
   # =============================================================================
@@ -762,7 +796,9 @@ class RowPartition(composite_tensor.CompositeTensor):
     """
     if self._value_rowids is not None:
       return self._value_rowids
-    return segment_id_ops.row_splits_to_segment_ids(self._row_splits)
+    return self._encoding_cache.get(
+        "value_rowids",
+        lambda: segment_id_ops.row_splits_to_segment_ids(self._row_splits))
 
   def nvals(self):
     """Returns the number of values partitioned by this `RowPartition`.
@@ -789,7 +825,9 @@ class RowPartition(composite_tensor.CompositeTensor):
       return self._nrows
     nsplits = tensor_shape.dimension_at_index(self._row_splits.shape, 0)
     if nsplits.value is None:
-      return array_ops.shape(self._row_splits, out_type=self.dtype)[0] - 1
+      return self._encoding_cache.get(
+          "nrows",
+          lambda: array_ops.shape(self._row_splits, out_type=self.dtype)[0] - 1)
     else:
       return constant_op.constant(nsplits.value - 1, dtype=self.dtype)
 
@@ -842,7 +880,8 @@ class RowPartition(composite_tensor.CompositeTensor):
     if self._row_lengths is not None:
       return self._row_lengths
     splits = self._row_splits
-    return splits[1:] - splits[:-1]
+    return self._encoding_cache.get("row_lengths",
+                                    lambda: splits[1:] - splits[:-1])
 
   @property
   def static_nrows(self):
@@ -1054,7 +1093,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nrows=self._nrows,
         uniform_row_length=self._uniform_row_length,
         nvals=self._nvals,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _with_precomputed_row_lengths(self):
     """Returns a copy of `self` with `row_lengths` precomputed."""
@@ -1065,7 +1105,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nrows=self._nrows,
         nvals=self._nvals,
         uniform_row_length=self._uniform_row_length,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _with_precomputed_value_rowids(self):
     """Returns a copy of `self` with `value_rowids` precomputed."""
@@ -1076,7 +1117,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nrows=self._nrows,
         nvals=self._nvals,
         uniform_row_length=self._uniform_row_length,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _with_precomputed_nrows(self):
     """Returns a copy of `self` with `nrows` precomputed."""
@@ -1087,7 +1129,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nrows=self.nrows(),
         nvals=self._nvals,
         uniform_row_length=self._uniform_row_length,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _with_precomputed_nvals(self):
     """Returns a copy of `self` with `row_splits` precomputed."""
@@ -1098,7 +1141,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nrows=self._nrows,
         nvals=self.nvals(),
         uniform_row_length=self._uniform_row_length,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _merge_with_spec(self, b):
     """Merge with a TypeSpec to create a new RowPartition."""
@@ -1120,7 +1164,8 @@ class RowPartition(composite_tensor.CompositeTensor):
         nvals=nvals,
         uniform_row_length=uniform_row_length,
         nrows=nrows,
-        internal=_row_partition_factory_key)
+        internal=_row_partition_factory_key,
+        encoding_cache=self._encoding_cache)
 
   def _merge_precomputed_encodings(self, other, validate=True):
     """Returns a RowPartition that merges encodings from `self` and `other`.
@@ -1395,6 +1440,121 @@ nested_structure_coder.register_codec(
 )
 
 
+# ===============================================================================
+# Encoding Cache
+# ===============================================================================
+
+
+class _EncodingCache(object):
+  """Encodings computed for a row partition, shared by equal `RowPartition`s.
+
+  A tensor can only be reused in the graph and control flow context where it
+  was created, so encodings are cached per graph and control flow context.
+  Graph tensors are only weakly referenced (the graph keeps them alive), so
+  the cache does not keep graphs alive.
+  """
+
+  __slots__ = ("_eager_encodings", "_graph_encodings")
+
+  def __init__(self):
+    self._eager_encodings = {}
+    # Maps graphs to dicts mapping (encoding, id(control flow context)) to a
+    # weak reference to the tensor.
+    self._graph_encodings = weakref.WeakKeyDictionary()
+
+  def __deepcopy__(self, memo):
+    # A copy of a `RowPartition` encodes the same partition.
+    del memo
+    return self
+
+  def get(self, encoding, compute_fn):
+    """Returns the cached `encoding`, or computes and caches it.
+
+    Args:
+      encoding: The name of the encoding, e.g. "value_rowids".
+      compute_fn: Computes the encoding from another encoding.
+
+    Returns:
+      A `Tensor`.
+    """
+    if context.executing_eagerly():
+      value = self._eager_encodings.get(encoding)
+      if value is None:
+        value = self._eager_encodings[encoding] = compute_fn()
+      return value
+
+    # pylint: disable=protected-access
+    graph = ops.get_default_graph()
+    if graph._current_control_dependencies():
+      # A cached tensor would not have the control dependencies.
+      _conversions_counter.get_cell(encoding).increase_by(1)
+      return compute_fn()
+    control_flow_context = graph._get_control_flow_context()
+    encodings = self._graph_encodings.setdefault(graph, {})
+    key = (encoding, id(control_flow_context))
+    ref = encodings.get(key)
+    value = None if ref is None else ref()
+    if (value is None or
+        value.op._get_control_flow_context() is not control_flow_context):
+      value = compute_fn()
+      encodings[key] = weakref.ref(value)
+      _conversions_counter.get_cell(encoding).increase_by(1)
+    else:
+      _cache_hits_counter.get_cell(encoding).increase_by(1)
+    return value
+
+  def add(self, encoding, value):
+    """Caches `value`, a precomputed `encoding`, if it isn't cached yet."""
+    if isinstance(value, ops.EagerTensor):
+      self._eager_encodings.setdefault(encoding, value)
+    else:
+      # pylint: disable=protected-access
+      control_flow_context = value.op._get_control_flow_context()
+      encodings = self._graph_encodings.setdefault(value.graph, {})
+      key = (encoding, id(control_flow_context))
+      ref = encodings.get(key)
+      if ref is None or ref() is None:
+        encodings[key] = weakref.ref(value)
+
+
+# Maps the `id` of `row_splits` tensors to a weak reference to the tensor and
+# the `_EncodingCache` of the `RowPartition`s built from it.  The entry is
+# removed by the weak reference's callback when the tensor is deleted, since
+# the cache may hold eager tensors as large as the values.
+_encoding_caches = {}
+
+
+def _register_encoding_cache(row_splits, encoding_cache=None):
+  """Returns the `_EncodingCache` for `row_splits`, registering it if needed.
+
+  Args:
+    row_splits: The `row_splits` tensor of a `RowPartition`.
+    encoding_cache: The `_EncodingCache` to use, or None to use the one
+      registered for `row_splits` (or a new one).  It is only registered if
+      `row_splits` doesn't have a cache yet.
+
+  Returns:
+    An `_EncodingCache`.
+  """
+  key = id(row_splits)
+  entry = _encoding_caches.get(key)
+  if entry is not None:
+    if encoding_cache is None:
+      encoding_cache = entry[1]
+    return encoding_cache
+  if encoding_cache is None:
+    encoding_cache = _EncodingCache()
+
+  def remove(ref):
+    # The id may have been reused by a tensor registered since.
+    entry = _encoding_caches.get(key)
+    if entry is not None and entry[0] is ref:
+      del _encoding_caches[key]
+
+  _encoding_caches[key] = (weakref.ref(row_splits, remove), encoding_cache)
+  return encoding_cache
+
+
 # ===============================================================================
 # Helper Functions
 # ===============================================================================
@@ -24,10 +24,12 @@ from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import errors
 from tensorflow.python.framework import errors_impl
+from tensorflow.python.framework import ops
 from tensorflow.python.framework import tensor_shape
 from tensorflow.python.framework import tensor_spec
 from tensorflow.python.framework import test_util
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import check_ops
 from tensorflow.python.ops.ragged import row_partition
 from tensorflow.python.ops.ragged.row_partition import RowPartition
 from tensorflow.python.ops.ragged.row_partition import RowPartitionSpec
@@ -917,6 +919,110 @@ class RowPartitionTest(test_util.TensorFlowTestCase, parameterized.TestCase):
       self.assertIsNone(static_nrows)
     foo(array_ops.constant([0, 3, 4, 5], dtype=dtypes.int32))
 
+  def testEncodingCacheSharedByEqualPartitions(self):
+    row_splits = constant_op.constant([0, 3, 3, 5], dtypes.int64)
+    rp1 = RowPartition.from_row_splits(row_splits, validate=False)
+    rp2 = RowPartition.from_row_splits(row_splits, validate=False)
+    rp3 = rp1._with_precomputed_row_splits()
+    conversions = row_partition._conversions_counter.get_cell("value_rowids")
+    hits = row_partition._cache_hits_counter.get_cell("value_rowids")
+    num_conversions = conversions.value()
+    num_hits = hits.value()
+
+    value_rowids = rp1.value_rowids()
+    self.assertIs(value_rowids, rp2.value_rowids())
+    self.assertIs(value_rowids, rp3.value_rowids())
+    self.assertIs(rp2.row_lengths(),
+                  rp3._with_precomputed_nrows().row_lengths())
+    self.assertFalse(rp2._has_precomputed_value_rowids())
+    if not context.executing_eagerly():
+      # Only encodings added to graphs are counted.
+      self.assertEqual(num_conversions + 1, conversions.value())
+      self.assertEqual(num_hits + 2, hits.value())
+    self.assertAllEqual([0, 0, 0, 2, 2], value_rowids)
+    self.assertAllEqual([3, 0, 2], rp1.row_lengths())
+
+  def testEncodingCacheReusesPrecomputedEncodings(self):
+    rp1 = RowPartition.from_value_rowids([0, 0, 2, 2], nrows=4)
+    rp2 = RowPartition.from_row_splits(rp1.row_splits(), validate=False)
+    self.assertIs(rp1.value_rowids(), rp2.value_rowids())
+    self.assertAllEqual([2, 0, 2, 0], rp2.row_lengths())
+
+  def testEncodingCacheNotSharedWithOtherDtypes(self):
+    rp1 = RowPartition.from_row_splits(
+        constant_op.constant([0, 3, 3, 5], dtypes.int64), validate=False)
+    rp2 = rp1.with_dtype(dtypes.int32)
+    self.assertIsNot(rp1.value_rowids(), rp2.value_rowids())
+    self.assertEqual(dtypes.int32, rp2.value_rowids().dtype)
+
+  def testEncodingCacheNotSharedWithValidatedPartitions(self):
+    if context.executing_eagerly():
+      return  # Checks run immediately in eager mode.
+    row_splits = array_ops.placeholder_with_default(
+        constant_op.constant([0, 3, 3, 5], dtypes.int64), [None])
+    rp = RowPartition.from_row_splits(row_splits, validate=False)
+    rp.value_rowids()
+    rp.row_lengths()
+    rp.nrows()
+    failed_check = check_ops.assert_equal(0, 1, message='check failed')
+    validated = [
+        rp._with_dependencies([failed_check]),
+        rp._merge_precomputed_encodings(
+            RowPartition.from_row_splits(
+                constant_op.constant([0, 3, 4, 5], dtypes.int64),
+                validate=False)),
+    ]
+    for (validated_rp, message) in zip(validated,
+                                       ['check failed', 'incompatible']):
+      for encoding in (validated_rp.value_rowids(),
+                       validated_rp.row_lengths(), validated_rp.nrows()):
+        with self.assertRaisesRegex(errors.InvalidArgumentError, message):
+          self.evaluate(encoding)
+
+  def testEncodingCacheNotReplaced(self):
+    rp1 = RowPartition.from_row_splits(
+        constant_op.constant([0, 3, 3, 5], dtypes.int64), validate=False)
+    rp2 = RowPartition.from_row_splits(
+        constant_op.constant([0, 1, 5], dtypes.int64), validate=False)
+    # A partition built with another partition's cache doesn't replace the
+    # cache registered for its row_splits.
+    RowPartition(
+        row_splits=rp1.row_splits(),
+        internal=row_partition._row_partition_factory_key,
+        encoding_cache=rp2._encoding_cache)
+    rp3 = RowPartition.from_row_splits(rp1.row_splits(), validate=False)
+    self.assertIs(rp1._encoding_cache, rp3._encoding_cache)
+    self.assertAllEqual([0, 0, 0, 2, 2], rp3.value_rowids())
+
+  def testEncodingCacheRemovedWithRowSplits(self):
+    if not context.executing_eagerly():
+      return  # The graph keeps its tensors alive.
+    row_splits = constant_op.constant([0, 3, 3, 5], dtypes.int64)
+    key = id(row_splits)
+    rp = RowPartition.from_row_splits(row_splits, validate=False)
+    rp.value_rowids()
+    self.assertIn(key, row_partition._encoding_caches)
+    num_caches = len(row_partition._encoding_caches)
+    del rp, row_splits
+    self.assertNotIn(key, row_partition._encoding_caches)
+    self.assertLen(row_partition._encoding_caches, num_caches - 1)
+
+  def testEncodingCacheNotSharedAcrossGraphs(self):
+    with ops.Graph().as_default():
+      rp = RowPartition.from_row_splits(
+          constant_op.constant([0, 3, 3, 5], dtypes.int64), validate=False)
+      value_rowids = rp.value_rowids()
+
+      @def_function.function
+      def foo():
+        inner_value_rowids = rp.value_rowids()
+        self.assertIsNot(value_rowids, inner_value_rowids)
+        self.assertIs(inner_value_rowids, rp.value_rowids())
+        return inner_value_rowids
+
+      foo()
+      self.assertIs(value_rowids, rp.value_rowids())
+
 
 @test_util.run_all_in_graph_and_eager_modes
 class RowPartitionSpecTest(test_util.TensorFlowTestCase,
@@ -892,6 +892,9 @@ class StructuredTensor(extension_type.BatchableExtensionType):
 
     Note that `StructuredTensor.from_pyval(pyval).to_pyval() == pyval`.
 
+    To convert a large list (or a stream) of records with the same fields,
+    `structured_tensor_builder.StructuredTensorBuilder` is much faster.
+
     Args:
       pyval: The nested Python structure that should be used to create the new
         `StructuredTensor`.
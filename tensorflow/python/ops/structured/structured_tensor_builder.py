@@ -0,0 +1,338 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Columnar construction of StructuredTensors from Python records.
+
+`StructuredTensor.from_pyval` walks a list of records recursively, and
+regroups the values of every field before converting them.  For large batches
+of records, `StructuredTensorBuilder` is much faster: the schema of the records
+is inferred once, from the first record, and each record is then appended
+directly to one flat column per field (plus row lengths for list fields).
+Each column is converted with a single conversion when the `StructuredTensor`
+is built.
+
+```python
+builder = StructuredTensorBuilder()
+for record in records:
+  builder.append(record)
+st = builder.build()  # Same as StructuredTensor.from_pyval(list(records)).
+```
+
+`batched_from_records` builds one `StructuredTensor` per batch of records from
+an iterator, so the records never need to be held in memory at once.
+"""
+
+import numpy as np
+
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import tensor
+from tensorflow.python.framework import tensor_shape
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops.ragged import ragged_tensor
+from tensorflow.python.ops.ragged.row_partition import RowPartition
+from tensorflow.python.ops.structured import structured_tensor
+
+
+class _ScalarColumn(object):
+  """The values of a field whose values are scalars (or fixed-shape lists)."""
+
+  def __init__(self, path, dtype=None, inner_shape=None):
+    self._path = path
+    self._dtype = dtype
+    # The shape of each value, or None for scalars.
+    self._inner_shape = inner_shape
+    self._values = []
+
+  def append(self, value):
+    if self._inner_shape is None and isinstance(value, (dict, list, tuple)):
+      raise ValueError('Value at %r must be a scalar, got %r' %
+                       (self._path, value))
+    self._values.append(value)
+
+  def build(self):
+    """Returns a Tensor with the values appended since the last build."""
+    values, self._values = self._values, []
+    inner_shape = self._inner_shape or tensor_shape.TensorShape([])
+    if values:
+      try:
+        result = constant_op.constant(values, self._dtype)
+      except (TypeError, ValueError) as exc:
+        raise ValueError('Error parsing path %r' % (self._path,)) from exc
+      if not (tensor_shape.TensorShape([None]).concatenate(inner_shape)
+              .is_compatible_with(result.shape)):
+        raise ValueError('Values at %r do not have shape %s' %
+                         (self._path, inner_shape))
+    else:
+      # Like `ragged_factory_ops.constant`, default to float32.
+      result = array_ops.zeros([0] + [d or 0 for d in inner_shape.as_list()],
+                               self._dtype or dtypes.float32)
+    # Later builds use the same dtype, even if their values would be inferred
+    # to have another one.
+    self._dtype = result.dtype
+    return result
+
+
+class _ListColumn(object):
+  """The values of a field whose values are lists of variable length."""
+
+  def __init__(self, path, values=None, row_splits_dtype=dtypes.int64):
+    self._path = path
+    # The column with the elements of all lists.  Inferred from the first
+    # element if None.
+    self._values = values
+    self._row_splits_dtype = row_splits_dtype
+    self._row_lengths = []
+
+  def append(self, value):
+    if not isinstance(value, (list, tuple)):
+      raise ValueError('Value at %r must be a list, got %r' %
+                       (self._path, value))
+    self._row_lengths.append(len(value))
+    if value:
+      values = self._values
+      if values is None:
+        values = self._values = _column_for_value(value[0], self._path)
+      for item in value:
+        values.append(item)
+
+  def build(self):
+    """Returns a RaggedTensor or StructuredTensor with the appended values."""
+    row_lengths, self._row_lengths = self._row_lengths, []
+    row_splits = np.zeros(
+        len(row_lengths) + 1, self._row_splits_dtype.as_numpy_dtype)
+    np.cumsum(row_lengths, out=row_splits[1:])
+    if self._values is None:
+      # Only empty lists so far.
+      values = array_ops.zeros([0], dtypes.float32)
+    else:
+      values = self._values.build()
+    partition = RowPartition.from_row_splits(row_splits, validate=False)
+    if isinstance(values, structured_tensor.StructuredTensor):
+      return values.partition_outer_dimension(partition)
+    return ragged_tensor.RaggedTensor._from_row_partition(  # pylint: disable=protected-access
+        values, partition, validate=False)
+
+
+class _StructColumn(object):
+  """The values of a field whose values are dicts."""
+
+  def __init__(self, path, typespec=None):
+    self._path = path
+    self._nrows = 0
+    if typespec is None:
+      # Inferred from the first value.
+      self._columns = None
+      self._shape = tensor_shape.TensorShape([None])
+    else:
+      self._columns = dict(
+          (key, _column_for_spec(spec, path + (key,)))
+          for (key, spec) in typespec._field_specs.items())  # pylint: disable=protected-access
+      self._shape = typespec.shape
+    self._keys = None if self._columns is None else set(self._columns)
+
+  @property
+  def nrows(self):
+    return self._nrows
+
+  def append(self, value):
+    if not isinstance(value, dict):
+      raise ValueError('Value at %r must be a dict, got %r' %
+                       (self._path, value))
+    columns = self._columns
+    if columns is None:
+      columns = self._columns = dict(
+          (key, _column_for_value(v, self._path + (key,)))
+          for (key, v) in value.items())
+      self._keys = set(columns)
+    elif value.keys() != self._keys:
+      raise ValueError('Value at %r has fields %r, expected %r' %
+                       (self._path, sorted(value), sorted(self._keys)))
+    for (key, column) in columns.items():
+      column.append(value[key])
+    self._nrows += 1
+
+  def build(self):
+    """Returns a rank-1 StructuredTensor with the appended values."""
+    nrows, self._nrows = self._nrows, 0
+    fields = dict((key, column.build())
+                  for (key, column) in (self._columns or {}).items())
+    try:
+      if not fields:
+        return structured_tensor.StructuredTensor.from_fields(
+            fields={}, shape=(nrows,), nrows=nrows)
+      return structured_tensor.StructuredTensor.from_fields(
+          fields=fields, shape=self._shape, validate=False)
+    except Exception as exc:
+      raise ValueError('Error parsing path %r' % (self._path,)) from exc
+
+
+def _column_for_value(value, path):
+  """Returns a column for values like `value`."""
+  if isinstance(value, dict):
+    return _StructColumn(path)
+  elif isinstance(value, (list, tuple)):
+    return _ListColumn(path)
+  else:
+    return _ScalarColumn(path)
+
+
+def _column_for_spec(spec, path):
+  """Returns a column for a field of a rank-1 StructuredTensor with `spec`."""
+  if isinstance(spec, structured_tensor.StructuredTensor.Spec):
+    if spec.rank != 1:
+      raise ValueError('StructuredTensorBuilder only supports StructuredTensor '
+                       'fields with rank 1, got %r at %r' % (spec, path))
+    return _StructColumn(path, spec)
+  elif isinstance(spec, ragged_tensor.RaggedTensorSpec):
+    if spec.shape.rank is None:
+      raise ValueError('Field at %r must have a known rank' % (path,))
+    inner_shape = spec.shape[spec.ragged_rank + 1:]
+    column = _ScalarColumn(path, spec.dtype, inner_shape or None)
+    for _ in range(spec.ragged_rank):
+      column = _ListColumn(path, column, spec.row_splits_dtype)
+    return column
+  elif isinstance(spec, tensor.TensorSpec):
+    if spec.shape.rank is None:
+      raise ValueError('Field at %r must have a known rank' % (path,))
+    return _ScalarColumn(path, spec.dtype, spec.shape[1:] or None)
+  else:
+    raise ValueError('Unsupported type spec at %r: %r' % (path, spec))
+
+
+class StructuredTensorBuilder(object):
+  """Builds a rank-1 `StructuredTensor` from Python records.
+
+  Each record is a `dict` with the same fields, whose values are scalars,
+  (nested) lists, or dicts.  The result is the same as
+  `StructuredTensor.from_pyval(records, typespec)`, but is computed with one
+  pass over the records and one conversion per field.
+
+  The schema is inferred from the first record (unless `typespec` is given),
+  and kept by later builds, so that all the `StructuredTensor`s built by a
+  builder have the same fields and dtypes.
+  """
+
+  def __init__(self, typespec=None):
+    """Creates a builder.
+
+    Args:
+      typespec: Optional `StructuredTensor.Spec` with rank 1, specifying the
+        type of each field.
+
+    Raises:
+      ValueError: If `typespec` is not a rank-1 `StructuredTensor.Spec`, or
+        has fields which the builder doesn't support.
+    """
+    if typespec is not None and not (
+        isinstance(typespec, structured_tensor.StructuredTensor.Spec) and
+        typespec.rank == 1):
+      raise ValueError('typespec must be a StructuredTensor.Spec with rank 1, '
+                       'got %r' % (typespec,))
+    self._root = _StructColumn((), typespec)
+    self._error = None
+
+  @property
+  def num_records(self):
+    """The number of records appended since the last build."""
+    return self._root.nrows
+
+  def append(self, record):
+    """Appends a record.
+
+    Args:
+      record: A `dict` with the fields of the record.
+
+    Raises:
+      ValueError: If `record` does not match the schema.  The builder can't be
+        used after that, since only part of the record may have been appended.
+    """
+    self._check_usable()
+    try:
+      self._root.append(record)
+    except ValueError as exc:
+      self._error = exc
+      raise
+
+  def extend(self, records):
+    """Appends all the records in the iterable `records`."""
+    for record in records:
+      self.append(record)
+
+  def build(self):
+    """Returns a `StructuredTensor` with the records appended since last build.
+
+    The builder is then empty, and can be used to build the next batch of
+    records.
+
+    Returns:
+      A `StructuredTensor` with shape `[num_records]`.
+    """
+    self._check_usable()
+    return self._root.build()
+
+  def _check_usable(self):
+    if self._error is not None:
+      raise ValueError('StructuredTensorBuilder can not be used after a '
+                       'record failed to be appended') from self._error
+
+
+def from_records(records, typespec=None):
+  """Builds a rank-1 `StructuredTensor` from an iterable of records.
+
+  Equivalent to `StructuredTensor.from_pyval(list(records), typespec)`, but
+  faster for large numbers of records.
+
+  Args:
+    records: An iterable of `dict`s with the same fields.
+    typespec: Optional `StructuredTensor.Spec` with rank 1, specifying the type
+      of each field.
+
+  Returns:
+    A `StructuredTensor` with one row per record.
+  """
+  builder = StructuredTensorBuilder(typespec)
+  builder.extend(records)
+  return builder.build()
+
+
+def batched_from_records(records, batch_size, typespec=None,
+                         drop_remainder=False):
+  """Yields rank-1 `StructuredTensor`s from batches of records.
+
+  The records are consumed lazily, so `records` may be a stream which doesn't
+  fit in memory.  The schema is inferred once, so all batches have the same
+  fields and dtypes.
+
+  Args:
+    records: An iterable of `dict`s with the same fields.
+    batch_size: The number of records in each batch.
+    typespec: Optional `StructuredTensor.Spec` with rank 1, specifying the type
+      of each field.
+    drop_remainder: Whether the last batch should be dropped if it has fewer
+      than `batch_size` records.
+
+  Yields:
+    `StructuredTensor`s with shape `[batch_size]`, except for the last one if
+    `drop_remainder` is False.
+  """
+  if batch_size < 1:
+    raise ValueError('batch_size must be positive, got %d' % batch_size)
+  builder = StructuredTensorBuilder(typespec)
+  for record in records:
+    builder.append(record)
+    if builder.num_records == batch_size:
+      yield builder.build()
+  if builder.num_records and not drop_remainder:
+    yield builder.build()
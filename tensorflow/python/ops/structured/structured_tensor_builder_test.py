@@ -0,0 +1,194 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for StructuredTensorBuilder."""
+
+import time
+
+from absl.testing import parameterized
+
+from tensorflow.python.eager import context
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import tensor
+from tensorflow.python.framework import test_util
+from tensorflow.python.ops.ragged import ragged_tensor
+from tensorflow.python.ops.structured import structured_tensor_builder
+from tensorflow.python.ops.structured.structured_tensor import StructuredTensor
+from tensorflow.python.platform import googletest
+
+
+@test_util.run_all_in_graph_and_eager_modes
+class StructuredTensorBuilderTest(test_util.TensorFlowTestCase,
+                                  parameterized.TestCase):
+
+  def _assertStructuredEqual(self, a, b):
+    self.assertEqual(repr(a.shape), repr(b.shape))
+    self.assertEqual(set(a.field_names()), set(b.field_names()))
+    for field in a.field_names():
+      a_value = a.field_value(field)
+      b_value = b.field_value(field)
+      self.assertIs(type(a_value), type(b_value))
+      if isinstance(a_value, StructuredTensor):
+        self._assertStructuredEqual(a_value, b_value)
+      else:
+        self.assertEqual(a_value.dtype, b_value.dtype)
+        if isinstance(a_value, ragged_tensor.RaggedTensor):
+          self.assertEqual(a_value.row_splits.dtype, b_value.row_splits.dtype)
+        self.assertAllEqual(a_value, b_value)
+
+  @parameterized.named_parameters([
+      dict(testcase_name="Scalars",
+           records=[{"a": 1, "b": 2.5, "c": b"x"},
+                    {"a": 3, "b": 4.5, "c": b"y"}]),
+      dict(testcase_name="RaggedLists",
+           records=[{"a": [1, 2], "b": [[1.0], []]},
+                    {"a": [], "b": [[2.0, 3.0]]},
+                    {"a": [3], "b": []}]),
+      dict(testcase_name="NestedDicts",
+           records=[{"a": {"b": 1, "c": [1, 2]}},
+                    {"a": {"b": 2, "c": []}}]),
+      dict(testcase_name="ListsOfDicts",
+           records=[{"a": [{"b": 1, "c": [[1]]}, {"b": 2, "c": []}]},
+                    {"a": []},
+                    {"a": [{"b": 3, "c": [[2, 3], [4]]}]}]),
+      dict(testcase_name="EmptyDicts",
+           records=[{"a": {}}, {"a": {}}, {"a": {}}]),
+      dict(testcase_name="NoFields",
+           records=[{}, {}]),
+      dict(testcase_name="OnlyEmptyLists",
+           records=[{"a": []}, {"a": []}]),
+  ])  # pyformat: disable
+  def testMatchesFromPyval(self, records):
+    expected = StructuredTensor.from_pyval(records)
+    actual = structured_tensor_builder.from_records(iter(records))
+    self._assertStructuredEqual(actual, expected)
+    if context.executing_eagerly():
+      self.assertEqual(actual.to_pyval(), records)
+
+  def testTypeSpec(self):
+    records = [{"a": 1, "b": [[1, 2], [3]], "c": [1.0, 2.0], "d": {"e": 5}},
+               {"a": 2, "b": [], "c": [3.0, 4.0], "d": {"e": 6}}]
+    typespec = StructuredTensor.Spec._from_fields_and_rank(  # pylint: disable=protected-access
+        fields={
+            "a": tensor.TensorSpec([None], dtypes.int64),
+            "b": ragged_tensor.RaggedTensorSpec([None, None, None],
+                                                dtypes.int32, ragged_rank=2,
+                                                row_splits_dtype=dtypes.int32),
+            "c": tensor.TensorSpec([None, 2], dtypes.float64),
+            "d": StructuredTensor.Spec._from_fields_and_rank(  # pylint: disable=protected-access
+                fields={"e": tensor.TensorSpec([None], dtypes.int32)},
+                rank=1),
+        },
+        rank=1)
+    expected = StructuredTensor.from_pyval(records, typespec)
+    actual = structured_tensor_builder.from_records(records, typespec)
+    self._assertStructuredEqual(actual, expected)
+
+  def testBatches(self):
+    records = [{"a": i, "b": list(range(i))} for i in range(7)]
+    batches = list(structured_tensor_builder.batched_from_records(
+        iter(records), batch_size=3))
+    self.assertLen(batches, 3)
+    for i, batch in enumerate(batches):
+      self._assertStructuredEqual(
+          batch, StructuredTensor.from_pyval(records[i * 3:(i + 1) * 3]))
+
+    batches = list(structured_tensor_builder.batched_from_records(
+        records, batch_size=3, drop_remainder=True))
+    self.assertLen(batches, 2)
+    self.assertAllEqual(3, batches[1].nrows())
+
+  def testSchemaIsKeptAcrossBuilds(self):
+    builder = structured_tensor_builder.StructuredTensorBuilder()
+    builder.append({"a": 1.0, "b": []})
+    builder.append({"a": 2.0, "b": [1.0]})
+    self.assertEqual(2, builder.num_records)
+    first = builder.build()
+    self.assertEqual(0, builder.num_records)
+    # The values would be inferred to be int32 on their own.
+    builder.append({"a": 3, "b": [2]})
+    second = builder.build()
+    self.assertEqual(first.field_value("a").dtype,
+                     second.field_value("a").dtype)
+    self.assertEqual(dtypes.float32, second.field_value("b").dtype)
+    self.assertAllEqual([3.0], second.field_value("a"))
+    self.assertAllEqual(0, builder.build().nrows())
+
+  @parameterized.named_parameters([
+      dict(testcase_name="MissingField",
+           records=[{"a": 1, "b": 2}, {"a": 1}],
+           error="has fields"),
+      dict(testcase_name="ExtraField",
+           records=[{"a": 1}, {"a": 1, "b": 2}],
+           error="has fields"),
+      dict(testcase_name="NotADict",
+           records=[{"a": 1}, 5],
+           error="must be a dict"),
+      dict(testcase_name="ListForScalar",
+           records=[{"a": 1}, {"a": [1]}],
+           error="must be a scalar"),
+      dict(testcase_name="ScalarForList",
+           records=[{"a": [1]}, {"a": 1}],
+           error="must be a list"),
+      dict(testcase_name="MixedTypes",
+           records=[{"a": 1}, {"a": b"x"}],
+           error=r"Error parsing path \('a',\)"),
+  ])  # pyformat: disable
+  def testErrors(self, records, error):
+    with self.assertRaisesRegex(ValueError, error):
+      structured_tensor_builder.from_records(records)
+
+  def testBuilderIsUnusableAfterError(self):
+    builder = structured_tensor_builder.StructuredTensorBuilder()
+    builder.append({"a": 1, "b": 2})
+    with self.assertRaisesRegex(ValueError, "has fields"):
+      builder.append({"a": 1})
+    with self.assertRaisesRegex(ValueError, "can not be used"):
+      builder.append({"a": 1, "b": 2})
+    with self.assertRaisesRegex(ValueError, "can not be used"):
+      builder.build()
+
+  def testInvalidArguments(self):
+    with self.assertRaisesRegex(ValueError, "rank 1"):
+      structured_tensor_builder.StructuredTensorBuilder(
+          tensor.TensorSpec([None], dtypes.int32))
+    with self.assertRaisesRegex(ValueError, "batch_size"):
+      list(structured_tensor_builder.batched_from_records([{}], batch_size=0))
+
+
+class StructuredTensorBuilderBenchmark(googletest.Benchmark):
+
+  def _benchmark(self, name, build_fn, records, iters=10):
+    with context.eager_mode():
+      build_fn(records)  # Warm up.
+      start = time.time()
+      for _ in range(iters):
+        build_fn(records)
+      self.report_benchmark(
+          name=name, iters=iters, wall_time=(time.time() - start) / iters,
+          extras={"num_records": len(records)})
+
+  def benchmark_build(self):
+    records = [{"id": i,
+                "score": float(i),
+                "tokens": [b"token"] * (i % 7),
+                "children": [{"x": j, "ys": [j] * (j % 3)}
+                             for j in range(i % 5)]}
+               for i in range(10000)]
+    self._benchmark("from_pyval", StructuredTensor.from_pyval, records)
+    self._benchmark("builder", structured_tensor_builder.from_records, records)
+
+
+if __name__ == "__main__":
+  googletest.main()
@@ -0,0 +1,88 @@
+# Copyright 2026 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks for SavedModel saving."""
+
+import os
+import time
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import ops
+from tensorflow.python.framework import tensor_spec
+from tensorflow.python.module import module
+from tensorflow.python.ops import random_ops
+from tensorflow.python.ops import variables
+from tensorflow.python.platform import test
+from tensorflow.python.saved_model import save
+from tensorflow.python.saved_model import save_options
+
+
+def _make_model(num_functions, num_variables, variable_size):
+  """Returns a module with many functions and a large checkpoint."""
+  root = module.Module()
+  root.vs = [
+      variables.Variable(random_ops.random_uniform([variable_size]))
+      for _ in range(num_variables)
+  ]
+
+  def make_function(i):
+    v = root.vs[i % num_variables]
+    return def_function.function(
+        lambda x: v * x + i,
+        input_signature=[tensor_spec.TensorSpec(None, dtypes.float32)])
+
+  root.fns = [make_function(i) for i in range(num_functions)]
+  for fn in root.fns:
+    fn.get_concrete_function()
+  return root
+
+
+class SaveBenchmarks(test.Benchmark):
+
+  def _run(self, name, root, options, num_iters):
+    export_dir = os.path.join(test.get_temp_dir(), name)
+    save.save(root, export_dir, options=options)
+    start = time.time()
+    for _ in range(num_iters):
+      save.save(root, export_dir, options=options)
+    end = time.time()
+    self.report_benchmark(
+        name=name,
+        iters=num_iters,
+        wall_time=(end - start) / num_iters)
+
+  def _benchmark_save(self, name, num_functions, num_variables, variable_size):
+    root = _make_model(num_functions, num_variables, variable_size)
+    self._run(name + "_sequential", root, save_options.SaveOptions(), 3)
+    self._run(
+        name + "_concurrent_checkpoint", root,
+        save_options.SaveOptions(
+            experimental_write_checkpoint_concurrently=True), 3)
+
+  def benchmark_many_functions_small_checkpoint(self):
+    self._benchmark_save(
+        "many_functions_small_checkpoint",
+        num_functions=500, num_variables=10, variable_size=1000)
+
+  def benchmark_many_functions_large_checkpoint(self):
+    # About 400MB of variables.
+    self._benchmark_save(
+        "many_functions_large_checkpoint",
+        num_functions=500, num_variables=100, variable_size=1000000)
+
+
+if __name__ == "__main__":
+  ops.enable_eager_execution()
+  test.main()
@@ -17,6 +17,7 @@
 import collections
 import pprint
 import re
+import threading
 
 from absl import logging
 
@@ -41,6 +42,7 @@ from tensorflow.python.util import compat
 from tensorflow.python.util import nest
 from tensorflow.python.util import tf_decorator
 from tensorflow.python.util import tf_inspect
+from tensorflow.python.util.compat import collections_abc
 
 
 def _is_tensor(t):
@@ -383,48 +385,151 @@ def load_function_def_library(library,
   Raises:
     ValueError: if functions dependencies have a cycle.
   """
-  library_function_names = set(fdef.signature.name for fdef in library.function)
-  functions = {}
-  renamed_functions = {}
-
-  # Our graph building code currently requires functions to be registered with
-  # some tf.Graph in order to import functions using the
-  # op-name-is-function-name calling convention. To avoid leaking memory into
-  # the global default graph when executing eagerly, we create a temporary
-  # Graph.
-  #
-  # TODO(b/205023033): Make this Graph creation unnecessary when executing
-  # eagerly by fixing function_def_to_graph_def.
-  if ops.executing_eagerly_outside_functions():
-    graph = ops.Graph()
-  else:
-    graph = ops.get_default_graph()
-
-  if load_shared_name_suffix is None:
-    load_shared_name_suffix = "_load_{}".format(ops.uid())
-
-  # Custom gradient functions must be re-registered under new UIDs.
-  library_gradient_names = {}  # Maps old op type to old function name
-  new_gradient_op_types = {}  # Maps old gradient op type to new op type.
-  gradients_to_register = {}  # Maps old function name to new op type
-  for gdef in library.registered_gradients:
-    if gdef.registered_op_type:
-      new_op_type = custom_gradient.generate_name()
-      old_op_type = compat.as_bytes(gdef.registered_op_type)
-
-      library_gradient_names[old_op_type] = gdef.gradient_func
-      new_gradient_op_types[old_op_type] = new_op_type
-      gradients_to_register[gdef.gradient_func] = new_op_type
-
-  function_deps = {}
-  for fdef in library.function:
-    function_deps[fdef.signature.name] = _list_function_deps(
-        fdef, library_function_names, library_gradient_names)
-
-  loaded_gradients = {}
-  for fdef in _sort_function_defs(library, function_deps):
-    orig_name = _fix_fdef_in_place(fdef, functions, load_shared_name_suffix,
-                                   new_gradient_op_types)
+  function_library = LazyFunctionLibrary(
+      library,
+      saved_object_graph=saved_object_graph,
+      load_shared_name_suffix=load_shared_name_suffix,
+      wrapper_function=wrapper_function)
+  function_library.load_all()
+  return dict(function_library.items())
+
+
+class LazyFunctionLibrary(collections_abc.Mapping):
+  """Maps FunctionDef names to `ConcreteFunction`s imported on first access.
+
+  Looking up a function imports it together with the functions it depends on
+  (called functions and custom gradients), in dependency order. Functions that
+  are never looked up are never imported. Otherwise the imported functions are
+  the same as the ones returned by `load_function_def_library`.
+  """
+
+  def __init__(self,
+               library,
+               saved_object_graph=None,
+               load_shared_name_suffix=None,
+               wrapper_function=None,
+               on_load=None):
+    """Scans `library` without importing any function.
+
+    Args:
+      library: FunctionDefLibrary proto message. Its FunctionDefs are mutated
+        in-place when they are imported.
+      saved_object_graph: SavedObjectGraph proto message. If not passed in,
+        concrete function structured signatures and outputs will not be set.
+      load_shared_name_suffix: If specified, used to uniquify shared names.
+        Otherwise, a unique name is generated.
+      wrapper_function: An object that will be wrapped on newly created
+        functions.
+      on_load: Optional callable, called with the original name and the
+        `ConcreteFunction` of each function once it has been imported.
+    """
+    self._function_defs = {
+        fdef.signature.name: fdef for fdef in library.function}
+    self._saved_object_graph = saved_object_graph
+    self._wrapper_function = wrapper_function
+    self._on_load = on_load
+    self._functions = {}
+    self._renamed_functions = {}
+    self._loaded_gradients = {}
+    self._lock = threading.RLock()
+
+    # Our graph building code currently requires functions to be registered
+    # with some tf.Graph in order to import functions using the
+    # op-name-is-function-name calling convention. To avoid leaking memory into
+    # the global default graph when executing eagerly, we create a temporary
+    # Graph.
+    #
+    # TODO(b/205023033): Make this Graph creation unnecessary when executing
+    # eagerly by fixing function_def_to_graph_def.
+    if ops.executing_eagerly_outside_functions():
+      self._graph = ops.Graph()
+    else:
+      self._graph = ops.get_default_graph()
+
+    if load_shared_name_suffix is None:
+      load_shared_name_suffix = "_load_{}".format(ops.uid())
+    self._load_shared_name_suffix = load_shared_name_suffix
+
+    # Custom gradient functions must be re-registered under new UIDs.
+    library_gradient_names = {}  # Maps old op type to old function name
+    self._new_gradient_op_types = {}  # Maps old gradient op type to new op type
+    self._gradients_to_register = {}  # Maps old function name to new op type
+    for gdef in library.registered_gradients:
+      if gdef.registered_op_type:
+        new_op_type = custom_gradient.generate_name()
+        old_op_type = compat.as_bytes(gdef.registered_op_type)
+
+        library_gradient_names[old_op_type] = gdef.gradient_func
+        self._new_gradient_op_types[old_op_type] = new_op_type
+        self._gradients_to_register[gdef.gradient_func] = new_op_type
+
+    library_function_names = set(self._function_defs)
+    self._function_deps = {}
+    for fdef in library.function:
+      self._function_deps[fdef.signature.name] = _list_function_deps(
+          fdef, library_function_names, library_gradient_names)
+
+  def __getitem__(self, name):
+    function = self._functions.get(name)
+    if function is None:
+      if name not in self._function_defs:
+        raise KeyError(name)
+      # Functions are imported in the context the library was created in, even
+      # when they are first looked up while building a graph.
+      with ops.init_scope():
+        self._load([name])
+      function = self._functions[name]
+    return function
+
+  def __contains__(self, name):
+    return name in self._function_defs
+
+  def __iter__(self):
+    return iter(self._function_defs)
+
+  def __len__(self):
+    return len(self._function_defs)
+
+  def is_loaded(self, name):
+    """Returns whether the function `name` has already been imported."""
+    return name in self._functions
+
+  def num_loaded(self):
+    """Returns the number of functions imported so far."""
+    return len(self._functions)
+
+  def load_all(self):
+    """Imports all functions of the library."""
+    self._load(self._function_defs)
+
+  def _load(self, names):
+    """Imports the functions in `names` and their transitive dependencies."""
+    with self._lock:
+      pending = set()
+      to_visit = [name for name in names if name not in self._functions]
+      while to_visit:
+        name = to_visit.pop()
+        if (name in pending or name in self._functions or
+            name not in self._function_deps):
+          continue
+        pending.add(name)
+        to_visit.extend(self._function_deps[name])
+      if not pending:
+        return
+      function_defs = [
+          fdef for name, fdef in self._function_defs.items()
+          if name in pending]
+      function_deps = {
+          name: self._function_deps[name] - set(self._functions)
+          for name in pending}
+      for fdef in _sort_function_defs(function_defs, function_deps):
+        self._load_function_def(fdef)
+
+  def _load_function_def(self, fdef):
+    """Imports a single FunctionDef whose dependencies are already imported."""
+    orig_name = _fix_fdef_in_place(fdef, self._functions,
+                                   self._load_shared_name_suffix,
+                                   self._new_gradient_op_types)
 
     # Setup function signatures and outputs
     #
@@ -435,13 +540,13 @@ def load_function_def_library(library,
     # restore time, so we must instead pass them to the FuncGraph explicitly.
     structured_input_signature = None
     structured_outputs = None
-    if (saved_object_graph is not None and
-        orig_name in saved_object_graph.concrete_functions):
+    if (self._saved_object_graph is not None and
+        orig_name in self._saved_object_graph.concrete_functions):
       # TODO(b/204324043): Offload the deserialization of the protos to the
       # first class objects by passing the actual protos. This is blocked on
       # importing `nested_structure_coder` in function.py causing a circular
       # dependency.
-      proto = saved_object_graph.concrete_functions[orig_name]
+      proto = self._saved_object_graph.concrete_functions[orig_name]
       structured_input_signature = nested_structure_coder.decode_proto(
           proto.canonicalized_input_signature)
       structured_outputs = nested_structure_coder.decode_proto(
@@ -452,17 +557,18 @@ def load_function_def_library(library,
     # extra function definitions are a no-op since they already imported as a
     # function before and passed in explicitly (due to the topologic sort
     # import).
-    with graph.as_default():
+    with self._graph.as_default():
       func_graph = function_def_lib.function_def_to_graph(
           fdef,
           structured_input_signature=structured_input_signature,
           structured_outputs=structured_outputs)
     # Restores gradients for function-call ops (not the same as ops that use
     # custom gradients)
-    _restore_gradient_functions(func_graph, renamed_functions, loaded_gradients)
+    _restore_gradient_functions(func_graph, self._renamed_functions,
+                                self._loaded_gradients)
 
-    for dep in function_deps[orig_name]:
-      functions[dep].add_to_graph(func_graph)
+    for dep in self._function_deps[orig_name]:
+      self._functions[dep].add_to_graph(func_graph)
 
     # We do not initialize the new ConcreteFunction's function_spec and/or
     # arg_keywords here (which are used to parse the structured and flat
@@ -481,24 +587,25 @@ def load_function_def_library(library,
     )
     func = function_lib.ConcreteFunction.from_func_graph(
         func_graph, function_type, attrs=fdef.attr)
-    if wrapper_function:
-      func = wrapper_function(func)
-    func.add_to_graph(graph)
+    if self._wrapper_function:
+      func = self._wrapper_function(func)
+    func.add_to_graph(self._graph)
 
-    functions[orig_name] = func
-    renamed_functions[func.name] = func
+    self._functions[orig_name] = func
+    self._renamed_functions[func.name] = func
     if any(op.type == "TRTEngineOp" for op in func_graph.get_operations()):
       # TODO(b/150708051): Remove this hack once TensorRT SavedModel integration
       # is fixed. Currently it's leaking memory to maintain bug compatibility
       # with previous behavior.
       func.add_to_graph(ops.get_default_graph())
 
-    if orig_name in gradients_to_register:
-      gradient_op_type = gradients_to_register[orig_name]
-      loaded_gradients[compat.as_bytes(gradient_op_type)] = func
+    if orig_name in self._gradients_to_register:
+      gradient_op_type = self._gradients_to_register[orig_name]
+      self._loaded_gradients[compat.as_bytes(gradient_op_type)] = func
       ops.RegisterGradient(gradient_op_type)(_gen_gradient_func(func))
 
-  return functions
+    if self._on_load is not None:
+      self._on_load(orig_name, func)
 
 
 def _gen_gradient_func(func):
@@ -556,8 +663,8 @@ def _restore_gradient_functions(func_graph, renamed_functions,
         grad_fn._arg_keywords = [inp.name for inp in op.inputs]  # pylint: disable=protected-access
 
 
-def _sort_function_defs(library, function_deps):
-  """Return a topologic sort of FunctionDefs in a library."""
+def _sort_function_defs(function_defs, function_deps):
+  """Return a topologic sort of FunctionDefs."""
   edges = collections.defaultdict(list)
   in_count = collections.defaultdict(lambda: 0)
 
@@ -567,7 +674,7 @@ def _sort_function_defs(library, function_deps):
       in_count[fname] += 1
   ready = [
       fdef.signature.name
-      for fdef in library.function
+      for fdef in function_defs
       if in_count[fdef.signature.name] == 0
   ]
   output = []
@@ -579,12 +686,12 @@ def _sort_function_defs(library, function_deps):
       if not in_count[dest]:
         ready.append(dest)
 
-  if len(output) != len(library.function):
+  if len(output) != len(function_defs):
     failed_to_resolve = sorted(set(in_count.keys()) - set(output))
     raise ValueError("There is a cyclic dependency between functions. ",
                      f"Could not resolve {failed_to_resolve}.")
 
-  reverse = {fdef.signature.name: fdef for fdef in library.function}
+  reverse = {fdef.signature.name: fdef for fdef in function_defs}
   return [reverse[x] for x in output]
 
 
@@ -18,6 +18,7 @@ import collections
 import functools
 import os
 import sys
+import threading
 
 from absl import logging
 
@@ -32,6 +33,7 @@ from tensorflow.python.distribute import distribute_utils
 from tensorflow.python.distribute import values_util
 from tensorflow.python.eager import context
 from tensorflow.python.eager import function
+from tensorflow.python.eager import monitoring
 from tensorflow.python.eager.polymorphic_function import saved_model_utils as function_saved_model_utils
 from tensorflow.python.framework import config
 from tensorflow.python.framework import constant_op
@@ -77,6 +79,23 @@ _BUILT_IN_REGISTRATIONS = {
     "resource": resource.RestoredResource,
     "constant": function_saved_model_utils.TrackableConstant}
 
+_load_phase_duration_milliseconds = monitoring.Sampler(
+    "/tensorflow/api/saved_model/load_phase_duration_milliseconds",
+    monitoring.ExponentialBuckets(scale=1, growth_factor=2, bucket_count=26),
+    "Track the time (in milliseconds) spent in each phase of loading a "
+    "SavedModel.", "phase")
+
+_lazily_loaded_functions = monitoring.Counter(
+    "/tensorflow/api/saved_model/lazily_loaded_functions",
+    "Number of function objects created on first access when loading with "
+    "`experimental_lazy_function_loading`.")
+
+
+# Records the duration of a load phase in milliseconds.
+_record_load_phase = functools.partial(
+    saved_model_utils.record_duration_milliseconds,
+    _load_phase_duration_milliseconds)
+
 
 def _unused_handle():
   """Returns a placeholder as a handle that is not supposed to be accessed."""
@@ -146,6 +165,32 @@ class _WrapperFunction(function.ConcreteFunction):
     return super()._call_flat(args, captured_inputs)
 
 
+class _UserObjectWithLazyChildren(autotrackable.AutoTrackable):
+  """A revived user object whose function attributes are created on access."""
+
+  def _add_lazy_child(self, name, load_fn):
+    """Adds an attribute which is created by calling `load_fn` when accessed."""
+    # Bypasses `AutoTrackable.__setattr__`, which would track the dict.
+    self.__dict__.setdefault("_self_lazy_children", {})[name] = load_fn
+
+  def __getattr__(self, name):
+    # Only called when the regular attribute lookup fails.
+    lazy_children = self.__dict__.get("_self_lazy_children", {})
+    load_fn = lazy_children.get(name)
+    if load_fn is None:
+      raise AttributeError(
+          f"{type(self).__name__!r} object has no attribute {name!r}")
+    value = load_fn()
+    lazy_children.pop(name, None)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return sorted(
+        set(super().__dir__()).union(
+            self.__dict__.get("_self_lazy_children", ())))
+
+
 class Loader(object):
   """Helper class to load an object-based SavedModel."""
 
@@ -157,11 +202,26 @@ class Loader(object):
         node.name: node.attr for node in meta_graph.graph_def.node}
     self._proto = object_graph_proto
     self._export_dir = export_dir
-    self._concrete_functions = (
-        function_deserialization.load_function_def_library(
+    # With lazy function loading, function nodes which nothing else depends on
+    # are only created when first accessed. Maps their node ids to protos.
+    self._lazy_function_loading = (
+        save_options.experimental_lazy_function_loading)
+    self._deferred_nodes = {}
+    self._deferred_nodes_lock = threading.RLock()
+    self._nodes = None
+    with _record_load_phase("function_library"):
+      if self._lazy_function_loading:
+        self._concrete_functions = function_deserialization.LazyFunctionLibrary(
             library=meta_graph.graph_def.library,
             saved_object_graph=self._proto,
-            wrapper_function=_WrapperFunction))
+            wrapper_function=_WrapperFunction,
+            on_load=self._on_function_loaded)
+      else:
+        self._concrete_functions = (
+            function_deserialization.load_function_def_library(
+                library=meta_graph.graph_def.library,
+                saved_object_graph=self._proto,
+                wrapper_function=_WrapperFunction))
     # Store a set of all concrete functions that have been set up with
     # captures.
     self._restored_concrete_functions = set()
@@ -220,15 +280,18 @@ class Loader(object):
     # Order all nodes or filtered nodes using the dependencies.
     self._ordered_node_ids = self._generate_ordered_node_ids()
 
-    self._load_all()
+    with _record_load_phase("object_graph"):
+      self._load_all()
 
     if not save_options.experimental_skip_checkpoint:
-      self._restore_checkpoint()
-    for node in self._nodes:
-      if isinstance(node, resource.CapturableResource):
-        init_op = node._initialize()  # pylint: disable=protected-access
-        if not context.executing_eagerly():
-          ops.add_to_collection(ops.GraphKeys.TABLE_INITIALIZERS, init_op)
+      with _record_load_phase("checkpoint"):
+        self._restore_checkpoint()
+    with _record_load_phase("resource_initialization"):
+      for node in self._nodes:
+        if isinstance(node, resource.CapturableResource):
+          init_op = node._initialize()  # pylint: disable=protected-access
+          if not context.executing_eagerly():
+            ops.add_to_collection(ops.GraphKeys.TABLE_INITIALIZERS, init_op)
 
   def _convert_node_paths_to_ints(self):
     """Maps all string node paths in node_filters to the int node ids."""
@@ -329,6 +392,9 @@ class Loader(object):
     """Restores the checkpoint-related save/restore functions to all nodes."""
     temp_session = [None]
     for node_id, proto in self._iter_all_nodes():
+      if node_id in self._deferred_nodes:
+        # Functions have no saveable objects.
+        continue
       node = self.get(node_id)
       if proto.saveable_objects.keys() == {
           trackable_utils.SERIALIZE_TO_TENSORS_NAME}:
@@ -355,6 +421,9 @@ class Loader(object):
   def _load_edges(self):
     """Adds edges from objects to other objects and functions."""
     for node_id, object_proto in self._iter_all_nodes():
+      if node_id in self._deferred_nodes:
+        # Edges are added when the node is created.
+        continue
       self._add_object_graph_edges(object_proto, node_id)
 
     # If root object isn't loaded, then create edges from the root for
@@ -362,7 +431,7 @@ class Loader(object):
     if self._filtered_nodes is not None and 0 not in self._filtered_nodes:
       root = self.get(0)
       for node_path in self._node_filters:
-        loaded_node = self._nodes[self._node_path_to_id[node_path]]
+        loaded_node = self.get(self._node_path_to_id[node_path])
         path = node_path.split(".")
         current_node = root
         for name in path[1:-1]:
@@ -378,7 +447,14 @@ class Loader(object):
     setter = self._node_setters[node_id]
 
     for reference in proto.children:
-      setter(obj, reference.local_name, self._nodes[reference.node_id])
+      if (reference.node_id in self._deferred_nodes and
+          reference.local_name != "__call__" and
+          hasattr(type(obj), "_add_lazy_child")):
+        obj._add_lazy_child(  # pylint: disable=protected-access
+            reference.local_name, functools.partial(self.get,
+                                                    reference.node_id))
+        continue
+      setter(obj, reference.local_name, self.get(reference.node_id))
       # Note: if an object has an attribute `__call__` add a class method
       # that allows `obj()` syntax to work. This is done per-instance to
       # allow `callable` to be used to find out if an object is callable.
@@ -390,6 +466,16 @@ class Loader(object):
     for name in concrete_function_names:
       if name in self._restored_concrete_functions:
         continue
+      if (self._lazy_function_loading and
+          not self._concrete_functions.is_loaded(name)):
+        # Set up by `_on_function_loaded` once the function is imported.
+        continue
+      self._setup_function_captures(name, self._nodes)
+
+  def _on_function_loaded(self, name, concrete_function):
+    """Sets up the captures of a function imported after the nodes exist."""
+    del concrete_function
+    if self._nodes is not None and name in self._proto.concrete_functions:
       self._setup_function_captures(name, self._nodes)
 
   def _setup_function_captures(self, concrete_function_name, nodes):
@@ -498,12 +584,46 @@ class Loader(object):
     for node_id in self._ordered_node_ids:
       yield node_id, self._proto.nodes[node_id]
 
+  def _find_deferrable_function_nodes(self):
+    """Returns the ids of function nodes which can be created on first access.
+
+    These are the `function` and `bare_concrete_function` nodes which are not
+    dependencies of any other node, so they are only reachable as children.
+    """
+    if not self._lazy_function_loading:
+      return set()
+    candidates = set()
+    required = set()
+    for node_id, proto in self._iter_all_nodes():
+      required.update(self._get_node_dependencies(proto).values())
+      if (proto.WhichOneof("kind") in ("function", "bare_concrete_function")
+          and registration.get_registered_class(proto.registered_name) is None
+          and self._loaded_nodes.get(node_id) is None):
+        candidates.add(node_id)
+    return candidates - required
+
+  def _load_deferred_node(self, node_id):
+    """Creates a node that was deferred by lazy function loading."""
+    with self._deferred_nodes_lock:
+      proto = self._deferred_nodes.get(node_id)
+      if proto is None:
+        # Already created, e.g. by another thread.
+        return
+      with _record_load_phase("lazy_function"), ops.init_scope():
+        node, setter = self._recreate(proto, node_id, self._nodes)
+      self._nodes[node_id] = node
+      self._node_setters[node_id] = setter
+      del self._deferred_nodes[node_id]
+      self._add_object_graph_edges(proto, node_id)
+      _lazily_loaded_functions.get_cell().increase_by(1)
+
   def _load_nodes(self):
     """Load all saved objects."""
     # `nodes` maps from node ids to recreated objects
     # `node_setters` maps from node ids to setter functions
     # (same signature as setattr) for setting children.
     nodes, node_setters = self._initialize_loaded_nodes()
+    deferrable_node_ids = self._find_deferrable_function_nodes()
 
     # Figure out which objects are slot variables. These objects are created
     # with Optimizer.add_slot rather than _recreate_variable.
@@ -520,6 +640,8 @@ class Loader(object):
     for node_id, proto in self._iter_all_nodes():
       if nodes.get(node_id) is not None:
         continue
+      elif node_id in deferrable_node_ids:
+        self._deferred_nodes[node_id] = proto
       elif node_id in slot_variable_node_ids:
         # Use the public Optimizer interface when creating slot variables.
         optimizer_node_id, slot_variable_proto = slot_variable_node_ids[node_id]
@@ -606,7 +728,10 @@ class Loader(object):
     for key in debug_info.traces:
       node, func = key.split("@")
       new_func = ""
-      if func in self._concrete_functions:
+      if func in self._concrete_functions and not (
+          self._lazy_function_loading and
+          not self._concrete_functions.is_loaded(func)):
+        # Functions that have not been imported yet have no new name.
         new_func = self._concrete_functions[func].function_def.signature.name
       output_debug_info.traces[node + "@" + new_func].CopyFrom(
           debug_info.traces[key])
@@ -615,6 +740,8 @@ class Loader(object):
   def get(self, node_id):
     if isinstance(node_id, str):
       node_id = self._node_path_to_id[node_id]
+    if node_id in self._deferred_nodes:
+      self._load_deferred_node(node_id)
     return self._nodes[node_id]
 
   def _recreate(self, proto, node_id, nodes):
@@ -710,8 +837,12 @@ class Loader(object):
     # Note: each user object has its own class. This allows making each one
     # individually callable by adding a `__call__` method to the classes of
     # the objects instances that have a `__call__` property.
+    if self._lazy_function_loading:
+      base_class = _UserObjectWithLazyChildren
+    else:
+      base_class = autotrackable.AutoTrackable
 
-    class _UserObject(autotrackable.AutoTrackable):
+    class _UserObject(base_class):
       pass
 
     return _UserObject(), setattr
@@ -0,0 +1,312 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""A process-level cache of SavedModels loaded with `tf.saved_model.load`.
+
+Entries are keyed by the singleprint of the SavedModel (see
+`tf.saved_model.experimental.Fingerprint`) together with the load tags and
+`tf.saved_model.LoadOptions`, so re-exports of the same model to different
+directories share an entry, while a re-export with different variable values
+does not.
+
+Example usage:
+
+```python
+with load_cache.get_default_cache().load(export_dir) as cached:
+  outputs = cached.model.signatures["serving_default"](x)
+```
+"""
+
+import collections
+import copy
+import threading
+
+from absl import logging
+
+from tensorflow.python.checkpoint import graph_view
+from tensorflow.python.checkpoint import util as checkpoint_util
+from tensorflow.python.eager import context
+from tensorflow.python.ops import resource_variable_ops
+from tensorflow.python.saved_model import fingerprinting_utils
+from tensorflow.python.saved_model import load
+from tensorflow.python.saved_model import load_options
+from tensorflow.python.training.saving import saveable_object_util
+from tensorflow.python.util import nest
+
+
+def _list_objects(root):
+  return checkpoint_util.list_objects(graph_view.ObjectGraphView(root))
+
+
+def _variable_bytes(root):
+  """Returns the number of bytes held by the variables reachable from root."""
+  num_bytes = 0
+  for obj in _list_objects(root):
+    if (isinstance(obj, resource_variable_ops.BaseResourceVariable) and
+        obj.shape.is_fully_defined()):
+      num_bytes += obj.shape.num_elements() * obj.dtype.size
+  return num_bytes
+
+
+def _copy_state(source, target):
+  """Copies the checkpointed state of `source` into `target`.
+
+  Args:
+    source: A loaded SavedModel object.
+    target: An object loaded from the same SavedModel without restoring its
+      checkpoint.
+
+  Returns:
+    False if some object in `source` only supports legacy `SaveableObject`s,
+    whose state cannot be copied. The caller must then restore `target` from
+    the checkpoint.
+
+  Raises:
+    ValueError: If `source` and `target` do not have the same structure.
+  """
+  source_objects = _list_objects(source)
+  target_objects = _list_objects(target)
+  if len(source_objects) != len(target_objects):
+    raise ValueError(
+        "Cannot copy the state of a SavedModel object with "
+        f"{len(source_objects)} trackable objects to one with "
+        f"{len(target_objects)}.")
+  pairs = []
+  for source_object, target_object in zip(source_objects, target_objects):
+    if saveable_object_util.trackable_has_serialize_to_tensor(source_object):
+      pairs.append((source_object, target_object))
+    elif source_object._gather_saveables_for_checkpoint():  # pylint: disable=protected-access
+      return False
+  for source_object, target_object in pairs:
+    tensors = source_object._serialize_to_tensors()  # pylint: disable=protected-access
+    if tensors:
+      target_object._restore_from_tensors(tensors)  # pylint: disable=protected-access
+  return True
+
+
+def _options_key(options):
+  return tuple(getattr(options, name) for name in options.__slots__)
+
+
+class CachedModel(object):
+  """A reference to a model held by a `LoadedModelCache`.
+
+  Call `release()`, or use the reference as a context manager, once the model
+  is no longer used so that the cache can evict it.
+  """
+
+  def __init__(self, cache, key, model):
+    self._cache = cache
+    self._key = key
+    self._model = model
+    self._released = False
+
+  @property
+  def model(self):
+    """The loaded object, as returned by `tf.saved_model.load`."""
+    if self._released:
+      raise ValueError("This model reference has already been released.")
+    return self._model
+
+  def release(self):
+    """Releases this reference. Calling it more than once has no effect."""
+    if not self._released:
+      self._released = True
+      self._model = None
+      self._cache._release(self._key)  # pylint: disable=protected-access
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.release()
+
+
+class _Entry(object):
+  """A loaded model in the cache."""
+
+  __slots__ = ("model", "num_bytes", "ref_count", "lock")
+
+  def __init__(self):
+    self.model = None
+    self.num_bytes = 0
+    self.ref_count = 0
+    # Held while the model is loaded, so that concurrent misses on the same
+    # key load it once.
+    self.lock = threading.Lock()
+
+
+class LoadedModelCache(object):
+  """Caches loaded SavedModels, with reference counting and LRU eviction.
+
+  Models are shared between all `load()` calls with the same key if
+  `share_variables=True`, so their variables are shared too. With
+  `share_variables=False`, each call returns a new object whose variables are
+  copied from a private cached copy of the model instead of being read from the
+  checkpoint again.
+
+  Entries which are not referenced are evicted in least-recently-used order
+  when the variables of all cached models take more than `max_bytes`.
+  Referenced entries are never evicted.
+  """
+
+  def __init__(self, max_bytes=None):
+    """Creates a cache.
+
+    Args:
+      max_bytes: Optional bound on the total size of the variables of cached
+        models.
+    """
+    if max_bytes is not None and max_bytes < 0:
+      raise ValueError(f"max_bytes must be non-negative, got {max_bytes}.")
+    self._max_bytes = max_bytes
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  @property
+  def total_bytes(self):
+    """The size of the variables of all cached models."""
+    with self._lock:
+      return sum(entry.num_bytes for entry in self._entries.values())
+
+  def __len__(self):
+    with self._lock:
+      return sum(
+          1 for entry in self._entries.values() if entry.model is not None)
+
+  def load(self, export_dir, tags=None, options=None, share_variables=True):
+    """Loads a SavedModel, reusing a cached copy if possible.
+
+    Args:
+      export_dir: The SavedModel directory to load from.
+      tags: A tag or sequence of tags identifying the MetaGraph to load, see
+        `tf.saved_model.load`.
+      options: `tf.saved_model.LoadOptions` object that specifies options for
+        loading.
+      share_variables: If True, all references to the same key share one
+        loaded object. If False, every call returns a new object whose state is
+        copied from the cached one.
+
+    Returns:
+      A `CachedModel`.
+
+    Raises:
+      RuntimeError: If eager execution is disabled.
+    """
+    if not context.executing_eagerly_outside_functions():
+      raise RuntimeError(
+          "LoadedModelCache is only supported when eager execution is "
+          "enabled.")
+    options = options or load_options.LoadOptions()
+    if tags is not None:
+      tags = frozenset(tags) if isinstance(tags, set) else frozenset(
+          nest.flatten(tags))
+    key = (fingerprinting_utils.singleprint_from_saved_model(export_dir), tags,
+           _options_key(options), share_variables)
+
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        entry = self._entries[key] = _Entry()
+      else:
+        self._entries.move_to_end(key)
+      if share_variables:
+        # Taken before loading so the entry can't be evicted meanwhile.
+        entry.ref_count += 1
+
+    loaded = False
+    try:
+      with entry.lock:
+        if entry.model is None:
+          entry.model = load.load(export_dir, tags=tags, options=options)
+          entry.num_bytes = _variable_bytes(entry.model)
+          logging.info("Cached SavedModel %s (%d bytes of variables).",
+                       export_dir, entry.num_bytes)
+          hit = False
+        else:
+          hit = True
+      loaded = True
+    finally:
+      with self._lock:
+        if loaded:
+          if hit:
+            self.hits += 1
+          else:
+            self.misses += 1
+        else:
+          if share_variables:
+            entry.ref_count -= 1
+          if entry.model is None and self._entries.get(key) is entry:
+            del self._entries[key]
+
+    self._evict()
+    if share_variables:
+      return CachedModel(self, key, entry.model)
+    return CachedModel(
+        self, None, self._copy_model(entry.model, export_dir, tags, options))
+
+  def _copy_model(self, model, export_dir, tags, options):
+    """Returns a new object with the state of the cached `model`."""
+    copy_options = copy.copy(options)
+    copy_options.experimental_skip_checkpoint = True
+    model_copy = load.load(export_dir, tags=tags, options=copy_options)
+    if not _copy_state(model, model_copy):
+      logging.info(
+          "SavedModel %s has objects whose state cannot be copied, restoring "
+          "them from the checkpoint.", export_dir)
+      model_copy = load.load(export_dir, tags=tags, options=options)
+    return model_copy
+
+  def _release(self, key):
+    if key is None:
+      return
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        entry.ref_count -= 1
+    self._evict()
+
+  def _evict(self):
+    """Evicts unreferenced entries until the cache fits in `max_bytes`."""
+    if self._max_bytes is None:
+      return
+    with self._lock:
+      total_bytes = sum(entry.num_bytes for entry in self._entries.values())
+      for key, entry in list(self._entries.items()):
+        if total_bytes <= self._max_bytes:
+          break
+        if entry.ref_count or entry.model is None:
+          continue
+        del self._entries[key]
+        total_bytes -= entry.num_bytes
+        self.evictions += 1
+
+  def clear(self):
+    """Evicts all unreferenced entries."""
+    with self._lock:
+      for key, entry in list(self._entries.items()):
+        if not entry.ref_count and entry.model is not None:
+          del self._entries[key]
+          self.evictions += 1
+
+
+_default_cache = LoadedModelCache()
+
+
+def get_default_cache():
+  """Returns the process-level `LoadedModelCache`."""
+  return _default_cache
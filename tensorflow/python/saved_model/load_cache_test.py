@@ -0,0 +1,129 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for LoadedModelCache."""
+
+import os
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.eager import test
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import tensor_spec
+from tensorflow.python.module import module
+from tensorflow.python.ops import variables
+from tensorflow.python.saved_model import load_cache
+from tensorflow.python.saved_model import load_options
+from tensorflow.python.saved_model import save
+
+
+class LoadedModelCacheTest(test.TestCase):
+
+  def _save_model(self, name, value=1.0, size=4, root=None):
+    if root is None:
+      root = module.Module()
+      root.v = variables.Variable([value] * size)
+      root.add = def_function.function(
+          lambda x: root.v + x,
+          input_signature=[tensor_spec.TensorSpec([size], dtypes.float32)])
+    path = os.path.join(self.get_temp_dir(), name)
+    save.save(root, path)
+    return path
+
+  def test_hits_share_model(self):
+    path = self._save_model("model")
+    cache = load_cache.LoadedModelCache()
+    with cache.load(path) as first, cache.load(path) as second:
+      self.assertIs(first.model, second.model)
+      first.model.v.assign([2.0] * 4)
+      self.assertAllEqual([2.0] * 4, second.model.v)
+    self.assertEqual(1, cache.misses)
+    self.assertEqual(1, cache.hits)
+    self.assertLen(cache, 1)
+    self.assertEqual(16, cache.total_bytes)
+
+  def test_same_model_in_different_directories(self):
+    root = module.Module()
+    root.v = variables.Variable([1.0] * 4)
+    first_path = self._save_model("first", root=root)
+    second_path = self._save_model("second", root=root)
+    other_path = self._save_model("other", value=3.0)
+    cache = load_cache.LoadedModelCache()
+    with cache.load(first_path) as first, cache.load(second_path) as second:
+      self.assertIs(first.model, second.model)
+      with cache.load(other_path) as other:
+        self.assertIsNot(first.model, other.model)
+        self.assertAllEqual([3.0] * 4, other.model.v)
+
+  def test_options_are_part_of_the_key(self):
+    path = self._save_model("model")
+    cache = load_cache.LoadedModelCache()
+    options = load_options.LoadOptions(allow_partial_checkpoint=True)
+    with cache.load(path) as first, cache.load(path, options=options) as second:
+      self.assertIsNot(first.model, second.model)
+      with cache.load(path, tags="serve") as third:
+        self.assertIsNot(first.model, third.model)
+    self.assertEqual(3, cache.misses)
+
+  def test_unshared_variables(self):
+    path = self._save_model("model")
+    cache = load_cache.LoadedModelCache()
+    with cache.load(path, share_variables=False) as first:
+      first.model.v.assign([5.0] * 4)
+      with cache.load(path, share_variables=False) as second:
+        self.assertIsNot(first.model, second.model)
+        self.assertAllEqual([1.0] * 4, second.model.v)
+        self.assertAllEqual([2.0] * 4,
+                            second.model.add(constant_op.constant([1.0] * 4)))
+    self.assertEqual(1, cache.misses)
+    self.assertEqual(1, cache.hits)
+
+  def test_eviction(self):
+    paths = [
+        self._save_model("model_%d" % i, value=float(i), size=4)
+        for i in range(3)
+    ]
+    # Room for the variables of two models.
+    cache = load_cache.LoadedModelCache(max_bytes=32)
+    first = cache.load(paths[0])
+    cache.load(paths[1]).release()
+    cache.load(paths[2]).release()
+    # The referenced model is kept, the least recently used one is evicted.
+    self.assertLen(cache, 2)
+    self.assertEqual(1, cache.evictions)
+    with cache.load(paths[0]) as again:
+      self.assertIs(first.model, again.model)
+    self.assertEqual(1, cache.hits)
+    first.release()
+    first.release()
+    with self.assertRaisesRegex(ValueError, "released"):
+      first.model  # pylint: disable=pointless-statement
+    cache.clear()
+    self.assertEmpty(cache)
+    self.assertEqual(0, cache.total_bytes)
+
+  def test_failed_load_is_not_cached(self):
+    path = self._save_model("model")
+    cache = load_cache.LoadedModelCache()
+    with self.assertRaises(ValueError):
+      cache.load(path, tags="bogus")
+    self.assertEmpty(cache)
+
+  def test_default_cache(self):
+    self.assertIs(load_cache.get_default_cache(),
+                  load_cache.get_default_cache())
+
+
+if __name__ == "__main__":
+  test.main()
@@ -29,14 +29,16 @@ class LoadOptions(object):
   # Define object attributes in __slots__ for improved memory and performance.
   __slots__ = ("allow_partial_checkpoint", "experimental_io_device",
                "experimental_skip_checkpoint", "experimental_variable_policy",
-               "experimental_load_function_aliases")
+               "experimental_load_function_aliases",
+               "experimental_lazy_function_loading")
 
   def __init__(self,
                allow_partial_checkpoint=False,
                experimental_io_device=None,
                experimental_skip_checkpoint=False,
                experimental_variable_policy=None,
-               experimental_load_function_aliases=False):
+               experimental_load_function_aliases=False,
+               experimental_lazy_function_loading=False):
     """Creates an object that stores options for SavedModel loading.
 
     *When to set `allow_partial_checkpoint=True`?*
@@ -108,6 +110,14 @@ class LoadOptions(object):
       experimental_load_function_aliases: bool. Defaults to `False`. If set to
         `True`, a `function_aliases` attribute will be added to the loaded
         SavedModel object.
+      experimental_lazy_function_loading: bool. Defaults to `False`. If set to
+        `True`, functions are only imported from the function library when
+        they are first used: `tf.function` attributes of loaded objects and
+        the entries of `.signatures` are created on first access, together
+        with the library functions they call. This reduces the load time of
+        SavedModels with many functions of which only a few are used, e.g.
+        when serving a single signature. Functions needed to restore the
+        checkpoint or to create other objects are still loaded eagerly.
 
     Example:
 
@@ -123,3 +133,4 @@ class LoadOptions(object):
     self.experimental_variable_policy = (
         save_options.VariablePolicy.from_obj(experimental_variable_policy))
     self.experimental_load_function_aliases = experimental_load_function_aliases
+    self.experimental_lazy_function_loading = experimental_lazy_function_loading
@@ -3532,6 +3532,94 @@ class DeferredInitModuleVariablesTest(test.TestCase, parameterized.TestCase):
     self.assertAllEqual(imported(constant_op.constant(["d", "b"])), [3, 1])
 
 
+class LazyFunctionLoadingTest(test.TestCase):
+
+  def _save_module(self):
+    root = module.Module()
+    root.v = variables.Variable(2.0)
+    spec = tensor_spec.TensorSpec(None, dtypes.float32)
+    root.scale = def_function.function(lambda x: root.v * x,
+                                       input_signature=[spec])
+    root.shift = def_function.function(lambda x: root.v + x,
+                                       input_signature=[spec])
+    root.child = module.Module()
+    root.child.negate = def_function.function(lambda x: -x,
+                                              input_signature=[spec])
+    path = tempfile.mkdtemp(prefix=self.get_temp_dir())
+    save.save(
+        root,
+        path,
+        signatures={
+            "scale": root.scale.get_concrete_function(),
+            "shift": root.shift.get_concrete_function(),
+        })
+    return path
+
+  def _lazy_load(self, path):
+    return load.load(
+        path,
+        options=load_options.LoadOptions(
+            experimental_lazy_function_loading=True))
+
+  def test_functions_created_on_access(self):
+    path = self._save_module()
+    num_lazily_loaded = load._lazily_loaded_functions.get_cell().value()
+    imported = self._lazy_load(path)
+
+    self.assertNotIn("scale", vars(imported))
+    self.assertIn("scale", dir(imported))
+    self.assertEqual(num_lazily_loaded,
+                     load._lazily_loaded_functions.get_cell().value())
+    self.assertAllEqual(6.0, imported.scale(constant_op.constant(3.0)))
+    self.assertIn("scale", vars(imported))
+    self.assertEqual(num_lazily_loaded + 1,
+                     load._lazily_loaded_functions.get_cell().value())
+    self.assertAllEqual(-1.0, imported.child.negate(constant_op.constant(1.0)))
+    self.assertIs(imported.scale, imported.scale)
+
+    self.assertCountEqual(["scale", "shift"], imported.signatures.keys())
+    self.assertAllEqual(
+        5.0, imported.signatures["shift"](x=constant_op.constant(3.0))
+        ["output_0"])
+    self.assertEqual(num_lazily_loaded + 3,
+                     load._lazily_loaded_functions.get_cell().value())
+    with self.assertRaises(AttributeError):
+      imported.missing  # pylint: disable=pointless-statement
+
+  def test_lazy_functions_in_graph_building(self):
+    imported = self._lazy_load(self._save_module())
+
+    @def_function.function
+    def apply(x):
+      return imported.shift(imported.scale(x))
+
+    self.assertAllEqual(8.0, apply(constant_op.constant(3.0)))
+
+  def test_resave_lazily_loaded_model(self):
+    imported = self._lazy_load(self._save_module())
+    path = tempfile.mkdtemp(prefix=self.get_temp_dir())
+    save.save(imported, path)
+    reloaded = load.load(path)
+    self.assertAllEqual(6.0, reloaded.scale(constant_op.constant(3.0)))
+    self.assertAllEqual(5.0, reloaded.shift(constant_op.constant(3.0)))
+    self.assertAllEqual(-1.0, reloaded.child.negate(constant_op.constant(1.0)))
+    self.assertCountEqual(["scale", "shift"], reloaded.signatures.keys())
+
+  def test_load_phase_metrics(self):
+    path = self._save_module()
+    phases = ("function_library", "object_graph", "checkpoint",
+              "resource_initialization")
+    before = {
+        phase: load._load_phase_duration_milliseconds.get_cell(
+            phase).value().num for phase in phases
+    }
+    load.load(path)
+    for phase in phases:
+      self.assertEqual(
+          before[phase] + 1,
+          load._load_phase_duration_milliseconds.get_cell(phase).value().num)
+
+
 class _TestModel(module.Module):
 
   def __init__(self, rows, cols):
@@ -15,6 +15,8 @@
 """Exports a SavedModel from a Trackable Python object."""
 
 import collections
+from concurrent import futures
+import functools
 import os
 import re
 import sys
@@ -38,6 +40,7 @@ from tensorflow.python.checkpoint import util as checkpoint_util
 from tensorflow.python.eager import context
 from tensorflow.python.eager import def_function
 from tensorflow.python.eager import function as defun
+from tensorflow.python.eager import monitoring
 from tensorflow.python.eager.polymorphic_function import concrete_function as cf
 from tensorflow.python.eager.polymorphic_function import polymorphic_function
 from tensorflow.python.eager.polymorphic_function import saved_model_exported_concrete
@@ -95,6 +98,17 @@ _NUM_DISPLAY_UNTRACED_FUNCTIONS = 5
 # API label for SavedModel metrics.
 _SAVE_V2_LABEL = "save_v2"
 
+_save_phase_duration_milliseconds = monitoring.Sampler(
+    "/tensorflow/api/saved_model/save_phase_duration_milliseconds",
+    monitoring.ExponentialBuckets(scale=1, growth_factor=2, bucket_count=26),
+    "Track the time (in milliseconds) spent in each phase of saving a "
+    "SavedModel.", "phase")
+
+
+# Records the duration of a save phase in milliseconds.
+_record_save_phase = functools.partial(
+    utils_impl.record_duration_milliseconds, _save_phase_duration_milliseconds)
+
 
 class _AugmentedGraphView(graph_view.ObjectGraphView):
   """An extendable graph which also tracks functions attached to objects.
@@ -880,7 +894,8 @@ def _fill_meta_graph_def(
   if save_custom_gradients:
     # Custom gradients functions must be traced in the same context as the
     # when they are registered.
-    _trace_gradient_functions(exported_graph, saveable_view)
+    with _record_save_phase("gradient_functions"):
+      _trace_gradient_functions(exported_graph, saveable_view)
   with exported_graph.as_default():
     # Create initializers for assets and resources.
     for resource_initializer_function in resource_initializers:
@@ -1367,20 +1382,55 @@ def save_and_return_nodes(
   saved_model = saved_model_pb2.SavedModel()
   meta_graph_def = saved_model.meta_graphs.add()
 
-  _, exported_graph, object_saver, asset_info, saved_nodes, node_paths = (
-      _build_meta_graph(obj, signatures, options, meta_graph_def))
-  saved_model.saved_model_schema_version = (
-      constants.SAVED_MODEL_SCHEMA_VERSION)
+  ckpt_options = checkpoint_options.CheckpointOptions(
+      experimental_io_device=options.experimental_io_device,
+      experimental_sharding_callback=options.experimental_sharding_callback)
+
+  def _write_checkpoint(object_saver):
+    path_helpers.get_or_create_variables_dir(export_dir)
+    with _record_save_phase("checkpoint"):
+      object_saver.save(
+          path_helpers.get_variables_path(export_dir), options=ckpt_options)
+
+  # When writing the checkpoint concurrently, the write starts on a background
+  # thread as soon as the functions of the MetaGraph are built. The save
+  # kernels run in C++ without holding the GIL, so the write overlaps with
+  # building and serializing the SavedModel proto on this thread.
+  write_executor = None
+  if (options.experimental_write_checkpoint_concurrently and
+      not experimental_skip_checkpoint and context.executing_eagerly()):
+    write_executor = futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="saved_model_checkpoint")
+  checkpoint_write = None
+
+  def _start_checkpoint_write(object_saver):
+    nonlocal checkpoint_write
+    checkpoint_write = write_executor.submit(_write_checkpoint, object_saver)
+
+  serialized_saved_model = None
+  try:
+    _, exported_graph, object_saver, asset_info, saved_nodes, node_paths = (
+        _build_meta_graph(
+            obj,
+            signatures,
+            options,
+            meta_graph_def,
+            on_functions_built=(
+                _start_checkpoint_write if write_executor else None)))
+    saved_model.saved_model_schema_version = (
+        constants.SAVED_MODEL_SCHEMA_VERSION)
+    if write_executor is not None and not options.experimental_image_format:
+      serialized_saved_model = saved_model.SerializeToString(
+          deterministic=True)
+  finally:
+    # Never leave the write running past this call, even if building failed.
+    if write_executor is not None:
+      write_executor.shutdown(wait=True)
 
   # Write the checkpoint, copy assets into the assets directory, and write out
   # the SavedModel proto itself.
-  if not experimental_skip_checkpoint:
-    path_helpers.get_or_create_variables_dir(export_dir)
-    ckpt_options = checkpoint_options.CheckpointOptions(
-        experimental_io_device=options.experimental_io_device,
-        experimental_sharding_callback=options.experimental_sharding_callback)
-    object_saver.save(
-        path_helpers.get_variables_path(export_dir), options=ckpt_options)
+  if write_executor is None and not experimental_skip_checkpoint:
+    _write_checkpoint(object_saver)
   builder_impl.copy_assets_to_destination_dir(asset_info.asset_filename_map,
                                               export_dir)
   # Note that this needs to be the last file operation when saving the
@@ -1388,6 +1438,8 @@ def save_and_return_nodes(
   # indication that the SavedModel is completely written.
   if context.executing_eagerly():
     try:
+      if checkpoint_write is not None:
+        checkpoint_write.result()  # Raises any error of the write.
       context.async_wait()  # Ensure save operations have completed.
     except errors.NotFoundError as err:
       raise FileNotFoundError(
@@ -1400,17 +1452,20 @@ def save_and_return_nodes(
   # as we build up the C++ API.
   pywrap_saved_model.Save(export_dir)
 
-  if options.experimental_image_format:
-    prefix = file_io.join(
-        compat.as_str(export_dir),
-        "saved_model")
-    proto_splitter.SavedModelSplitter(saved_model).write(prefix)
-  else:
-    path = file_io.join(
-        compat.as_str(export_dir),
-        compat.as_str(constants.SAVED_MODEL_FILENAME_PB))
-    file_io.atomic_write_string_to_file(
-        path, saved_model.SerializeToString(deterministic=True))
+  with _record_save_phase("saved_model_proto"):
+    if options.experimental_image_format:
+      prefix = file_io.join(
+          compat.as_str(export_dir),
+          "saved_model")
+      proto_splitter.SavedModelSplitter(saved_model).write(prefix)
+    else:
+      path = file_io.join(
+          compat.as_str(export_dir),
+          compat.as_str(constants.SAVED_MODEL_FILENAME_PB))
+      if serialized_saved_model is None:
+        serialized_saved_model = saved_model.SerializeToString(
+            deterministic=True)
+      file_io.atomic_write_string_to_file(path, serialized_saved_model)
   fingerprinting_utils.write_fingerprint(export_dir)
 
   # Save debug info, if requested.
@@ -1474,7 +1529,11 @@ def export_meta_graph(
 
 
 def _build_meta_graph_impl(
-    obj, signatures, options: save_options.SaveOptions, meta_graph_def=None
+    obj,
+    signatures,
+    options: save_options.SaveOptions,
+    meta_graph_def=None,
+    on_functions_built=None,
 ):
   """Creates a MetaGraph containing the resources and functions of an object."""
   if ops.inside_function():
@@ -1505,17 +1564,19 @@ def _build_meta_graph_impl(
   augmented_graph_view.set_signature(signature_map, wrapped_functions)
 
   # Use _SaveableView to provide a frozen listing of properties and functions.
-  saveable_view = _SaveableView(augmented_graph_view, options)
+  with _record_save_phase("saveable_view"):
+    saveable_view = _SaveableView(augmented_graph_view, options)
   object_saver = checkpoint.TrackableSaver(augmented_graph_view)
-  asset_info, exported_graph = _fill_meta_graph_def(
-      meta_graph_def=meta_graph_def,
-      saveable_view=saveable_view,
-      signature_functions=signatures,
-      namespace_whitelist=options.namespace_whitelist,
-      save_custom_gradients=options.experimental_custom_gradients,
-      create_saver=not options.experimental_skip_saver,
-      defaults=defaults,
-  )
+  with _record_save_phase("meta_graph"):
+    asset_info, exported_graph = _fill_meta_graph_def(
+        meta_graph_def=meta_graph_def,
+        saveable_view=saveable_view,
+        signature_functions=signatures,
+        namespace_whitelist=options.namespace_whitelist,
+        save_custom_gradients=options.experimental_custom_gradients,
+        create_saver=not options.experimental_skip_saver,
+        defaults=defaults,
+    )
   if options.function_aliases:
     function_aliases = meta_graph_def.meta_info_def.function_aliases
     for alias, func in options.function_aliases.items():
@@ -1535,9 +1596,12 @@ def _build_meta_graph_impl(
             " should be created by tf.function, or concrete functions, or"
             " collections of concrete functions."
         )
-  object_graph_proto = _serialize_object_graph(
-      saveable_view, asset_info.asset_index
-  )
+  if on_functions_built is not None:
+    on_functions_built(object_saver)
+  with _record_save_phase("object_graph"):
+    object_graph_proto = _serialize_object_graph(
+        saveable_view, asset_info.asset_index
+    )
   meta_graph_def.object_graph_def.CopyFrom(object_graph_proto)
   return (
       meta_graph_def,
@@ -1554,6 +1618,7 @@ def _build_meta_graph(
     signatures,
     options: save_options.SaveOptions,
     meta_graph_def: meta_graph_pb2.MetaGraphDef = None,
+    on_functions_built: Callable[[checkpoint.TrackableSaver], None] = None,
 ):
   """Creates a MetaGraph under a save context.
 
@@ -1567,6 +1632,9 @@ def _build_meta_graph(
     options: `tf.saved_model.SaveOptions` object that specifies options for
       saving.
     meta_graph_def: Optional, the MetaGraphDef proto fill.
+    on_functions_built: Optional callable, called with the
+      `checkpoint.TrackableSaver` of `obj` once the functions of the MetaGraph
+      are built and before the SavedObjectGraph is serialized.
 
   Raises:
     AssertionError: If `export_meta_graph` is executing inside a `tf.function`.
@@ -1582,4 +1650,5 @@ def _build_meta_graph(
   """
 
   with save_context.save_context(options):
-    return _build_meta_graph_impl(obj, signatures, options, meta_graph_def)
+    return _build_meta_graph_impl(obj, signatures, options, meta_graph_def,
+                                  on_functions_built)
@@ -109,6 +109,7 @@ class SaveOptions:
       "experimental_image_format",
       "experimental_skip_saver",
       "experimental_sharding_callback",
+      "experimental_write_checkpoint_concurrently",
   )
 
   def __init__(
@@ -122,6 +123,7 @@ class SaveOptions:
       experimental_image_format=False,
       experimental_skip_saver=False,
       experimental_sharding_callback=None,
+      experimental_write_checkpoint_concurrently=False,
   ):
     """Creates an object that stores options for SavedModel saving.
 
@@ -179,6 +181,10 @@ class SaveOptions:
         `tf.train.experimental.ShardByDevicePolicy` and
         `tf.train.experimental.MaxShardSizePolicy`. You may also write a custom
         callback, see `tf.train.experimental.ShardingCallback`.
+      experimental_write_checkpoint_concurrently: Boolean. When True and
+        executing eagerly, the variables checkpoint is written on a background
+        thread while the SavedModel proto is built and serialized. The
+        SavedModel proto is still written last. Defaults to `False`.
     """
     self.namespace_whitelist = _validate_namespace_whitelist(
         namespace_whitelist
@@ -207,6 +213,8 @@ class SaveOptions:
                          "must be of type ShardingCallback. The option provided"
                          f"was of type {type(experimental_sharding_callback)}.")
     self.experimental_sharding_callback = experimental_sharding_callback
+    self.experimental_write_checkpoint_concurrently = (
+        experimental_write_checkpoint_concurrently)
 
 
 def _validate_namespace_whitelist(namespace_whitelist):
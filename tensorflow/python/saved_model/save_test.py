@@ -990,6 +990,24 @@ class SaveTest(test.TestCase, parameterized.TestCase):
     self.assertEqual(loaded_root.v2.numpy()[0], root.v2.numpy()[0])
     self.assertEqual(loaded_root.v2.numpy()[1], root.v2.numpy()[1])
 
+  def test_save_phase_metrics(self):
+    root = module.Module()
+    root.v = variables.Variable(3.)
+    root.f = def_function.function(
+        lambda x: root.v * x,
+        input_signature=[tensor_spec.TensorSpec(None, dtypes.float32)])
+    phases = ("saveable_view", "meta_graph", "gradient_functions",
+              "object_graph", "checkpoint", "saved_model_proto")
+    before = {
+        phase: save._save_phase_duration_milliseconds.get_cell(
+            phase).value().num for phase in phases
+    }
+    save.save(root, os.path.join(self.get_temp_dir(), "saved_model"))
+    for phase in phases:
+      self.assertEqual(
+          before[phase] + 1,
+          save._save_phase_duration_milliseconds.get_cell(phase).value().num)
+
 
 class DependencyTest(test.TestCase):
   """Tests for deserialization dependencies (saving-related only)."""
@@ -1264,6 +1282,51 @@ class SavingOptionsTest(test.TestCase):
       options = save_options.SaveOptions(
           experimental_variable_policy="not_a_valid_value")
 
+  def test_write_checkpoint_concurrently(self):
+    root = module.Module()
+    root.v = variables.Variable(3.)
+    root.fns = [
+        def_function.function(
+            lambda x, i=i: root.v * x + i,
+            input_signature=[tensor_spec.TensorSpec(None, dtypes.float32)])
+        for i in range(4)
+    ]
+    sequential_dir = os.path.join(self.get_temp_dir(), "sequential")
+    save.save(root, sequential_dir)
+    concurrent_dir = os.path.join(self.get_temp_dir(), "concurrent")
+    save.save(
+        root,
+        concurrent_dir,
+        options=save_options.SaveOptions(
+            experimental_write_checkpoint_concurrently=True))
+
+    sequential = loader_impl.parse_saved_model(sequential_dir).meta_graphs[0]
+    concurrent = loader_impl.parse_saved_model(concurrent_dir).meta_graphs[0]
+    self.assertEqual(sequential.object_graph_def.nodes,
+                     concurrent.object_graph_def.nodes)
+    self.assertLen(concurrent.object_graph_def.concrete_functions,
+                   len(sequential.object_graph_def.concrete_functions))
+    loaded = load.load(concurrent_dir)
+    self.assertEqual(3., loaded.v.numpy())
+    for i, fn in enumerate(loaded.fns):
+      self.assertAllEqual(6. + i, fn(constant_op.constant(2.)))
+
+  def test_write_checkpoint_concurrently_raises_write_error(self):
+    root = module.Module()
+    root.v = variables.Variable(3.)
+    export_dir = os.path.join(self.get_temp_dir(), "saved_model")
+    # A file in place of the variables directory makes the write fail.
+    file_io.recursive_create_dir(export_dir)
+    file_io.write_string_to_file(os.path.join(export_dir, "variables"), "")
+    with self.assertRaises(Exception):
+      save.save(
+          root,
+          export_dir,
+          options=save_options.SaveOptions(
+              experimental_write_checkpoint_concurrently=True))
+    self.assertFalse(
+        file_io.file_exists(os.path.join(export_dir, "saved_model.pb")))
+
 
 class AssetTests(test.TestCase):
 
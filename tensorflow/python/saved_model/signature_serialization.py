@@ -279,6 +279,16 @@ def _normalize_outputs(outputs, function_name, signature_key):
   return outputs
 
 
+class _LazySignature(object):
+  """Placeholder for a signature which is loaded on first access."""
+
+  def __init__(self, load_fn):
+    self.load_fn = load_fn
+
+  def __repr__(self):
+    return "<not loaded yet>"
+
+
 # _SignatureMap is immutable to ensure that users do not expect changes to be
 # reflected in the SavedModel. Using public APIs, tf.saved_model.load() is the
 # only way to create a _SignatureMap and there is no way to modify it. So we can
@@ -298,8 +308,16 @@ class _SignatureMap(collections_abc.Mapping, base.Trackable):
     # need a private API for adding new signatures to an existing object.
     self._signatures[name] = concrete_function
 
+  def _add_lazy_child(self, name, load_fn):
+    """Adds a signature which is created by calling `load_fn` when accessed."""
+    self._signatures[name] = _LazySignature(load_fn)
+
   def __getitem__(self, key):
-    return self._signatures[key]
+    signature = self._signatures[key]
+    if isinstance(signature, _LazySignature):
+      signature = signature.load_fn()
+      self._signatures[key] = signature
+    return signature
 
   def __iter__(self):
     return iter(self._signatures)
@@ -14,6 +14,9 @@
 # ==============================================================================
 """SavedModel utility functions implementation."""
 
+import contextlib
+import time
+
 from tensorflow.core.framework import types_pb2
 from tensorflow.core.protobuf import meta_graph_pb2
 from tensorflow.core.protobuf import struct_pb2
@@ -212,3 +215,22 @@ def swap_function_tensor_content(meta_graph_def, from_endiness, to_endiness):
   bst.swap_tensor_content_in_graph_function(
       meta_graph_def, from_endiness, to_endiness
   )
+
+
+@contextlib.contextmanager
+def record_duration_milliseconds(sampler, label):
+  """Adds the duration of the block in milliseconds to a cell of `sampler`.
+
+  Args:
+    sampler: A `monitoring.Sampler` with one label.
+    label: The label of the cell to add the duration to, e.g. a save or load
+      phase.
+
+  Yields:
+    Nothing.
+  """
+  start_time = time.time()
+  try:
+    yield
+  finally:
+    sampler.get_cell(label).add((time.time() - start_time) * 1000)
@@ -82,6 +82,7 @@ def main(unused_args):
     else:
       text_format.Merge(data.decode("utf-8"), input_graph_def)
 
+  pass_stats = []
   output_graph_def = optimize_for_inference_lib.optimize_for_inference(
       input_graph_def,
       FLAGS.input_names.split(","),
@@ -89,7 +90,10 @@ def main(unused_args):
       _parse_placeholder_types(FLAGS.placeholder_type_enum),
       FLAGS.toco_compatible,
       FLAGS.placeholder_to_const_names.split(","),
+      pass_stats=pass_stats,
   )
+  if FLAGS.print_pass_timings:
+    print(optimize_for_inference_lib.format_pass_stats(pass_stats))
 
   if FLAGS.frozen_graph:
     f = gfile.GFile(FLAGS.output, "w")
@@ -167,6 +171,15 @@ def parse_args():
       eg: --placeholder_to_const_names=phase_train=False\
       """,
   )
+  parser.add_argument(
+      "--print_pass_timings",
+      nargs="?",
+      const=True,
+      type="bool",
+      default=False,
+      help="""\
+      If true, prints the time taken by each optimization pass.\
+      """)
   return parser.parse_known_args()
 
 
@@ -44,10 +44,13 @@ bazel-bin/tensorflow/python/tools/optimize_for_inference \
 
 """
 
+import bisect
 import collections
+import functools
 import math
 import re
-from typing import Mapping, Sequence
+import time
+from typing import Callable, Iterable, List, Mapping, Optional, Sequence
 
 import numpy as np
 
@@ -103,6 +106,8 @@ def optimize_for_inference(
     placeholder_type_enum: int,
     toco_compatible: bool = False,
     placeholder_to_const_names=None,
+    custom_passes: Optional[Sequence["GraphPass"]] = None,
+    pass_stats: Optional[List["PassStats"]] = None,
 ) -> graph_pb2.GraphDef:
   """Applies a series of inference optimizations on the input graph.
 
@@ -118,33 +123,489 @@ def optimize_for_inference(
       TOCO compatible graph operations (default=False).
     placeholder_to_const_names: A list of names of the PlaceholderWithDefault
       nodes to be converted to Constant.
+    custom_passes: Optional list of `GraphPass`es to run after the built-in
+      optimizations.
+    pass_stats: Optional list, which the `PassStats` of every pass that ran are
+      appended to.
 
   Returns:
     An optimized version of the input graph.
   """
   ensure_graph_is_valid(input_graph_def)
-  optimized_graph_def = input_graph_def
-  optimized_graph_def = convert_placeholder_to_const(
-      optimized_graph_def, placeholder_to_const_names
-  )
-  optimized_graph_def = strip_unused_lib.strip_unused(
-      optimized_graph_def,
+  pass_manager = inference_pass_manager(
       input_node_names,
       output_node_names,
       placeholder_type_enum,
+      toco_compatible=toco_compatible,
+      placeholder_to_const_names=placeholder_to_const_names,
+      custom_passes=custom_passes,
   )
-  optimized_graph_def = graph_util.remove_training_nodes(
-      optimized_graph_def, output_node_names
-  )
-  optimized_graph_def = fold_batch_norms(optimized_graph_def)
-  if not toco_compatible:
-    optimized_graph_def = fuse_resize_and_conv(
-        optimized_graph_def, output_node_names
-    )
+  optimized_graph_def = pass_manager.run(input_graph_def)
+  if pass_stats is not None:
+    pass_stats.extend(pass_manager.stats)
   ensure_graph_is_valid(optimized_graph_def)
   return optimized_graph_def
 
 
+def inference_pass_manager(
+    input_node_names: Sequence[str],
+    output_node_names: Sequence[str],
+    placeholder_type_enum: int,
+    toco_compatible: bool = False,
+    placeholder_to_const_names=None,
+    custom_passes: Optional[Sequence["GraphPass"]] = None,
+) -> "PassManager":
+  """Returns the `PassManager` used by `optimize_for_inference`.
+
+  Args:
+    input_node_names: See `optimize_for_inference`.
+    output_node_names: See `optimize_for_inference`.
+    placeholder_type_enum: See `optimize_for_inference`.
+    toco_compatible: See `optimize_for_inference`.
+    placeholder_to_const_names: See `optimize_for_inference`.
+    custom_passes: Optional list of `GraphPass`es to run after the built-in
+      optimizations.
+
+  Returns:
+    A `PassManager`.
+  """
+  pass_manager = PassManager()
+  pass_manager.add_pass(
+      GraphDefPass(
+          "convert_placeholder_to_const",
+          functools.partial(
+              convert_placeholder_to_const,
+              nodes_to_convert=placeholder_to_const_names,
+          ),
+      )
+  )
+  pass_manager.add_pass(
+      GraphDefPass(
+          "strip_unused",
+          functools.partial(
+              strip_unused_lib.strip_unused,
+              input_node_names=input_node_names,
+              output_node_names=output_node_names,
+              placeholder_type_enum=placeholder_type_enum,
+          ),
+      )
+  )
+  pass_manager.add_pass(
+      GraphDefPass(
+          "remove_training_nodes",
+          functools.partial(
+              graph_util.remove_training_nodes,
+              protected_nodes=output_node_names,
+          ),
+      )
+  )
+  pass_manager.add_pass(fold_batch_norms_pass())
+  if not toco_compatible:
+    pass_manager.add_pass(fuse_resize_and_conv_pass(output_node_names))
+  for graph_pass in custom_passes or ():
+    pass_manager.add_pass(graph_pass)
+  return pass_manager
+
+
+class GraphIndex(object):
+  """A mutable GraphDef, indexed by node name, op type and consumers.
+
+  Passes edit the graph through the index, which records the nodes that were
+  added, modified or removed so that later passes only re-scan the affected
+  parts of the graph. A NodeDef returned by `node()` may be edited in place, as
+  long as `update_node()` is called with it afterwards.
+
+  A GraphDef given to the index is only indexed once its nodes are accessed, so
+  whole graph passes running one after the other hand their GraphDefs to each
+  other without indexing or copying them.
+  """
+
+  def __init__(self, graph_def: graph_pb2.GraphDef):
+    self._template = graph_pb2.GraphDef()
+    self._node_storage = graph_pb2.GraphDef()
+    self._nodes = {}
+    self._inputs = {}
+    self._consumers = collections.defaultdict(set)
+    self._nodes_by_op = collections.defaultdict(dict)
+    self._generation = 0
+    self._change_generations = []
+    self._changed_names = []
+    # The graph as a GraphDef, while it was not edited through the index.
+    self._graph_def = None
+    # Whether `_graph_def` still has to be indexed.
+    self._pending = False
+    self.reset(graph_def)
+
+  @property
+  def generation(self) -> int:
+    """A counter incremented by every change to the graph."""
+    return self._generation
+
+  def __contains__(self, name: str) -> bool:
+    self._sync()
+    return name in self._nodes
+
+  def __len__(self) -> int:
+    if self._pending:
+      return len(self._graph_def.node)
+    return len(self._nodes)
+
+  def __iter__(self):
+    self._sync()
+    return iter(list(self._nodes))
+
+  def node(self, name: str) -> node_def_pb2.NodeDef:
+    """Returns the node with the given name, ignoring ports and `^`."""
+    self._sync()
+    return node_from_map(self._nodes, name)
+
+  def consumers(self, name: str) -> List[str]:
+    """Returns the names of the nodes that have `name` as an input."""
+    self._sync()
+    return sorted(self._consumers.get(name, ()))
+
+  def nodes_with_ops(self, ops: Iterable[str]) -> List[str]:
+    """Returns the names of the nodes of the given op types, in graph order."""
+    self._sync()
+    names = set()
+    for op in ops:
+      names.update(self._nodes_by_op.get(op, ()))
+    return [name for name in self._nodes if name in names]
+
+  def changed_since(self, generation: int) -> List[str]:
+    """Returns the names of the nodes changed after `generation`."""
+    self._sync()
+    start = bisect.bisect_right(self._change_generations, generation)
+    return list(dict.fromkeys(self._changed_names[start:]))
+
+  def add_node(self, node: node_def_pb2.NodeDef) -> None:
+    """Adds a node at the end of the graph."""
+    self._sync()
+    if node.name in self._nodes:
+      raise ValueError("Duplicate node names detected for ", node.name)
+    self._nodes[node.name] = node
+    self._index(node)
+    self._mark_changed(node.name)
+
+  def update_node(self, node: node_def_pb2.NodeDef) -> None:
+    """Replaces the node with the same name, keeping its position."""
+    self._sync()
+    if node.name not in self._nodes:
+      raise ValueError("No node named '%s' found in map." % node.name)
+    self._unindex(node.name)
+    self._nodes[node.name] = node
+    self._index(node)
+    self._mark_changed(node.name)
+
+  def remove_node(self, name: str) -> None:
+    """Removes a node, and the control dependencies on it.
+
+    Data inputs referring to the node are not changed, the caller is expected
+    to rewire them.
+
+    Args:
+      name: Name of the node to remove.
+    """
+    self.node(name)
+    for consumer_name in self.consumers(name):
+      consumer = self._nodes[consumer_name]
+      if "^" + name in consumer.input:
+        retained_input = [i for i in consumer.input if i != "^" + name]
+        consumer.input[:] = retained_input
+        self.update_node(consumer)
+    self._unindex(name)
+    del self._nodes[name]
+    self._mark_changed(name)
+
+  def reset(self, graph_def: graph_pb2.GraphDef) -> None:
+    """Replaces the graph.
+
+    The index keeps `graph_def` without copying it, so it must not be modified
+    afterwards. It is indexed when the nodes are next accessed, and only the
+    nodes that differ are marked as changed, at the generation of this call.
+    Replacing the graph by the GraphDef it was last set to, or by an equal one,
+    does not change the generation.
+
+    Args:
+      graph_def: The new graph.
+    """
+    if self._graph_def is not None and (
+        graph_def is self._graph_def or graph_def == self._graph_def
+    ):
+      return
+    self._graph_def = graph_def
+    self._pending = True
+    self._generation += 1
+
+  def as_graph_def(self) -> graph_pb2.GraphDef:
+    """Returns the graph as a GraphDef, which must not be modified.
+
+    Unlike `to_graph_def()`, this returns the GraphDef last given to `reset()`
+    without copying it, unless the graph was edited since.
+    """
+    if self._graph_def is None:
+      self._graph_def = self.to_graph_def()
+    return self._graph_def
+
+  def to_graph_def(self) -> graph_pb2.GraphDef:
+    """Returns a GraphDef with the nodes of the index."""
+    graph_def = graph_pb2.GraphDef()
+    if self._graph_def is not None:
+      graph_def.CopyFrom(self._graph_def)
+      return graph_def
+    graph_def.CopyFrom(self._template)
+    graph_def.node.extend(self._nodes.values())
+    return graph_def
+
+  def _sync(self):
+    """Indexes the GraphDef given to `reset()`, if it was not yet."""
+    if not self._pending:
+      return
+    self._pending = False
+    graph_def = self._graph_def
+    generation = self._generation
+    self._template = graph_pb2.GraphDef()
+    for field, value in graph_def.ListFields():
+      if field.name == "node":
+        continue
+      if field.message_type is None:
+        setattr(self._template, field.name, value)
+      else:
+        getattr(self._template, field.name).CopyFrom(value)
+    # Copied so that editing nodes in place does not change `graph_def`.
+    self._node_storage = graph_pb2.GraphDef()
+    self._node_storage.node.extend(graph_def.node)
+    new_nodes = {}
+    for node in self._node_storage.node:
+      if node.name in new_nodes:
+        raise ValueError("Duplicate node names detected for ", node.name)
+      new_nodes[node.name] = node
+    for name in list(self._nodes):
+      if name not in new_nodes:
+        self._unindex(name)
+        self._mark_changed(name, generation)
+    for name, node in new_nodes.items():
+      old_node = self._nodes.get(name)
+      if old_node is not None and old_node == node:
+        continue
+      if old_node is not None:
+        self._unindex(name)
+      self._nodes[name] = node
+      self._index(node)
+      self._mark_changed(name, generation)
+    self._nodes = {name: node for name, node in new_nodes.items()}
+    # The nodes now match `graph_def` again.
+    self._graph_def = graph_def
+
+  def _index(self, node):
+    inputs = tuple(node_name_from_input(name) for name in node.input)
+    self._inputs[node.name] = (node.op, inputs)
+    self._nodes_by_op[node.op][node.name] = None
+    for input_name in inputs:
+      self._consumers[input_name].add(node.name)
+
+  def _unindex(self, name):
+    op, inputs = self._inputs.pop(name)
+    del self._nodes_by_op[op][name]
+    for input_name in inputs:
+      self._consumers[input_name].discard(name)
+
+  def _mark_changed(self, name, generation=None):
+    self._graph_def = None
+    if generation is None:
+      self._generation += 1
+      generation = self._generation
+    self._change_generations.append(generation)
+    self._changed_names.append(name)
+
+
+class GraphPass(object):
+  """Base class of the graph transformations run by a `PassManager`.
+
+  Attributes:
+    name: Name of the pass, used in `PassStats`.
+    ops: Op types of the nodes the pass rewrites, or None if the pass
+      transforms the whole graph. Passes with `ops` are only given the nodes
+      that may have become rewritable since the pass last ran.
+    lookahead: The number of inputs away from a rewritten node the pass looks
+      at to match its pattern. A node is re-scanned if any node within that
+      distance changed.
+  """
+
+  name = "graph_pass"
+  ops = None
+  lookahead = 0
+
+  def run(self, index: GraphIndex, candidates: Optional[List[str]]) -> bool:
+    """Transforms the graph.
+
+    Args:
+      index: The `GraphIndex` to edit.
+      candidates: Names of the nodes with one of `ops` to scan, or None if
+        `ops` is None.
+
+    Returns:
+      Whether the graph was changed.
+    """
+    raise NotImplementedError
+
+
+class GraphDefPass(GraphPass):
+  """A pass calling a function that transforms a GraphDef.
+
+  `fn` must not modify the GraphDef it is given. It returns that GraphDef if it
+  has nothing to change, and a new GraphDef otherwise.
+  """
+
+  def __init__(
+      self, name: str, fn: Callable[[graph_pb2.GraphDef], graph_pb2.GraphDef]
+  ):
+    self.name = name
+    self._fn = fn
+
+  def run(self, index, candidates):
+    del candidates
+    generation = index.generation
+    index.reset(self._fn(index.as_graph_def()))
+    return index.generation != generation
+
+
+class NodePass(GraphPass):
+  """A pass calling `fn(index, node)` on every candidate node.
+
+  `fn` edits the graph through the `GraphIndex` and returns whether it did.
+  """
+
+  def __init__(
+      self,
+      name: str,
+      ops: Iterable[str],
+      fn: Callable[[GraphIndex, node_def_pb2.NodeDef], bool],
+      lookahead: int = 0,
+  ):
+    self.name = name
+    self.ops = frozenset(ops)
+    self.lookahead = lookahead
+    self._fn = fn
+
+  def run(self, index, candidates):
+    changed = False
+    for name in candidates:
+      # Earlier rewrites may have removed or replaced the node.
+      if name in index and index.node(name).op in self.ops:
+        changed = bool(self._fn(index, index.node(name))) or changed
+    return changed
+
+
+PassStats = collections.namedtuple(
+    "PassStats", ["name", "iteration", "seconds", "num_candidates", "changed"]
+)
+
+
+class PassManager(object):
+  """Runs a sequence of `GraphPass`es over a shared `GraphIndex`.
+
+  The index is built once. Passes with `ops` only re-scan the nodes that
+  changed since they last ran, and the nodes within their `lookahead` of those.
+  With `max_iterations > 1` the passes are repeated until none of them changes
+  the graph.
+  """
+
+  def __init__(
+      self, passes: Sequence[GraphPass] = (), max_iterations: int = 1
+  ):
+    if max_iterations < 1:
+      raise ValueError(
+          f"max_iterations must be at least 1, got {max_iterations}."
+      )
+    self._passes = list(passes)
+    self._max_iterations = max_iterations
+    self._stats = []
+
+  @property
+  def passes(self) -> List[GraphPass]:
+    return list(self._passes)
+
+  @property
+  def stats(self) -> List[PassStats]:
+    """The `PassStats` of the passes that ran during the last `run()`."""
+    return list(self._stats)
+
+  def add_pass(self, graph_pass: GraphPass) -> None:
+    self._passes.append(graph_pass)
+
+  def run(self, graph_def: graph_pb2.GraphDef) -> graph_pb2.GraphDef:
+    """Runs the passes and returns the transformed GraphDef."""
+    self._stats = []
+    index = GraphIndex(graph_def)
+    last_run = [None] * len(self._passes)
+    for iteration in range(self._max_iterations):
+      changed = False
+      for i, graph_pass in enumerate(self._passes):
+        if last_run[i] is not None and last_run[i] == index.generation:
+          continue
+        candidates = _pass_candidates(index, graph_pass, last_run[i])
+        if candidates is not None and not candidates:
+          last_run[i] = index.generation
+          continue
+        last_run[i] = index.generation
+        start = time.time()
+        pass_changed = graph_pass.run(index, candidates)
+        stats = PassStats(
+            name=graph_pass.name,
+            iteration=iteration,
+            seconds=time.time() - start,
+            num_candidates=(
+                len(index) if candidates is None else len(candidates)
+            ),
+            changed=pass_changed,
+        )
+        tf_logging.info(
+            "Pass %s took %.3f seconds (%d candidates, changed: %s).",
+            stats.name,
+            stats.seconds,
+            stats.num_candidates,
+            stats.changed,
+        )
+        self._stats.append(stats)
+        changed = changed or pass_changed
+      if not changed:
+        break
+    return index.to_graph_def()
+
+
+def _pass_candidates(index, graph_pass, last_run):
+  """Returns the nodes `graph_pass` has to scan, None for whole graph passes."""
+  if graph_pass.ops is None:
+    return None
+  if last_run is None:
+    return index.nodes_with_ops(graph_pass.ops)
+  dirty = set(index.changed_since(last_run))
+  frontier = dirty
+  for _ in range(graph_pass.lookahead):
+    frontier = {
+        consumer for name in frontier for consumer in index.consumers(name)
+    } - dirty
+    if not frontier:
+      break
+    dirty.update(frontier)
+  return [name for name in index.nodes_with_ops(graph_pass.ops)
+          if name in dirty]
+
+
+def format_pass_stats(stats: Sequence[PassStats]) -> str:
+  """Formats `PassStats` as a table."""
+  lines = ["%-32s %9s %10s %10s %7s" % (
+      "pass", "iteration", "seconds", "candidates", "changed")]
+  for stat in stats:
+    lines.append("%-32s %9d %10.3f %10d %7s" % (
+        stat.name, stat.iteration, stat.seconds, stat.num_candidates,
+        stat.changed))
+  lines.append("%-32s %9s %10.3f" % (
+      "total", "", sum(stat.seconds for stat in stats)))
+  return "\n".join(lines)
+
+
 def strtobool(val_str):
   """Return boolean value of it's equivalent string representation"""
   if val_str in ("True", "true"):
@@ -294,229 +755,207 @@ def fold_batch_norms(input_graph_def: graph_pb2.GraphDef) -> graph_pb2.GraphDef:
   Raises:
     ValueError: If the graph is badly formed with duplicate node names.
   """
-  input_node_map = {}
-  for node in input_graph_def.node:
-    if node.name not in input_node_map:
-      input_node_map[node.name] = node
-    else:
-      raise ValueError("Duplicate node names detected for ", node.name)
+  pass_manager = PassManager([fold_batch_norms_pass()])
+  return pass_manager.run(input_graph_def)
+
+
+def fold_batch_norms_pass() -> GraphPass:
+  """Returns a `GraphPass` that folds batch norms, see `fold_batch_norms`."""
+  return NodePass(
+      "fold_batch_norms",
+      ops=INPUT_ORDER.keys(),
+      fn=_fold_batch_norm,
+      # BatchNorm <- Add <- Conv2D <- Const.
+      lookahead=3,
+  )
 
-  nodes_to_skip = {}
-  new_ops = []
-  for node in input_graph_def.node:
-    if node.op not in (
-        "BatchNormWithGlobalNormalization",
-        "FusedBatchNorm",
-        "FusedBatchNormV3",
-    ):
-      continue
 
-    bias = None
-    conv_op = node_from_map(
-        input_node_map, node.input[INPUT_ORDER[node.op].index("conv_op")]
-    )
-    # There might be an Add/BiasAdd op between the conv and the batchnorm,
-    # which we can fold into the mean param of the batchnorm.
-    if conv_op.op in ["BiasAdd", "Add", "AddV2"]:
-      add_op = conv_op
-      # Follow the first input of the add to get to the conv.
-      conv_op = node_from_map(input_node_map, add_op.input[0])
-      bias = node_from_map(input_node_map, add_op.input[1])
-      if conv_op.op not in ["Conv2D", "DepthwiseConv2dNative"]:
-        # Follow the second input of the add to get to the conv.
-        conv_op = node_from_map(input_node_map, add_op.input[1])
-        bias = node_from_map(input_node_map, add_op.input[0])
-    if bias and bias.op != "Const":
-      tf_logging.warning(
-          "The bias %s after the conv %s was not a constant. "
-          "Maybe because freeze_graph wasn't "
-          "run first?" % (bias.name, conv_op.name)
-      )
-      continue
+def _fold_batch_norm(index: GraphIndex, node: node_def_pb2.NodeDef) -> bool:
+  """Folds the batch norm `node` into the preceding convolution, if possible."""
+  bias = None
+  conv_op = index.node(node.input[INPUT_ORDER[node.op].index("conv_op")])
+  # There might be an Add/BiasAdd op between the conv and the batchnorm,
+  # which we can fold into the mean param of the batchnorm.
+  if conv_op.op in ["BiasAdd", "Add", "AddV2"]:
+    add_op = conv_op
+    # Follow the first input of the add to get to the conv.
+    conv_op = index.node(add_op.input[0])
+    bias = index.node(add_op.input[1])
     if conv_op.op not in ["Conv2D", "DepthwiseConv2dNative"]:
-      tf_logging.warning(
-          "Didn't find expected Conv2D or DepthwiseConv2dNative input to '%s'"
-          % node.name
-      )
-      continue
-
-    weights_op = node_from_map(input_node_map, conv_op.input[1])
-    if weights_op.op != "Const":
-      tf_logging.warning(
-          "Didn't find expected conv Constant input to '%s',"
-          " found %s instead. Maybe because freeze_graph wasn't"
-          " run first?" % (conv_op.name, weights_op)
-      )
-      continue
-    weights = values_from_const(weights_op)
-    if conv_op.op == "Conv2D":
-      channel_count = weights.shape[3]
-    elif conv_op.op == "DepthwiseConv2dNative":
-      channel_count = weights.shape[2] * weights.shape[3]
-
-    mean_op = node_from_map(
-        input_node_map, node.input[INPUT_ORDER[node.op].index("mean_op")]
+      # Follow the second input of the add to get to the conv.
+      conv_op = index.node(add_op.input[1])
+      bias = index.node(add_op.input[0])
+  if bias and bias.op != "Const":
+    tf_logging.warning(
+        "The bias %s after the conv %s was not a constant. "
+        "Maybe because freeze_graph wasn't "
+        "run first?" % (bias.name, conv_op.name)
     )
-    if mean_op.op != "Const":
-      tf_logging.warning(
-          "Didn't find expected mean Constant input to '%s',"
-          " found %s instead. Maybe because freeze_graph wasn't"
-          " run first?" % (node.name, mean_op)
-      )
-      continue
-    mean_value = values_from_const(mean_op)
-    if mean_value.shape != (channel_count,):
-      tf_logging.warning(
-          "Incorrect shape for mean, found %s, expected %s, for node %s"
-          % (str(mean_value.shape), str((channel_count,)), node.name)
-      )
-      continue
-    if bias is not None:
-      # Adjust the mean of the batchnorm based on the add op in-between the conv
-      # and the batchnorm.
-      mean_value = mean_value - values_from_const(bias)
-
-    var_op = node_from_map(
-        input_node_map, node.input[INPUT_ORDER[node.op].index("var_op")]
+    return False
+  if conv_op.op not in ["Conv2D", "DepthwiseConv2dNative"]:
+    tf_logging.warning(
+        "Didn't find expected Conv2D or DepthwiseConv2dNative input to '%s'"
+        % node.name
     )
-    if var_op.op != "Const":
-      tf_logging.warning(
-          "Didn't find expected var Constant input to '%s',"
-          " found %s instead. Maybe because freeze_graph wasn't"
-          " run first?" % (node.name, var_op)
-      )
-      continue
-    var_value = values_from_const(var_op)
-    if var_value.shape != (channel_count,):
-      tf_logging.warning(
-          "Incorrect shape for var, found %s, expected %s, for node %s"
-          % (str(var_value.shape), str((channel_count,)), node.name)
-      )
-      continue
+    return False
 
-    beta_op = node_from_map(
-        input_node_map, node.input[INPUT_ORDER[node.op].index("beta_op")]
+  weights_op = index.node(conv_op.input[1])
+  if weights_op.op != "Const":
+    tf_logging.warning(
+        "Didn't find expected conv Constant input to '%s',"
+        " found %s instead. Maybe because freeze_graph wasn't"
+        " run first?" % (conv_op.name, weights_op)
     )
-    if beta_op.op != "Const":
-      tf_logging.warning(
-          "Didn't find expected beta Constant input to '%s',"
-          " found %s instead. Maybe because freeze_graph wasn't"
-          " run first?" % (node.name, beta_op)
-      )
-      continue
-    beta_value = values_from_const(beta_op)
-    if beta_value.shape != (channel_count,):
-      tf_logging.warning(
-          "Incorrect shape for beta, found %s, expected %s, for node %s"
-          % (str(beta_value.shape), str((channel_count,)), node.name)
-      )
-      continue
-
-    gamma_op = node_from_map(
-        input_node_map, node.input[INPUT_ORDER[node.op].index("gamma_op")]
+    return False
+  weights = values_from_const(weights_op)
+  if conv_op.op == "Conv2D":
+    channel_count = weights.shape[3]
+  elif conv_op.op == "DepthwiseConv2dNative":
+    channel_count = weights.shape[2] * weights.shape[3]
+
+  mean_op = index.node(node.input[INPUT_ORDER[node.op].index("mean_op")])
+  if mean_op.op != "Const":
+    tf_logging.warning(
+        "Didn't find expected mean Constant input to '%s',"
+        " found %s instead. Maybe because freeze_graph wasn't"
+        " run first?" % (node.name, mean_op)
     )
-    if gamma_op.op != "Const":
-      tf_logging.warning(
-          "Didn't find expected gamma Constant input to '%s',"
-          " found %s instead. Maybe because freeze_graph wasn't"
-          " run first?" % (node.name, gamma_op)
-      )
-      continue
-    gamma_value = values_from_const(gamma_op)
-    if gamma_value.shape != (channel_count,):
-      tf_logging.warning(
-          "Incorrect shape for gamma, found %s, expected %s, for node %s"
-          % (str(gamma_value.shape), str((channel_count,)), node.name)
-      )
-      continue
-
-    variance_epsilon_value = node.attr[EPSILON_ATTR[node.op]].f
-    nodes_to_skip[node.name] = True
-    nodes_to_skip[weights_op.name] = True
-    nodes_to_skip[conv_op.name] = True
-    if bias is not None:
-      nodes_to_skip[add_op.name] = True
-
-    if scale_after_normalization(node):
-      scale_value = (
-          1.0 / np.vectorize(math.sqrt)(var_value + variance_epsilon_value)
-      ) * gamma_value
-    else:
-      scale_value = 1.0 / np.vectorize(math.sqrt)(
-          var_value + variance_epsilon_value
-      )
-    offset_value = (-mean_value * scale_value) + beta_value
-    scaled_weights = np.copy(weights)
-    it = np.nditer(
-        scaled_weights, flags=["multi_index"], op_flags=["readwrite"]
+    return False
+  mean_value = values_from_const(mean_op)
+  if mean_value.shape != (channel_count,):
+    tf_logging.warning(
+        "Incorrect shape for mean, found %s, expected %s, for node %s"
+        % (str(mean_value.shape), str((channel_count,)), node.name)
     )
-    if conv_op.op == "Conv2D":
-      while not it.finished:
-        current_scale = scale_value[it.multi_index[3]]
-        it[0] *= current_scale
-        it.iternext()
-    elif conv_op.op == "DepthwiseConv2dNative":
-      channel_multiplier = weights.shape[3]
-      while not it.finished:
-        current_scale = scale_value[
-            it.multi_index[2] * channel_multiplier + it.multi_index[3]
-        ]
-        it[0] *= current_scale
-        it.iternext()
-    scaled_weights_op = node_def_pb2.NodeDef()
-    scaled_weights_op.op = "Const"
-    scaled_weights_op.name = conv_op.name + "_weights"
-    scaled_weights_op.attr["dtype"].CopyFrom(weights_op.attr["dtype"])
-    scaled_weights_op.attr["value"].CopyFrom(
-        attr_value_pb2.AttrValue(
-            tensor=tensor_util.make_tensor_proto(
-                scaled_weights, weights.dtype.type, weights.shape
-            )
-        )
+    return False
+  if bias is not None:
+    # Adjust the mean of the batchnorm based on the add op in-between the conv
+    # and the batchnorm.
+    mean_value = mean_value - values_from_const(bias)
+
+  var_op = index.node(node.input[INPUT_ORDER[node.op].index("var_op")])
+  if var_op.op != "Const":
+    tf_logging.warning(
+        "Didn't find expected var Constant input to '%s',"
+        " found %s instead. Maybe because freeze_graph wasn't"
+        " run first?" % (node.name, var_op)
     )
-    # Replace the weights node with scaled weights node
-    for i, weights_node in enumerate(conv_op.input):
-      if weights_node == weights_op.name:
-        conv_op.input[i] = scaled_weights_op.name
-
-    new_conv_op = node_def_pb2.NodeDef()
-    new_conv_op.CopyFrom(conv_op)
-    offset_op = node_def_pb2.NodeDef()
-    offset_op.op = "Const"
-    offset_op.name = conv_op.name + "_bn_offset"
-    offset_op.attr["dtype"].CopyFrom(mean_op.attr["dtype"])
-    offset_op.attr["value"].CopyFrom(
-        attr_value_pb2.AttrValue(
-            tensor=tensor_util.make_tensor_proto(
-                offset_value, mean_value.dtype.type, offset_value.shape
-            )
-        )
+    return False
+  var_value = values_from_const(var_op)
+  if var_value.shape != (channel_count,):
+    tf_logging.warning(
+        "Incorrect shape for var, found %s, expected %s, for node %s"
+        % (str(var_value.shape), str((channel_count,)), node.name)
     )
-    bias_add_op = node_def_pb2.NodeDef()
-    bias_add_op.op = "BiasAdd"
-    bias_add_op.name = node.name
-    bias_add_op.attr["T"].CopyFrom(conv_op.attr["T"])
-    bias_add_op.attr["data_format"].CopyFrom(conv_op.attr["data_format"])
-    bias_add_op.input.extend([new_conv_op.name, offset_op.name])
-    new_ops.extend([scaled_weights_op, new_conv_op, offset_op, bias_add_op])
+    return False
 
-  result_graph_def = graph_pb2.GraphDef()
-  for node in input_graph_def.node:
-    if node.name in nodes_to_skip:
-      continue
-    new_node = node_def_pb2.NodeDef()
-    new_node.CopyFrom(node)
-    retained_input = []
-    for input_node in new_node.input:
-      if not input_node.startswith("^") or input_node[1:] not in nodes_to_skip:
-        retained_input.append(input_node)
-    new_node.input[:] = retained_input
+  beta_op = index.node(node.input[INPUT_ORDER[node.op].index("beta_op")])
+  if beta_op.op != "Const":
+    tf_logging.warning(
+        "Didn't find expected beta Constant input to '%s',"
+        " found %s instead. Maybe because freeze_graph wasn't"
+        " run first?" % (node.name, beta_op)
+    )
+    return False
+  beta_value = values_from_const(beta_op)
+  if beta_value.shape != (channel_count,):
+    tf_logging.warning(
+        "Incorrect shape for beta, found %s, expected %s, for node %s"
+        % (str(beta_value.shape), str((channel_count,)), node.name)
+    )
+    return False
 
-    result_graph_def.node.extend([new_node])
+  gamma_op = index.node(node.input[INPUT_ORDER[node.op].index("gamma_op")])
+  if gamma_op.op != "Const":
+    tf_logging.warning(
+        "Didn't find expected gamma Constant input to '%s',"
+        " found %s instead. Maybe because freeze_graph wasn't"
+        " run first?" % (node.name, gamma_op)
+    )
+    return False
+  gamma_value = values_from_const(gamma_op)
+  if gamma_value.shape != (channel_count,):
+    tf_logging.warning(
+        "Incorrect shape for gamma, found %s, expected %s, for node %s"
+        % (str(gamma_value.shape), str((channel_count,)), node.name)
+    )
+    return False
 
-  result_graph_def.node.extend(new_ops)
-  result_graph_def.versions.CopyFrom(input_graph_def.versions)
-  return result_graph_def
+  variance_epsilon_value = node.attr[EPSILON_ATTR[node.op]].f
+  if scale_after_normalization(node):
+    scale_value = (
+        1.0 / np.vectorize(math.sqrt)(var_value + variance_epsilon_value)
+    ) * gamma_value
+  else:
+    scale_value = 1.0 / np.vectorize(math.sqrt)(
+        var_value + variance_epsilon_value
+    )
+  offset_value = (-mean_value * scale_value) + beta_value
+  scaled_weights = np.copy(weights)
+  it = np.nditer(
+      scaled_weights, flags=["multi_index"], op_flags=["readwrite"]
+  )
+  if conv_op.op == "Conv2D":
+    while not it.finished:
+      current_scale = scale_value[it.multi_index[3]]
+      it[0] *= current_scale
+      it.iternext()
+  elif conv_op.op == "DepthwiseConv2dNative":
+    channel_multiplier = weights.shape[3]
+    while not it.finished:
+      current_scale = scale_value[
+          it.multi_index[2] * channel_multiplier + it.multi_index[3]
+      ]
+      it[0] *= current_scale
+      it.iternext()
+  scaled_weights_op = node_def_pb2.NodeDef()
+  scaled_weights_op.op = "Const"
+  scaled_weights_op.name = conv_op.name + "_weights"
+  scaled_weights_op.attr["dtype"].CopyFrom(weights_op.attr["dtype"])
+  scaled_weights_op.attr["value"].CopyFrom(
+      attr_value_pb2.AttrValue(
+          tensor=tensor_util.make_tensor_proto(
+              scaled_weights, weights.dtype.type, weights.shape
+          )
+      )
+  )
+  # Replace the weights node with scaled weights node
+  new_conv_op = node_def_pb2.NodeDef()
+  new_conv_op.CopyFrom(conv_op)
+  for i, weights_node in enumerate(new_conv_op.input):
+    if weights_node == weights_op.name:
+      new_conv_op.input[i] = scaled_weights_op.name
+
+  offset_op = node_def_pb2.NodeDef()
+  offset_op.op = "Const"
+  offset_op.name = conv_op.name + "_bn_offset"
+  offset_op.attr["dtype"].CopyFrom(mean_op.attr["dtype"])
+  offset_op.attr["value"].CopyFrom(
+      attr_value_pb2.AttrValue(
+          tensor=tensor_util.make_tensor_proto(
+              offset_value, mean_value.dtype.type, offset_value.shape
+          )
+      )
+  )
+  bias_add_op = node_def_pb2.NodeDef()
+  bias_add_op.op = "BiasAdd"
+  bias_add_op.name = node.name
+  bias_add_op.attr["T"].CopyFrom(conv_op.attr["T"])
+  bias_add_op.attr["data_format"].CopyFrom(conv_op.attr["data_format"])
+  bias_add_op.input.extend([new_conv_op.name, offset_op.name])
+
+  index.add_node(scaled_weights_op)
+  index.update_node(new_conv_op)
+  index.add_node(offset_op)
+  index.update_node(bias_add_op)
+  # Remove the nodes that were only used by the folded ops.
+  unused_candidates = [weights_op, mean_op, var_op, beta_op, gamma_op]
+  if bias is not None:
+    unused_candidates = [add_op, bias] + unused_candidates
+  for unused_node in unused_candidates:
+    if unused_node.name in index and not index.consumers(unused_node.name):
+      index.remove_node(unused_node.name)
+  return True
 
 
 def fuse_resize_and_conv(
@@ -540,110 +979,110 @@ def fuse_resize_and_conv(
   Raises:
     ValueError: If the graph is badly formed with duplicate node names.
   """
+  index = GraphIndex(input_graph_def)
+  # Nodes that are neither referenced nor outputs are dropped as well.
+  unused_node_names = [
+      name for name in index
+      if not index.consumers(name) and name not in output_node_names
+  ]
+  for name in index.nodes_with_ops(["Conv2D"]):
+    _fuse_resize_and_conv(output_node_names, index, index.node(name))
+  for name in unused_node_names:
+    if name in index and not index.consumers(name):
+      index.remove_node(name)
+  return index.to_graph_def()
+
+
+def fuse_resize_and_conv_pass(output_node_names: Sequence[str]) -> GraphPass:
+  """Returns a `GraphPass` that fuses convs, see `fuse_resize_and_conv`."""
+  return NodePass(
+      "fuse_resize_and_conv",
+      ops=["Conv2D"],
+      fn=functools.partial(_fuse_resize_and_conv, output_node_names),
+      # Conv2D <- MirrorPad <- ResizeBilinear.
+      lookahead=2,
+  )
 
-  input_node_map = {}
-  for node in input_graph_def.node:
-    if node.name not in input_node_map:
-      input_node_map[node.name] = node
-    else:
-      raise ValueError("Duplicate node names detected for ", node.name)
-
-  node_reference_count = collections.defaultdict(int)
-  for node in input_graph_def.node:
-    for input_name in node.input:
-      stripped_name = node_name_from_input(input_name)
-      node_reference_count[stripped_name] += 1
-  for output_name in output_node_names:
-    node_reference_count[output_name] += 1
-
-  new_ops = []
-  for node in input_graph_def.node:
-    if node.op != "Conv2D":
-      continue
-    conv_op = node
-
-    input_op = node_from_map(input_node_map, conv_op.input[0])
-    if input_op.op == "MirrorPad":
-      mirror_pad_op = input_op
-      resize_op = node_from_map(input_node_map, mirror_pad_op.input[0])
-      if resize_op.op != "ResizeBilinear":
-        resize_op = None
-    else:
-      mirror_pad_op = None
-      if input_op.op == "ResizeBilinear":
-        resize_op = input_op
-      else:
-        resize_op = None
-
-    # There are no ops to be fused into the conv, so skip replacing this one.
-    if not mirror_pad_op and not resize_op:
-      continue
-
-    # We're replacing this node, so make sure the old one is removed.
-    node_reference_count[conv_op.name] = 0
-    if mirror_pad_op:
-      node_reference_count[mirror_pad_op.name] -= 1
-    if resize_op:
-      node_reference_count[resize_op.name] -= 1
 
-    fused_conv_op = node_def_pb2.NodeDef()
-    if resize_op:
-      fused_conv_op.op = "FusedResizeAndPadConv2D"
-    else:
-      fused_conv_op.op = "FusedPadConv2D"
-    fused_conv_op.name = conv_op.name
-    if mirror_pad_op:
-      mirror_paddings_name = mirror_pad_op.input[1]
-      mirror_paddings_mode = mirror_pad_op.attr["mode"]
-    else:
-      # If there was no MirrorPad op, then create settings that make the padding
-      # stage of the fused operation a no-op.
-      paddings_op = node_def_pb2.NodeDef()
-      paddings_op.op = "Const"
-      paddings_op.name = conv_op.name + "_dummy_paddings"
-      paddings_op.attr["dtype"].CopyFrom(
-          attr_value_pb2.AttrValue(type=dtypes.int32.as_datatype_enum)
-      )
-      paddings_op.attr["value"].CopyFrom(
-          attr_value_pb2.AttrValue(
-              tensor=tensor_util.make_tensor_proto(
-                  [0, 0, 0, 0, 0, 0, 0, 0], dtypes.int32, [4, 2]
-              )
-          )
-      )
-      new_ops.extend([paddings_op])
-      mirror_paddings_name = paddings_op.name
-      mirror_paddings_mode = attr_value_pb2.AttrValue(s=b"REFLECT")
-    if resize_op:
-      fused_conv_op.input.extend([
-          resize_op.input[0],
-          resize_op.input[1],
-          mirror_paddings_name,
-          conv_op.input[1],
-      ])
-      fused_conv_op.attr["resize_align_corners"].CopyFrom(
-          resize_op.attr["align_corners"]
-      )
+def _fuse_resize_and_conv(
+    output_node_names: Sequence[str],
+    index: GraphIndex,
+    conv_op: node_def_pb2.NodeDef,
+) -> bool:
+  """Fuses the resize and pad ops preceding `conv_op` into it, if possible."""
+  input_op = index.node(conv_op.input[0])
+  if input_op.op == "MirrorPad":
+    mirror_pad_op = input_op
+    resize_op = index.node(mirror_pad_op.input[0])
+    if resize_op.op != "ResizeBilinear":
+      resize_op = None
+  else:
+    mirror_pad_op = None
+    if input_op.op == "ResizeBilinear":
+      resize_op = input_op
     else:
-      fused_conv_op.input.extend(
-          [mirror_pad_op.input[0], mirror_paddings_name, conv_op.input[1]]
-      )
-    fused_conv_op.attr["T"].CopyFrom(conv_op.attr["T"])
-    fused_conv_op.attr["mode"].CopyFrom(mirror_paddings_mode)
-    fused_conv_op.attr["strides"].CopyFrom(conv_op.attr["strides"])
-    fused_conv_op.attr["padding"].CopyFrom(conv_op.attr["padding"])
-    new_ops.extend([fused_conv_op])
+      resize_op = None
 
-  result_graph_def = graph_pb2.GraphDef()
-  for node in input_graph_def.node:
-    if node_reference_count[node.name] < 1:
-      continue
-    new_node = node_def_pb2.NodeDef()
-    new_node.CopyFrom(node)
-    result_graph_def.node.extend([new_node])
+  # There are no ops to be fused into the conv, so skip replacing this one.
+  if not mirror_pad_op and not resize_op:
+    return False
 
-  result_graph_def.node.extend(new_ops)
-  return result_graph_def
+  fused_conv_op = node_def_pb2.NodeDef()
+  if resize_op:
+    fused_conv_op.op = "FusedResizeAndPadConv2D"
+  else:
+    fused_conv_op.op = "FusedPadConv2D"
+  fused_conv_op.name = conv_op.name
+  if mirror_pad_op:
+    mirror_paddings_name = mirror_pad_op.input[1]
+    mirror_paddings_mode = mirror_pad_op.attr["mode"]
+  else:
+    # If there was no MirrorPad op, then create settings that make the padding
+    # stage of the fused operation a no-op.
+    paddings_op = node_def_pb2.NodeDef()
+    paddings_op.op = "Const"
+    paddings_op.name = conv_op.name + "_dummy_paddings"
+    paddings_op.attr["dtype"].CopyFrom(
+        attr_value_pb2.AttrValue(type=dtypes.int32.as_datatype_enum)
+    )
+    paddings_op.attr["value"].CopyFrom(
+        attr_value_pb2.AttrValue(
+            tensor=tensor_util.make_tensor_proto(
+                [0, 0, 0, 0, 0, 0, 0, 0], dtypes.int32, [4, 2]
+            )
+        )
+    )
+    index.add_node(paddings_op)
+    mirror_paddings_name = paddings_op.name
+    mirror_paddings_mode = attr_value_pb2.AttrValue(s=b"REFLECT")
+  if resize_op:
+    fused_conv_op.input.extend([
+        resize_op.input[0],
+        resize_op.input[1],
+        mirror_paddings_name,
+        conv_op.input[1],
+    ])
+    fused_conv_op.attr["resize_align_corners"].CopyFrom(
+        resize_op.attr["align_corners"]
+    )
+  else:
+    fused_conv_op.input.extend(
+        [mirror_pad_op.input[0], mirror_paddings_name, conv_op.input[1]]
+    )
+  fused_conv_op.attr["T"].CopyFrom(conv_op.attr["T"])
+  fused_conv_op.attr["mode"].CopyFrom(mirror_paddings_mode)
+  fused_conv_op.attr["strides"].CopyFrom(conv_op.attr["strides"])
+  fused_conv_op.attr["padding"].CopyFrom(conv_op.attr["padding"])
+  index.update_node(fused_conv_op)
+  # Remove the fused ops if the conv was their only consumer.
+  for fused_op in (mirror_pad_op, resize_op):
+    if (
+        fused_op
+        and not index.consumers(fused_op.name)
+        and fused_op.name not in output_node_names
+    ):
+      index.remove_node(fused_op.name)
+  return True
 
 
 def convert_placeholder_to_const(input_graph_def, nodes_to_convert=None):
@@ -15,6 +15,9 @@
 # ==============================================================================
 """Tests for tensorflow.python.client.graph_util."""
 
+import collections
+import time
+
 import numpy as np
 
 from tensorflow.core.framework import attr_value_pb2
@@ -124,6 +127,172 @@ class OptimizeForInferenceTest(test.TestCase):
         graph_def, [], [add_name], dtypes.float32.as_datatype_enum)
     self.assertProtoEquals(expected_output, output)
 
+  def _create_chain_graph_def(self):
+    graph_def = graph_pb2.GraphDef()
+    graph_def.node.extend([
+        self.create_constant_node_def(
+            "a", value=1, dtype=dtypes.float32, shape=[]),
+        self.create_node_def("Identity", "b", ["a"]),
+        self.create_node_def("Identity", "c", ["b", "^a"]),
+        self.create_node_def("Neg", "d", ["c:0"]),
+    ])
+    return graph_def
+
+  def testGraphIndex(self):
+    graph_def = self._create_chain_graph_def()
+    index = optimize_for_inference_lib.GraphIndex(graph_def)
+    self.assertEqual(["a", "b", "c", "d"], list(index))
+    self.assertEqual(["b", "c"], index.consumers("a"))
+    self.assertEqual(["d"], index.consumers("c"))
+    self.assertEqual(["b", "c"], index.nodes_with_ops(["Identity"]))
+    self.assertEqual("c", index.node("c:0").name)
+
+    generation = index.generation
+    node = index.node("c")
+    node.input[0] = "a"
+    index.update_node(node)
+    self.assertEqual(["c"], index.changed_since(generation))
+    self.assertEqual([], index.consumers("b"))
+    index.remove_node("b")
+    index.remove_node("a")
+    self.assertEqual(["c", "b", "a"], index.changed_since(generation))
+    # Control dependencies on removed nodes are removed.
+    self.assertEqual(["a"], list(index.node("c").input))
+    index.add_node(self.create_node_def("Neg", "e", ["d"]))
+    self.assertEqual(["Neg"] * 2, [n.op for n in index.to_graph_def().node
+                                   if n.name in ("d", "e")])
+    with self.assertRaisesRegex(ValueError, "Duplicate node names"):
+      index.add_node(self.create_node_def("Neg", "e", ["d"]))
+
+    # The input graph is not modified.
+    self.assertProtoEquals(self._create_chain_graph_def(), graph_def)
+
+  def testGraphDefPassesShareGraphDefs(self):
+    graph_def = self._create_chain_graph_def()
+    received = []
+    outputs = []
+
+    def square_d(input_graph_def):
+      received.append(input_graph_def)
+      output_graph_def = graph_pb2.GraphDef()
+      output_graph_def.CopyFrom(input_graph_def)
+      output_graph_def.node[3].op = "Square"
+      outputs.append(output_graph_def)
+      return output_graph_def
+
+    def keep_graph(input_graph_def):
+      received.append(input_graph_def)
+      return input_graph_def
+
+    pass_manager = optimize_for_inference_lib.PassManager(
+        [
+            optimize_for_inference_lib.GraphDefPass("square_d", square_d),
+            optimize_for_inference_lib.GraphDefPass("keep", keep_graph),
+            optimize_for_inference_lib.GraphDefPass("square_d_again",
+                                                    square_d),
+        ],
+        max_iterations=3,
+    )
+    output = pass_manager.run(graph_def)
+
+    self.assertProtoEquals(outputs[0], output)
+    self.assertIsNot(outputs[0], output)
+    self.assertEqual("Neg", graph_def.node[3].op)
+    # Each pass gets the GraphDef of the last change, without copies.
+    self.assertIs(graph_def, received[0])
+    self.assertLen(received, 4)
+    for graph in received[1:]:
+      self.assertIs(outputs[0], graph)
+    # Returning the input graph, or an equal graph, is not a change.
+    self.assertEqual(
+        [("square_d", True), ("keep", False), ("square_d_again", False),
+         ("square_d", False)],
+        [(stats.name, stats.changed) for stats in pass_manager.stats])
+
+  def testGraphIndexResetMarksChangedNodes(self):
+    index = optimize_for_inference_lib.GraphIndex(
+        self._create_chain_graph_def())
+    self.assertEqual(["a", "b", "c", "d"], list(index))
+    generation = index.generation
+
+    graph_def = index.to_graph_def()
+    graph_def.node[3].op = "Square"
+    index.reset(graph_def)
+    self.assertGreater(index.generation, generation)
+    self.assertEqual(["d"], index.changed_since(generation))
+    self.assertEqual(["d"], index.nodes_with_ops(["Square"]))
+    generation = index.generation
+    index.reset(index.to_graph_def())
+    self.assertEqual(generation, index.generation)
+
+  def testPassManagerOnlyRescansChangedNodes(self):
+    for lookahead, expected_neg_candidates in [(0, [["d"]]),
+                                               (2, [["d"], ["d"]])]:
+      neg_candidates = []
+      identity_candidates = []
+
+      class RecordingPass(optimize_for_inference_lib.GraphPass):
+        ops = ["Neg"]
+
+        def run(self, index, candidates):
+          neg_candidates.append(candidates)
+          return False
+
+      recording_pass = RecordingPass()
+      recording_pass.lookahead = lookahead
+
+      def remove_identity(index, node):
+        identity_candidates.append(node.name)
+        if node.name != "b":
+          return False
+        node.op = "Square"
+        index.update_node(node)
+        return True
+
+      pass_manager = optimize_for_inference_lib.PassManager(
+          [
+              recording_pass,
+              optimize_for_inference_lib.NodePass(
+                  "square_b", ["Identity"], remove_identity
+              ),
+          ],
+          max_iterations=3,
+      )
+      output = pass_manager.run(self._create_chain_graph_def())
+
+      self.assertEqual("Square", output.node[1].op)
+      self.assertEqual(expected_neg_candidates, neg_candidates)
+      # "b" is no longer an Identity, so the pass does not scan it again.
+      self.assertEqual(["b", "c"], identity_candidates)
+      self.assertEqual(
+          ["graph_pass", "square_b"] + ["graph_pass"] * (lookahead > 0),
+          [stats.name for stats in pass_manager.stats])
+
+  def testOptimizeForInferenceWithCustomPass(self):
+    graph_def = self._create_chain_graph_def()
+
+    def negate_to_identity(index, node):
+      node.op = "Identity"
+      index.update_node(node)
+      return True
+
+    pass_stats = []
+    output = optimize_for_inference_lib.optimize_for_inference(
+        graph_def, [], ["d"], dtypes.float32.as_datatype_enum,
+        custom_passes=[
+            optimize_for_inference_lib.NodePass(
+                "negate_to_identity", ["Neg"], negate_to_identity)
+        ],
+        pass_stats=pass_stats)
+
+    self.assertEqual("Identity", output.node[-1].op)
+    self.assertEqual([
+        "convert_placeholder_to_const", "strip_unused",
+        "remove_training_nodes", "negate_to_identity"
+    ], [stats.name for stats in pass_stats])
+    self.assertIn("negate_to_identity",
+                  optimize_for_inference_lib.format_pass_stats(pass_stats))
+
   def testConvertPlaceholderToConstant(self):
     """Build the placeholder testing graph."""
     placeholder_name = "phase_train"
@@ -501,5 +670,44 @@ class OptimizeForInferenceTest(test.TestCase):
       self.assertNotEqual("ResizeBilinear", node.op)
 
 
+class OptimizeForInferenceBenchmark(test.Benchmark):
+
+  def _create_chain_graph_def(self, num_nodes):
+    graph_def = graph_pb2.GraphDef()
+    node = graph_def.node.add(name="input", op="Const")
+    node.attr["dtype"].CopyFrom(
+        attr_value_pb2.AttrValue(type=dtypes.float32.as_datatype_enum))
+    node.attr["value"].CopyFrom(
+        attr_value_pb2.AttrValue(
+            tensor=tensor_util.make_tensor_proto(1., dtypes.float32, [])))
+    for i in range(num_nodes):
+      graph_def.node.add(
+          name="neg_%d" % i, op="Neg", input=[graph_def.node[-1].name])
+    return graph_def
+
+  def benchmarkOptimizeForInference(self):
+    num_nodes = 20000
+    graph_def = self._create_chain_graph_def(num_nodes)
+    output_node_names = [graph_def.node[-1].name]
+    num_iters = 5
+    optimize_for_inference_lib.optimize_for_inference(
+        graph_def, [], output_node_names, dtypes.float32.as_datatype_enum)
+    pass_stats = []
+    start = time.time()
+    for _ in range(num_iters):
+      optimize_for_inference_lib.optimize_for_inference(
+          graph_def, [], output_node_names, dtypes.float32.as_datatype_enum,
+          pass_stats=pass_stats)
+    wall_time = (time.time() - start) / num_iters
+    extras = collections.defaultdict(float)
+    for stats in pass_stats:
+      extras[stats.name + "_seconds"] += stats.seconds / num_iters
+    self.report_benchmark(
+        name="optimize_for_inference_%d_nodes" % num_nodes,
+        iters=num_iters,
+        wall_time=wall_time,
+        extras=dict(extras))
+
+
 if __name__ == "__main__":
   test.main()
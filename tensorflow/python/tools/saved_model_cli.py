@@ -20,11 +20,15 @@ https://www.tensorflow.org/guide/saved_model#cli_to_inspect_and_execute_savedmod
 """
 
 import argparse
+from multiprocessing import pool as multiprocessing_pool
 import platform
 
 import ast
+import json
 import os
 import re
+import sys
+import time
 
 from absl import app  # pylint: disable=unused-import
 from absl import flags
@@ -38,6 +42,7 @@ from tensorflow.python.client import session
 from tensorflow.python.debug.wrappers import local_cli_wrapper
 from tensorflow.python.eager import def_function
 from tensorflow.python.eager import function as defun
+from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import meta_graph as meta_graph_lib
 from tensorflow.python.framework import ops as ops_lib
 from tensorflow.python.framework import tensor_spec
@@ -223,9 +228,30 @@ _SMCLI_MULTITHREADING = flags.DEFINE_string(
     'this flag enabled, the resulting object files may have external '
     'dependencies on multithreading libraries, such as \'nsync\'.')
 
+_SMCLI_NUM_WARMUP_RUNS = flags.DEFINE_integer(
+    name='num_warmup_runs', default=10,
+    help='Number of runs before the benchmark measurements start.')
+
+_SMCLI_NUM_RUNS = flags.DEFINE_integer(
+    name='num_runs', default=100,
+    help='Number of measured runs for each concurrency level of the '
+    'benchmark.')
+
+_SMCLI_CONCURRENCY = flags.DEFINE_string(
+    name='concurrency', default='1',
+    help='Comma-separated list of the numbers of concurrent runs to benchmark, '
+    'e.g. \'1,4,16\'.')
+
+_SMCLI_BATCH_SIZE = flags.DEFINE_integer(
+    name='batch_size', default=1,
+    help='Size of the unknown dimensions of the inputs generated by the '
+    'benchmark, for the inputs not passed with --inputs, --input_exprs or '
+    '--input_examples.')
+
 command_required_flags = {
     'show': ['dir'],
     'run': ['dir', 'tag_set', 'signature_def'],
+    'benchmark': ['dir', 'tag_set', 'signature_def'],
     'scan': ['dir'],
     'convert': ['dir', 'output_dir', 'tag_set'],
     'freeze_model': ['dir', 'output_prefix', 'tag_set'],
@@ -618,6 +644,59 @@ def scan_meta_graph_def(meta_graph_def, op_denylist):
         % meta_graph_def.meta_info_def.tags, op_denylist)
 
 
+def _get_feed_dict_and_output_names(meta_graph_def, signature_def_key,
+                                    input_tensor_key_feed_dict):
+  """Maps the inputs and outputs of a SignatureDef to tensor names.
+
+  Args:
+    meta_graph_def: MetaGraphDef containing the SignatureDef.
+    signature_def_key: A SignatureDef key string.
+    input_tensor_key_feed_dict: A dictionary maps input keys to numpy ndarrays.
+
+  Returns:
+    A tuple of the feed dict keyed by input tensor name, the sorted output keys
+    and the output tensor names in the same order.
+
+  Raises:
+    ValueError: When any of the input tensor keys is not valid.
+  """
+  # Re-create feed_dict based on input tensor name instead of key as session.run
+  # uses tensor name.
+  inputs_tensor_info = _get_inputs_tensor_info_from_meta_graph_def(
+      meta_graph_def, signature_def_key)
+
+  # Check if input tensor keys are valid.
+  for input_key_name in input_tensor_key_feed_dict.keys():
+    if input_key_name not in inputs_tensor_info:
+      raise ValueError(
+          '"%s" is not a valid input key. Please choose from %s, or use '
+          '--show option.' %
+          (input_key_name, '"' + '", "'.join(inputs_tensor_info.keys()) + '"'))
+
+  inputs_feed_dict = {
+      inputs_tensor_info[key].name: tensor
+      for key, tensor in input_tensor_key_feed_dict.items()
+  }
+  # Get outputs
+  outputs_tensor_info = _get_outputs_tensor_info_from_meta_graph_def(
+      meta_graph_def, signature_def_key)
+  # Sort to preserve order because we need to go from value to key later.
+  output_tensor_keys_sorted = sorted(outputs_tensor_info.keys())
+  output_tensor_names_sorted = [
+      outputs_tensor_info[tensor_key].name
+      for tensor_key in output_tensor_keys_sorted
+  ]
+  return inputs_feed_dict, output_tensor_keys_sorted, output_tensor_names_sorted
+
+
+def _session_config(use_tfrt):
+  if not use_tfrt:
+    return None
+  logging.info('Using TFRT session.')
+  return config_pb2.ConfigProto(
+      experimental=config_pb2.ConfigProto.Experimental(use_tfrt=True))
+
+
 def run_saved_model_with_feed_dict(saved_model_dir,
                                    tag_set,
                                    signature_def_key,
@@ -662,40 +741,12 @@ def run_saved_model_with_feed_dict(saved_model_dir,
   # Get a list of output tensor names.
   meta_graph_def = saved_model_utils.get_meta_graph_def(saved_model_dir,
                                                         tag_set)
+  inputs_feed_dict, output_tensor_keys_sorted, output_tensor_names_sorted = (
+      _get_feed_dict_and_output_names(meta_graph_def, signature_def_key,
+                                      input_tensor_key_feed_dict))
 
-  # Re-create feed_dict based on input tensor name instead of key as session.run
-  # uses tensor name.
-  inputs_tensor_info = _get_inputs_tensor_info_from_meta_graph_def(
-      meta_graph_def, signature_def_key)
-
-  # Check if input tensor keys are valid.
-  for input_key_name in input_tensor_key_feed_dict.keys():
-    if input_key_name not in inputs_tensor_info:
-      raise ValueError(
-          '"%s" is not a valid input key. Please choose from %s, or use '
-          '--show option.' %
-          (input_key_name, '"' + '", "'.join(inputs_tensor_info.keys()) + '"'))
-
-  inputs_feed_dict = {
-      inputs_tensor_info[key].name: tensor
-      for key, tensor in input_tensor_key_feed_dict.items()
-  }
-  # Get outputs
-  outputs_tensor_info = _get_outputs_tensor_info_from_meta_graph_def(
-      meta_graph_def, signature_def_key)
-  # Sort to preserve order because we need to go from value to key later.
-  output_tensor_keys_sorted = sorted(outputs_tensor_info.keys())
-  output_tensor_names_sorted = [
-      outputs_tensor_info[tensor_key].name
-      for tensor_key in output_tensor_keys_sorted
-  ]
-
-  config = None
-  if use_tfrt:
-    logging.info('Using TFRT session.')
-    config = config_pb2.ConfigProto(
-        experimental=config_pb2.ConfigProto.Experimental(use_tfrt=True))
-  with session.Session(worker, graph=ops_lib.Graph(), config=config) as sess:
+  with session.Session(worker, graph=ops_lib.Graph(),
+                       config=_session_config(use_tfrt)) as sess:
     if init_tpu:
       print('Initializing TPU System ...')
       # This is needed for freshly started worker, or if the job
@@ -731,6 +782,176 @@ def run_saved_model_with_feed_dict(saved_model_dir,
                                             output_full_path))
 
 
+def _generate_inputs(inputs_tensor_info, input_tensor_key_feed_dict,
+                     batch_size):
+  """Generates random values for the inputs missing from a feed dict.
+
+  Args:
+    inputs_tensor_info: A dictionary that maps input keys to TensorInfo.
+    input_tensor_key_feed_dict: A dictionary maps input keys to numpy ndarrays.
+    batch_size: The size of the unknown dimensions of the generated inputs.
+
+  Returns:
+    A copy of `input_tensor_key_feed_dict` with a value for every input.
+
+  Raises:
+    ValueError: If an input is missing and can not be generated.
+  """
+  feed_dict = dict(input_tensor_key_feed_dict)
+  for input_key, tensor_info in sorted(inputs_tensor_info.items()):
+    if input_key in feed_dict:
+      continue
+    dtype = dtypes.as_dtype(tensor_info.dtype)
+    if (tensor_info.WhichOneof('encoding') != 'name' or
+        tensor_info.tensor_shape.unknown_rank or dtype.is_quantized or
+        not (dtype.is_floating or dtype.is_integer or dtype.is_bool)):
+      raise ValueError(
+          'Can not generate a value for input "%s" of type %s. Please pass it '
+          'with --inputs, --input_exprs or --input_examples.' %
+          (input_key, dtype.name))
+    shape = [
+        batch_size if dim.size < 0 else dim.size
+        for dim in tensor_info.tensor_shape.dim
+    ]
+    if dtype.is_bool:
+      value = np.random.randint(0, 2, size=shape).astype(np.bool_)
+    elif dtype.is_integer:
+      value = np.random.randint(0, 100, size=shape)
+    else:
+      value = np.random.uniform(size=shape)
+    feed_dict[input_key] = np.asarray(value).astype(dtype.as_numpy_dtype)
+  return feed_dict
+
+
+def _peak_memory_bytes():
+  """Returns the peak resident set size of the process, or None."""
+  try:
+    import resource  # pylint: disable=g-import-not-at-top
+  except ImportError:  # Not available on Windows.
+    return None
+  peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # ru_maxrss is in bytes on macOS and in kilobytes on Linux.
+  return peak_memory if sys.platform == 'darwin' else peak_memory * 1024
+
+
+def benchmark_saved_model_with_feed_dict(saved_model_dir,
+                                         tag_set,
+                                         signature_def_key,
+                                         input_tensor_key_feed_dict,
+                                         num_warmup_runs=10,
+                                         num_runs=100,
+                                         concurrency_levels=(1,),
+                                         batch_size=1,
+                                         worker=None,
+                                         use_tfrt=False):
+  """Measures the latency and throughput of a SignatureDef.
+
+  The MetaGraphDef is loaded once. After `num_warmup_runs` sequential runs,
+  the SignatureDef is run `num_runs` times for every concurrency level, by as
+  many threads as the concurrency level.
+
+  Args:
+    saved_model_dir: Directory containing the SavedModel to execute.
+    tag_set: Group of tag(s) of the MetaGraphDef with the SignatureDef map, in
+        string format, separated by ','.
+    signature_def_key: A SignatureDef key string.
+    input_tensor_key_feed_dict: A dictionary maps input keys to numpy ndarrays.
+        Random values are generated for the inputs that are not given.
+    num_warmup_runs: Number of runs before the measurements start.
+    num_runs: Number of measured runs for each concurrency level.
+    concurrency_levels: Numbers of concurrent runs to measure.
+    batch_size: Size of the unknown dimensions of generated inputs.
+    worker: If provided, the session will be run on the worker.
+    use_tfrt: If true, TFRT session will be used.
+
+  Returns:
+    A JSON-serializable dictionary with the latency percentiles in
+    milliseconds and the throughput in runs per second for each concurrency
+    level, and the peak memory of the process.
+
+  Raises:
+    ValueError: When any of the input tensor keys is not valid, an input can
+    not be generated, or the number of runs or a concurrency level is not
+    positive.
+  """
+  if num_runs < 1 or num_warmup_runs < 0:
+    raise ValueError(
+        'num_runs must be positive and num_warmup_runs non-negative, got %d '
+        'and %d.' % (num_runs, num_warmup_runs))
+  if not concurrency_levels or min(concurrency_levels) < 1:
+    raise ValueError('Concurrency levels must be positive, got %s.' %
+                     (list(concurrency_levels),))
+
+  meta_graph_def = saved_model_utils.get_meta_graph_def(saved_model_dir,
+                                                        tag_set)
+  inputs_tensor_info = _get_inputs_tensor_info_from_meta_graph_def(
+      meta_graph_def, signature_def_key)
+  input_tensor_key_feed_dict = _generate_inputs(
+      inputs_tensor_info, input_tensor_key_feed_dict, batch_size)
+  inputs_feed_dict, _, output_tensor_names_sorted = (
+      _get_feed_dict_and_output_names(meta_graph_def, signature_def_key,
+                                      input_tensor_key_feed_dict))
+  feed_names = sorted(inputs_feed_dict)
+  feed_values = [inputs_feed_dict[name] for name in feed_names]
+
+  results = []
+  with session.Session(worker, graph=ops_lib.Graph(),
+                       config=_session_config(use_tfrt)) as sess:
+    loader.load(sess, tag_set.split(','), saved_model_dir)
+    run_signature = sess.make_callable(
+        output_tensor_names_sorted, feed_list=feed_names)
+
+    def timed_run(_):
+      start = time.perf_counter()
+      run_signature(*feed_values)
+      return time.perf_counter() - start
+
+    for _ in range(num_warmup_runs):
+      run_signature(*feed_values)
+
+    for concurrency in concurrency_levels:
+      thread_pool = multiprocessing_pool.ThreadPool(concurrency)
+      try:
+        start = time.perf_counter()
+        latencies = thread_pool.map(timed_run, range(num_runs), chunksize=1)
+        wall_time = time.perf_counter() - start
+      finally:
+        thread_pool.close()
+        thread_pool.join()
+      latencies_ms = np.array(latencies) * 1000
+      results.append({
+          'concurrency': concurrency,
+          'num_runs': num_runs,
+          'wall_time_sec': wall_time,
+          'throughput_runs_per_sec': num_runs / wall_time,
+          'latency_ms': {
+              'mean': float(np.mean(latencies_ms)),
+              'min': float(np.min(latencies_ms)),
+              'p50': float(np.percentile(latencies_ms, 50)),
+              'p90': float(np.percentile(latencies_ms, 90)),
+              'p99': float(np.percentile(latencies_ms, 99)),
+              'max': float(np.max(latencies_ms)),
+          },
+      })
+      logging.info('Concurrency %d: %.1f runs/sec, p50 latency %.3f ms.',
+                   concurrency, results[-1]['throughput_runs_per_sec'],
+                   results[-1]['latency_ms']['p50'])
+
+  return {
+      'saved_model_dir': saved_model_dir,
+      'tag_set': tag_set,
+      'signature_def': signature_def_key,
+      'inputs': {
+          key: {'dtype': str(np.asarray(value).dtype),
+                'shape': list(np.shape(value))}
+          for key, value in sorted(input_tensor_key_feed_dict.items())
+      },
+      'num_warmup_runs': num_warmup_runs,
+      'results': results,
+      'peak_memory_bytes': _peak_memory_bytes(),
+  }
+
+
 def preprocess_inputs_arg_string(inputs_str):
   """Parses input arg into dictionary that maps input to file/variable tuple.
 
@@ -1035,6 +1256,48 @@ def run():
       tf_debug=_SMCLI_TF_DEBUG.value)
 
 
+def benchmark():
+  """Function triggered by benchmark command.
+
+  Raises:
+    RuntimeError: An error when the output file already exists and overwrite
+    is not enabled.
+  """
+  tensor_key_feed_dict = load_inputs_from_input_arg_string(
+      _SMCLI_INPUTS.value,
+      _SMCLI_INPUT_EXPRS.value,
+      _SMCLI_INPUT_EXAMPLES.value)
+  concurrency_levels = [
+      int(level) for level in _SMCLI_CONCURRENCY.value.split(',') if level
+  ]
+  results = benchmark_saved_model_with_feed_dict(
+      _SMCLI_DIR.value,
+      _SMCLI_TAG_SET.value,
+      _SMCLI_SIGNATURE_DEF.value,
+      tensor_key_feed_dict,
+      num_warmup_runs=_SMCLI_NUM_WARMUP_RUNS.value,
+      num_runs=_SMCLI_NUM_RUNS.value,
+      concurrency_levels=concurrency_levels,
+      batch_size=_SMCLI_BATCH_SIZE.value,
+      worker=_SMCLI_WORKER.value,
+      use_tfrt=_SMCLI_USE_TFRT.value)
+  results_json = json.dumps(results, indent=2)
+  print(results_json)
+
+  outdir = _SMCLI_OUTDIR.value
+  if outdir:
+    if not os.path.isdir(outdir):
+      os.makedirs(outdir)
+    output_full_path = os.path.join(outdir, 'benchmark.json')
+    if not _SMCLI_OVERWRITE.value and os.path.exists(output_full_path):
+      raise RuntimeError(
+          'Output file %s already exists. Add \"--overwrite\" to overwrite'
+          ' the existing output files.' % output_full_path)
+    with file_io.FileIO(output_full_path, 'w') as f:
+      f.write(results_json)
+    print('Benchmark results are saved to %s' % output_full_path)
+
+
 def scan():
   """Function triggered by scan command."""
   if _SMCLI_TAG_SET.value and _SMCLI_OP_DENYLIST.value:
@@ -1189,6 +1452,28 @@ def add_run_subparser(subparsers):
   parser_run.set_defaults(func=run)
 
 
+def add_benchmark_subparser(subparsers):
+  """Add parser for `benchmark`."""
+  benchmark_msg = (
+      'Usage example:\n'
+      'To measure the latency and throughput of a SignatureDef with 1 and 8 '
+      'concurrent runs, generating the inputs that are not given:\n'
+      '$saved_model_cli benchmark --dir /tmp/saved_model --tag_set serve '
+      '\\\n'
+      '   --signature_def serving_default \\\n'
+      '   --input_exprs \'input1_key=np.ones((8, 2))\' \\\n'
+      '   --num_warmup_runs 10 --num_runs 1000 --concurrency 1,8 '
+      '--batch_size 8 \\\n'
+      '   --outdir=/out\n\n'
+      'The results are printed as JSON, and saved to benchmark.json in '
+      '--outdir if given.\n')
+  parser_benchmark = subparsers.add_parser(
+      'benchmark',
+      description=benchmark_msg,
+      formatter_class=argparse.RawTextHelpFormatter)
+  parser_benchmark.set_defaults(func=benchmark)
+
+
 def add_scan_subparser(subparsers):
   """Add parser for `scan`."""
   scan_msg = ('Usage example:\n'
@@ -1301,6 +1586,9 @@ def create_parser():
   # run command
   add_run_subparser(subparsers)
 
+  # benchmark command
+  add_benchmark_subparser(subparsers)
+
   # scan command
   add_scan_subparser(subparsers)
 
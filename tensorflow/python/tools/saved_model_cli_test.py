@@ -15,6 +15,7 @@
 """Tests for SavedModelCLI tool."""
 import contextlib
 import io
+import json
 import os
 import pickle
 import platform
@@ -939,6 +940,69 @@ Concrete Functions:
     y_expected = np.array([[2.5], [3.0]])
     self.assertAllClose(y_expected, y_actual)
 
+  def testBenchmarkCommand(self):
+    base_path = test.test_src_dir_path(SAVED_MODEL_PATH)
+    output_dir = os.path.join(test.get_temp_dir(), 'benchmark_dir')
+    if os.path.isdir(output_dir):
+      shutil.rmtree(output_dir)
+
+    saved_model_cli.flags.FLAGS.unparse_flags()
+    saved_model_cli.flags.FLAGS([
+        'saved_model_cli',
+        'benchmark', '--dir', base_path, '--tag_set', 'serve',
+        '--signature_def', 'serving_default', '--num_warmup_runs', '2',
+        '--num_runs', '10', '--concurrency', '1,2', '--batch_size', '4',
+        '--outdir', output_dir
+    ])
+    parser = saved_model_cli.create_parser()
+    parser.parse_args()
+    with captured_output() as (out, _):
+      saved_model_cli.benchmark()
+
+    with open(os.path.join(output_dir, 'benchmark.json')) as f:
+      results = json.load(f)
+    self.assertIn(json.dumps(results, indent=2), out.getvalue())
+    self.assertEqual({'x': {'dtype': 'float32', 'shape': [4, 1]}},
+                     results['inputs'])
+    self.assertEqual([1, 2],
+                     [result['concurrency'] for result in results['results']])
+    for result in results['results']:
+      self.assertEqual(10, result['num_runs'])
+      self.assertGreater(result['throughput_runs_per_sec'], 0)
+      latency = result['latency_ms']
+      self.assertLessEqual(latency['min'], latency['p50'])
+      self.assertLessEqual(latency['p50'], latency['p90'])
+      self.assertLessEqual(latency['p90'], latency['p99'])
+      self.assertLessEqual(latency['p99'], latency['max'])
+    self.assertGreater(results['peak_memory_bytes'], 0)
+
+    # The results are not overwritten unless --overwrite is set.
+    with self.assertRaises(RuntimeError):
+      saved_model_cli.benchmark()
+
+  def testBenchmarkWithGivenInputs(self):
+    base_path = test.test_src_dir_path(SAVED_MODEL_PATH)
+    results = saved_model_cli.benchmark_saved_model_with_feed_dict(
+        base_path, 'serve', 'serving_default',
+        {'x': np.array([[1.], [2.]], dtype=np.float32)},
+        num_warmup_runs=0, num_runs=3)
+    self.assertEqual({'dtype': 'float32', 'shape': [2, 1]},
+                     results['inputs']['x'])
+    self.assertLen(results['results'], 1)
+
+    with self.assertRaisesRegex(ValueError, 'not a valid input key'):
+      saved_model_cli.benchmark_saved_model_with_feed_dict(
+          base_path, 'serve', 'serving_default', {'y': np.ones((2, 1))})
+    with self.assertRaisesRegex(ValueError, 'Concurrency levels'):
+      saved_model_cli.benchmark_saved_model_with_feed_dict(
+          base_path, 'serve', 'serving_default', {}, concurrency_levels=[0])
+
+  def testBenchmarkCannotGenerateStringInputs(self):
+    base_path = test.test_src_dir_path(SAVED_MODEL_PATH)
+    with self.assertRaisesRegex(ValueError, 'Can not generate a value'):
+      saved_model_cli.benchmark_saved_model_with_feed_dict(
+          base_path, 'serve', 'regress_x_to_y', {})
+
   def testScanCommand(self):
     base_path = test.test_src_dir_path(SAVED_MODEL_PATH)
 
@@ -26,6 +26,84 @@ ops.NotDifferentiable("GenerateVocabRemapping")
 ops.NotDifferentiable("LoadAndRemapMatrix")
 
 
+def _generate_remappings(new_row_vocab_offset,
+                         num_rows_to_load,
+                         new_col_vocab_size,
+                         old_row_vocab_size=-1,
+                         old_row_vocab_file=None,
+                         new_row_vocab_file=None,
+                         old_col_vocab_file=None,
+                         new_col_vocab_file=None,
+                         num_row_oov_buckets=0,
+                         num_col_oov_buckets=0):
+  """Validates arguments and generates row and column remappings.
+
+  See `_load_and_remap_matrix` for a description of the arguments.
+
+  Returns:
+    A tuple `(row_remapping, num_rows_present, col_remapping,
+    num_cols_present)`.
+
+  Raises:
+    ValueError: See `_load_and_remap_matrix`.
+  """
+  if num_row_oov_buckets < 0:
+    raise ValueError("num_row_oov_buckets must be >= 0, but received %d" %
+                     num_row_oov_buckets)
+  if num_col_oov_buckets < 0:
+    raise ValueError("num_col_oov_buckets must be >= 0, but received %d" %
+                     num_col_oov_buckets)
+
+  if bool(old_row_vocab_file) != bool(new_row_vocab_file):
+    raise ValueError(
+        "old_row_vocab_file and new_row_vocab_file must both be specified or "
+        "left unspecified. old_row_vocab_file='{}', new_row_vocab_file='{}'".
+        format(old_row_vocab_file, new_row_vocab_file))
+  if bool(old_col_vocab_file) != bool(new_col_vocab_file):
+    raise ValueError(
+        "old_col_vocab_file and new_col_vocab_file must both be specified or "
+        "left unspecified. old_col_vocab_file='{}', new_col_vocab_file='{}'".
+        format(old_col_vocab_file, new_col_vocab_file))
+
+  remap_rows = new_row_vocab_file and old_row_vocab_file
+  remap_cols = new_col_vocab_file and old_col_vocab_file
+  if not (remap_rows or remap_cols):
+    raise ValueError(
+        "Must provide either row or column vocab files. If no remapping is "
+        "necessary, consider using `tf.contrib.framework.init_from_checkpoint` "
+        "instead.")
+
+  num_rows_present = num_rows_to_load
+  if remap_rows:
+    row_remapping, num_rows_present = (
+        gen_checkpoint_ops.generate_vocab_remapping(
+            new_vocab_file=new_row_vocab_file,
+            old_vocab_file=old_row_vocab_file,
+            new_vocab_offset=new_row_vocab_offset,
+            num_new_vocab=num_rows_to_load,
+            old_vocab_size=old_row_vocab_size))
+  else:
+    # Even when the rows are not being reordered, we still need to generate a
+    # remapping to account for initializing partitioned Variables (when
+    # new_row_vocab_offset is non-zero).
+    row_remapping = math_ops.range(
+        new_row_vocab_offset,
+        new_row_vocab_offset + num_rows_to_load,
+        dtype=dtypes.int64)
+
+  col_remapping = []
+  num_cols_present = new_col_vocab_size
+  if remap_cols:
+    col_remapping, num_cols_present = (
+        gen_checkpoint_ops.generate_vocab_remapping(
+            new_vocab_file=new_col_vocab_file,
+            old_vocab_file=old_col_vocab_file,
+            new_vocab_offset=0,  # Offset is unused for cols (no partitioning).
+            num_new_vocab=new_col_vocab_size))
+
+  return row_remapping, num_rows_present, col_remapping, num_cols_present
+
+
 def _load_and_remap_matrix(ckpt_path,
                            old_tensor_name,
                            new_row_vocab_offset,
@@ -116,59 +194,18 @@ def _load_and_remap_matrix(ckpt_path,
       `new_col_vocab_file`.
     ValueError: If neither row vocabs or col vocabs are provided.
   """
-  if num_row_oov_buckets < 0:
-    raise ValueError("num_row_oov_buckets must be >= 0, but received %d" %
-                     num_row_oov_buckets)
-  if num_col_oov_buckets < 0:
-    raise ValueError("num_col_oov_buckets must be >= 0, but received %d" %
-                     num_col_oov_buckets)
-
-  if bool(old_row_vocab_file) != bool(new_row_vocab_file):
-    raise ValueError(
-        "old_row_vocab_file and new_row_vocab_file must both be specified or "
-        "left unspecified. old_row_vocab_file='{}', new_row_vocab_file='{}'".
-        format(old_row_vocab_file, new_row_vocab_file))
-  if bool(old_col_vocab_file) != bool(new_col_vocab_file):
-    raise ValueError(
-        "old_col_vocab_file and new_col_vocab_file must both be specified or "
-        "left unspecified. old_col_vocab_file='{}', new_col_vocab_file='{}'".
-        format(old_col_vocab_file, new_col_vocab_file))
-
-  remap_rows = new_row_vocab_file and old_row_vocab_file
-  remap_cols = new_col_vocab_file and old_col_vocab_file
-  if not (remap_rows or remap_cols):
-    raise ValueError(
-        "Must provide either row or column vocab files. If no remapping is "
-        "necessary, consider using `tf.contrib.framework.init_from_checkpoint` "
-        "instead.")
-
-  num_rows_present = num_rows_to_load
-  if remap_rows:
-    row_remapping, num_rows_present = (
-        gen_checkpoint_ops.generate_vocab_remapping(
-            new_vocab_file=new_row_vocab_file,
-            old_vocab_file=old_row_vocab_file,
-            new_vocab_offset=new_row_vocab_offset,
-            num_new_vocab=num_rows_to_load,
-            old_vocab_size=old_row_vocab_size))
-  else:
-    # Even when the rows are not being reordered, we still need to generate a
-    # remapping to account for initializing partitioned Variables (when
-    # new_row_vocab_offset is non-zero).
-    row_remapping = math_ops.range(
-        new_row_vocab_offset,
-        new_row_vocab_offset + num_rows_to_load,
-        dtype=dtypes.int64)
-
-  col_remapping = []
-  num_cols_present = new_col_vocab_size
-  if remap_cols:
-    col_remapping, num_cols_present = (
-        gen_checkpoint_ops.generate_vocab_remapping(
-            new_vocab_file=new_col_vocab_file,
-            old_vocab_file=old_col_vocab_file,
-            new_vocab_offset=0,  # Offset is unused for cols (no partitioning).
-            num_new_vocab=new_col_vocab_size))
+  row_remapping, num_rows_present, col_remapping, num_cols_present = (
+      _generate_remappings(
+          new_row_vocab_offset=new_row_vocab_offset,
+          num_rows_to_load=num_rows_to_load,
+          new_col_vocab_size=new_col_vocab_size,
+          old_row_vocab_size=old_row_vocab_size,
+          old_row_vocab_file=old_row_vocab_file,
+          new_row_vocab_file=new_row_vocab_file,
+          old_col_vocab_file=old_col_vocab_file,
+          new_col_vocab_file=new_col_vocab_file,
+          num_row_oov_buckets=num_row_oov_buckets,
+          num_col_oov_buckets=num_col_oov_buckets))
 
   init_vals = initializer([
       num_rows_to_load * new_col_vocab_size -
@@ -199,6 +236,107 @@ def _load_and_remap_matrix(ckpt_path,
   return return_tensor
 
 
+def _load_and_remap_matrix_chunks(ckpt_path,
+                                  old_tensor_name,
+                                  new_row_vocab_offset,
+                                  num_rows_to_load,
+                                  new_col_vocab_size,
+                                  initializer,
+                                  rows_per_chunk,
+                                  old_row_vocab_size=-1,
+                                  old_row_vocab_file=None,
+                                  new_row_vocab_file=None,
+                                  old_col_vocab_file=None,
+                                  new_col_vocab_file=None,
+                                  num_row_oov_buckets=0,
+                                  num_col_oov_buckets=0,
+                                  max_rows_in_memory=-1):
+  """Loads a 2-D (matrix) `Tensor` from checkpoint in blocks of rows.
+
+  Computes the same values as `_load_and_remap_matrix`, but splits the result
+  into blocks of at most `rows_per_chunk` rows. The vocabulary remappings are
+  generated once and sliced per block, and each block has its own
+  `LoadAndRemapMatrix` op, so blocks can be loaded concurrently and the full
+  matrix never needs to exist as a single tensor.
+
+  This is a generator: the ops for each block are only created when the block
+  is requested, so callers can create them under their own control
+  dependencies.
+
+  Args:
+    ckpt_path: See `_load_and_remap_matrix`.
+    old_tensor_name: See `_load_and_remap_matrix`.
+    new_row_vocab_offset: See `_load_and_remap_matrix`.
+    num_rows_to_load: See `_load_and_remap_matrix`.
+    new_col_vocab_size: See `_load_and_remap_matrix`.
+    initializer: See `_load_and_remap_matrix`.
+    rows_per_chunk: `int` specifying the maximum number of rows in each block.
+      Must be > 0.
+    old_row_vocab_size: See `_load_and_remap_matrix`.
+    old_row_vocab_file: See `_load_and_remap_matrix`.
+    new_row_vocab_file: See `_load_and_remap_matrix`.
+    old_col_vocab_file: See `_load_and_remap_matrix`.
+    new_col_vocab_file: See `_load_and_remap_matrix`.
+    num_row_oov_buckets: See `_load_and_remap_matrix`.
+    num_col_oov_buckets: See `_load_and_remap_matrix`.
+    max_rows_in_memory: See `_load_and_remap_matrix`.
+
+  Yields:
+    `(row_offset, Tensor)` pairs covering all
+    `num_rows_to_load + num_row_oov_buckets` rows in order. Every `Tensor` has
+    `new_col_vocab_size + num_col_oov_buckets` columns.
+
+  Raises:
+    ValueError: If `rows_per_chunk` <= 0, or see `_load_and_remap_matrix`.
+  """
+  if rows_per_chunk <= 0:
+    raise ValueError("rows_per_chunk must be > 0, but received %d" %
+                     rows_per_chunk)
+  row_remapping, _, col_remapping, num_cols_present = _generate_remappings(
+      new_row_vocab_offset=new_row_vocab_offset,
+      num_rows_to_load=num_rows_to_load,
+      new_col_vocab_size=new_col_vocab_size,
+      old_row_vocab_size=old_row_vocab_size,
+      old_row_vocab_file=old_row_vocab_file,
+      new_row_vocab_file=new_row_vocab_file,
+      old_col_vocab_file=old_col_vocab_file,
+      new_col_vocab_file=new_col_vocab_file,
+      num_row_oov_buckets=num_row_oov_buckets,
+      num_col_oov_buckets=num_col_oov_buckets)
+  num_cols_present = math_ops.cast(num_cols_present, dtypes.int32)
+
+  for row_offset in range(0, num_rows_to_load, rows_per_chunk):
+    num_rows = min(rows_per_chunk, num_rows_to_load - row_offset)
+    chunk_row_remapping = row_remapping[row_offset:row_offset + num_rows]
+    # Rows missing from the old vocabulary are marked with -1.
+    num_rows_present = math_ops.reduce_sum(
+        math_ops.cast(chunk_row_remapping >= 0, dtypes.int32))
+    # Like `_load_and_remap_matrix`, only the missing values are initialized.
+    init_vals = initializer([
+        num_rows * new_col_vocab_size - num_rows_present * num_cols_present, 1
+    ])
+    chunk = gen_checkpoint_ops.load_and_remap_matrix(
+        ckpt_path=ckpt_path,
+        old_tensor_name=old_tensor_name,
+        row_remapping=chunk_row_remapping,
+        col_remapping=col_remapping,
+        initializing_values=init_vals,
+        num_rows=num_rows,
+        num_cols=new_col_vocab_size,
+        max_rows_in_memory=max_rows_in_memory)
+    if num_col_oov_buckets > 0:
+      init_col_oov_val = ops.convert_to_tensor(
+          initializer([num_rows, num_col_oov_buckets]))
+      chunk = array_ops.concat([chunk, init_col_oov_val], 1)
+    yield row_offset, chunk
+
+  if num_row_oov_buckets > 0:
+    init_row_oov_val = ops.convert_to_tensor(
+        initializer([num_row_oov_buckets,
+                     new_col_vocab_size + num_col_oov_buckets]))
+    yield num_rows_to_load, init_row_oov_val
+
+
 def _load_and_remap_matrix_initializer(ckpt_path,
                                        old_tensor_name,
                                        new_row_vocab_size,
@@ -335,16 +473,22 @@ def _load_and_remap_matrix_initializer(ckpt_path,
         "initializer must be callable, instead of being {} of type {}.".format(
             initializer, type(initializer)))
 
-  def _initializer(shape, dtype=dtypes.float32, partition_info=None):
+  def _initializer(shape,
+                   dtype=dtypes.float32,
+                   partition_info=None,
+                   rows_per_chunk=None):
     """Variable initializer.
 
     Args:
       shape: Shape of `Tensor` to return. Should include OOV on both axes.
       dtype: Must be float32.
       partition_info: variable_scope._PartitionInfo.
+      rows_per_chunk: Optional `int`. If set, the value is returned in blocks of
+        at most `rows_per_chunk` rows (see `_load_and_remap_matrix_chunks`).
 
     Returns:
-      `Tensor` of shape `shape`.
+      `Tensor` of shape `shape`, or an iterable of `(row_offset, Tensor)` pairs
+      covering the rows of `shape` if `rows_per_chunk` is set.
 
     Raises:
       TypeError: If `dtype` is anything other than float32.
@@ -391,9 +535,16 @@ def _load_and_remap_matrix_initializer(ckpt_path,
         raise ValueError(
             "Partitioned variable offset is greater than new vocab size and "
             "not operating on OOV-only partition.")
+      if rows_per_chunk:
+        return [(0, ops.convert_to_tensor(initializer(shape)))]
       return initializer(shape)
 
-    return _load_and_remap_matrix(
+    load_kwargs = {}
+    load_fn = _load_and_remap_matrix
+    if rows_per_chunk:
+      load_fn = _load_and_remap_matrix_chunks
+      load_kwargs["rows_per_chunk"] = rows_per_chunk
+    return load_fn(
         ckpt_path=ckpt_path,
         old_tensor_name=old_tensor_name,
         new_row_vocab_offset=offset,
@@ -407,7 +558,8 @@ def _load_and_remap_matrix_initializer(ckpt_path,
         new_col_vocab_file=new_col_vocab_file,
         num_row_oov_buckets=row_oov_buckets_to_use,
         num_col_oov_buckets=num_col_oov_buckets,
-        max_rows_in_memory=max_rows_in_memory)
+        max_rows_in_memory=max_rows_in_memory,
+        **load_kwargs)
 
   return _initializer
 
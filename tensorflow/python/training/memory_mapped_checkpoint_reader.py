@@ -0,0 +1,286 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""A checkpoint reader which memory-maps the data files of local checkpoints.
+
+`MemoryMappedCheckpointReader` parses the `.index` file of a V2 checkpoint
+directly and maps the `.data-?????-of-?????` shards into memory. Tensors with a
+fixed-size dtype are returned as read-only NumPy views into the mapped shards,
+so only the pages which are actually accessed are read from disk. Everything
+else (string tensors, partitioned tensors, byte-swapped checkpoints) is read
+with the regular `CheckpointReader`.
+"""
+
+import mmap
+import struct
+import sys
+
+import numpy as np
+
+from tensorflow.core.protobuf import tensor_bundle_pb2
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import errors_impl
+from tensorflow.python.framework import tensor_shape
+from tensorflow.python.training import py_checkpoint_reader
+from tensorflow.python.util import compat
+
+# See tsl/lib/io/format.h for the layout of the table backing `.index` files.
+_TABLE_MAGIC_NUMBER = 0xdb4775248b80fb57
+_FOOTER_LENGTH = 48
+_NO_COMPRESSION = 0
+
+# Keys of tensor slices (see EncodeTensorNameSlice) start with a zero byte,
+# while the header is stored under the empty key.
+_HEADER_KEY = b""
+_SLICE_KEY_PREFIX = b"\x00"
+
+_UNMAPPABLE_DTYPES = frozenset(
+    [dtypes.string, dtypes.resource, dtypes.variant])
+
+
+def _decode_varint(buf, pos):
+  """Decodes a little-endian base-128 varint, returning (value, new_pos)."""
+  result = 0
+  shift = 0
+  while True:
+    byte = buf[pos]
+    pos += 1
+    result |= (byte & 0x7f) << shift
+    if not byte & 0x80:
+      return result, pos
+    shift += 7
+
+
+def _read_block(data, handle, pos=0):
+  """Returns the contents of the block whose handle starts at `handle[pos]`."""
+  offset, pos = _decode_varint(handle, pos)
+  size, pos = _decode_varint(handle, pos)
+  if offset + size >= len(data):
+    raise errors_impl.DataLossError(None, None, "Truncated checkpoint index.")
+  if data[offset + size] != _NO_COMPRESSION:
+    raise errors_impl.UnimplementedError(
+        None, None, "Compressed checkpoint index blocks are not supported.")
+  return data[offset:offset + size], pos
+
+
+def _iterate_block(block):
+  """Yields the (key, value) pairs stored in a table block."""
+  num_restarts, = struct.unpack_from("<I", block, len(block) - 4)
+  limit = len(block) - 4 * (num_restarts + 1)
+  pos = 0
+  key = b""
+  while pos < limit:
+    shared, pos = _decode_varint(block, pos)
+    non_shared, pos = _decode_varint(block, pos)
+    value_length, pos = _decode_varint(block, pos)
+    key = key[:shared] + bytes(block[pos:pos + non_shared])
+    pos += non_shared
+    yield key, bytes(block[pos:pos + value_length])
+    pos += value_length
+
+
+def _read_index(index_filename):
+  """Yields the (key, serialized proto) pairs of a checkpoint index file."""
+  with open(index_filename, "rb") as f:
+    data = memoryview(f.read())
+  if len(data) < _FOOTER_LENGTH:
+    raise errors_impl.DataLossError(
+        None, None, "Checkpoint index %s is too short." % index_filename)
+  footer = data[-_FOOTER_LENGTH:]
+  magic, = struct.unpack_from("<Q", footer, _FOOTER_LENGTH - 8)
+  if magic != _TABLE_MAGIC_NUMBER:
+    raise errors_impl.DataLossError(
+        None, None, "Checkpoint index %s is not an sstable." % index_filename)
+  # The footer holds the metaindex handle followed by the index handle.
+  _, pos = _decode_varint(footer, 0)
+  _, pos = _decode_varint(footer, pos)
+  index_block, _ = _read_block(data, footer, pos)
+  for _, data_handle in _iterate_block(index_block):
+    block, _ = _read_block(data, data_handle)
+    for key, value in _iterate_block(block):
+      yield key, value
+
+
+def tensor_slice_to_index(shape, begin, size):
+  """Converts `tf.slice`-style `begin` and `size` to a NumPy index.
+
+  Args:
+    shape: The shape of the sliced tensor, as a list of integers.
+    begin: A list with the start offset of the slice in each dimension.
+    size: A list with the size of the slice in each dimension. `-1` selects
+      all remaining elements in that dimension.
+
+  Returns:
+    A tuple of `slice` objects.
+
+  Raises:
+    ValueError: If `begin` or `size` do not match `shape`.
+  """
+  if len(begin) != len(shape) or len(size) != len(shape):
+    raise ValueError(
+        f"`begin` and `size` must both have length {len(shape)}, got "
+        f"begin={begin} and size={size}.")
+  index = []
+  for dim, start, length in zip(shape, begin, size):
+    if length == -1:
+      length = dim - start
+    if start < 0 or length < 0 or start + length > dim:
+      raise ValueError(
+          f"Slice with begin={begin} and size={size} is out of bounds for a "
+          f"tensor of shape {shape}.")
+    index.append(slice(start, start + length))
+  return tuple(index)
+
+
+class MemoryMappedCheckpointReader(object):
+  """Reads tensors from a local V2 checkpoint without copying them.
+
+  Example usage:
+
+  ```python
+  reader = MemoryMappedCheckpointReader("/tmp/model/ckpt-10")
+  embedding = reader.get_tensor("embedding/.ATTRIBUTES/VARIABLE_VALUE")
+  rows = reader.get_tensor_slice(
+      "embedding/.ATTRIBUTES/VARIABLE_VALUE", [1000, 0], [64, -1])
+  ```
+
+  Returned arrays are read-only and keep the underlying shard mapped for as
+  long as they are alive. The reader has the same lookup methods as the
+  `CheckpointReader` returned by `tf.compat.v1.train.NewCheckpointReader`.
+  """
+
+  def __init__(self, filepattern):
+    """Opens the checkpoint with prefix `filepattern`.
+
+    Args:
+      filepattern: The prefix of a V2 checkpoint on a local filesystem.
+
+    Raises:
+      NotFoundError: If the checkpoint index does not exist.
+      DataLossError: If the checkpoint index is corrupted.
+    """
+    self._prefix = compat.as_str(filepattern)
+    self._serialized_entries = {}
+    self._entries = {}
+    self._shards = {}
+    self._fallback_reader = None
+    header = None
+    index_filename = self._prefix + ".index"
+    try:
+      for key, value in _read_index(index_filename):
+        if key == _HEADER_KEY:
+          header = tensor_bundle_pb2.BundleHeaderProto.FromString(value)
+        elif not key.startswith(_SLICE_KEY_PREFIX):
+          self._serialized_entries[compat.as_str(key)] = value
+    except FileNotFoundError:
+      raise errors_impl.NotFoundError(
+          None, None,
+          "Failed to find any matching files for %s" % index_filename)
+    if header is None:
+      raise errors_impl.DataLossError(
+          None, None, "Checkpoint index %s has no header." % index_filename)
+    self._num_shards = header.num_shards
+    host_is_little_endian = sys.byteorder == "little"
+    self._native_byte_order = host_is_little_endian == (
+        header.endianness == tensor_bundle_pb2.BundleHeaderProto.LITTLE)
+
+  def _get_entry(self, name):
+    name = compat.as_str(name)
+    entry = self._entries.get(name)
+    if entry is None:
+      serialized = self._serialized_entries.get(name)
+      if serialized is None:
+        raise errors_impl.NotFoundError(
+            None, None, "Key %s not found in checkpoint" % name)
+      entry = tensor_bundle_pb2.BundleEntryProto.FromString(serialized)
+      self._entries[name] = entry
+    return entry
+
+  def _get_shard(self, shard_id):
+    shard = self._shards.get(shard_id)
+    if shard is None:
+      filename = "%s.data-%05d-of-%05d" % (
+          self._prefix, shard_id, self._num_shards)
+      with open(filename, "rb") as f:
+        shard = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      self._shards[shard_id] = shard
+    return shard
+
+  def _get_fallback_reader(self):
+    if self._fallback_reader is None:
+      self._fallback_reader = py_checkpoint_reader.NewCheckpointReader(
+          self._prefix)
+    return self._fallback_reader
+
+  def _map_tensor(self, entry):
+    """Returns a view of the tensor described by `entry`, or None."""
+    if entry.slices or not self._native_byte_order:
+      return None
+    dtype = dtypes.as_dtype(entry.dtype)
+    if dtype in _UNMAPPABLE_DTYPES:
+      return None
+    np_dtype = np.dtype(dtype.as_numpy_dtype)
+    shape = tensor_shape.TensorShape(entry.shape).as_list()
+    num_elements = int(np.prod(shape, dtype=np.int64))
+    if num_elements * np_dtype.itemsize != entry.size:
+      return None
+    if not num_elements:
+      array = np.zeros(shape, dtype=np_dtype)
+      array.flags.writeable = False
+      return array
+    return np.frombuffer(
+        self._get_shard(entry.shard_id),
+        dtype=np_dtype,
+        count=num_elements,
+        offset=entry.offset).reshape(shape)
+
+  def has_tensor(self, tensor_str):
+    return compat.as_str(tensor_str) in self._serialized_entries
+
+  def get_variable_to_shape_map(self):
+    return {
+        name: tensor_shape.TensorShape(self._get_entry(name).shape).as_list()
+        for name in self._serialized_entries
+    }
+
+  def get_variable_to_dtype_map(self):
+    return {
+        name: dtypes.as_dtype(self._get_entry(name).dtype)
+        for name in self._serialized_entries
+    }
+
+  def get_tensor(self, tensor_str):
+    """Returns the value of a tensor, as a read-only view where possible."""
+    entry = self._get_entry(tensor_str)
+    array = self._map_tensor(entry)
+    if array is None:
+      return self._get_fallback_reader().get_tensor(tensor_str)
+    return array
+
+  def get_tensor_slice(self, tensor_str, begin, size):
+    """Returns a slice of a tensor.
+
+    Only the pages of the data file which hold the slice are read.
+
+    Args:
+      tensor_str: The name of the tensor.
+      begin: A list with the start offset of the slice in each dimension.
+      size: A list with the size of the slice in each dimension. `-1` selects
+        all remaining elements in that dimension.
+
+    Returns:
+      A NumPy array. It is a read-only view if the tensor can be memory-mapped.
+    """
+    array = self.get_tensor(tensor_str)
+    return array[tensor_slice_to_index(list(array.shape), begin, size)]
@@ -0,0 +1,107 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for MemoryMappedCheckpointReader."""
+
+import os
+
+import numpy as np
+
+from tensorflow.python.checkpoint import checkpoint as trackable_utils
+from tensorflow.python.eager import test
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import errors_impl
+from tensorflow.python.module import module
+from tensorflow.python.ops import variables
+from tensorflow.python.training import memory_mapped_checkpoint_reader
+from tensorflow.python.training import py_checkpoint_reader
+
+
+class MemoryMappedCheckpointReaderTest(test.TestCase):
+
+  def _save_checkpoint(self):
+    root = module.Module()
+    root.matrix = variables.Variable(
+        np.arange(60, dtype=np.float32).reshape([20, 3]))
+    root.scalar = variables.Variable(7, dtype=dtypes.int64)
+    root.empty = variables.Variable(np.zeros([0, 4], dtype=np.float64))
+    root.flags = variables.Variable([True, False, True])
+    root.words = variables.Variable(constant_op.constant(["a", "bc"]))
+    return trackable_utils.Checkpoint(root=root).write(
+        os.path.join(self.get_temp_dir(), "ckpt"))
+
+  def testMatchesCheckpointReader(self):
+    prefix = self._save_checkpoint()
+    reader = memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+        prefix)
+    expected = py_checkpoint_reader.NewCheckpointReader(prefix)
+    self.assertEqual(expected.get_variable_to_shape_map(),
+                     reader.get_variable_to_shape_map())
+    self.assertEqual(expected.get_variable_to_dtype_map(),
+                     reader.get_variable_to_dtype_map())
+    for name in expected.get_variable_to_shape_map():
+      self.assertTrue(reader.has_tensor(name))
+      self.assertAllEqual(expected.get_tensor(name), reader.get_tensor(name))
+
+  def testReturnsReadOnlyViews(self):
+    prefix = self._save_checkpoint()
+    reader = memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+        prefix)
+    name = "root/matrix/.ATTRIBUTES/VARIABLE_VALUE"
+    value = reader.get_tensor(name)
+    self.assertFalse(value.flags.writeable)
+    self.assertFalse(value.flags.owndata)
+    with self.assertRaises(ValueError):
+      value[0, 0] = 1.
+
+  def testGetTensorSlice(self):
+    prefix = self._save_checkpoint()
+    reader = memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+        prefix)
+    name = "root/matrix/.ATTRIBUTES/VARIABLE_VALUE"
+    full = np.arange(60, dtype=np.float32).reshape([20, 3])
+    self.assertAllEqual(full[5:9, 1:3],
+                        reader.get_tensor_slice(name, [5, 1], [4, 2]))
+    self.assertAllEqual(full[18:, :],
+                        reader.get_tensor_slice(name, [18, 0], [-1, -1]))
+    with self.assertRaisesRegex(ValueError, "out of bounds"):
+      reader.get_tensor_slice(name, [18, 0], [3, -1])
+    with self.assertRaisesRegex(ValueError, "must both have length"):
+      reader.get_tensor_slice(name, [0], [1])
+
+  def testFallsBackForStrings(self):
+    prefix = self._save_checkpoint()
+    reader = memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+        prefix)
+    self.assertAllEqual(
+        [b"a", b"bc"],
+        reader.get_tensor("root/words/.ATTRIBUTES/VARIABLE_VALUE"))
+
+  def testMissingTensor(self):
+    prefix = self._save_checkpoint()
+    reader = memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+        prefix)
+    self.assertFalse(reader.has_tensor("missing"))
+    with self.assertRaisesRegex(errors_impl.NotFoundError, "missing"):
+      reader.get_tensor("missing")
+
+  def testMissingCheckpoint(self):
+    with self.assertRaises(errors_impl.NotFoundError):
+      memory_mapped_checkpoint_reader.MemoryMappedCheckpointReader(
+          os.path.join(self.get_temp_dir(), "does_not_exist"))
+
+
+if __name__ == "__main__":
+  test.main()
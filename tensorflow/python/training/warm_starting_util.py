@@ -18,6 +18,8 @@ import collections
 
 from tensorflow.python.framework import errors
 from tensorflow.python.framework import ops
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import state_ops
 from tensorflow.python.ops import variable_scope
 from tensorflow.python.ops import variables as variables_lib
@@ -28,6 +30,10 @@ from tensorflow.python.training import saver as saver_lib
 from tensorflow.python.training.saving import saveable_object_util
 from tensorflow.python.util.tf_export import tf_export
 
+# Default number of row blocks of a single variable (partition) loaded at the
+# same time when warm-starting in chunks.
+_DEFAULT_MAX_PARALLEL_CHUNKS = 4
+
 
 @tf_export(v1=["train.VocabInfo"])
 class VocabInfo(
@@ -195,7 +201,9 @@ def _warm_start_var_with_vocab(var,
                                current_oov_buckets=0,
                                prev_tensor_name=None,
                                initializer=None,
-                               axis=0):
+                               axis=0,
+                               rows_per_chunk=None,
+                               max_parallel_chunks=_DEFAULT_MAX_PARALLEL_CHUNKS):
   """Warm-starts given variable from `prev_tensor_name` tensor in `prev_ckpt`.
 
   Use this method when the `var` is backed by vocabulary. This method stitches
@@ -227,6 +235,12 @@ def _warm_start_var_with_vocab(var,
     initializer: Variable initializer to be used for missing entries.  If None,
       missing entries will be zero-initialized.
     axis: Axis of the variable that the provided vocabulary corresponds to.
+    rows_per_chunk: Optional `int`. If set, each (partition of the) variable is
+      loaded and assigned in blocks of at most `rows_per_chunk` rows instead of
+      as a single tensor. This bounds the memory used while warm-starting large
+      embedding matrices.
+    max_parallel_chunks: Maximum number of row blocks per variable partition
+      that may be loaded at the same time. Only used if `rows_per_chunk` is set.
 
   Raises:
     ValueError: If required args are not provided.
@@ -300,14 +314,59 @@ def _warm_start_var_with_vocab(var,
         num_row_oov_buckets=num_row_oov_buckets,
         num_col_oov_buckets=num_col_oov_buckets,
         initializer=initializer)
-    new_init_val = ops.convert_to_tensor(
-        init(shape=v_shape, partition_info=partition_info))
-    v._initializer_op = state_ops.assign(v, new_init_val)
+    if rows_per_chunk:
+      v._initializer_op = _assign_row_chunks(
+          v,
+          init(shape=v_shape, partition_info=partition_info,
+               rows_per_chunk=rows_per_chunk),
+          max_parallel_chunks)
+    else:
+      new_init_val = ops.convert_to_tensor(
+          init(shape=v_shape, partition_info=partition_info))
+      v._initializer_op = state_ops.assign(v, new_init_val)
 
 
 # pylint: enable=protected-access
 
 
+def _assign_row_chunks(var, chunks, max_parallel_chunks):
+  """Returns an op assigning `(row_offset, value)` chunks into rows of `var`.
+
+  Chunks are created lazily from `chunks` so that each one can wait for an
+  earlier chunk to be assigned. At most `max_parallel_chunks` chunks are in
+  flight at once; independent chunks are loaded concurrently by the inter-op
+  thread pool. Slices can only be assigned to an initialized variable, so
+  `var` is first filled with zeros, and the chunks are assigned after that.
+
+  Args:
+    var: The `Variable` to assign to.
+    chunks: An iterable of `(row_offset, Tensor)` pairs, e.g. from
+      `checkpoint_ops._load_and_remap_matrix_chunks`.
+    max_parallel_chunks: Maximum number of chunks loaded at the same time.
+
+  Returns:
+    An op which runs all assignments.
+  """
+  chunks = iter(chunks)
+  zeros_op = state_ops.assign(
+      var, array_ops.zeros(var.get_shape(), var.dtype.base_dtype)).op
+  assign_ops = []
+  while True:
+    dependencies = []
+    if len(assign_ops) >= max_parallel_chunks:
+      dependencies = [assign_ops[-max_parallel_chunks]]
+    with ops.control_dependencies(dependencies):
+      chunk = next(chunks, None)
+    if chunk is None:
+      break
+    row_offset, value = chunk
+    num_rows = value.get_shape().as_list()[0]
+    with ops.control_dependencies(dependencies + [zeros_op]):
+      assign_ops.append(
+          var[row_offset:row_offset + num_rows].assign(value).op)
+  return control_flow_ops.group(zeros_op, *assign_ops)
+
+
 def _get_grouped_variables(vars_to_warm_start):
   """Collects and groups (possibly partitioned) variables into a dictionary.
 
@@ -406,7 +465,8 @@ def _get_object_checkpoint_renames(path, variable_names):
 def warm_start(ckpt_to_initialize_from,
                vars_to_warm_start=".*",
                var_name_to_vocab_info=None,
-               var_name_to_prev_var_name=None):
+               var_name_to_prev_var_name=None,
+               experimental_rows_per_chunk=None):
   """Warm-starts a model using the given settings.
 
   If you are using a tf.estimator.Estimator, this will automatically be called
@@ -446,6 +506,11 @@ def warm_start(ckpt_to_initialize_from,
       effect on the set of variables that is warm-started, and only controls
       name mapping (use `vars_to_warm_start` for controlling what variables to
       warm-start).
+    experimental_rows_per_chunk: [Optional] An `int`. If set, variables with a
+      `VocabInfo` are loaded from the checkpoint and assigned in blocks of at
+      most this many rows, several blocks at a time, rather than materializing
+      each (partition of a) variable as a single tensor. Recommended for large
+      embedding tables.
 
   Raises:
     ValueError: If the WarmStartSettings contains prev_var_name or VocabInfo
@@ -506,7 +571,8 @@ def warm_start(ckpt_to_initialize_from,
           current_oov_buckets=vocab_info.num_oov_buckets,
           prev_tensor_name=prev_var_name,
           initializer=vocab_info.backup_initializer,
-          axis=vocab_info.axis)
+          axis=vocab_info.axis,
+          rows_per_chunk=experimental_rows_per_chunk)
     else:
       # For the special value of vars_to_warm_start = None,
       # we only warm-start variables with explicitly specified vocabularies.
@@ -444,6 +444,100 @@ class WarmStartingUtilTest(test.TestCase):
         self.assertAllClose([[1.2, 1.5, 0.], [2.3, 2., 0.]],
                             fruit_output_layer_vars[1].eval(sess))
 
+  def testWarmStartVarWithVocabInChunks(self):
+    prev_vocab_path = self._write_vocab(["apple", "banana", "guava", "orange"],
+                                        "old_vocab")
+    self._create_prev_run_var(
+        "fruit_weights",
+        shape=[4, 1],
+        initializer=[[0.5], [1.], [1.5], [2.]],
+        partitioner=lambda shape, dtype: [2, 1])
+
+    # New vocab with elements in reverse order and two new elements, plus an
+    # OOV bucket so that the last partition mixes vocab and OOV rows.
+    new_vocab_path = self._write_vocab(
+        ["orange", "guava", "banana", "apple", "raspberry",
+         "blueberry"], "new_vocab")
+    # New session and new graph.
+    with ops.Graph().as_default() as g:
+      with self.session(graph=g) as sess:
+        fruit_weights = variable_scope.get_variable(
+            "fruit_weights",
+            shape=[7, 1],
+            initializer=[[-1.]] * 7,
+            partitioner=lambda shape, dtype: [2, 1])
+        ws_util._warm_start_var_with_vocab(
+            fruit_weights,
+            new_vocab_path,
+            6,
+            self.get_temp_dir(),
+            prev_vocab_path,
+            current_oov_buckets=1,
+            rows_per_chunk=2,
+            max_parallel_chunks=1)
+        self.evaluate(variables.global_variables_initializer())
+        fruit_weights_vars = fruit_weights._get_variable_list()
+        self.assertAllClose([[2.], [1.5], [1.], [0.5]],
+                            fruit_weights_vars[0].eval(sess))
+        self.assertAllClose([[0.], [0.], [0.]],
+                            fruit_weights_vars[1].eval(sess))
+
+  def testWarmStartVarWithVocabInParallelChunks(self):
+    prev_vocab_path = self._write_vocab(["apple", "banana", "guava", "orange"],
+                                        "old_vocab")
+    self._create_prev_run_var(
+        "fruit_weights", initializer=[[0.5, 5.], [1., 10.], [1.5, 15.],
+                                      [2., 20.]])
+
+    # New vocab with two new elements, which are initialized with ones.
+    new_vocab_path = self._write_vocab(
+        ["orange", "raspberry", "guava", "banana", "blueberry", "apple"],
+        "new_vocab")
+    # New session and new graph.
+    with ops.Graph().as_default() as g:
+      with self.session(graph=g) as sess:
+        fruit_weights = variable_scope.get_variable(
+            "fruit_weights", initializer=[[-1., -1.]] * 6)
+        ws_util._warm_start_var_with_vocab(
+            fruit_weights,
+            new_vocab_path,
+            6,
+            self.get_temp_dir(),
+            prev_vocab_path,
+            initializer=ones(),
+            rows_per_chunk=1,
+            max_parallel_chunks=3)
+        self.evaluate(variables.global_variables_initializer())
+        self.assertAllClose(
+            [[2., 20.], [1., 1.], [1.5, 15.], [1., 10.], [1., 1.], [0.5, 5.]],
+            fruit_weights.eval(sess))
+
+  def testWarmStartVarWithColumnVocabInChunks(self):
+    prev_vocab_path = self._write_vocab(["apple", "orange"], "old_vocab")
+    self._create_prev_run_var(
+        "fruit_output_layer",
+        initializer=[[0.5, 0.3], [1., 0.8], [1.5, 1.2], [2., 2.3],
+                     [2.5, 2.8]])
+
+    # New vocab with elements in reverse order and one new element.
+    new_vocab_path = self._write_vocab(["orange", "apple", "banana"],
+                                       "new_vocab")
+    # New session and new graph.
+    with ops.Graph().as_default() as g:
+      with self.session(graph=g) as sess:
+        fruit_output_layer = variable_scope.get_variable(
+            "fruit_output_layer", initializer=[[-1., -1., -1.]] * 5)
+        ws_util._warm_start_var_with_vocab(fruit_output_layer, new_vocab_path,
+                                           current_vocab_size=3,
+                                           prev_ckpt=self.get_temp_dir(),
+                                           prev_vocab_path=prev_vocab_path,
+                                           axis=1,
+                                           rows_per_chunk=2)
+        self.evaluate(variables.global_variables_initializer())
+        self.assertAllClose([[0.3, 0.5, 0.], [0.8, 1.0, 0.], [1.2, 1.5, 0.],
+                             [2.3, 2., 0.], [2.8, 2.5, 0.]],
+                            fruit_output_layer.eval(sess))
+
   def testWarmStart_ListOfVariables(self):
     # Save checkpoint from which to warm-start.
     _, prev_int_val = self._create_prev_run_var("v1", shape=[10, 1],
@@ -0,0 +1,344 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Lazy reader for chunked protos written by a `ComposableSplitter`.
+
+The reader follows the merge rules of `merge.cc`, but only reads the chunks
+that contribute to the requested field. For example, a single function or node
+of a chunked GraphDef can be read without merging the entire GraphDef:
+
+```python
+with ChunkedProtoReader(prefix, graph_pb2.GraphDef) as reader:
+  node = reader.read(["node", 1234])
+  function = reader.read(["library", "function", 12])
+```
+"""
+
+from collections.abc import Sequence
+from typing import Any, Optional, Type
+
+import riegeli
+
+from google.protobuf import descriptor
+from google.protobuf import message
+from tensorflow.python.lib.io import file_io
+from tensorflow.tools.proto_splitter import chunk_pb2
+from tensorflow.tools.proto_splitter import util
+
+# A step into a nested field: (field number, index or map key or None).
+_Step = tuple[int, Any]
+
+
+def _to_steps(field_tags: Sequence[chunk_pb2.FieldIndex]) -> list[_Step]:
+  """Groups FieldIndex protos into (field number, index/map key) steps."""
+  steps = []
+  for tag in field_tags:
+    kind = tag.WhichOneof("kind")
+    if kind == "field":
+      steps.append((tag.field, None))
+    elif kind == "index":
+      steps[-1] = (steps[-1][0], tag.index)
+    else:
+      key = getattr(tag.map_key, tag.map_key.WhichOneof("type"))
+      steps[-1] = (steps[-1][0], key)
+  return steps
+
+
+def _sort_key(chunked_field: chunk_pb2.ChunkedField):
+  """Sorts chunked fields in the order used by the C++ Merger."""
+  tags = []
+  for tag in chunked_field.field_tag:
+    kind = tag.WhichOneof("kind")
+    # Map keys are unordered.
+    tags.append(0 if kind == "map_key" else getattr(tag, kind))
+  return tuple(tags), chunked_field.message.chunk_index
+
+
+def _is_map(field_desc: descriptor.FieldDescriptor) -> bool:
+  return (
+      field_desc.message_type is not None
+      and field_desc.message_type.GetOptions().map_entry
+  )
+
+
+def _get_or_create(
+    msg: message.Message, steps: Sequence[_Step]
+) -> message.Message:
+  """Returns the nested message at `steps`, creating fields as needed."""
+  for number, key in steps:
+    field_desc = msg.DESCRIPTOR.fields_by_number[number]
+    field = getattr(msg, field_desc.name)
+    if _is_map(field_desc):
+      msg = field[key]
+    elif util.is_repeated(field_desc):
+      while len(field) <= key:
+        field.add()
+      msg = field[key]
+    else:
+      msg = field
+  return msg
+
+
+def _mutable_field(msg: message.Message, steps: Sequence[_Step]):
+  """Navigates to the last step, creating intermediate fields as needed.
+
+  Args:
+    msg: Message to navigate.
+    steps: Non-empty list of steps.
+
+  Returns:
+    Tuple of (parent message, field descriptor, index or map key of the last
+    step).
+  """
+  msg = _get_or_create(msg, steps[:-1])
+  number, key = steps[-1]
+  return msg, msg.DESCRIPTOR.fields_by_number[number], key
+
+
+def _check_message_path(
+    message_type: Type[message.Message], steps: Sequence[_Step], fields
+) -> None:
+  """Raises an error if `steps` do not lead to a single message."""
+  desc = message_type.DESCRIPTOR
+  for number, key in steps:
+    field_desc = desc.fields_by_number[number]
+    if _is_map(field_desc):
+      field_desc = field_desc.message_type.fields_by_name["value"]
+    elif util.is_repeated(field_desc) and key is None:
+      raise ValueError(
+          f"Fields {fields} must include an index into the repeated field "
+          f"'{field_desc.name}'."
+      )
+    if field_desc.message_type is None:
+      raise ValueError(f"Fields {fields} do not resolve to a message.")
+    desc = field_desc.message_type
+
+
+class ChunkedProtoReader:
+  """Reads fields of a chunked proto without merging the entire message."""
+
+  def __init__(self, prefix: str, message_type: Type[message.Message]):
+    """Opens a chunked proto.
+
+    Args:
+      prefix: Path of the proto without the `.pb` / `.cpb` extension, as
+        returned by `ComposableSplitter.write` without the extension.
+      message_type: The type of the proto that was split.
+
+    Raises:
+      FileNotFoundError: If neither `{prefix}.cpb` nor `{prefix}.pb` exist.
+    """
+    self._message_type = message_type
+    self._pb_path = None
+    self._reader = None
+    self._metadata = None
+    if file_io.file_exists(f"{prefix}.cpb"):
+      self._reader = riegeli.RecordReader(
+          file_io.FileIO(f"{prefix}.cpb", "rb")
+      )
+      self._reader.seek_back()
+      self._metadata = self._reader.read_message(chunk_pb2.ChunkMetadata)
+    elif file_io.file_exists(f"{prefix}.pb"):
+      self._pb_path = f"{prefix}.pb"
+    else:
+      raise FileNotFoundError(
+          f"Could not find a proto at {prefix}.cpb or {prefix}.pb."
+      )
+
+  @property
+  def metadata(self) -> Optional[chunk_pb2.ChunkMetadata]:
+    """The ChunkMetadata, or None if the proto was not chunked."""
+    return self._metadata
+
+  def read_chunk(self, chunk_index: int) -> bytes:
+    """Returns the serialized chunk at `chunk_index`."""
+    chunk_info = self._metadata.chunks[chunk_index]
+    self._reader.seek_numeric(chunk_info.offset)
+    return self._reader.read_record()
+
+  def read(self, fields: util.FieldTypes = ()) -> message.Message:
+    """Reads a nested message, only reading the chunks that contribute to it.
+
+    Args:
+      fields: List of string/int/map key fields, e.g. ["node", 3] represents
+        `proto.node[3]`. Must resolve to a message. If empty, the whole proto
+        is merged.
+
+    Returns:
+      A new message with the merged contents of the field. The message is
+      empty if the field is not set.
+    """
+    if not isinstance(fields, (list, tuple)):
+      fields = [fields]
+    root = self._message_type()
+    steps = _to_steps(util.get_field_tag(root, list(fields)))
+    _check_message_path(self._message_type, steps, fields)
+    target = _get_or_create(root, steps)
+
+    if self._pb_path is not None:
+      with file_io.FileIO(self._pb_path, "rb") as f:
+        proto = self._message_type.FromString(f.read())
+      self._extract(proto, (), steps, target, {})
+      del proto
+    else:
+      self._read_path(self._metadata.message, (), steps, target, {})
+
+    result = type(target)()
+    result.CopyFrom(target)
+    return result
+
+  def close(self) -> None:
+    if self._reader is not None:
+      self._reader.close()
+      self._reader = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def _merge(
+      self, chunked_message: chunk_pb2.ChunkedMessage, msg: message.Message
+  ) -> None:
+    """Merges all the chunks of `chunked_message` into `msg`."""
+    if chunked_message.HasField("chunk_index"):
+      msg.MergeFromString(self.read_chunk(chunked_message.chunk_index))
+    for chunked_field in sorted(chunked_message.chunked_fields, key=_sort_key):
+      steps = _to_steps(chunked_field.field_tag)
+      if not steps:
+        # The chunk is a portion of `msg` itself.
+        self._merge(chunked_field.message, msg)
+      else:
+        self._merge_field(chunked_field.message, msg, steps)
+
+  def _merge_field(
+      self,
+      chunked_message: chunk_pb2.ChunkedMessage,
+      msg: message.Message,
+      steps: Sequence[_Step],
+  ) -> None:
+    """Merges `chunked_message` into the field of `msg` at `steps`."""
+    parent, field_desc, key = _mutable_field(msg, steps)
+    field = getattr(parent, field_desc.name)
+    if _is_map(field_desc):
+      value_desc = field_desc.message_type.fields_by_name["value"]
+      if value_desc.message_type is not None:
+        self._merge(chunked_message, field[key])
+      else:
+        field[key] = self._read_scalar(chunked_message, value_desc)
+    elif field_desc.message_type is not None:
+      if util.is_repeated(field_desc):
+        while len(field) <= key:
+          field.add()
+        field = field[key]
+      self._merge(chunked_message, field)
+    else:
+      value = self._read_scalar(chunked_message, field_desc)
+      if util.is_repeated(field_desc):
+        while len(field) <= key:
+          field.append(type(value)())
+        field[key] = value
+      else:
+        setattr(parent, field_desc.name, value)
+
+  def _read_scalar(
+      self,
+      chunked_message: chunk_pb2.ChunkedMessage,
+      field_desc: descriptor.FieldDescriptor,
+  ):
+    chunk = self.read_chunk(chunked_message.chunk_index)
+    if field_desc.type == descriptor.FieldDescriptor.TYPE_STRING:
+      return chunk.decode("utf-8")
+    return chunk
+
+  def _read_path(
+      self,
+      chunked_message: chunk_pb2.ChunkedMessage,
+      prefix: tuple[_Step, ...],
+      steps: Sequence[_Step],
+      target: message.Message,
+      counts: dict[Any, int],
+  ) -> None:
+    """Merges the part of `chunked_message` at `steps` into `target`.
+
+    Args:
+      chunked_message: Describes the message at `prefix` of the root proto.
+      prefix: Steps from the root proto to the message.
+      steps: Steps from the message to the target field.
+      target: The message the target field is merged into.
+      counts: Number of elements merged so far into each repeated field along
+        the path, keyed by the steps to the message that holds the field.
+        Indices in field tags refer to the merged repeated field, so this is
+        used to find elements in chunks that are concatenated.
+    """
+    if not steps:
+      self._merge(chunked_message, target)
+      return
+    if chunked_message.HasField("chunk_index"):
+      msg_type = type(_get_or_create(self._message_type(), prefix))
+      msg = msg_type.FromString(
+          self.read_chunk(chunked_message.chunk_index)
+      )
+      self._extract(msg, prefix, steps, target, counts)
+      del msg
+
+    for chunked_field in sorted(chunked_message.chunked_fields, key=_sort_key):
+      field_steps = _to_steps(chunked_field.field_tag)
+      n = min(len(field_steps), len(steps))
+      if field_steps[:n] != list(steps[:n]):
+        continue  # Not on the path to the target.
+      if len(field_steps) <= len(steps):
+        self._read_path(
+            chunked_field.message,
+            prefix + tuple(field_steps),
+            steps[len(field_steps) :],
+            target,
+            counts,
+        )
+      else:
+        # The chunk is nested within the target.
+        self._merge_field(
+            chunked_field.message, target, field_steps[len(steps) :]
+        )
+
+  def _extract(
+      self,
+      msg: message.Message,
+      prefix: tuple[_Step, ...],
+      steps: Sequence[_Step],
+      target: message.Message,
+      counts: dict[Any, int],
+  ) -> bool:
+    """Merges the field of a parsed chunk at `steps` into `target`."""
+    for i, (number, key) in enumerate(steps):
+      field_desc = msg.DESCRIPTOR.fields_by_number[number]
+      field = getattr(msg, field_desc.name)
+      if _is_map(field_desc):
+        if key not in field:
+          return False
+        msg = field[key]
+      elif util.is_repeated(field_desc):
+        path = prefix + tuple(steps[:i])
+        offset = counts.get(path, 0)
+        counts[path] = offset + len(field)
+        if not offset <= key < offset + len(field):
+          return False
+        msg = field[key - offset]
+      else:
+        if not msg.HasField(field_desc.name):
+          return False
+        msg = field
+    target.MergeFrom(msg)
+    return True
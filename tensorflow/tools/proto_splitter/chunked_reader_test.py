@@ -0,0 +1,132 @@
+# Copyright 2024 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for ChunkedProtoReader."""
+
+import os
+
+from absl.testing import parameterized
+
+from tensorflow.core.framework import graph_pb2
+from tensorflow.python.platform import test
+from tensorflow.tools.proto_splitter import chunked_reader
+from tensorflow.tools.proto_splitter import constants
+from tensorflow.tools.proto_splitter import split_graph_def
+from tensorflow.tools.proto_splitter.python import test_util
+
+
+class ChunkedProtoReaderTest(test.TestCase, parameterized.TestCase):
+
+  def _write(self, graph_def, streaming):
+    graph_def_copy = graph_pb2.GraphDef()
+    graph_def_copy.CopyFrom(graph_def)
+    prefix = os.path.join(self.create_tempdir(), "graph_def")
+    split_graph_def.GraphDefSplitter(graph_def_copy).write(
+        prefix, streaming=streaming
+    )
+    return prefix
+
+  @parameterized.named_parameters(
+      ("in_memory", False),
+      ("streaming", True),
+  )
+  def testReadGraphDefFields(self, streaming):
+    constants.debug_set_max_size(200)
+    graph_def = test_util.make_graph_def_with_constant_nodes(
+        [50, 50, 50, 500, 50, 50],
+        fn1=[50, 50, 50],
+        fn2=[50],
+        fn3=[500, 50],
+    )
+    prefix = self._write(graph_def, streaming)
+    self.assertTrue(os.path.exists(f"{prefix}.cpb"))
+
+    with chunked_reader.ChunkedProtoReader(
+        prefix, graph_pb2.GraphDef
+    ) as reader:
+      self.assertProtoEquals(graph_def, reader.read())
+      for i, node in enumerate(graph_def.node):
+        self.assertProtoEquals(node, reader.read(["node", i]))
+      for i, function in enumerate(graph_def.library.function):
+        self.assertProtoEquals(
+            function, reader.read(["library", "function", i])
+        )
+        for j, node in enumerate(function.node_def):
+          self.assertProtoEquals(
+              node, reader.read(["library", "function", i, "node_def", j])
+          )
+      self.assertProtoEquals(
+          graph_def.node[3].attr["value"],
+          reader.read(["node", 3, "attr", "value"]),
+      )
+      # Out of range elements are empty.
+      self.assertProtoEquals(
+          "", reader.read(["node", len(graph_def.node)])
+      )
+
+  def testStreamingMatchesInMemory(self):
+    constants.debug_set_max_size(200)
+    graph_def = test_util.make_graph_def_with_constant_nodes(
+        [95] * 10, fn1=[50, 50, 50]
+    )
+    in_memory = self._write(graph_def, streaming=False)
+    streaming = self._write(graph_def, streaming=True)
+    with chunked_reader.ChunkedProtoReader(
+        in_memory, graph_pb2.GraphDef
+    ) as in_memory_reader, chunked_reader.ChunkedProtoReader(
+        streaming, graph_pb2.GraphDef
+    ) as streaming_reader:
+      self.assertProtoEquals(
+          in_memory_reader.metadata.message,
+          streaming_reader.metadata.message,
+      )
+      self.assertEqual(
+          [c.size for c in in_memory_reader.metadata.chunks],
+          [c.size for c in streaming_reader.metadata.chunks],
+      )
+
+  def testReadUnchunked(self):
+    constants.debug_set_max_size(2000)
+    graph_def = test_util.make_graph_def_with_constant_nodes([50, 50])
+    prefix = self._write(graph_def, streaming=True)
+    self.assertTrue(os.path.exists(f"{prefix}.pb"))
+    with chunked_reader.ChunkedProtoReader(
+        prefix, graph_pb2.GraphDef
+    ) as reader:
+      self.assertIsNone(reader.metadata)
+      self.assertProtoEquals(graph_def, reader.read())
+      self.assertProtoEquals(graph_def.node[1], reader.read(["node", 1]))
+
+  def testInvalidFields(self):
+    constants.debug_set_max_size(2000)
+    prefix = self._write(
+        test_util.make_graph_def_with_constant_nodes([50]), streaming=False
+    )
+    with chunked_reader.ChunkedProtoReader(
+        prefix, graph_pb2.GraphDef
+    ) as reader:
+      with self.assertRaisesRegex(ValueError, "must include an index"):
+        reader.read(["node"])
+      with self.assertRaisesRegex(ValueError, "do not resolve to a message"):
+        reader.read(["node", 0, "name"])
+
+  def testMissingFile(self):
+    with self.assertRaises(FileNotFoundError):
+      chunked_reader.ChunkedProtoReader(
+          os.path.join(self.get_temp_dir(), "missing"), graph_pb2.GraphDef
+      )
+
+
+if __name__ == "__main__":
+  test.main()
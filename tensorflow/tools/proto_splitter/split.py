@@ -92,11 +92,19 @@ class ComposableSplitter(Splitter):
     # Whether chunks have been created. See `build_chunks()`.
     self._built = False
 
-    # Keep a list of chunk ids in the order in which they were added to the
-    # list.
+    # Each chunk is identified by a key, assigned in the order in which the
+    # chunks are added. `_chunk_keys` is parallel to `_chunks`, and
+    # `_add_chunk_order` lists the keys in the order they were added.
+    self._chunk_keys = []
     self._add_chunk_order = []
     self._fix_chunk_order = False
 
+    # Set while streaming chunks to disk, see `write(streaming=True)`.
+    self._stream = None
+    self._streamed = False
+    # Maps the id of chunks added with `final=False` to their key.
+    self._open_chunks = {}
+
     # Initialize chunks and ChunkedMessage (optionally with the first chunk as
     # the user-provided proto.
     if parent_splitter is not None:
@@ -107,7 +115,8 @@ class ComposableSplitter(Splitter):
     elif proto_as_initial_chunk:
       self._chunks = [self._proto]
       self._chunked_message = chunk_pb2.ChunkedMessage(chunk_index=0)
-      self._add_chunk_order.append(id(self._proto))
+      self._chunk_keys.append(0)
+      self._add_chunk_order.append(0)
     else:
       self._chunks = []
       self._chunked_message = chunk_pb2.ChunkedMessage()
@@ -141,6 +150,12 @@ class ComposableSplitter(Splitter):
           "the parent's `split()` method instead."
       )
 
+    if self._streamed:
+      raise ValueError(
+          "The chunks of this splitter were streamed to disk by "
+          "`write(streaming=True)` and are no longer available."
+      )
+
     assert self._chunks is not None
     assert self._chunked_message is not None
 
@@ -150,7 +165,7 @@ class ComposableSplitter(Splitter):
       self._built = True
     return self._chunks, self._chunked_message
 
-  def write(self, file_prefix: str) -> str:
+  def write(self, file_prefix: str, streaming: bool = False) -> str:
     """Serializes a proto to disk.
 
     The writer writes all chunks into a riegeli file. The chunk metadata
@@ -160,6 +175,10 @@ class ComposableSplitter(Splitter):
       file_prefix: string prefix of the filepath. The writer will automatically
         attach a `.pb` or `.cpb` (chunked pb) suffix depending on whether the
         proto is split.
+      streaming: If True, chunks are written to the file as soon as they are
+        final, and released, instead of being held in memory until all chunks
+        are built. Chunks are then no longer available from `split()`. Has no
+        effect if the chunks were already built.
 
     Returns:
       The actual filepath the proto is written to. The filepath will be
@@ -174,15 +193,12 @@ class ComposableSplitter(Splitter):
       )
 
     start_time = time.time()
+    if streaming and not self._built:
+      return self._write_streaming(file_prefix, start_time)
     chunks, chunked_message = self.split()
 
     if not chunked_message.chunked_fields:
-      path = f"{file_prefix}.pb"
-      file_io.atomic_write_string_to_file(
-          path, self._proto.SerializeToString(deterministic=True)
-      )
-      logging.info("Unchunked file exported to %s", path)
-      return path
+      return self._write_unchunked(file_prefix)
 
     path = f"{file_prefix}.cpb"
     with riegeli.RecordWriter(file_io.FileIO(path, "wb")) as f:
@@ -190,17 +206,7 @@ class ComposableSplitter(Splitter):
           message=chunked_message, version=self.version_def
       )
       for chunk in chunks:
-        if isinstance(chunk, message.Message):
-          f.write_message(chunk)
-          chunk_type = chunk_pb2.ChunkInfo.Type.MESSAGE
-          size = chunk.ByteSize()
-        else:
-          f.write_record(chunk)
-          chunk_type = chunk_pb2.ChunkInfo.Type.BYTES
-          size = len(chunk)
-        metadata.chunks.add(
-            type=chunk_type, size=size, offset=f.last_pos.numeric
-        )
+        metadata.chunks.append(_write_chunk(f, chunk))
       f.write_message(metadata)
 
     end = time.time()
@@ -216,11 +222,65 @@ class ComposableSplitter(Splitter):
     )
     return path
 
+  def _write_unchunked(self, file_prefix: str) -> str:
+    path = f"{file_prefix}.pb"
+    file_io.atomic_write_string_to_file(
+        path, self._proto.SerializeToString(deterministic=True)
+    )
+    logging.info("Unchunked file exported to %s", path)
+    return path
+
+  def _write_streaming(self, file_prefix: str, start_time: float) -> str:
+    """Builds the chunks while writing them to disk, see `write`."""
+    path = f"{file_prefix}.cpb"
+    self._stream = _ChunkStream(path)
+    try:
+      self.build_chunks()
+      self._fix_chunks()
+      self._built = True
+
+      if not self._chunked_message.chunked_fields:
+        return self._write_unchunked(file_prefix)
+
+      # Write the chunks that were still open, including the initial proto.
+      for i, (key, chunk) in enumerate(zip(self._chunk_keys, self._chunks)):
+        if chunk is not None:
+          self._stream.write(key, chunk)
+          self._chunks[i] = None
+      self._open_chunks.clear()
+      num_chunks = len(self._chunks)
+      self._stream.close(
+          chunk_pb2.ChunkMetadata(
+              message=self._chunked_message,
+              version=self.version_def,
+              chunks=[self._stream.chunk_info(k) for k in self._chunk_keys],
+          )
+      )
+      self._streamed = True
+    except Exception:
+      self._stream.abort()
+      raise
+    finally:
+      self._stream = None
+
+    logging.info("Chunked file exported to %s", path)
+    logging.info(
+        "Total time spent splitting and writing the message: %s",
+        time.time() - start_time,
+    )
+    logging.info(
+        "Number of chunks created (including initial message): %s",
+        num_chunks,
+    )
+    return path
+
   def add_chunk(
       self,
       chunk: Union[message.Message, bytes],
       field_tags: util.FieldTypes,
       index=None,
+      *,
+      final: bool = True,
   ) -> None:
     """Adds a new chunk and updates the ChunkedMessage proto.
 
@@ -230,10 +290,14 @@ class ComposableSplitter(Splitter):
         within self._proto.
       index: Optional index at which to insert the chunk. The chunk ordering is
         important for merging.
+      final: Whether the chunk will not be modified anymore. When streaming,
+        final chunks are written right away. Chunks that are still being filled
+        must be added with `final=False`, and passed to `finalize_chunk` once
+        they are complete.
     """
     if self._parent_splitter is not None:
       self._parent_splitter.add_chunk(
-          chunk, self._fields_in_parent + field_tags, index
+          chunk, self._fields_in_parent + field_tags, index, final=final
       )
     else:
       assert self._chunks is not None
@@ -243,14 +307,35 @@ class ComposableSplitter(Splitter):
       )
       new_chunk_index = len(self._chunks)
       field.message.chunk_index = new_chunk_index
-      self._add_chunk_order.append(id(chunk))
+      key = len(self._add_chunk_order)
+      self._add_chunk_order.append(key)
+
+      if self._stream is not None:
+        if final:
+          self._stream.write(key, chunk)
+          chunk = None
+        else:
+          self._open_chunks[id(chunk)] = key
 
       if index is None:
         self._chunks.append(chunk)
+        self._chunk_keys.append(key)
       else:
         self._chunks.insert(index, chunk)
+        self._chunk_keys.insert(index, key)
         self._fix_chunk_order = True
 
+  def finalize_chunk(self, chunk: Union[message.Message, bytes]) -> None:
+    """Marks a chunk added with `add_chunk(final=False)` as complete."""
+    if self._parent_splitter is not None:
+      self._parent_splitter.finalize_chunk(chunk)
+      return
+    if self._stream is None:
+      return
+    key = self._open_chunks.pop(id(chunk))
+    self._stream.write(key, chunk)
+    self._chunks[self._chunk_keys.index(key)] = None
+
   def _fix_chunks(self) -> None:
     """Fixes chunk indices in the ChunkedMessage."""
     if not self._fix_chunk_order:
@@ -261,9 +346,8 @@ class ComposableSplitter(Splitter):
     # always added to the end of the list. However, this is not always the case
     # the indices must be updated.
 
-    # Use the address of each chunk (python `id`) as lookup keys to the
-    # ordered chunk indices.
-    chunk_indices = {id(chunk): i for i, chunk in enumerate(self._chunks)}
+    # Use the key of each chunk as lookup keys to the ordered chunk indices.
+    chunk_indices = {key: i for i, key in enumerate(self._chunk_keys)}
 
     to_fix = [self._chunked_message]
     while to_fix:
@@ -272,12 +356,60 @@ class ComposableSplitter(Splitter):
           to_fix.append(field.message)
         if not field.message.HasField("chunk_index"):
           continue
-        chunk_addr = self._add_chunk_order[field.message.chunk_index]
-        assert (
-            chunk_addr in chunk_indices
-        ), f"Found unexpected chunk {chunk_addr}"
-        new_chunk_index = chunk_indices[chunk_addr]
+        chunk_key = self._add_chunk_order[field.message.chunk_index]
+        assert chunk_key in chunk_indices, f"Found unexpected chunk {chunk_key}"
+        new_chunk_index = chunk_indices[chunk_key]
         field.message.chunk_index = new_chunk_index
 
-    self._add_chunk_order = [id(chunk) for chunk in self._chunks]
+    self._add_chunk_order = list(self._chunk_keys)
     self._fix_chunk_order = False
+
+
+def _write_chunk(
+    writer: riegeli.RecordWriter, chunk: Union[message.Message, bytes]
+) -> chunk_pb2.ChunkInfo:
+  """Writes a chunk to the riegeli file and returns its ChunkInfo."""
+  if isinstance(chunk, message.Message):
+    writer.write_message(chunk)
+    chunk_type = chunk_pb2.ChunkInfo.Type.MESSAGE
+    size = chunk.ByteSize()
+  else:
+    writer.write_record(chunk)
+    chunk_type = chunk_pb2.ChunkInfo.Type.BYTES
+    size = len(chunk)
+  return chunk_pb2.ChunkInfo(
+      type=chunk_type, size=size, offset=writer.last_pos.numeric
+  )
+
+
+class _ChunkStream:
+  """Writes chunks to a riegeli file in the order in which they are final.
+
+  The merger locates chunks by their offset, so the order of the records in the
+  file doesn't need to match the order of the chunks in the ChunkMetadata.
+  """
+
+  def __init__(self, path: str):
+    self._path = path
+    self._writer = None
+    self._chunk_infos = {}
+
+  def write(self, key: int, chunk: Union[message.Message, bytes]) -> None:
+    if self._writer is None:
+      self._writer = riegeli.RecordWriter(file_io.FileIO(self._path, "wb"))
+    self._chunk_infos[key] = _write_chunk(self._writer, chunk)
+
+  def chunk_info(self, key: int) -> chunk_pb2.ChunkInfo:
+    return self._chunk_infos[key]
+
+  def close(self, metadata: chunk_pb2.ChunkMetadata) -> None:
+    self._writer.write_message(metadata)
+    self._writer.close()
+    self._writer = None
+
+  def abort(self) -> None:
+    """Closes and deletes a partially written file."""
+    if self._writer is not None:
+      self._writer.close()
+      self._writer = None
+      file_io.delete_file(self._path)
@@ -15,7 +15,6 @@
 """GraphDef splitter."""
 
 from collections.abc import Sequence
-import itertools
 from typing import Optional, Type
 
 from google.protobuf import message
@@ -236,10 +235,14 @@ class RepeatedMessageSplitter(split.ComposableSplitter):
 
       # Create a new GraphDef chunk if the current list of nodes is too large.
       if total_size + size >= constants.max_size():
+        # All elements of the previous chunk have been processed, so it can
+        # be filled (and written, when streaming).
+        self._fill_last_chunk(repeated_msg_split, repeated_msg_graphs, n)
+
         new_msg = type(self._proto)()
         repeated_msg_split.append(n)
         repeated_msg_graphs.append(new_msg)
-        self.add_chunk(new_msg, [])
+        self.add_chunk(new_msg, [], final=False)
 
         if len(repeated_msg_split) >= 1:
           total_size_diff += total_size
@@ -250,17 +253,28 @@ class RepeatedMessageSplitter(split.ComposableSplitter):
 
     if repeated_msg_split:
       # Finish writing repeated chunks.
-      start = repeated_msg_split[0]
-      for end, msg in zip(
-          itertools.chain.from_iterable([repeated_msg_split[1:], [None]]),
-          repeated_msg_graphs,
-      ):
-        _split_repeated_field(proto, msg, self.repeated_field, start, end)
-        start = end
+      self._fill_last_chunk(repeated_msg_split, repeated_msg_graphs, None)
       del field[repeated_msg_split[0] :]
 
     return total_size_diff
 
+  def _fill_last_chunk(
+      self,
+      repeated_msg_split: list[int],
+      repeated_msg_graphs: list[Optional[message.Message]],
+      end: Optional[int],
+  ) -> None:
+    """Copies the elements of the last created chunk, and finalizes it."""
+    if not repeated_msg_graphs:
+      return
+    msg = repeated_msg_graphs[-1]
+    _split_repeated_field(
+        self._proto, msg, self.repeated_field, repeated_msg_split[-1], end
+    )
+    self.finalize_chunk(msg)
+    # The proto is owned by the chunk list (or released after streaming).
+    repeated_msg_graphs[-1] = None
+
 
 class ConstantNodeDefSplitter(SplitBasedOnSize):
   """Extracts constant value from a `Const` NodeDef."""
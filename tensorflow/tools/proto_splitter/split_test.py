@@ -101,6 +101,58 @@ class SplitRepeatedStringTest(test.TestCase):
         reader.seek_numeric(chunk_info.offset)
         self.assertEqual(expected_data, reader.read_record())
 
+  def testWriteStreaming(self):
+    data = [_random_string(5), _random_string(10), _random_string(15)]
+    path = os.path.join(self.create_tempdir(), "split-repeat")
+    splitter = RepeatedStringSplitter(
+        test_message_pb2.RepeatedString(strings=data)
+    )
+    self.assertEqual(f"{path}.cpb", splitter.write(path, streaming=True))
+    with self.assertRaisesRegex(ValueError, "streamed to disk"):
+      splitter.split()
+
+    with riegeli.RecordReader(open(f"{path}.cpb", "rb")) as reader:
+      records = list(reader.read_records())
+      self.assertLen(records, 4)
+      self.assertEqual(data, records[:3])
+
+      proto = chunk_pb2.ChunkMetadata()
+      proto.ParseFromString(records[-1])
+      self.assertLen(proto.chunks, 3)
+      for i, expected_data in enumerate(data):
+        self.assertEqual(i, proto.message.chunked_fields[i].message.chunk_index)
+        reader.seek_numeric(proto.chunks[i].offset)
+        self.assertEqual(expected_data, reader.read_record())
+
+  def testWriteStreamingOpenAndInsertedChunks(self):
+    proto = test_message_pb2.RepeatedRepeatedString(
+        rs=[test_message_pb2.RepeatedString(strings=["a", "b"])]
+    )
+    path = os.path.join(self.create_tempdir(), "split-open")
+    InsertingSplitter(proto).write(path, streaming=True)
+
+    with riegeli.RecordReader(open(f"{path}.cpb", "rb")) as reader:
+      records = list(reader.read_records())
+      metadata = chunk_pb2.ChunkMetadata()
+      metadata.ParseFromString(records[-1])
+      # The chunks are written in the order in which they are final, but the
+      # ChunkMetadata lists them in the order of the chunk indices:
+      # [initial proto, inserted chunk, open chunk].
+      self.assertLen(metadata.chunks, 3)
+      chunks = []
+      for chunk_info in metadata.chunks:
+        reader.seek_numeric(chunk_info.offset)
+        chunks.append(reader.read_record())
+    self.assertEqual(b"inserted", chunks[1])
+    self.assertEqual(
+        test_message_pb2.RepeatedString(strings=["a", "b", "c"]),
+        test_message_pb2.RepeatedString.FromString(chunks[2]),
+    )
+    self.assertEqual(
+        [2, 1],
+        [f.message.chunk_index for f in metadata.message.chunked_fields],
+    )
+
   def test_child_splitter(self):
     proto = test_message_pb2.RepeatedRepeatedString(
         rs=[
@@ -138,6 +190,19 @@ class SplitRepeatedStringTest(test.TestCase):
       child.write(path)
 
 
+class InsertingSplitter(split.ComposableSplitter):
+  """Adds an open chunk, then inserts a chunk before it."""
+
+  def build_chunks(self):
+    rs = test_message_pb2.RepeatedString()
+    self.add_chunk(rs, ["rs", 0], final=False)
+    self.add_chunk(b"inserted", ["rs", 0, "strings", 0], index=1)
+    rs.MergeFrom(self._proto.rs[0])
+    rs.strings.append("c")
+    self.finalize_chunk(rs)
+    self._proto.ClearField("rs")
+
+
 class NoOpSplitter(split.ComposableSplitter):
 
   def build_chunks(self):